@@ -0,0 +1,95 @@
+"""
+Benchmark: replay recorded agent runs (cassettes) through AgentGraphCore.
+
+Each cassette holds the LLM responses and tool results of one recorded run plus its initial
+state (record with LLM_CASSETTE_RECORD_DIR=<dir> set, see src/utils/cassette.py). Replaying
+with zero latency removes the model and the tools from the measurement, so wall time and
+CPU time are what the orchestrator itself costs: prompt building, parsing, routing and
+state handling. Node hops count the graph steps LangGraph executed.
+
+Run from the project root:
+    python benchmarks/bench_cassette_replay.py basic_logs/cassettes
+    python benchmarks/bench_cassette_replay.py run1.cassette.json.gz --runs 5 --latency original
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage  # noqa: E402
+
+from src.config import settings  # noqa: E402
+
+# normally set by ChatInitializer; replayed responses and prompts are wrapped in them, and the
+# tool wrappers read them at import time
+settings.HumanMessage, settings.AIMessage, settings.BaseMessage = HumanMessage, AIMessage, BaseMessage
+
+from src.agents.agentic_orchestrator.AgentGraphCore import AgentGraphCore  # noqa: E402
+from src.core.chat_initializer import ChatInitializer  # noqa: E402
+from src.utils.cassette import Cassette, CassetteFile  # noqa: E402
+
+# the planner lists the chat's tools (recorded prompts include them); register them without
+# starting MCP servers or Neo4j
+ChatInitializer.__new__(ChatInitializer).tools_register()
+
+
+def collect(paths: list[str]) -> list[Path]:
+    cassettes: list[Path] = []
+    for raw in paths:
+        path = Path(raw)
+        cassettes.extend(sorted(path.glob("*.cassette.json.gz")) if path.is_dir() else [path])
+    return cassettes
+
+
+def replay_once(graph, path: Path, latency: str, strict: bool) -> dict:
+    initial_state = CassetteFile.load(path).meta["initial_state"]
+    hops = 0
+    final_state: dict = {}
+    with Cassette.replay(path, latency=latency, strict=strict) as cassette:
+        wall_started, cpu_started = time.perf_counter(), time.process_time()
+        for mode, chunk in graph.stream(
+            initial_state,
+            config={"recursion_limit": settings.recursion_limit},
+            stream_mode=["updates", "values"],
+        ):
+            if mode == "updates":
+                hops += 1
+            else:
+                final_state = chunk
+        wall, cpu = time.perf_counter() - wall_started, time.process_time() - cpu_started
+    return {"wall": wall, "cpu": cpu, "hops": hops, "status": final_state.get("workflow_status", "UNKNOWN"),
+            **cassette.report()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("cassettes", nargs="+", help="cassette files or directories containing them")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--latency", choices=["zero", "original"], default="zero")
+    parser.add_argument("--strict", action="store_true", help="fail on calls missing from the cassette")
+    args = parser.parse_args()
+
+    graph = AgentGraphCore.build_graph()
+    print(f"{'cassette':<40} {'status':<10} {'hops':>5} {'wall s':>8} {'cpu s':>8} {'llm':>5} {'tool':>5} {'fuzzy':>6} {'miss':>5}")
+    totals = {"wall": 0.0, "cpu": 0.0, "hops": 0}
+    for path in collect(args.cassettes):
+        results = [replay_once(graph, path, args.latency, args.strict) for _ in range(args.runs)]
+        last = results[-1]
+        wall = statistics.median(r["wall"] for r in results)
+        cpu = statistics.median(r["cpu"] for r in results)
+        totals["wall"] += wall
+        totals["cpu"] += cpu
+        totals["hops"] += last["hops"]
+        print(
+            f"{path.name[:40]:<40} {last['status'][:10]:<10} {last['hops']:>5} {wall:>8.3f} {cpu:>8.3f} "
+            f"{last['llm_calls']:>5} {last['tool_calls']:>5} {last['fuzzy']:>6} {last['missed']:>5}"
+        )
+    print(f"{'total (median per cassette)':<40} {'':<10} {totals['hops']:>5} {totals['wall']:>8.3f} {totals['cpu']:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark: single-pass json_extractor vs. the previous convert_to_json scanning strategy.
+
+The legacy implementation below is a log-free copy of the algorithm convert_to_json used
+before the extractor (full json.loads, markdown regex, then separate brace and bracket
+loops calling json.loads on every balanced span).
+
+Run from the project root:
+    python benchmarks/bench_json_extraction.py
+    python benchmarks/bench_json_extraction.py --iterations 2000
+"""
+
+import argparse
+import json
+import re
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.utils.json_extractor import extract_json  # noqa: E402
+
+
+def legacy_convert_to_json(content: str):
+    try:
+        return json.loads(content)
+    except (json.JSONDecodeError, TypeError):
+        pass
+
+    markdown_match = re.search(r"```(?:json)?\s*(\{.*?\}|\[.*?\])\s*```", content, re.DOTALL)
+    if markdown_match:
+        try:
+            return json.loads(markdown_match.group(1))
+        except json.JSONDecodeError:
+            pass
+
+    json_objects = []
+    for opener, closer, kind in (("{", "}", "object"), ("[", "]", "array")):
+        depth = 0
+        start_pos = -1
+        for i, char in enumerate(content):
+            if char == opener:
+                if depth == 0:
+                    start_pos = i
+                depth += 1
+            elif char == closer:
+                depth -= 1
+                if depth == 0 and start_pos != -1:
+                    try:
+                        json_objects.append((kind, json.loads(content[start_pos : i + 1])))
+                    except json.JSONDecodeError:
+                        pass
+                    start_pos = -1
+
+    if json_objects:
+        json_objects.sort(key=lambda x: 0 if x[0] == "object" else 1)
+        return json_objects[0][1]
+    return {"content": content, "parsing_error": "Failed to extract valid JSON"}
+
+
+def build_payloads() -> dict[str, tuple[str, str, object]]:
+    """name -> (payload, key the correct answer contains, schema hint for the extractor)"""
+    answer = {"message_type": "tool", "reasoning": "The user asks for current information {live}."}
+    tool_echo = json.dumps(
+        {"results": [{"id": i, "title": f"doc {i}", "meta": {"tags": ["a", "b"], "score": i / 7}} for i in range(400)]}
+    )
+    plan = {"tasks": [{"task_id": i, "description": f"step {i}", "tool_name": "read_file"} for i in range(30)]}
+    return {
+        "clean_object": (json.dumps(answer), "message_type", None),
+        "fenced_with_prose": (
+            "Sure! Here is my answer:\n```json\n" + json.dumps(answer, indent=2) + "\n```\nLet me know.",
+            "message_type",
+            None,
+        ),
+        "large_tool_echo": ("The tool returned " + tool_echo + " so the plan is:\n" + json.dumps(plan), "tasks", {"tasks"}),
+        "brace_heavy_prose": ("Use {placeholders} like {name} and {x}. " * 200 + json.dumps(answer), "message_type", None),
+        "trailing_comma": ('{"goal_achieved": true, "confidence": 0.9, "reason": "done",}', "goal_achieved", None),
+        "truncated_tail": (json.dumps(plan)[:-40], "tasks", None),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{'payload':<20} {'chars':>8} {'legacy µs':>12} {'extractor µs':>14} {'speedup':>9}  correct (legacy / extractor)")
+    for name, (payload, expected_key, hint) in build_payloads().items():
+        legacy = timeit.timeit(lambda: legacy_convert_to_json(payload), number=args.iterations)
+        current = timeit.timeit(lambda: extract_json(payload, schema_hint=hint), number=args.iterations)
+        legacy_result = legacy_convert_to_json(payload)
+        extracted = extract_json(payload, schema_hint=hint)
+        legacy_ok = isinstance(legacy_result, dict) and expected_key in legacy_result
+        current_ok = extracted is not None and isinstance(extracted.value, dict) and expected_key in extracted.value
+        print(
+            f"{name:<20} {len(payload):>8} {legacy / args.iterations * 1e6:>12.1f} "
+            f"{current / args.iterations * 1e6:>14.1f} {legacy / current:>8.1f}x  {legacy_ok} / {current_ok}"
+        )
+
+
+if __name__ == "__main__":
+    main()
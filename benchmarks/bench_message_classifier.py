@@ -0,0 +1,95 @@
+"""
+Benchmark: local fast-path classifier vs. the LLM router on a labelled evaluation set.
+
+For the local classifier it reports overall accuracy, coverage (share of messages answered
+locally at the threshold), accuracy on the covered messages and per-message latency. With
+--llm the same messages also go through classify_message_type with the fast path disabled,
+which needs a reachable model endpoint (OPENAI_BASE_URL / OPENAI_API_KEY).
+
+The evaluation set (benchmarks/data/classifier_eval.jsonl) is disjoint from the seed set
+the local model is trained on.
+
+Run from the project root:
+    python benchmarks/bench_message_classifier.py
+    python benchmarks/bench_message_classifier.py --threshold 0.9 --llm
+    python benchmarks/bench_message_classifier.py --export-onnx message_classifier.onnx
+"""
+
+import argparse
+import io
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.config import settings  # noqa: E402
+from src.utils.fast_classifier import FastClassifier, export_onnx, load_examples  # noqa: E402
+
+EVAL_PATH = Path(__file__).resolve().parent / "data" / "classifier_eval.jsonl"
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def bench_local(examples: list[tuple[str, str]], threshold: float) -> None:
+    started = time.perf_counter()
+    FastClassifier.model()
+    print(f"training on seed set: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    results = [(FastClassifier.classify(text, threshold=threshold), label) for text, label in examples]
+    covered = [(result, label) for result, label in results if result.confident]
+    latencies = [result.latency_ms for result, _ in results]
+    print(f"local  accuracy {sum(r.label == l for r, l in results) / len(results):.3f}  "
+          f"coverage {len(covered) / len(results):.3f}  "
+          f"covered accuracy {sum(r.label == l for r, l in covered) / max(len(covered), 1):.3f}  "
+          f"latency p50 {statistics.median(latencies):.3f} ms p95 {percentile(latencies, 0.95):.3f} ms")
+    for result, label in results:
+        if result.label != label:
+            marker = "accepted" if result.confident else "fallback"
+            print(f"  miss [{marker}] expected {label:<5} got {result.label:<5} {result.confidence:.2f} {result.source}")
+
+
+def bench_llm(examples: list[tuple[str, str]]) -> None:
+    from langchain_core.messages import AIMessage, HumanMessage
+    from rich.console import Console
+
+    from src.agents.classify_agent import classify_message_type
+
+    settings.HumanMessage = settings.HumanMessage or HumanMessage
+    settings.AIMessage = settings.AIMessage or AIMessage
+    settings.console = settings.console or Console(file=io.StringIO())
+    settings.FAST_CLASSIFIER_ENABLED = False
+
+    correct, latencies = 0, []
+    for text, label in examples:
+        started = time.perf_counter()
+        predicted = classify_message_type({"messages": [HumanMessage(content=text)]})["message_type"]
+        latencies.append((time.perf_counter() - started) * 1000)
+        correct += predicted == label
+    print(f"llm    accuracy {correct / len(examples):.3f}  "
+          f"latency p50 {statistics.median(latencies):.0f} ms p95 {percentile(latencies, 0.95):.0f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--eval", default=str(EVAL_PATH), help="labelled JSON-lines file")
+    parser.add_argument("--threshold", type=float, default=settings.FAST_CLASSIFIER_THRESHOLD)
+    parser.add_argument("--llm", action="store_true", help="also run the LLM router (needs an endpoint)")
+    parser.add_argument("--export-onnx", metavar="PATH", help="write the trained model as ONNX (needs onnx)")
+    args = parser.parse_args()
+
+    examples = load_examples(args.eval)
+    print(f"{len(examples)} labelled messages, threshold {args.threshold}")
+    bench_local(examples, args.threshold)
+    if args.llm:
+        bench_llm(examples)
+    if args.export_onnx:
+        print(f"exported {export_onnx(FastClassifier.model(), args.export_onnx)}")
+
+
+if __name__ == "__main__":
+    main()
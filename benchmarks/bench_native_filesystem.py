@@ -0,0 +1,118 @@
+"""
+Benchmark: in-process filesystem tools vs. the same calls through the npx server-filesystem.
+
+Builds a temporary tree (nested source directories plus one large log file) and times each
+native tool call against the tools/call round trip over stdio to
+@modelcontextprotocol/server-filesystem. When the server cannot be started (no Node.js, or
+npx cannot fetch the package), only the native timings are printed.
+
+Run from the project root:
+    python benchmarks/bench_native_filesystem.py
+    python benchmarks/bench_native_filesystem.py --iterations 200 --log-mb 64
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.config import settings  # noqa: E402
+from src.mcp.native_filesystem import NativeFilesystem  # noqa: E402
+from src.mcp.transport import McpStdioTransport  # noqa: E402
+
+NATIVE_TOOLS = ["read_text_file", "read_file", "write_file", "list_directory", "search_files", "directory_tree"]
+
+
+def build_tree(root: Path, log_mb: int) -> None:
+    for package in range(20):
+        directory = root / "src" / f"pkg_{package}" / "sub"
+        directory.mkdir(parents=True)
+        for module in range(10):
+            (directory.parent / f"module_{module}.py").write_text(f"VALUE = {module}\n" * 50)
+            (directory / f"helper_{module}.py").write_text("pass\n")
+    line = b"2024-01-01T00:00:00 INFO request handled in 12ms\n"
+    with (root / "app.log").open("wb") as handle:
+        for _ in range(log_mb * 1024 * 1024 // len(line)):
+            handle.write(line)
+
+
+def build_calls(root: Path) -> dict[str, tuple[str, dict]]:
+    """name -> (tool, arguments)"""
+    return {
+        "read_small": ("read_text_file", {"path": str(root / "src" / "pkg_0" / "module_0.py")}),
+        "head_large_log": ("read_text_file", {"path": str(root / "app.log"), "head": 20}),
+        "tail_large_log": ("read_text_file", {"path": str(root / "app.log"), "tail": 20}),
+        "write_file": ("write_file", {"path": str(root / "scratch.txt"), "content": "x" * 4096}),
+        "list_directory": ("list_directory", {"path": str(root / "src" / "pkg_0")}),
+        "search_files": ("search_files", {"path": str(root), "pattern": "helper_9"}),
+        "directory_tree": ("directory_tree", {"path": str(root / "src")}),
+    }
+
+
+def start_server(root: Path) -> tuple[McpStdioTransport | None, str]:
+    npx = shutil.which("npx")
+    if npx is None:
+        return None, "npx not found"
+    transport = McpStdioTransport(
+        "filesystem", [npx, "-y", "@modelcontextprotocol/server-filesystem", str(root)], cwd=str(root)
+    )
+    try:
+        transport.start_sync()
+        transport.request_sync(
+            "initialize",
+            {"protocolVersion": "2024-11-05", "capabilities": {}, "clientInfo": {"name": "bench", "version": "1.0.0"}},
+            timeout=120,
+        )
+        transport.notify_sync("notifications/initialized")
+    except Exception as error:
+        transport.close_sync()
+        return None, str(error) or type(error).__name__
+    return transport, ""
+
+
+def time_calls(call, iterations: int) -> float:
+    """Mean seconds per call."""
+    call()  # warm up: first page cache and server JIT hits are not what is measured
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call()
+    return (time.perf_counter() - started) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--log-mb", type=int, default=32, help="size of the large log file")
+    args = parser.parse_args()
+
+    settings.MCP_CONFIG["MCP_NATIVE_FILESYSTEM_TOOLS"] = NATIVE_TOOLS
+    with tempfile.TemporaryDirectory() as temp:
+        root = Path(temp).resolve()
+        build_tree(root, args.log_mb)
+        config = {"args": ["-y", "@modelcontextprotocol/server-filesystem", str(root)]}
+        transport, reason = start_server(root)
+        if transport is None:
+            print(f"MCP path unavailable: {reason}\n")
+        try:
+            print(f"{'call':<16} {'native µs':>12} {'MCP µs':>12} {'speedup':>9}")
+            for name, (tool, arguments) in build_calls(root).items():
+                native = time_calls(lambda: NativeFilesystem.call(config, tool, arguments), args.iterations)
+                if transport is None:
+                    print(f"{name:<16} {native * 1e6:>12.1f} {'-':>12} {'-':>9}")
+                    continue
+                remote = time_calls(
+                    lambda: transport.request_sync("tools/call", {"name": tool, "arguments": arguments}, timeout=60),
+                    args.iterations,
+                )
+                print(f"{name:<16} {native * 1e6:>12.1f} {remote * 1e6:>12.1f} {remote / native:>8.1f}x")
+        finally:
+            if transport is not None:
+                transport.close_sync()
+
+
+if __name__ == "__main__":
+    main()
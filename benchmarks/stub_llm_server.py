@@ -0,0 +1,338 @@
+"""
+Local OpenAI-compatible stub LLM server for offline benchmarking.
+
+Speaks ``POST /v1/chat/completions`` (plain and ``stream=true`` server-sent events) and
+``GET /v1/models``. Responses come from a rule script: the first rule whose regex matches
+the request's messages answers it, with its own latency distribution, token rate and
+error injection (429, 502 and truncated JSON). Only the standard library is used, so the
+server runs anywhere the project does.
+
+Point the orchestrator at it with the OPENAI_BASE_URL setting:
+
+    python benchmarks/stub_llm_server.py --port 8808 --script benchmarks/stub_scripts/agent_workflow.json
+    OPENAI_BASE_URL=http://127.0.0.1:8808/v1 python src/main_orchestrator.py
+
+Rule script format (JSON):
+
+    {
+      "defaults": {"latency": {"dist": "lognormal", "median": 0.6, "sigma": 0.4},
+                   "tokens_per_s": 80, "errors": {"429": 0.0, "502": 0.0, "truncate": 0.0}},
+      "rules": [
+        {"name": "planner", "match": "strategic planner", "response": [{"task_id": 1, ...}]},
+        {"name": "chat", "match": ".*", "responses": ["first answer", "second answer"]}
+      ]
+    }
+
+``response`` may be a string or any JSON value (sent as its JSON text); ``responses`` are
+served in turn. Latency ``dist`` is ``fixed`` (value), ``uniform`` (low, high),
+``normal`` (mean, stddev) or ``lognormal`` (median, sigma). Rules override the defaults
+key by key.
+
+Usage from code (e.g. a benchmark):
+    with StubLLMServer(script) as server:
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Iterator, Optional, Union
+
+DEFAULT_SCRIPT = Path(__file__).resolve().parent / "stub_scripts" / "agent_workflow.json"
+
+_DEFAULTS: dict[str, Any] = {
+    "latency": {"dist": "fixed", "value": 0.0},
+    "tokens_per_s": 0,  # 0 = send the whole answer at once
+    "errors": {"429": 0.0, "502": 0.0, "truncate": 0.0},
+}
+
+
+@dataclass
+class StubRule:
+    """One scripted answer (or rotation of answers) for requests matching a pattern."""
+
+    name: str
+    pattern: re.Pattern
+    responses: list[str]
+    latency: dict[str, Any]
+    tokens_per_s: float
+    errors: dict[str, float]
+    _turn: Iterator[int] = field(default_factory=itertools.count, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def next_response(self) -> str:
+        with self._lock:
+            return self.responses[next(self._turn) % len(self.responses)]
+
+
+@dataclass
+class StubStats:
+    """Requests served per rule and injected errors (exposed on GET /stats)."""
+
+    requests: dict[str, int] = field(default_factory=dict)
+    injected: dict[str, int] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def count(self, bucket: str, key: str) -> None:
+        with self._lock:
+            target = getattr(self, bucket)
+            target[key] = target.get(key, 0) + 1
+
+    def as_dict(self) -> dict[str, Any]:
+        with self._lock:
+            return {"requests": dict(self.requests), "injected": dict(self.injected)}
+
+
+def load_rules(script: Union[str, Path, dict, None]) -> list[StubRule]:
+    """Build rules from a script dict or JSON file (None loads the default agent-workflow script)."""
+    if not isinstance(script, dict):
+        script = json.loads(Path(script or DEFAULT_SCRIPT).read_text(encoding="utf-8"))
+    defaults = {**_DEFAULTS, **script.get("defaults", {})}
+    rules = []
+    for index, raw in enumerate(script.get("rules", [])):
+        answers = raw["responses"] if "responses" in raw else [raw.get("response", "")]
+        rules.append(
+            StubRule(
+                name=raw.get("name", f"rule_{index}"),
+                pattern=re.compile(raw.get("match", ".*"), re.IGNORECASE | re.DOTALL),
+                responses=[a if isinstance(a, str) else json.dumps(a) for a in answers],
+                latency=raw.get("latency", defaults["latency"]),
+                tokens_per_s=raw.get("tokens_per_s", defaults["tokens_per_s"]),
+                errors={**defaults["errors"], **raw.get("errors", {})},
+            )
+        )
+    return rules
+
+
+def sample_latency(spec: dict[str, Any], rng: random.Random) -> float:
+    dist = spec.get("dist", "fixed")
+    if dist == "uniform":
+        value = rng.uniform(spec.get("low", 0.0), spec.get("high", 0.0))
+    elif dist == "normal":
+        value = rng.gauss(spec.get("mean", 0.0), spec.get("stddev", 0.0))
+    elif dist == "lognormal":
+        value = rng.lognormvariate(math.log(max(spec.get("median", 0.1), 1e-6)), spec.get("sigma", 0.0))
+    else:
+        value = spec.get("value", 0.0)
+    return max(float(value), 0.0)
+
+
+def approx_tokens(text: str) -> int:
+    """Rough token count (about four characters per token) for usage and pacing."""
+    return max(1, math.ceil(len(text) / 4)) if text else 0
+
+
+class StubLLMServer:
+    """Threaded stub server; use as a context manager or call start()/stop()."""
+
+    def __init__(
+        self,
+        script: Union[str, Path, dict, None] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: Optional[int] = None,
+        latency_scale: float = 1.0,
+    ):
+        self.rules = load_rules(script)
+        self.rng = random.Random(seed)
+        self.latency_scale = latency_scale
+        self.stats = StubStats()
+        self._httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "StubLLMServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="stub-llm-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "StubLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def match(self, messages: list[dict[str, Any]]) -> Optional[StubRule]:
+        transcript = "\n".join(str(message.get("content", "")) for message in messages)
+        return next((rule for rule in self.rules if rule.pattern.search(transcript)), None)
+
+    def roll(self, probability: float) -> bool:
+        return probability > 0 and self.rng.random() < probability
+
+
+def _make_handler(server: StubLLMServer) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format: str, *args: Any) -> None:  # keep benchmark output clean
+            pass
+
+        def do_GET(self) -> None:
+            if self.path.rstrip("/").endswith("/models"):
+                self._send_json(200, {"object": "list", "data": [{"id": "stub", "object": "model", "owned_by": "stub"}]})
+            elif self.path.rstrip("/").endswith("/stats"):
+                self._send_json(200, server.stats.as_dict())
+            else:
+                self._send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+
+        def do_POST(self) -> None:
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                body = json.loads(self.rfile.read(length) or b"{}")
+            except json.JSONDecodeError:
+                self._send_json(400, {"error": {"message": "invalid JSON body", "type": "invalid_request_error"}})
+                return
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+                return
+
+            messages = body.get("messages", [])
+            rule = server.match(messages)
+            rule_name = rule.name if rule else "unmatched"
+            server.stats.count("requests", rule_name)
+            time.sleep(sample_latency(rule.latency if rule else _DEFAULTS["latency"], server.rng) * server.latency_scale)
+
+            errors = rule.errors if rule else _DEFAULTS["errors"]
+            if server.roll(errors.get("429", 0.0)):
+                server.stats.count("injected", "429")
+                self._send_json(
+                    429,
+                    {"error": {"message": "Rate limit exceeded (injected)", "type": "rate_limit_error"}},
+                    headers={"Retry-After": "1"},
+                )
+                return
+            if server.roll(errors.get("502", 0.0)):
+                server.stats.count("injected", "502")
+                self._send_json(502, {"error": {"message": "Bad Gateway (injected)", "type": "server_error"}})
+                return
+
+            content = rule.next_response() if rule else "OK."
+            if server.roll(errors.get("truncate", 0.0)):
+                server.stats.count("injected", "truncate")
+                content = content[: max(1, int(len(content) * server.rng.uniform(0.3, 0.9)))]
+
+            model = body.get("model", "stub")
+            prompt_tokens = sum(approx_tokens(str(m.get("content", ""))) for m in messages)
+            tokens_per_s = rule.tokens_per_s if rule else 0
+            if body.get("stream"):
+                self._stream(model, content, tokens_per_s, prompt_tokens, body.get("stream_options") or {})
+            else:
+                if tokens_per_s:
+                    time.sleep(approx_tokens(content) / tokens_per_s * server.latency_scale)
+                self._send_json(200, _completion(model, content, prompt_tokens))
+
+        def _stream(
+            self, model: str, content: str, tokens_per_s: float, prompt_tokens: int, stream_options: dict
+        ) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+            pieces = re.findall(r"\S+\s*|\s+", content) or [""]
+            self._event(_chunk(completion_id, model, {"role": "assistant", "content": ""}))
+            for piece in pieces:
+                if tokens_per_s:
+                    time.sleep(approx_tokens(piece) / tokens_per_s * server.latency_scale)
+                self._event(_chunk(completion_id, model, {"content": piece}))
+            self._event(_chunk(completion_id, model, {}, finish_reason="stop"))
+            if stream_options.get("include_usage"):
+                usage_chunk = _chunk(completion_id, model, {}, finish_reason=None)
+                usage_chunk["choices"] = []
+                usage_chunk["usage"] = _usage(prompt_tokens, approx_tokens(content))
+                self._event(usage_chunk)
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+            self.close_connection = True
+
+        def _event(self, payload: dict) -> None:
+            self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode())
+            self.wfile.flush()
+
+        def _send_json(self, status: int, payload: dict, headers: Optional[dict[str, str]] = None) -> None:
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Handler
+
+
+def _usage(prompt_tokens: int, completion_tokens: int) -> dict[str, int]:
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+def _completion(model: str, content: str, prompt_tokens: int) -> dict[str, Any]:
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}
+        ],
+        "usage": _usage(prompt_tokens, approx_tokens(content)),
+    }
+
+
+def _chunk(completion_id: str, model: str, delta: dict, finish_reason: Optional[str] = None) -> dict[str, Any]:
+    return {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8808)
+    parser.add_argument("--script", default=str(DEFAULT_SCRIPT), help="rule script (JSON)")
+    parser.add_argument("--seed", type=int, default=None, help="seed latency and error sampling")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="multiply every sampled delay")
+    args = parser.parse_args()
+
+    server = StubLLMServer(args.script, args.host, args.port, args.seed, args.latency_scale).start()
+    print(f"Stub LLM server on {server.base_url} ({len(server.rules)} rules) - Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,7 @@ from langchain_core.documents import Document
 # ✅ LOCAL IMPORTS (lightweight)
 from src.RAG.RAG_FILES import neo4j_rag
 from src.config import settings
+from src.utils.llm_scheduler import LLMScheduler, Priority
 from src.utils.model_manager import ModelManager
 import pathlib
 
@@ -471,8 +472,9 @@ async def process_chunks_with_immediate_saving(
             start_time_u_s = asyncio.get_event_loop().time()
 
             try:
-                # Call Gemini API (properly awaiting the async function)
-                result = await function(chunk)
+                # Call the extraction function; ingestion yields to chat turns (only OpenAI calls are scheduled)
+                with LLMScheduler.priority(Priority.BACKGROUND):
+                    result = await function(chunk)
 
                 # Log completion with timing information
                 duration = asyncio.get_event_loop().time() - start_time_u_s
@@ -17,7 +17,10 @@ Usage:
 
 import re
 import sys
+import time
 import unicodedata
+from contextlib import nullcontext
+from pathlib import Path
 
 # 🔄 HIERARCHICAL AGENT INTEGRATION: Import AgentGraphCore for complex workflows
 from src.agents.agentic_orchestrator.AgentGraphCore import (
@@ -34,6 +37,11 @@ from src.ui.diagnostics.rich_traceback_manager import (
     RichTracebackManager,
     rich_exception_handler,
 )
+from src.utils.cassette import Cassette
+from src.utils.llm_scheduler import LLMScheduler, Priority
+from src.utils.llm_usage import LLMUsage
+from src.utils.model_cascade import ModelCascade
+from src.utils.structured_output import StructuredOutput
 
 
 def normalize_utf8_text(text: str) -> str:
@@ -92,6 +100,14 @@ def formated_final_response(create_display_response: str) -> str:
     return create_display_response
 
 
+def _cassette_recording(initial_state: dict):
+    """Record the run's LLM and tool calls when LLM_CASSETTE_RECORD_DIR is set (replay: benchmarks/bench_cassette_replay.py)."""
+    if not settings.LLM_CASSETTE_RECORD_DIR or Cassette.active():
+        return nullcontext()
+    path = Path(settings.LLM_CASSETTE_RECORD_DIR) / f"agent_run_{time.strftime('%Y%m%d_%H%M%S')}.cassette.json.gz"
+    return Cassette.record(path, meta={"initial_state": initial_state})
+
+
 @rich_exception_handler("Agent Node Processing")
 def agent_node(state):
     from src.ui.print_message_style import print_message
@@ -159,10 +175,14 @@ def agent_node(state):
         final_response = None
         final_state = None
 
+        # every LLM call made by the graph is accounted to this workflow (per node and model)
+        usage_token = LLMUsage.start_workflow("agent_node")
         try:
             graph = AgentGraphCore.build_graph()
             # Correct way to set recursion limit in LangGraph
-            final_state = graph.invoke(initial_state, config={"recursion_limit": settings.recursion_limit})
+            # agent workflows yield to interactive turns but still beat background requests
+            with LLMScheduler.priority(Priority.AGENT), _cassette_recording(initial_state):
+                final_state = graph.invoke(initial_state, config={"recursion_limit": settings.recursion_limit})
 
             # Debug: Log the complete final_state structure
             debug_info(
@@ -193,6 +213,9 @@ def agent_node(state):
                     "final_response_type": type(final_response).__name__ if final_response else "None"
                 },
             )
+            ModelCascade.log_report()
+            StructuredOutput.log_report()
+            LLMScheduler.log_report()
 
         except Exception as workflow_error:
             debug_error(
@@ -214,6 +237,10 @@ def agent_node(state):
                     "reason": "Exception during graph execution"
                 }
             }
+        finally:
+            usage = LLMUsage.end_workflow(usage_token)
+            LLMUsage.log_summary(usage)
+            LLMUsage.export_jsonl(usage)
 
         # Handle workflow failure: log critical info but do NOT overwrite the final_response provided by the LLM.
         if "workflow_status" in locals() and workflow_status != "COMPLETED":
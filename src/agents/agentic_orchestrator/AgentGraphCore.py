@@ -1,3 +1,4 @@
+import functools
 import uuid
 from typing import TYPE_CHECKING, Any, Literal
 
@@ -35,7 +36,11 @@ except Exception:
     def debug_error(*args, **kwargs):
         return None
 from ...utils.argument_schema_util import get_tool_argument_schema
+from ...utils.cassette import TOOL, Cassette
+from ...utils.llm_usage import LLMUsage
+from ...utils.model_cascade import ModelCascade
 from ...utils.model_manager import ModelManager
+from ...utils.plan_stream import PlanStream
 
 # Forward reference for TASK to avoid circular import issues
 
@@ -149,6 +154,19 @@ class AgentState(BaseModel):
     persona: str | None = Field(default=None, description="The persona for the next action")
 
 
+class ComplexityAnalysisResult(BaseModel):
+    """Structured output of the complexity analyzer."""
+    requires_decomposition: bool = Field(..., description="True if the task must be split into sub-tasks")
+    reasoning: str = Field(default="", description="Why the decision was made")
+    atomic_tool_name: str | None = Field(default=None, description="Tool that completes the task in one call")
+
+
+class GoalValidationResult(BaseModel):
+    """Structured output of the goal validator."""
+    goal_achieved: bool = Field(..., description="True if the task result achieves the task goal")
+    reasoning: str = Field(default="", description="A brief, clear explanation for the decision")
+
+
 class WorkflowStateModel(BaseModel):
     tasks: list[TASK]
     current_task_id: str | int | float
@@ -409,14 +427,24 @@ class AgentCoreHelpers:
                 ["tool1", "tool2", "tool3"]
                 '''
 
-            model = ModelManager()
-            response = model.invoke([
-                {"role": "system",
-                 "content": "You are a tool recommendation expert. Select the most relevant tools for the given task."},
-                {"role": "user", "content": recommend_prompt},
-            ])
+            recommender_system_prompt = "You are a tool recommendation expert. Select the most relevant tools for the given task."
 
-            recommended_tools = ModelManager.convert_to_json(response.content)
+            def recommend_with_large_model():
+                model = ModelManager()
+                response = model.invoke([
+                    {"role": "system", "content": recommender_system_prompt},
+                    {"role": "user", "content": recommend_prompt},
+                ])
+                return ModelManager.convert_to_json(response.content)
+
+            recommended_tools = ModelCascade.run(
+                "tool_recommender",
+                recommender_system_prompt,
+                recommend_prompt,
+                escalate=recommend_with_large_model,
+                validator=lambda r: isinstance(r, list) and any(
+                    t in all_tool_names or t == "perform_synthesis" for t in r),
+            )
 
             # Validate and filter
             if isinstance(recommended_tools, list):
@@ -1125,7 +1153,21 @@ class AgentCoreHelpers:
             Implementation notes:
             - Use `multiprocessing` or `concurrent.futures.ProcessPoolExecutor` to isolate execution.
             - Ensure proper cleanup of processes and robust exception handling to avoid resource leaks.
+            - When a cassette is recording or replaying, the (success, result) pair is captured/served by it.
             """
+            if Cassette.active():
+                return Cassette.through(
+                    TOOL,
+                    tool_name,
+                    {"tool": tool_name, "parameters": parameters},
+                    lambda: AgentCoreHelpers.ToolExecutionHelpers._execute_with_timeout(parameters, tool_name, timeout),
+                    encode=list,
+                    decode=tuple,
+                )
+            return AgentCoreHelpers.ToolExecutionHelpers._execute_with_timeout(parameters, tool_name, timeout)
+
+        @staticmethod
+        def _execute_with_timeout(parameters: dict, tool_name: str, timeout: int) -> tuple[bool, str]:
             from concurrent.futures import ThreadPoolExecutor, TimeoutError
 
             executor = ThreadPoolExecutor(max_workers=1)
@@ -1168,13 +1210,21 @@ class AgentCoreHelpers:
                 task.description, task.tool_name, tool_schema, task.depth, parent_context=spawn_reason
             )
 
-            model = ModelManager()
-            response = model.invoke([
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": human_prompt},
-            ])
-
-            analysis_result = ModelManager.convert_to_json(response.content)
+            def analyze_with_large_model():
+                model = ModelManager()
+                response = model.invoke([
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": human_prompt},
+                ], response_format=ComplexityAnalysisResult, call_site="complexity_analyzer")
+                return ModelManager.convert_to_json(response.content, schema_hint=ComplexityAnalysisResult)
+
+            analysis_result = ModelCascade.run(
+                "complexity_analyzer",
+                system_prompt,
+                human_prompt,
+                escalate=analyze_with_large_model,
+                validator=lambda r: isinstance(r, dict) and "requires_decomposition" in r,
+            )
 
             if not isinstance(analysis_result, dict) or "requires_decomposition" not in analysis_result:
                 simple_tools = ["list_directory", "read_text_file", "write_file", "create_directory", "google_search"]
@@ -1228,19 +1278,201 @@ class AgentGraphCore:
     # TODO we need to fix ~updated task thing and iteration to find the current task in the task list
     # :-- current_task = next((task for task in updated_tasks if task.task_id == current_task_id), None)
 
+    @classmethod
+    def __validate_plan_item(cls, item_idx: int, item: Any, safe_tool_names: list[str]) -> tuple[dict | None, str | None, str | None]:
+        """Validates one planned task and corrects its tool name.
+
+        Returns (item, None, None) for a valid task, otherwise (None, invalid_tool_name, validation_error_details).
+        """
+        if not isinstance(item, dict):
+            return None, f"Item at index {item_idx} is not a dictionary: {item}", None
+
+        if "tool_name" not in item:
+            return None, f"Task at index {item_idx} missing 'tool_name' key", None
+
+        if "description" not in item:
+            return None, f"Task at index {item_idx} missing 'description' key", None
+
+        # NEW: Capture the high-fidelity flag from the plan
+        requires_high_fidelity = item.get("requires_high_fidelity_context", False)
+
+        original_tool_name = item.get("tool_name")  # Use .get() for safety
+        if not original_tool_name:
+            return None, f"Task at index {item_idx} has empty or null 'tool_name'", None
+
+        tool_name_lower = original_tool_name.lower()
+
+        if tool_name_lower not in safe_tool_names:
+            # Get available tools for better error message
+            available_tools = ", ".join(
+                [t.name for t in AgentCoreHelpers.get_safe_tools_list()][:10])  # Show first 10 tools
+            return None, original_tool_name, f"Tool '{original_tool_name}' not found. Available tools: {available_tools}"
+
+        # Handle case correction and virtual tool
+        if tool_name_lower == "perform_synthesis":
+            item["tool_name"] = "perform_synthesis"
+        else:
+            # It's a real tool, find the correct case-sensitive name
+            correct_tool_name = next(
+                (t.name for t in AgentCoreHelpers.get_safe_tools_list() if t.name.lower() == tool_name_lower),
+                None)
+            # If we couldn't find an exact match, try a more lenient matching approach
+            if correct_tool_name is None:
+                # Try to find a tool that contains the tool name (for partial matches)
+                correct_tool_name = next((t.name for t in AgentCoreHelpers.get_safe_tools_list() if
+                                          tool_name_lower in t.name.lower() or t.name.lower() in tool_name_lower),
+                                         None)
+
+            # If we still couldn't find it, keep the original name but validate it exists
+            if correct_tool_name is None:
+                # Check if the original tool name exists in the safe tool list (case-insensitive)
+                tool_exists = any(
+                    t.name.lower() == tool_name_lower for t in AgentCoreHelpers.get_safe_tools_list())
+                if tool_exists:
+                    correct_tool_name = original_tool_name  # Keep original case
+
+            item["tool_name"] = correct_tool_name
+
+        # Final check to ensure a valid tool name was assigned before appending
+        if item["tool_name"] is None:
+            return None, original_tool_name, None  # Use the original name in the error
+
+        # Add the high-fidelity flag to the validated task item
+        item['requires_high_fidelity_context'] = requires_high_fidelity
+        return item, None, None
+
+    @staticmethod
+    def __plan_feedback(invalid_tool_name: str, validation_error_details: str | None) -> str:
+        """Feedback for the next planning attempt after an invalid task."""
+        if validation_error_details:
+            return f"You previously planned to use the tool '{invalid_tool_name}', which is not a valid tool. {validation_error_details}. Please only use tools from the provided list and ensure correct spelling and capitalization."
+        return f"You previously planned to use the tool '{invalid_tool_name}', which is not a valid tool. Please only use tools from the provided list and ensure correct spelling and capitalization."
+
+    @staticmethod
+    def __plan_task(idx: int, item: dict, skip_threshold: int) -> "TASK":
+        """Builds the TASK for the validated plan item at position ``idx``, applying the pre-flight skip threshold."""
+        skip_probability = item.get("skip_probability", 0)
+        skip_reason = item.get("skip_reason", "")
+
+        # Determine initial status based on skip probability
+        initial_status: Literal["pending", "skip"] = "skip" if skip_probability >= skip_threshold else "pending"
+
+        # Log skip decisions for visibility
+        if initial_status == "skip":
+            debug_info("Initial Planner - Pre-Flight Skip",
+                      f"Task {idx + 1} marked as SKIP (probability: {skip_probability}%): {item['description'][:60]}...",
+                      metadata={
+                          "task_id": str(idx + 1),
+                          "skip_reason": skip_reason,
+                          "skip_probability": skip_probability,
+                          "threshold": skip_threshold
+                      })
+
+        return TASK(
+            task_id=str(idx + 1),
+            description=item["description"],
+            tool_name=item["tool_name"],
+            status=initial_status,  # 🔥 Set status based on skip probability
+            requires_high_fidelity_context=item.get("requires_high_fidelity_context", False),
+            required_context=REQUIRED_CONTEXT(
+                source_node="initial_planner",
+                pre_execution_context={
+                    "skip_probability": skip_probability,
+                    "skip_reason": skip_reason
+                } if skip_probability > 0 else None
+            ),
+        )
+
+    @classmethod
+    def __stream_initial_plan(cls, messages: list[dict], safe_tool_names: list[str], skip_threshold: int,
+                              goal: str, detailed_tool_context: Any) -> tuple[PlanStream, list[str]]:
+        """Streams the planner response; every array element is validated, deduplicated and turned
+        into a TASK the moment it closes, so execution can start before the plan is complete.
+        Tasks dropped as invalid are replanned once the stream ends, with the same feedback as the
+        blocking retry. Returns the plan and the feedback collected for dropped tasks.
+        """
+        seen_descriptions = set()
+        rejected = []
+
+        def accept(item_idx: int, item: Any) -> "TASK | None":
+            validated_item, invalid_tool_name, validation_error_details = cls.__validate_plan_item(
+                item_idx, item, safe_tool_names)
+            if validated_item is None:
+                rejected.append(cls.__plan_feedback(invalid_tool_name, validation_error_details))
+                debug_warning("Initial Planner", f"Dropped streamed task {item_idx + 1}: {rejected[-1]}",
+                              metadata={"item_index": item_idx})
+                return None
+            # Remove duplicates: the first task with a description wins, as in the blocking path
+            if validated_item["description"] in seen_descriptions:
+                return None
+            seen_descriptions.add(validated_item["description"])
+            return cls.__plan_task(len(seen_descriptions) - 1, validated_item, skip_threshold)
+
+        def produce(plan: PlanStream):
+            for part in ModelManager().stream(messages):
+                yield part.content or ""
+
+        def replan(plan: PlanStream) -> list | None:
+            # Nothing accepted means the planner retries the whole plan itself (blocking path)
+            if not rejected or not plan.accepted:
+                return None
+            error_feedback = (f"{rejected[0]} These tasks are already planned and running, do not repeat them: "
+                              f"{sorted(seen_descriptions)}. Return only the remaining tasks.")
+            debug_warning("Initial Planner", f"Replanning {len(rejected)} dropped streamed task(s). Feedback: {error_feedback}",
+                          metadata={"rejected": len(rejected), **plan.report()})
+            system_prompt, human_prompt = HierarchicalAgentPrompt().generate_tool_aware_initial_plan_prompt(
+                goal, detailed_tool_context, error_feedback=error_feedback)
+            response = ModelManager().invoke([
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": human_prompt},
+            ])
+            items = ModelManager.convert_to_json(response.content)
+            # All or nothing, like a blocking attempt: a replan with an invalid task is not used
+            invalid = [] if isinstance(items, list) else ["The response was not a valid JSON array of tasks."]
+            for item_idx, item in enumerate(items if isinstance(items, list) else []):
+                validated_item, invalid_tool_name, validation_error_details = cls.__validate_plan_item(
+                    item_idx, item, safe_tool_names)
+                if validated_item is None:
+                    invalid.append(cls.__plan_feedback(invalid_tool_name, validation_error_details))
+                    break
+            if invalid:
+                plan.error = ValueError(f"Replan of dropped streamed tasks failed: {invalid[0]}")
+                debug_error("Initial Planner", f"Could not replan the dropped streamed tasks; the plan is missing "
+                            f"{len(rejected)} task(s). {invalid[0]}", metadata={"rejected": rejected})
+                return None
+            rejected.clear()
+            return items
+
+        return PlanStream(accept, replan).start(produce), rejected
+
     @classmethod
     def __subAGENT_initial_planner(cls, state: "WorkflowStateModel") -> dict:
-        """Creates high-level plan using tool pre-filtering and self-healing for efficiency."""
+        """Creates high-level plan using tool pre-filtering and self-healing for efficiency.
+
+        With PLANNER_STREAMING_ENABLED the first attempt is streamed: the workflow continues as soon
+        as the first task validates and the task planner collects the rest as they arrive (PlanStream).
+        Invalid tasks in the stream are replanned with validation feedback instead of being dropped.
+        """
         AgentStatusUpdater.update_status('Initial Planner')
         goal = state.original_goal
         debug_info("--- NODE: Initial Planner ---", f"Decomposing goal: {goal}",
                    metadata={"function name": "__subAGENT_initial_planner", "original_goal": goal})
+        PlanStream.clear()
 
         llm_returned = []
         validated_tasks = []
+        streamed_tasks = []
         error_feedback = None
         plan_is_valid = False
 
+        # Using a safe list of tool names for case-insensitive comparison
+        safe_tool_names = [tool.name.lower() for tool in AgentCoreHelpers.get_safe_tools_list()]
+        # Add our virtual tool to the list of valid names for the planner's validation step
+        safe_tool_names.append("perform_synthesis")
+
+        # Get skip threshold from settings (default 70)
+        skip_threshold = getattr(settings, 'SKIP_THRESHOLD', 70)
+
         for attempt in range(2):  # Try to generate a valid plan up to 2 times
             debug_info("Initial Planner", f"Planning attempt {attempt + 1}", metadata={"attempt": attempt + 1})
 
@@ -1255,12 +1487,30 @@ class AgentGraphCore:
                 detailed_tool_context,
                 error_feedback=error_feedback  # Pass feedback from previous failed attempt
             )
-
-            model = ModelManager()
-            response = model.invoke([
+            messages = [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": human_prompt},
-            ])
+            ]
+
+            # Streamed attempt (not while recording/replaying a cassette, which captures invoke() calls only)
+            if attempt == 0 and settings.PLANNER_STREAMING_ENABLED and not Cassette.active():
+                plan, rejected = cls.__stream_initial_plan(messages, safe_tool_names, skip_threshold,
+                                                           goal, detailed_tool_context)
+                streamed_tasks = plan.wait(timeout=settings.PLANNER_STREAM_DEADLINE)
+                if streamed_tasks:
+                    PlanStream.activate(plan)
+                    debug_info("Initial Planner", f"Starting with {len(streamed_tasks)} streamed task(s) while the plan is still generating.",
+                               metadata={"attempt": attempt + 1, **plan.report()})
+                    break
+                plan.cancel()
+                error_feedback = rejected[0] if rejected else "The response was not a valid JSON array of tasks. Please format the output correctly."
+                debug_warning("Initial Planner",
+                              f"Invalid plan generated on attempt {attempt + 1}. Feedback: {error_feedback}",
+                              metadata={"attempt": attempt + 1, **plan.report()})
+                continue
+
+            model = ModelManager()
+            response = model.invoke(messages)
             llm_returned = ModelManager.convert_to_json(response.content)
 
             # Basic validation of response format
@@ -1274,81 +1524,13 @@ class AgentGraphCore:
             invalid_tool_name = None
             validation_error_details = None
 
-            # Using a safe list of tool names for case-insensitive comparison
-            safe_tool_names = [tool.name.lower() for tool in AgentCoreHelpers.get_safe_tools_list()]
-            # Add our virtual tool to the list of valid names for the planner's validation step
-            safe_tool_names.append("perform_synthesis")
-
             for item_idx, item in enumerate(llm_returned):
-                if not isinstance(item, dict):
+                validated_item, invalid_tool_name, validation_error_details = cls.__validate_plan_item(
+                    item_idx, item, safe_tool_names)
+                if validated_item is None:
                     has_invalid_tool = True
-                    invalid_tool_name = f"Item at index {item_idx} is not a dictionary: {item}"
                     break
-
-                if "tool_name" not in item:
-                    has_invalid_tool = True
-                    invalid_tool_name = f"Task at index {item_idx} missing 'tool_name' key"
-                    break
-
-                if "description" not in item:
-                    has_invalid_tool = True
-                    invalid_tool_name = f"Task at index {item_idx} missing 'description' key"
-                    break
-
-                # NEW: Capture the high-fidelity flag from the plan
-                requires_high_fidelity = item.get("requires_high_fidelity_context", False)
-
-                original_tool_name = item.get("tool_name")  # Use .get() for safety
-                if not original_tool_name:
-                    has_invalid_tool = True
-                    invalid_tool_name = f"Task at index {item_idx} has empty or null 'tool_name'"
-                    break
-
-                tool_name_lower = original_tool_name.lower()
-
-                if tool_name_lower not in safe_tool_names:
-                    has_invalid_tool = True
-                    invalid_tool_name = original_tool_name
-                    # Get available tools for better error message
-                    available_tools = ", ".join(
-                        [t.name for t in AgentCoreHelpers.get_safe_tools_list()][:10])  # Show first 10 tools
-                    validation_error_details = f"Tool '{original_tool_name}' not found. Available tools: {available_tools}"
-                    break
-
-                # Handle case correction and virtual tool
-                if tool_name_lower == "perform_synthesis":
-                    item["tool_name"] = "perform_synthesis"
-                else:
-                    # It's a real tool, find the correct case-sensitive name
-                    correct_tool_name = next(
-                        (t.name for t in AgentCoreHelpers.get_safe_tools_list() if t.name.lower() == tool_name_lower),
-                        None)
-                    # If we couldn't find an exact match, try a more lenient matching approach
-                    if correct_tool_name is None:
-                        # Try to find a tool that contains the tool name (for partial matches)
-                        correct_tool_name = next((t.name for t in AgentCoreHelpers.get_safe_tools_list() if
-                                                  tool_name_lower in t.name.lower() or t.name.lower() in tool_name_lower),
-                                                 None)
-
-                    # If we still couldn't find it, keep the original name but validate it exists
-                    if correct_tool_name is None:
-                        # Check if the original tool name exists in the safe tool list (case-insensitive)
-                        tool_exists = any(
-                            t.name.lower() == tool_name_lower for t in AgentCoreHelpers.get_safe_tools_list())
-                        if tool_exists:
-                            correct_tool_name = original_tool_name  # Keep original case
-
-                    item["tool_name"] = correct_tool_name
-
-                # Final check to ensure a valid tool name was assigned before appending
-                if item["tool_name"] is None:
-                    has_invalid_tool = True
-                    invalid_tool_name = original_tool_name  # Use the original name in the error
-                    break
-
-                # Add the high-fidelity flag to the validated task item
-                item['requires_high_fidelity_context'] = requires_high_fidelity
-                current_validated_tasks.append(item)
+                current_validated_tasks.append(validated_item)
 
             if not has_invalid_tool:
                 plan_is_valid = True
@@ -1357,16 +1539,16 @@ class AgentGraphCore:
                 break  # Exit loop on success
             else:
                 # Create feedback for the next attempt
-                if validation_error_details:
-                    error_feedback = f"You previously planned to use the tool '{invalid_tool_name}', which is not a valid tool. {validation_error_details}. Please only use tools from the provided list and ensure correct spelling and capitalization."
-                else:
-                    error_feedback = f"You previously planned to use the tool '{invalid_tool_name}', which is not a valid tool. Please only use tools from the provided list and ensure correct spelling and capitalization."
+                error_feedback = cls.__plan_feedback(invalid_tool_name, validation_error_details)
                 debug_warning("Initial Planner",
                               f"Invalid plan generated on attempt {attempt + 1}. Feedback: {error_feedback}",
                               metadata={"attempt": attempt + 1})
 
         # After the loop, proceed with a valid plan or use the final fallback
-        if plan_is_valid:
+        if streamed_tasks:
+            # the remaining streamed tasks are collected by the task planner as they arrive
+            actual_tasks = streamed_tasks
+        elif plan_is_valid:
             # Remove duplicates from the successfully validated plan
             filtered_tasks = []
             seen_descriptions = set()
@@ -1393,43 +1575,7 @@ class AgentGraphCore:
             #     # Defensive: never fail planning because of enforcement
             #     pass
 
-            # Get skip threshold from settings (default 70)
-            skip_threshold = getattr(settings, 'SKIP_THRESHOLD', 70)
-
-            actual_tasks = []
-            for idx, item in enumerate(filtered_tasks):
-                skip_probability = item.get("skip_probability", 0)
-                skip_reason = item.get("skip_reason", "")
-
-                # Determine initial status based on skip probability
-                initial_status: Literal["pending", "skip"] = "skip" if skip_probability >= skip_threshold else "pending"
-
-                # Log skip decisions for visibility
-                if initial_status == "skip":
-                    debug_info("Initial Planner - Pre-Flight Skip",
-                              f"Task {idx + 1} marked as SKIP (probability: {skip_probability}%): {item['description'][:60]}...",
-                              metadata={
-                                  "task_id": str(idx + 1),
-                                  "skip_reason": skip_reason,
-                                  "skip_probability": skip_probability,
-                                  "threshold": skip_threshold
-                              })
-
-                task = TASK(
-                    task_id=str(idx + 1),
-                    description=item["description"],
-                    tool_name=item["tool_name"],
-                    status=initial_status,  # 🔥 Set status based on skip probability
-                    requires_high_fidelity_context=item.get("requires_high_fidelity_context", False),
-                    required_context=REQUIRED_CONTEXT(
-                        source_node="initial_planner",
-                        pre_execution_context={
-                            "skip_probability": skip_probability,
-                            "skip_reason": skip_reason
-                        } if skip_probability > 0 else None
-                    ),
-                )
-                actual_tasks.append(task)
+            actual_tasks = [cls.__plan_task(idx, item, skip_threshold) for idx, item in enumerate(filtered_tasks)]
         else:
             # Final fallback if all attempts fail
             actual_tasks = []
@@ -2079,13 +2225,21 @@ class AgentGraphCore:
                 analysis=current_task.execution_context.analysis or "N/A"
             )
 
-            model = ModelManager()
-            response = model.invoke([
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": human_prompt},
-            ])
-
-            validation_result = ModelManager.convert_to_json(response.content)
+            def validate_with_large_model():
+                model = ModelManager()
+                response = model.invoke([
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": human_prompt},
+                ], response_format=GoalValidationResult, call_site="goal_validator")
+                return ModelManager.convert_to_json(response.content, schema_hint=GoalValidationResult)
+
+            validation_result = ModelCascade.run(
+                "goal_validator",
+                system_prompt,
+                human_prompt,
+                escalate=validate_with_large_model,
+                validator=lambda r: isinstance(r, dict) and isinstance(r.get("goal_achieved"), bool),
+            )
 
             if isinstance(validation_result, dict) and "goal_achieved" in validation_result:
                 current_task.execution_context.goal_achieved = validation_result.get("goal_achieved", False)
@@ -2128,7 +2282,7 @@ class AgentGraphCore:
                 debug_warning("Goal Validator",
                               f"Invalid response from validation LLM for Task {current_task_id}. Defaulting to goal not achieved.",
                               metadata={"function name": "__subAGENT_goal_validator", "task_id": current_task_id,
-                                        "llm_response": response.content})
+                                        "llm_response": str(validation_result)})
                 current_task.execution_context.goal_achieved = False
                 current_task.status = "failed"
                 # CRITICAL FIX: Preserve the original failed_parameters here too
@@ -2420,6 +2574,16 @@ class AgentGraphCore:
         tasks = state.tasks
         last_completed_id = state.current_task_id
 
+        # 🌊 STREAMED PLAN: pick up tasks the initial planner is still generating (wait when none is pending)
+        if PlanStream.is_streaming():
+            has_pending = any(t.status == "pending" for t in tasks)
+            streamed_tasks = PlanStream.collect(wait=not has_pending, timeout=settings.PLANNER_STREAM_DEADLINE)
+            if streamed_tasks:
+                tasks = tasks + streamed_tasks
+                debug_info("Task Planner", f"Added {len(streamed_tasks)} streamed task(s) from the initial plan",
+                           metadata={"function name": "__subAGENT_task_planner",
+                                     "task_ids": [t.task_id for t in streamed_tasks]})
+
         # If the last completed task was a sub-task (e.g., '1.1-abc'), update its parent
         if isinstance(last_completed_id, str) and '-' in last_completed_id:  # Check for new string format
             # Extract parent_id from string, e.g., '1' from '1.1-abc'
@@ -2491,6 +2655,7 @@ class AgentGraphCore:
         # print_log_message("--- NODE: Finalizer ---", "Finalizer")
         debug_info("--- NODE: Finalizer ---", "Generating final response consolidating all task results",
                    metadata={"function name": "__subAGENT_finalizer"})
+        PlanStream.clear()  # tasks still streaming in are not executed anymore
 
         tasks = state.tasks
 
@@ -2760,8 +2925,8 @@ class AgentGraphCore:
 
         # If the task succeeded, check if there are more pending tasks.
         pending_tasks = [t for t in tasks if t.status == "pending"]
-        if not pending_tasks:
-            # If no more pending tasks, it's time to finalize the workflow.
+        if not pending_tasks and not PlanStream.is_streaming():
+            # If no more pending tasks (and the initial plan has fully arrived), it's time to finalize the workflow.
             # print_log_message("All tasks completed. Routing to finalizer.", "Router")
             debug_info("Router", "All tasks completed. Routing to finalizer.",
                        metadata={"function name": "__router_after_execution"})
@@ -2799,6 +2964,17 @@ class AgentGraphCore:
             return "subAGENT_finalizer"
         return "subAGENT_classifier"
 
+    @staticmethod
+    def __usage_node(name: str, node_fn):
+        """Wrap a node so the LLM calls it makes are attributed to it in LLMUsage."""
+
+        @functools.wraps(node_fn)
+        def run(state: "WorkflowStateModel") -> dict:
+            with LLMUsage.node(name):
+                return node_fn(state)
+
+        return run
+
     @classmethod
     def build_graph(cls):
         """🏗️ LANGGRAPH WORKFLOW BUILDER: Constructs the complete hierarchical agent workflow.
@@ -2822,16 +2998,16 @@ class AgentGraphCore:
 
         graph_builder = StateGraph(state_schema=WorkflowStateModel)
 
-        # 🏗️ NODE REGISTRATION: Add all workflow nodes
-        graph_builder.add_node("subAGENT_initial_planner", cls.__subAGENT_initial_planner)
-        graph_builder.add_node("subAGENT_classifier", cls.__subAGENT_classifier)
-        graph_builder.add_node("subAGENT_parameter_generator", cls.subAGENT_parameter_generator)
-        graph_builder.add_node("subAGENT_task_executor", cls.__subAGENT_task_executor)
-        graph_builder.add_node("subAGENT_context_synthesizer", cls.__subAGENT_context_synthesizer)
-        graph_builder.add_node("subAGENT_goal_validator", cls.__subAGENT_goal_validator)  # New node
-        graph_builder.add_node("subAGENT_error_fallback", cls.__subAGENT_error_fallback)
-        graph_builder.add_node("subAGENT_task_planner", cls.__subAGENT_task_planner)
-        graph_builder.add_node("subAGENT_finalizer", cls.__subAGENT_finalizer)
+        # 🏗️ NODE REGISTRATION: Add all workflow nodes (LLM usage is attributed to the node name)
+        graph_builder.add_node("subAGENT_initial_planner", cls.__usage_node("subAGENT_initial_planner", cls.__subAGENT_initial_planner))
+        graph_builder.add_node("subAGENT_classifier", cls.__usage_node("subAGENT_classifier", cls.__subAGENT_classifier))
+        graph_builder.add_node("subAGENT_parameter_generator", cls.__usage_node("subAGENT_parameter_generator", cls.subAGENT_parameter_generator))
+        graph_builder.add_node("subAGENT_task_executor", cls.__usage_node("subAGENT_task_executor", cls.__subAGENT_task_executor))
+        graph_builder.add_node("subAGENT_context_synthesizer", cls.__usage_node("subAGENT_context_synthesizer", cls.__subAGENT_context_synthesizer))
+        graph_builder.add_node("subAGENT_goal_validator", cls.__usage_node("subAGENT_goal_validator", cls.__subAGENT_goal_validator))  # New node
+        graph_builder.add_node("subAGENT_error_fallback", cls.__usage_node("subAGENT_error_fallback", cls.__subAGENT_error_fallback))
+        graph_builder.add_node("subAGENT_task_planner", cls.__usage_node("subAGENT_task_planner", cls.__subAGENT_task_planner))
+        graph_builder.add_node("subAGENT_finalizer", cls.__usage_node("subAGENT_finalizer", cls.__subAGENT_finalizer))
 
         # 🚀 WORKFLOW DEFINITION: Set entry point and routing
         graph_builder.set_entry_point("subAGENT_initial_planner")
@@ -1,31 +1,30 @@
+import time
+from typing import Callable, Optional
+
 from langchain_core.messages import AIMessage, HumanMessage
 
 from src.config import settings
 from src.tools.lggraph_tools.tool_assign import ToolAssign
 from src.ui.print_message_style import print_message
+from src.ui.streaming_message import StreamingMessageView
+from src.utils.context_window import ContextWindow, estimate_tokens
+from src.utils.json_extractor import StreamingFieldExtractor
 from src.utils.model_manager import ModelManager
+from src.utils.speculation import Speculation, SpeculativeChat
 
 
-def generate_llm_response(state) -> dict:
-    """Generates a response using the LLM based on the conversation history and the latest user message.
-    Shows a spinner while generating the response.
-    """
-    console = settings.console
-    console.print("\t\t----[bold][green]Node is chatBot[/bold][/green]")
-    # Access state directly from LangGraph parameter
-    messages = state.get("messages", [])
-    history = "\n".join(f"{msg.type}: {msg.content}" for msg in messages[:-1])
-    latest_message_content = messages[-1].content if messages else ""
+def speculation_key(messages: list) -> tuple:
+    """Identifies the turn a speculative chatBot reply was generated for."""
+    return len(messages), messages[-1].content if messages else ""
 
-    tools = ToolAssign.get_tools_list()
 
-    tools_context = (
-        "\n\n".join(
-            [f"Tool: {tool.name}\nDescription: {tool.description}" for tool in tools],
-        )
-        if tools
-        else "No tools available."
-    )
+def build_chat_prompt(messages: list) -> list:
+    """Build the chatBot prompt for a conversation (the latest message is the current request)."""
+    # rolling summary of older turns + recent turns verbatim, bounded by CONTEXT_HISTORY_TOKENS
+    history = ContextWindow.build(messages[:-1]).render(empty="")
+    latest_message_content = messages[-1].content if messages else ""
+
+    tools_context = ContextWindow.tool_catalogue(ToolAssign.get_tools_list())
 
     system_prompt = (
         "You are an intelligent AI assistant with deep reasoning capabilities and full conversation awareness.\n\n"
@@ -55,22 +54,114 @@ def generate_llm_response(state) -> dict:
         '- Always return a valid JSON object: {{"response": "Your thoughtful response here"}}\n\n'
         "Think about what the user really wants to know, considering everything we've discussed together."
     )
-    messages_with_system_prompt = [HumanMessage(content=system_prompt)]
-    llm = ModelManager(temperature=0.7, format="json")
+    return [HumanMessage(content=system_prompt)]
 
-    with console.status("[bold green]Thinking...[/bold green]", spinner="dots"):
-        stream = llm.stream(messages_with_system_prompt)
-        content = ""
+
+def stream_chat_response(
+    prompt: list,
+    speculation: Speculation | None = None,
+    on_chunk: Optional[Callable[[str], None]] = None,
+) -> str:
+    """Stream the chatBot answer for a prompt; a speculative run stops as soon as it is cancelled.
+    ``on_chunk`` receives every streamed chunk (live display).
+    """
+    llm = ModelManager(temperature=0.7, format="json")
+    stream = llm.stream(prompt)
+    content = ""
+    try:
         for part in stream:
+            if speculation is not None and speculation.cancelled:
+                break
             chunk = part.content if part.content is not None else ""
             content += chunk
-    # Print AI message in modern style
-    # now we will not print raw json now we will extract the response from the content
-    json_content = llm.convert_to_json(content)
+            if speculation is not None:
+                speculation.add_chunk(chunk)
+            if on_chunk is not None and chunk:
+                on_chunk(chunk)
+    finally:
+        # closing the generator closes the underlying HTTP stream of a cancelled speculation
+        close = getattr(stream, "close", None)
+        if close is not None:
+            close()
+    return content
+
+
+def speculate_chat_response(messages: list) -> None:
+    """Start generating the chatBot reply for this turn in the background (see SpeculativeChat)."""
+    messages = list(messages)  # the speculation must not see later state changes
+
+    def produce(speculation: Speculation) -> str:
+        prompt = build_chat_prompt(messages)
+        speculation.prompt_tokens = estimate_tokens(prompt[0].content)
+        return stream_chat_response(prompt, speculation)
+
+    SpeculativeChat.start(speculation_key(messages), produce)
+
+
+def follow_speculation(speculation: Speculation, on_chunk: Callable[[str], None]) -> Optional[str]:
+    """Feed an adopted speculation's text to ``on_chunk`` as it grows; its result() when done."""
+    interval = 1.0 / settings.CHAT_STREAM_RENDER_FPS
+    deadline = time.perf_counter() + settings.LLM_CALL_DEADLINE
+    seen = 0
+    while True:
+        finished = speculation.wait(interval)
+        content = speculation.content
+        if len(content) > seen:
+            on_chunk(content[seen:])
+            seen = len(content)
+        if finished or time.perf_counter() >= deadline:
+            return speculation.result(timeout=0)
+
+
+def discard_speculation(speculation: Optional[Speculation]) -> None:
+    """Stop a speculation that missed its deadline or failed, so it does not stream next to the fresh call."""
+    if speculation is not None and not speculation.done:
+        speculation.cancel()
+
+
+def response_text(content: str) -> str:
+    """The "response" field of the chatBot JSON reply, or the raw content when it is not in that format."""
+    json_content = ModelManager.convert_to_json(content)
     if json_content and "response" in json_content:
-        content = json_content["response"]
+        return json_content["response"]
+    return content
+
+
+def generate_llm_response(state) -> dict:
+    """Generates a response using the LLM based on the conversation history and the latest user message.
+    With CHAT_STREAMING_DISPLAY the "response" field is shown token by token as it streams in,
+    otherwise a spinner is shown until the whole response has arrived.
+    """
+    console = settings.console
+    console.print("\t\t----[bold][green]Node is chatBot[/bold][/green]")
+    # Access state directly from LangGraph parameter
+    messages = state.get("messages", [])
+    # a reply speculatively started next to the classifier is already streaming
+    speculation = SpeculativeChat.take(speculation_key(messages))
+
+    if settings.CHAT_STREAMING_DISPLAY:
+        with StreamingMessageView(console) as view:
+            extractor = StreamingFieldExtractor("response")
+
+            def on_chunk(chunk: str) -> None:
+                view.append(extractor.feed(chunk))
+
+            content = follow_speculation(speculation, on_chunk) if speculation is not None else None
+            if content is None:
+                discard_speculation(speculation)
+                extractor = StreamingFieldExtractor("response")
+                view.reset()
+                content = stream_chat_response(build_chat_prompt(messages), on_chunk=on_chunk)
+            content = response_text(content).strip()
+            view.finish(content)
     else:
-        # If the response is not in the expected format, print the raw content
-        pass
-    print_message(content.strip(), sender="ai")
-    return {"messages": [AIMessage(content=content.strip())]}
+        with console.status("[bold green]Thinking...[/bold green]", spinner="dots"):
+            content = speculation.result(timeout=settings.LLM_CALL_DEADLINE) if speculation is not None else None
+            if content is None:
+                discard_speculation(speculation)
+                content = stream_chat_response(build_chat_prompt(messages))
+        content = response_text(content).strip()
+        print_message(content, sender="ai")
+    if speculation is not None:
+        SpeculativeChat.log_report()
+    return {"messages": [AIMessage(content=content)]}
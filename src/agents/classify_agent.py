@@ -1,10 +1,15 @@
 from langchain_core.messages import HumanMessage
 
+from src.agents.chat_llm import speculate_chat_response, speculation_key
 from src.config import settings
 from src.models.state import StateAccessor
 from src.tools.lggraph_tools.tool_assign import ToolAssign
 from src.ui.diagnostics.debug_helpers import debug_info
+from src.utils.context_window import ContextWindow
+from src.utils.fast_classifier import FastClassifier, is_follow_up
+from src.utils.model_cascade import ModelCascade
 from src.utils.model_manager import ModelManager
+from src.utils.speculation import SpeculativeChat
 from src.slash_commands.parser import ParseCommand
 from src.slash_commands.executionar import ExecutionAr
 
@@ -57,11 +62,23 @@ def classify_message_type(state) -> dict:
 
                 return {"message_type": "llm"}
 
-    # Build history from state messages directly
-    history_parts = []
-    for msg in messages[:-1]:
-        history_parts.append(f"{msg.type}: {msg.content}")
-    history = "\n".join(history_parts)
+    # Local fast path: keyword rules + small local model; the LLM router only runs when it is unsure.
+    # Follow-ups like "ok run it" depend on the previous turn, so they always go to the LLM router.
+    if settings.FAST_CLASSIFIER_ENABLED and not (len(messages) > 1 and is_follow_up(content)):
+        fast = FastClassifier.classify(content)
+        debug_info(
+            heading="CLASSIFIER • FAST_PATH",
+            body=f"{fast.label} ({fast.source}, confidence {fast.confidence:.2f}) -> "
+                 f"{'accepted' if fast.confident else 'LLM fallback'}",
+            metadata={"label": fast.label, "confidence": fast.confidence, "source": fast.source,
+                      "latency_ms": round(fast.latency_ms, 3), "threshold": fast.threshold},
+        )
+        if fast.confident:
+            console.print(f"[u][red]Message classified as[/u][/red]: {fast.label} (local)")
+            return {"message_type": fast.label}
+
+    # Summary of older turns + recent turns verbatim, bounded by CONTEXT_HISTORY_TOKENS
+    history = ContextWindow.build(messages[:-1]).render()
 
     llm = ModelManager(model=settings.GPT_MODEL, temperature=0.5)
 
@@ -114,21 +131,10 @@ OR
 
 Classify thoughtfully based on true user intent, not just keywords."""
     # modify the content and provide the history and tool context
-    if not history:
-        history = "No previous messages in this conversation."
     if not content:
         content = "No current message provided."
-    # Add conversation context and tool context to the content
-    tool_context = (
-        "No tools available"
-        if not ToolAssign.get_tools_list()
-        else "\n".join(
-            [
-                f"Tool: {tool.name}\nDescription: {tool.description}\nParameters: {tool.args_schema}"
-                for tool in ToolAssign.get_tools_list()
-            ],
-        )
-    )
+    # Routing only needs what each tool does, not its parameter schema
+    tool_context = ContextWindow.tool_catalogue(ToolAssign.get_tools_list())
 
     content = f"""
 
@@ -142,15 +148,15 @@ Classify thoughtfully based on true user intent, not just keywords."""
         {tool_context}
     """
 
-    response = llm.invoke(
-        [
-            settings.HumanMessage(content=system_prompt),
-            settings.HumanMessage(content=content),
-        ],
-    )
-
-    # Use the new JSON conversion method
-    result_json = ModelManager.convert_to_json(response)
+    def classify_with_large_model():
+        response = llm.invoke(
+            [
+                settings.HumanMessage(content=system_prompt),
+                settings.HumanMessage(content=content),
+            ],
+        )
+        # Use the new JSON conversion method
+        return ModelManager.convert_to_json(response, schema_hint={"message_type"})
 
     # Create message_classifier object from JSON
     from dataclasses import dataclass
@@ -160,9 +166,30 @@ Classify thoughtfully based on true user intent, not just keywords."""
         message_type: str
         reasoning: str = ""
 
-    result = MessageClassifier(
-        message_type=result_json.get("message_type", "llm"),
-        reasoning=result_json.get("reasoning", ""),
-    )
+    # Speculative chat: the chatBot reply streams next to the routing call and is dropped unless routed to 'llm'
+    speculating = SpeculativeChat.enabled()
+    if speculating:
+        speculate_chat_response(messages)
+    result = None
+    try:
+        # small model first, large model only when the small one is not confident
+        result_json = ModelCascade.run(
+            "classify_message_type",
+            system_prompt,
+            content,
+            escalate=classify_with_large_model,
+            validator=lambda r: isinstance(r, dict) and r.get("message_type") in ("llm", "tool", "agent"),
+        )
+        if not isinstance(result_json, dict):
+            result_json = {}
+
+        result = MessageClassifier(
+            message_type=result_json.get("message_type", "llm"),
+            reasoning=result_json.get("reasoning", ""),
+        )
+    finally:
+        # a routing call that raised adopts nothing, so the speculation is cancelled rather than left streaming
+        if speculating:
+            SpeculativeChat.resolve(speculation_key(messages), adopt=result is not None and result.message_type == "llm")
     console.print(f"[u][red]Message classified as[/u][/red]: {result.message_type}")
     return {"message_type": result.message_type}
@@ -4,7 +4,7 @@ from src.config import settings
 from src.prompts.system_prompt_tool_selector import get_tool_selector_prompt
 from src.tools.lggraph_tools.tool_assign import ToolAssign
 from src.ui.print_message_style import print_message
-from src.utils.argument_schema_util import get_tool_argument_schema
+from src.utils.context_window import ContextWindow
 from src.utils.model_manager import ModelManager
 
 
@@ -18,16 +18,11 @@ def tool_selection_agent(state) -> dict:
     messages = state.get("messages", [])
     last_message = messages[-1] if messages else None
     content = last_message.content if last_message else ""
-    history = messages
+    history = ContextWindow.build(messages[:-1]).render()
     tools = ToolAssign.get_tools_list()
 
     tools_context = (
-        "\n\n".join(
-            [
-                f"Tool: {tool.name}\nDescription: {tool.description}\nParameters: {get_tool_argument_schema(tool)}"
-                for tool in tools
-            ],
-        )
+        ContextWindow.tool_catalogue(tools, with_schemas=True)
         if tools
         else settings.socket_con.send_error("[ERROR] No tools available for selection.")
         if settings.socket_con
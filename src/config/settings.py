@@ -34,6 +34,47 @@ GPT_MODEL = os.getenv("GPT_MODEL", "openai/gpt-oss-120b")
 KIMI_MODEL = os.getenv("KIMI_MODEL", "moonshotai/kimi-k2-instruct-0905")
 API_DEFAULT_API_MODEL = KIMI_MODEL
 OPEN_AI_API_KEY = os.getenv("OPENAI_API_KEY", "your_openai_api_key_here")
+# OpenAI-compatible endpoint; point at benchmarks/stub_llm_server.py for offline runs
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://integrate.api.nvidia.com/v1")
+
+# Model cascade: routing-style call sites try a small fast model first and only
+# escalate to the large model when the small model's self-reported confidence is low.
+# Opt-in: every escalation costs one extra request against LLM_RATE_LIMIT_PER_MINUTE
+# (the small call plus the large one), so enable it only where escalations are rare.
+MODEL_CASCADE_ENABLED = os.getenv("MODEL_CASCADE_ENABLED", "false").lower() == "true"
+CASCADE_SMALL_MODEL = os.getenv("CASCADE_SMALL_MODEL", "meta/llama-3.1-8b-instruct")
+CASCADE_CONFIDENCE_THRESHOLD = float(os.getenv("CASCADE_CONFIDENCE_THRESHOLD", 0.75))
+CASCADE_SMALL_MAX_TOKENS = int(os.getenv("CASCADE_SMALL_MAX_TOKENS", 1024))
+# per call-site profiles; backend is "openai" (small_model served by the API endpoint)
+# or "ollama" (small_model served locally, e.g. CLASSIFIER_MODEL)
+MODEL_PROFILES = {
+    "classify_message_type": {
+        "backend": os.getenv("CASCADE_CLASSIFIER_BACKEND", "openai"),
+        "small_model": os.getenv("CASCADE_CLASSIFIER_MODEL", CASCADE_SMALL_MODEL),
+        "threshold": CASCADE_CONFIDENCE_THRESHOLD,
+    },
+    "goal_validator": {
+        "backend": "openai",
+        "small_model": CASCADE_SMALL_MODEL,
+        "threshold": float(os.getenv("CASCADE_GOAL_VALIDATOR_THRESHOLD", 0.85)),
+    },
+    "complexity_analyzer": {
+        "backend": "openai",
+        "small_model": CASCADE_SMALL_MODEL,
+        "threshold": CASCADE_CONFIDENCE_THRESHOLD,
+    },
+    "tool_recommender": {
+        "backend": "openai",
+        "small_model": CASCADE_SMALL_MODEL,
+        "threshold": CASCADE_CONFIDENCE_THRESHOLD,
+    },
+}
+
+# Structured output: how schema-constrained calls ask the endpoint for JSON.
+# "guided_json" (NVIDIA NIM nvext guided decoding), "json_schema" (OpenAI response_format),
+# "json_object" (plain JSON mode) or "prompt" (schema in the prompt only). Unsupported modes
+# are downgraded automatically per model.
+STRUCTURED_OUTPUT_MODE = os.getenv("STRUCTURED_OUTPUT_MODE", "guided_json")
 
 # API endpoints
 TRANSLATION_API_URL = os.getenv(
@@ -84,6 +125,13 @@ OPENAI_CONNECT_TIMEOUT = int(
     os.getenv("OPENAI_CONNECT_TIMEOUT", 10)
 )  # Default 10 seconds
 
+# LLM endpoint connection pool (shared by every OpenAI client, pre-warmed at startup)
+OPENAI_HTTP2 = os.getenv("OPENAI_HTTP2", "true").lower() == "true"  # via httpx[http2] (h2)
+OPENAI_POOL_MAX_CONNECTIONS = int(os.getenv("OPENAI_POOL_MAX_CONNECTIONS", 20))
+OPENAI_POOL_MAX_KEEPALIVE = int(os.getenv("OPENAI_POOL_MAX_KEEPALIVE", 10))
+OPENAI_POOL_KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_POOL_KEEPALIVE_EXPIRY", 120))  # seconds
+OPENAI_PREWARM = os.getenv("OPENAI_PREWARM", "true").lower() == "true"
+
 # NEO4J settings
 NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
 NEO4J_USER = os.getenv("NEO4J_USERNAME", "neo4j")
@@ -97,9 +145,50 @@ SEMAPHORE_CLI = int(os.getenv("SEMAPHORE_LIMIT_CLI", 15))
 SEMAPHORE_API = int(os.getenv("SEMAPHORE_LIMIT_API", 5))
 SEMAPHORE_OPENAI = int(os.getenv("SEMAPHORE_LIMIT_OPENAI", 15))
 
+# LLM endpoint resilience (per endpoint/model AIMD concurrency limit, circuit breaker, retry backoff)
+LLM_CONCURRENCY_INITIAL = int(os.getenv("LLM_CONCURRENCY_INITIAL", 4))
+LLM_CONCURRENCY_MIN = int(os.getenv("LLM_CONCURRENCY_MIN", 1))
+LLM_CONCURRENCY_MAX = int(os.getenv("LLM_CONCURRENCY_MAX", SEMAPHORE_OPENAI))
+LLM_BREAKER_MAX_FAILURES = int(os.getenv("LLM_BREAKER_MAX_FAILURES", 5))
+LLM_BREAKER_OPEN_SECONDS = float(os.getenv("LLM_BREAKER_OPEN_SECONDS", 10))
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", 1.0))  # seconds, doubled per attempt (full jitter)
+LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", 8.0))
+LLM_CALL_DEADLINE = float(os.getenv("LLM_CALL_DEADLINE", 180))  # default end-to-end budget per call incl. retries
+
+# LLM request scheduler (shared per-minute budget, served interactive > agent > background)
+LLM_RATE_LIMIT_PER_MINUTE = int(os.getenv("LLM_RATE_LIMIT_PER_MINUTE", 30))
+LLM_INTERACTIVE_RESERVE = int(os.getenv("LLM_INTERACTIVE_RESERVE", 5))  # grants per window background work may not use
+
+# Conversation context window for chatBot / classifier / tool selector prompts
+CONTEXT_HISTORY_TOKENS = int(os.getenv("CONTEXT_HISTORY_TOKENS", 3000))  # recent turns kept verbatim
+CONTEXT_SUMMARY_TOKENS = int(os.getenv("CONTEXT_SUMMARY_TOKENS", 600))  # cap for the rolling summary of older turns
+CONTEXT_SUMMARY_MODEL = os.getenv("CONTEXT_SUMMARY_MODEL", CASCADE_SMALL_MODEL)
+
+# Local fast-path message classifier (keyword rules + hashed bag-of-words model) ahead of the LLM router
+FAST_CLASSIFIER_ENABLED = os.getenv("FAST_CLASSIFIER_ENABLED", "true").lower() == "true"
+FAST_CLASSIFIER_THRESHOLD = float(os.getenv("FAST_CLASSIFIER_THRESHOLD", 0.8))  # below this the LLM decides
+FAST_CLASSIFIER_ONNX_PATH = os.getenv("FAST_CLASSIFIER_ONNX_PATH", "")  # optional exported model, scored with onnxruntime
+
+# Speculative chat: start the chatBot reply next to the LLM classifier call, drop it unless routed to 'llm'
+SPECULATIVE_CHAT_ENABLED = os.getenv("SPECULATIVE_CHAT_ENABLED", "false").lower() == "true"
+
+# chatBot replies: live token-by-token panel, Markdown re-rendered at most this many times per second
+CHAT_STREAMING_DISPLAY = os.getenv("CHAT_STREAMING_DISPLAY", "true").lower() == "true"
+CHAT_STREAM_RENDER_FPS = float(os.getenv("CHAT_STREAM_RENDER_FPS", 12))
+
+# Agent initial planner: stream the plan and start on the first validated task while the rest is generated
+PLANNER_STREAMING_ENABLED = os.getenv("PLANNER_STREAMING_ENABLED", "true").lower() == "true"
+PLANNER_STREAM_DEADLINE = float(os.getenv("PLANNER_STREAM_DEADLINE", 60))  # seconds to wait for the next streamed task
+
 # PNG FILE PATH
 PNG_FILE_PATH = BASE_DIR.parent / "basic_logs" / "graph.png"
 
+# LLM usage accounting (JSON lines, one record per LLM call, appended after each agent run)
+LLM_USAGE_LOG_PATH = Path(os.getenv("LLM_USAGE_LOG_PATH", BASE_DIR.parent / "basic_logs" / "llm_usage.jsonl"))
+
+# Record/replay cassettes: when set, every agent run records its LLM and tool calls into this directory
+LLM_CASSETTE_RECORD_DIR = os.getenv("LLM_CASSETTE_RECORD_DIR", "")
+
 console = (
     None  # Placeholder for console object, to be initialized in main_orchestrator.py
 )
@@ -146,7 +235,51 @@ MCP_CONFIG = {
     "MCP_PORT": int(os.getenv("MCP_PORT", 5000)),
     "MCP_API_KEY": os.getenv("MCP_API_KEY", "your_api_key_here"),
     "MCP_TIMEOUT": int(os.getenv("MCP_TIMEOUT", 30)),  # Timeout in seconds
+    "MCP_STDERR_BUFFER_KB": int(os.getenv("MCP_STDERR_BUFFER_KB", 64)),  # recent stderr kept per server for error reports
+    "MCP_STDERR_LOG_RATE": float(os.getenv("MCP_STDERR_LOG_RATE", 20)),  # max stderr lines per second forwarded to the log
+    # servers keeping per-process state: started as one replica, whatever "replicas" says (see src/mcp/pool.py)
+    "MCP_STATEFUL_SERVERS": [
+        name.strip() for name in os.getenv("MCP_STATEFUL_SERVERS", "memory,puppeteer").split(",") if name.strip()
+    ],
+    # tools/list results reused across sessions, so servers can start lazily (see src/mcp/discovery_cache.py)
+    "MCP_DISCOVERY_CACHE_PATH": Path(
+        os.getenv("MCP_DISCOVERY_CACHE_PATH", BASE_DIR.parent / "basic_logs" / "mcp_discovery_cache.json")
+    ),
+    "MCP_DISCOVERY_CACHE_TTL_HOURS": float(os.getenv("MCP_DISCOVERY_CACHE_TTL_HOURS", 24)),  # unpinned packages only
+    "MCP_LAZY_START": os.getenv("MCP_LAZY_START", "true").lower() == "true",  # start cached servers on first call
+    "MCP_IDLE_SHUTDOWN_S": float(os.getenv("MCP_IDLE_SHUTDOWN_S", 600)),  # 0 keeps started servers running
+    # supervisor (src/mcp/supervisor.py): periodic ping, restart with backoff, warm standby; interval 0 disables
+    "MCP_HEALTH_CHECK_INTERVAL_S": float(os.getenv("MCP_HEALTH_CHECK_INTERVAL_S", 15)),
+    "MCP_HEALTH_CHECK_TIMEOUT_S": float(os.getenv("MCP_HEALTH_CHECK_TIMEOUT_S", 5)),  # no pong = wedged
+    "MCP_RESTART_BACKOFF_MAX_S": float(os.getenv("MCP_RESTART_BACKOFF_MAX_S", 60)),
+    "MCP_STANDBY_SERVERS": [
+        name.strip() for name in os.getenv("MCP_STANDBY_SERVERS", "").split(",") if name.strip()
+    ],
+    # servers with a "url" in .mcp.json (streamable HTTP) share one pooled keep-alive client
+    "MCP_HTTP_MAX_CONNECTIONS": int(os.getenv("MCP_HTTP_MAX_CONNECTIONS", 20)),
+    "MCP_HTTP_KEEPALIVE_EXPIRY_S": float(os.getenv("MCP_HTTP_KEEPALIVE_EXPIRY_S", 30)),
+    "MCP_HTTP_CONNECT_TIMEOUT_S": float(os.getenv("MCP_HTTP_CONNECT_TIMEOUT_S", 10)),
+    # large results: a bigger JSON-RPC message fails its call; results above MCP_RESULT_MAX_KB are
+    # stored on disk and the agent gets a preview (see src/mcp/result_store.py); 0 disables the cap
+    "MCP_MAX_MESSAGE_MB": int(os.getenv("MCP_MAX_MESSAGE_MB", 64)),
+    "MCP_RESULT_MAX_KB": int(os.getenv("MCP_RESULT_MAX_KB", 256)),
+    "MCP_RESULT_PREVIEW_KB": int(os.getenv("MCP_RESULT_PREVIEW_KB", 16)),
+    "MCP_RESULT_BLOB_DIR": Path(os.getenv("MCP_RESULT_BLOB_DIR", BASE_DIR.parent / "basic_logs" / "mcp_results")),
+    "MCP_RESULT_BLOB_MAX_FILES": int(os.getenv("MCP_RESULT_BLOB_MAX_FILES", 50)),
     "MCP_CONFIG_PATH": BASE_DIR.parent / ".mcp.json",  # Path to MCP configuration file
+    # apply .mcp.json edits without a restart: only added, removed and changed servers are touched
+    "MCP_CONFIG_HOT_RELOAD": os.getenv("MCP_CONFIG_HOT_RELOAD", "true").lower() == "true",
+    "MCP_CONFIG_RELOAD_DEBOUNCE_MS": int(os.getenv("MCP_CONFIG_RELOAD_DEBOUNCE_MS", 500)),
+    # server-filesystem tools served in-process instead of by the npx server (see
+    # src/mcp/native_filesystem.py); an empty value sends every call to the server
+    "MCP_NATIVE_FILESYSTEM_TOOLS": [
+        tool.strip()
+        for tool in os.getenv(
+            "MCP_NATIVE_FILESYSTEM_TOOLS",
+            "read_text_file,read_file,write_file,list_directory,search_files,directory_tree",
+        ).split(",")
+        if tool.strip()
+    ],
 }
 
 if __name__ == "__main__":
@@ -24,6 +24,7 @@ from src.ui.diagnostics.rich_traceback_manager import (
     rich_exception_handler,
 )
 from src.ui.print_message_style import print_message
+from src.utils.llm_scheduler import LLMScheduler, Priority
 from src.utils.socket_manager import SocketManager
 
 from src.utils.listeners.exit_listener import ExitListener
@@ -199,13 +200,23 @@ class ChatInitializer:
                 wrapper = server_config["wrapper"]
 
                 MCP_Manager.add_server(
-                    server_name, package=None, runner=runner, args=args, func=wrapper
+                    server_name,
+                    package=None,
+                    runner=runner,
+                    args=args,
+                    func=wrapper,
+                    replicas=server_config.get("replicas", 1),
+                    stateful=server_config.get("stateful"),
+                    url=server_config.get("url"),
+                    headers=server_config.get("headers"),
                 )
 
             # LEGACY: Uncomment if you want to use the legacy filesystem server
             # MCP_Manager.add_server("filesystem", "npx", "@modelcontextprotocol/server-filesystem", [f"{settings.BASE_DIR.parent}"], FileSystemWrapper)
             # start the MCP servers in asynchronously (that's working)
             async def start_mcp_server(server_name: str):
+                if settings.MCP_CONFIG.get("MCP_LAZY_START") and MCP_Manager.register_cached_tools(server_name):
+                    return  # tools came from the discovery cache; the server starts on first use
                 loop = asyncio.get_running_loop()
                 got_start = await loop.run_in_executor(
                     None, MCP_Manager.start_server, server_name
@@ -229,6 +240,11 @@ class ChatInitializer:
             ]
             await asyncio.gather(*task)
 
+            if settings.MCP_CONFIG.get("MCP_CONFIG_HOT_RELOAD"):
+                from src.mcp.config_watcher import McpConfigWatcher
+
+                McpConfigWatcher.start()  # later .mcp.json edits only touch the servers they change
+
         except Exception as e:
             RichTracebackManager.handle_exception(
                 e,
@@ -456,7 +472,9 @@ class ChatInitializer:
                         settings.HumanMessage(content=user_input)
                     )
                     print_message(user_input, sender="user")
-                    self._state = self.graph.invoke(self._state)
+                    # the user's turn pre-empts queued agent and background LLM requests
+                    with LLMScheduler.priority(Priority.INTERACTIVE):
+                        self._state = self.graph.invoke(self._state)
 
                     # ✅ FIXED: Only set exit_flag when user actually wants to exit
                     # Check if this was an exit-related workflow
@@ -542,6 +560,7 @@ class ChatInitializer:
         from src.slash_commands.commands.clear import register_clear_command
         from src.slash_commands.commands.help import register_help_command
         from src.slash_commands.commands.exit import register_exit_command
+        from src.slash_commands.commands.stats import register_stats_command
         # core/routing slash commands
         from src.slash_commands.commands.core_slashs.agent import register_agent_command
         from src.slash_commands.commands.core_slashs.chat_llm import register_chat_llm_command
@@ -555,6 +574,7 @@ class ChatInitializer:
                 asyncio.to_thread(register_help_command),
                 asyncio.to_thread(register_agent_command),
                 asyncio.to_thread(register_exit_command),
+                asyncio.to_thread(register_stats_command),
                 asyncio.to_thread(register_chat_llm_command),
                 asyncio.to_thread(register_slash_command_use_tool),
             ]
@@ -50,6 +50,7 @@ from src.config import settings
 from src.core.graphs.node_assign import GraphBuilder
 from src.models.state import State
 from src.ui.print_banner import print_banner
+from src.utils.fast_classifier import FastClassifier
 from src.utils.model_manager import ModelManager
 from src.mcp.manager import MCP_Manager
 from src.utils.argument_schema_util import get_tool_argument_schema
@@ -67,6 +68,9 @@ def run_chat(destructor: ChatDestructor):
         )
         settings.chat = chat  # Set global chat reference
 
+        # open the LLM endpoint connection in the background while the banner prints
+        ModelManager.prewarm()
+        FastClassifier.prewarm()
         os.system("cls" if os.name == "nt" else "clear")  # Clear console
         print_banner()
         console = settings.console or __import__("rich").console.Console()
@@ -0,0 +1,143 @@
+"""
+Hot reload of .mcp.json: incremental reconfiguration of the running MCP servers.
+
+Editing .mcp.json used to require restarting the app, which relaunched every server and
+rediscovered every tool. The watcher (watchfiles, on a daemon thread) reloads the file when it
+changes and hands the parsed servers to MCP_Manager.apply_config, which diffs them against the
+registered set:
+
+    - added servers are registered and started (or lazily registered from the discovery cache)
+    - removed servers are stopped and their tools unregistered
+    - changed servers (command, args, url, headers, replicas, stateful) are restarted
+    - every other server keeps running and keeps its tools
+
+A file that does not parse or is empty (an editor saving half a change, or truncating the file
+before writing it) is logged and ignored; the running servers stay as they are until the next
+valid save.
+
+Usage:
+    McpConfigWatcher.start()     # after the MCP servers are initialised
+    McpConfigWatcher.reload()    # apply the file now, e.g. from a command
+    McpConfigWatcher.stop()
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, ClassVar, Iterable, Mapping, Optional
+
+from src.config import settings
+
+# fields that decide how a server is started; a change to any of them restarts the server
+# (env is not compared: servers run with the app's environment)
+RESTART_FIELDS = ("command", "args", "url", "headers", "replicas", "stateful")
+_DEFAULTS: dict[str, Any] = {"args": [], "headers": {}, "replicas": 1}
+
+
+@dataclass
+class McpConfigDiff:
+    """Server names by what a reload does with them."""
+
+    added: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    changed: list[str] = field(default_factory=list)
+
+    @property
+    def empty(self) -> bool:
+        return not (self.added or self.removed or self.changed)
+
+    def as_dict(self) -> dict[str, list[str]]:
+        return {"added": self.added, "removed": self.removed, "changed": self.changed}
+
+
+def diff_configs(current: Mapping[str, Mapping[str, Any]], loaded: Iterable[Mapping[str, Any]]) -> McpConfigDiff:
+    """Compare the registered servers with freshly loaded server configs."""
+    loaded_by_name = {config["name"]: config for config in loaded}
+    diff = McpConfigDiff(
+        added=[name for name in loaded_by_name if name not in current],
+        removed=[name for name in current if name not in loaded_by_name],
+    )
+    for name, config in loaded_by_name.items():
+        if name in current and _start_spec(current[name]) != _start_spec(config):
+            diff.changed.append(name)
+    return diff
+
+
+def _start_spec(config: Mapping[str, Any]) -> str:
+    spec = {}
+    for key in RESTART_FIELDS:
+        value = config.get(key)
+        spec[key] = _DEFAULTS.get(key) if value is None else getattr(value, "value", value)  # Command enum
+    return json.dumps(spec, sort_keys=True, default=str)
+
+
+class McpConfigWatcher:
+    """Class-level watcher of the MCP config file."""
+
+    _thread: ClassVar[Optional[threading.Thread]] = None
+    _stop: ClassVar[threading.Event] = threading.Event()
+
+    @staticmethod
+    def path() -> Path:
+        return Path(settings.MCP_CONFIG.get("MCP_CONFIG_PATH")).resolve()
+
+    @classmethod
+    def start(cls) -> None:
+        if cls._thread is not None and cls._thread.is_alive():
+            return
+        cls._stop = threading.Event()
+        cls._thread = threading.Thread(target=cls._run, args=(cls._stop,), name="mcp-config-watcher", daemon=True)
+        cls._thread.start()
+
+    @classmethod
+    def stop(cls) -> None:
+        cls._stop.set()
+        cls._thread = None
+
+    @classmethod
+    def reload(cls) -> Optional[McpConfigDiff]:
+        """Load the config file and apply it; None when the file could not be loaded."""
+        from src.mcp.load_config import McpConfigFile
+        from src.mcp.manager import MCP_Manager
+
+        try:
+            server_configs = McpConfigFile.retrieve_config()
+        except Exception as load_error:
+            cls._log_invalid(load_error)
+            return None
+        if server_configs is None:
+            # an empty file is a save in progress, not a request to stop every server
+            cls._log_invalid(ValueError("the MCP config file is empty"))
+            return None
+        return MCP_Manager.apply_config(server_configs)
+
+    @classmethod
+    def _run(cls, stop_event: threading.Event) -> None:
+        from watchfiles import watch
+
+        path = cls.path()
+        # the directory is watched: editors save by writing a new file and renaming it over the old one
+        for _changes in watch(
+            path.parent,
+            watch_filter=lambda _change, changed_path: Path(changed_path).resolve() == path,
+            debounce=settings.MCP_CONFIG.get("MCP_CONFIG_RELOAD_DEBOUNCE_MS"),
+            stop_event=stop_event,
+            recursive=False,
+        ):
+            try:
+                cls.reload()
+            except Exception as reload_error:  # the watcher must survive a failed reconfiguration
+                cls._log_invalid(reload_error)
+
+    @staticmethod
+    def _log_invalid(error: BaseException) -> None:
+        from src.ui.diagnostics.debug_helpers import debug_warning
+
+        debug_warning(
+            heading="MCP • CONFIG_RELOAD_FAILED",
+            body=f"Could not load or apply the changed MCP config: {error}",
+            metadata={"error": repr(error)},
+        )
@@ -0,0 +1,125 @@
+"""
+On-disk cache of MCP tool discovery results.
+
+Starting a server only to ask for its tools/list costs an npx/uvx cold start per server before
+the first prompt. The tools/list result of every server is therefore kept in a JSON file, keyed
+by a fingerprint of the server's command, args, env variable names and package version, so the
+next session can register its tools without starting it (MCP_Manager then starts the server
+lazily, on the first call to one of its tools).
+
+An entry is used when its fingerprint matches. Servers whose package is not pinned to a version
+("@latest", no version at all) may resolve to a newer release at any time, so their entries also
+expire after MCP_DISCOVERY_CACHE_TTL_HOURS. Every live discovery rewrites the entry.
+
+Usage:
+    tools = McpDiscoveryCache.load("github", server_config)   # None on a miss
+    McpDiscoveryCache.store("github", server_config, tools, server_version="0.6.2")
+    McpDiscoveryCache.invalidate("github")
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, ClassVar, Optional
+
+from src.config import settings
+
+CACHE_FORMAT = 1
+
+# "@scope/pkg@1.2.3", "pkg@1.2.3" (npx) or "pkg==1.2.3" (uvx/pipx)
+_VERSION_PATTERN = re.compile(r"^(?P<package>@?[^@=\s]+)(?:@|==)(?P<version>[^@=\s]+)$")
+_FLOATING_VERSIONS = {"latest", "next", "beta", "canary"}
+
+
+class McpDiscoveryCache:
+    """tools/list results per server, shared by every session through one JSON file."""
+
+    _lock: ClassVar[threading.Lock] = threading.Lock()
+
+    @staticmethod
+    def path() -> Path:
+        return Path(settings.MCP_CONFIG.get("MCP_DISCOVERY_CACHE_PATH"))
+
+    @staticmethod
+    def package_version(args: list[str]) -> Optional[str]:
+        """Version the server package is pinned to, or None for a floating / unversioned package."""
+        package = next((arg for arg in args if not arg.startswith("-")), None)
+        match = _VERSION_PATTERN.match(package or "")
+        if match is None or match.group("version") in _FLOATING_VERSIONS:
+            return None
+        return match.group("version")
+
+    @classmethod
+    def fingerprint(cls, config: dict[str, Any]) -> str:
+        command = config.get("command")
+        args = [str(arg) for arg in config.get("args", [])]
+        material = {
+            "command": getattr(command, "value", str(command)),
+            "url": config.get("url"),
+            "args": args,
+            # names only: a rotated token does not change the tools
+            "env": sorted(config.get("env") or {}),
+            "version": cls.package_version(args),
+        }
+        return hashlib.sha256(json.dumps(material, sort_keys=True).encode("utf-8")).hexdigest()
+
+    @classmethod
+    def load(cls, name: str, config: dict[str, Any]) -> Optional[list[dict[str, Any]]]:
+        """Cached tools of a server, or None when there is no valid entry."""
+        entry = cls._read().get(name)
+        if not entry or entry.get("fingerprint") != cls.fingerprint(config):
+            return None
+        ttl_s = settings.MCP_CONFIG.get("MCP_DISCOVERY_CACHE_TTL_HOURS") * 3600
+        if not entry.get("pinned") and time.time() - entry.get("cached_at", 0) > ttl_s:
+            return None
+        return entry.get("tools") or None
+
+    @classmethod
+    def store(
+        cls, name: str, config: dict[str, Any], tools: list[dict[str, Any]], server_version: Optional[str] = None
+    ) -> None:
+        with cls._lock:
+            servers = cls._read()
+            servers[name] = {
+                "fingerprint": cls.fingerprint(config),
+                "pinned": cls.package_version([str(arg) for arg in config.get("args", [])]) is not None,
+                "server_version": server_version,
+                "cached_at": time.time(),
+                "tools": tools,
+            }
+            cls._write(servers)
+
+    @classmethod
+    def invalidate(cls, name: Optional[str] = None) -> None:
+        """Drop one server's entry, or every entry when ``name`` is None."""
+        with cls._lock:
+            servers = cls._read()
+            if name is None:
+                servers.clear()
+            else:
+                servers.pop(name, None)
+            cls._write(servers)
+
+    @classmethod
+    def _read(cls) -> dict[str, Any]:
+        try:
+            data = json.loads(cls.path().read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("format") != CACHE_FORMAT:
+            return {}
+        return data.get("servers", {})
+
+    @classmethod
+    def _write(cls, servers: dict[str, Any]) -> None:
+        path = cls.path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # write-then-rename so a crash never leaves a truncated cache behind
+        temporary = path.with_suffix(path.suffix + ".tmp")
+        temporary.write_text(json.dumps({"format": CACHE_FORMAT, "servers": servers}, indent=1), encoding="utf-8")
+        temporary.replace(path)
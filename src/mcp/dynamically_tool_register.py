@@ -21,12 +21,14 @@ class DynamicToolRegister:
         return cls._instance
 
     @classmethod
-    def register_tool(cls, response, function):
+    def register_tool(cls, response, function, exposed_names=None):
         """
         Extracts the schema from the response and registers MCP tools dynamically.
 
         :param response: The response object from the MCP server of tools/list.
         :param function: The function to be associated with the tool.
+        :param exposed_names: Optional {server tool name: registered name} from McpRoutingTable.update_server,
+            so a tool whose name another server already owns is registered under its namespaced name.
         """
         # get the tool's schema from the response
         tools = response["result"]["tools"]
@@ -35,7 +37,7 @@ class DynamicToolRegister:
 
         try:
             for tool in tools:
-                tool_name = tool["name"]
+                tool_name = (exposed_names or {}).get(tool["name"], tool["name"])
                 arguments = tool["inputSchema"]
 
                 # Add tool name to arguments schema (modify the properties' dict)
@@ -73,7 +75,7 @@ class DynamicToolRegister:
                 # settings.socket_con.send_error(f"[DEBUG] Tool arguments schema: {arguments}")
 
                 # register the tool with its schema
-                DynamicToolRegister.tool_list.append(
+                cls._add(
                     ToolAssign(
                         name=tool_name,
                         description=description,
@@ -87,6 +89,32 @@ class DynamicToolRegister:
         except Exception as e:
             raise ValueError(f"Error registering tool: {e} {inspect.trace()}")
 
+    @classmethod
+    def _add(cls, tool):
+        """
+        Register a tool, replacing an earlier registration of the same name (a restarted server).
+        Once the chat initializer has set the tool list, the tool is published there as well.
+        """
+        cls.tool_list[:] = [registered for registered in cls.tool_list if registered.name != tool.name]
+        cls.tool_list.append(tool)
+        assigned = getattr(ToolAssign, "_tool_list", None)
+        if assigned is not None and assigned is not cls.tool_list:
+            assigned[:] = [registered for registered in assigned if registered.name != tool.name]
+            assigned.append(tool)
+
+    @classmethod
+    def unregister_tools(cls, names):
+        """
+        Remove tools by their registered names, here and from the tool list the agents use.
+
+        :param names: Registered (exposed) tool names, e.g. the tools of a removed server.
+        """
+        names = set(names)
+        cls.tool_list[:] = [tool for tool in cls.tool_list if tool.name not in names]
+        assigned = getattr(ToolAssign, "_tool_list", None)
+        if assigned is not None and assigned is not cls.tool_list:
+            assigned[:] = [tool for tool in assigned if tool.name not in names]
+
     @classmethod
     def get_registered_tools(cls):
         """
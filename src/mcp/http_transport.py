@@ -0,0 +1,286 @@
+"""
+MCP streamable-HTTP transport for shared, long-lived MCP servers.
+
+A stdio server is a child process of one app instance. A server reached over HTTP runs once and
+serves many clients: every app instance (and every session of a server deployment) only opens an
+MCP session on it. A server entry in .mcp.json with a "url" instead of a "command" uses this
+transport:
+
+    "search": {"url": "http://mcp.internal:8931/mcp", "headers": {"Authorization": "Bearer ..."}}
+
+Every JSON-RPC message is POSTed to the endpoint. The server answers a request either with a JSON
+body or with an SSE stream (text/event-stream) that carries notifications and server requests
+before the response. The Mcp-Session-Id the server assigns at initialize is sent with every
+later message; a 404 for that session means it expired, and the transport reports itself as
+exited so the pool's recovery opens a new session. Closing sends DELETE to end the session.
+A reply above ``max_message_bytes`` fails its call with ResponseTooLarge, as on stdio.
+
+All HTTP servers share one httpx.AsyncClient on the MCP event loop, so calls reuse kept-alive
+(HTTP/2 through ``httpx[http2]``) connections. McpHttpTransport has the interface of
+McpStdioTransport and raises the same exceptions, so McpServerPool, the supervisor and
+MCP_Manager treat both alike.
+
+Usage:
+    transport = McpHttpTransport("search", "http://localhost:8931/mcp")
+    transport.start_sync()
+    transport.request_sync("initialize", {...}, timeout_s=30)
+    reply = transport.request_sync("tools/list", {}, timeout_s=30)
+    transport.close_sync()
+"""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import importlib.util
+import inspect
+import itertools
+import json
+from typing import Any, Callable, ClassVar, Optional
+
+import httpx
+from httpx_sse import EventSource
+
+from src.config import settings
+from src.mcp.transport import (
+    MAX_MESSAGE_BYTES,
+    METHOD_NOT_FOUND,
+    NOTIFICATION_BACKLOG,
+    McpEventLoop,
+    McpStdioTransport,
+    StderrCapture,
+)
+
+SESSION_HEADER = "Mcp-Session-Id"
+
+
+class McpHttpTransport:
+    """JSON-RPC 2.0 over MCP's streamable-HTTP transport, one MCP session per instance."""
+
+    TransportError = McpStdioTransport.TransportError
+    CallTimeout = McpStdioTransport.CallTimeout
+    ServerExited = McpStdioTransport.ServerExited
+    ResponseTooLarge = McpStdioTransport.ResponseTooLarge
+
+    _client: ClassVar[Optional[httpx.AsyncClient]] = None
+
+    def __init__(
+        self,
+        name: str,
+        url: str,
+        headers: Optional[dict[str, str]] = None,
+        max_message_bytes: int = MAX_MESSAGE_BYTES,
+    ):
+        self.name = name
+        self.url = url
+        self.headers = dict(headers or {})
+        self.max_message_bytes = max_message_bytes
+        self.session_id: Optional[str] = None
+        self.notifications: collections.deque[dict[str, Any]] = collections.deque(maxlen=NOTIFICATION_BACKLOG)
+        # no process and no stderr; kept empty so error reports treat both transports alike
+        self.stderr = StderrCapture(name, 0, 0)
+        self._ids = itertools.count(1)
+        self._in_flight = 0
+        self._handlers: list[Callable[[str, dict[str, Any]], Any]] = []
+        self._started = False
+        self._closed = False
+
+    @property
+    def pid(self) -> Optional[int]:
+        return None  # the server is not our process
+
+    @property
+    def running(self) -> bool:
+        return self._started and not self._closed
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def add_notification_handler(self, handler: Callable[[str, dict[str, Any]], Any]) -> None:
+        """``handler(server_name, message)`` is called on the MCP loop for every notification."""
+        self._handlers.append(handler)
+
+    @classmethod
+    def client(cls) -> httpx.AsyncClient:
+        """The pooled client shared by every HTTP MCP server (MCP loop only)."""
+        if cls._client is None or cls._client.is_closed:
+            cls._client = httpx.AsyncClient(
+                http2=importlib.util.find_spec("h2") is not None,
+                limits=httpx.Limits(
+                    max_connections=settings.MCP_CONFIG.get("MCP_HTTP_MAX_CONNECTIONS"),
+                    max_keepalive_connections=settings.MCP_CONFIG.get("MCP_HTTP_MAX_CONNECTIONS"),
+                    keepalive_expiry=settings.MCP_CONFIG.get("MCP_HTTP_KEEPALIVE_EXPIRY_S"),
+                ),
+                # per-call deadlines come from request(timeout_s=...); SSE streams may stay quiet for long
+                timeout=httpx.Timeout(None, connect=settings.MCP_CONFIG.get("MCP_HTTP_CONNECT_TIMEOUT_S")),
+            )
+        return cls._client
+
+    @classmethod
+    async def aclose_client(cls) -> None:
+        client, cls._client = cls._client, None
+        if client is not None:
+            await client.aclose()
+
+    # ------------------------------------------------------------------ async API
+
+    async def start(self) -> None:
+        """Nothing to spawn: the session itself is opened by the initialize request."""
+        self.session_id = None
+        self._started = True
+        self._closed = False
+
+    async def request(self, method: str, params: Optional[dict[str, Any]] = None, timeout_s: Optional[float] = None) -> dict[str, Any]:
+        """POST a request and wait up to ``timeout_s`` for the response message with its id (``result`` or ``error``)."""
+        if not self.running:
+            raise self.ServerExited(f"MCP server '{self.name}' session is closed")
+        request_id = next(self._ids)
+        message = {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params or {}}
+        self._in_flight += 1
+        try:
+            return await asyncio.wait_for(self._post(message, request_id), timeout_s)
+        except asyncio.TimeoutError:
+            await self._cancel_on_server(request_id, f"timed out after {timeout_s}s")
+            raise self.CallTimeout(f"MCP server '{self.name}' did not answer '{method}' within {timeout_s}s") from None
+        finally:
+            self._in_flight -= 1
+
+    async def notify(self, method: str, params: Optional[dict[str, Any]] = None) -> None:
+        message: dict[str, Any] = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            message["params"] = params
+        await self._post(message, None)
+
+    async def close(self, timeout_s: float = 5) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self.session_id is None:
+            return
+        try:
+            # servers that do not support ending sessions answer 405; either way we are done
+            await asyncio.wait_for(self.client().delete(self.url, headers=self._headers()), timeout_s)
+        except (httpx.HTTPError, asyncio.TimeoutError):
+            pass
+
+    # ------------------------------------------------------------------ sync wrappers
+
+    def start_sync(self) -> None:
+        McpEventLoop.run(self.start())
+
+    def request_sync(self, method: str, params: Optional[dict[str, Any]] = None, timeout_s: Optional[float] = None) -> dict[str, Any]:
+        return McpEventLoop.run(self.request(method, params, timeout_s))
+
+    def notify_sync(self, method: str, params: Optional[dict[str, Any]] = None) -> None:
+        McpEventLoop.run(self.notify(method, params))
+
+    def close_sync(self, timeout_s: float = 5) -> None:
+        McpEventLoop.run(self.close(timeout_s))
+
+    # ------------------------------------------------------------------ internals
+
+    def _headers(self) -> dict[str, str]:
+        headers = {**self.headers, "Accept": "application/json, text/event-stream"}
+        if self.session_id is not None:
+            headers[SESSION_HEADER] = self.session_id
+        return headers
+
+    async def _post(self, message: dict[str, Any], request_id: Optional[int]) -> Optional[dict[str, Any]]:
+        """Send one message; for a request, read the JSON or SSE answer until its response arrives."""
+        try:
+            async with self.client().stream("POST", self.url, json=message, headers=self._headers()) as response:
+                if response.status_code == 404 and self.session_id is not None:
+                    self._closed = True  # the pool replaces the transport, which opens a new session
+                    raise self.ServerExited(f"MCP server '{self.name}' session {self.session_id} expired")
+                if response.status_code >= 400:
+                    body = (await response.aread()).decode("utf-8", errors="replace")
+                    raise self.TransportError(
+                        f"MCP server '{self.name}' answered HTTP {response.status_code}: {body[:200]}"
+                    )
+                self.session_id = response.headers.get(SESSION_HEADER, self.session_id)
+                if request_id is None:
+                    return None  # notifications are acknowledged with 202 Accepted
+
+                if response.headers.get("content-type", "").startswith("text/event-stream"):
+                    async for event in EventSource(response).aiter_sse():
+                        if len(event.data) > self.max_message_bytes:
+                            raise self._too_large()
+                        reply = await self._dispatch(event.data, request_id) if event.data else None
+                        if reply is not None:
+                            return reply  # leaving the block closes the stream
+                else:
+                    reply = await self._dispatch(await self._read_body(response), request_id)
+                    if reply is not None:
+                        return reply
+                raise self.ServerExited(f"MCP server '{self.name}' ended the response without a reply")
+        except httpx.TransportError as http_error:  # connect/read failures: the server is unreachable
+            raise self.ServerExited(f"MCP server '{self.name}' is unreachable: {http_error}") from http_error
+
+    async def _read_body(self, response: httpx.Response) -> bytes:
+        """The JSON body, read chunk by chunk so an oversized reply is dropped before it is buffered."""
+        declared = int(response.headers.get("content-length") or 0)
+        if declared > self.max_message_bytes:
+            raise self._too_large()
+        chunks: list[bytes] = []
+        size = 0
+        async for chunk in response.aiter_bytes():
+            size += len(chunk)
+            if size > self.max_message_bytes:
+                raise self._too_large()
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    def _too_large(self) -> McpStdioTransport.ResponseTooLarge:
+        return self.ResponseTooLarge(
+            f"MCP server '{self.name}' sent a message above the {self.max_message_bytes} byte limit"
+        )
+
+    async def _dispatch(self, data: str | bytes, request_id: int) -> Optional[dict[str, Any]]:
+        """Handle the messages of one body or SSE event; returns the response to ``request_id`` if present."""
+        try:
+            payload = json.loads(data)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return None
+        reply = None
+        for message in payload if isinstance(payload, list) else [payload]:
+            if not isinstance(message, dict):
+                continue
+            if "method" not in message:
+                if message.get("id") == request_id:
+                    reply = message
+            elif "id" in message:
+                await self._answer_server_request(message)
+            else:
+                await self._notify_handlers(message)
+        return reply
+
+    async def _notify_handlers(self, message: dict[str, Any]) -> None:
+        self.notifications.append(message)
+        for handler in list(self._handlers):
+            try:
+                result = handler(self.name, message)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                pass  # a broken handler must not fail the call whose stream carried the notification
+
+    async def _answer_server_request(self, message: dict[str, Any]) -> None:
+        if message["method"] == "ping":
+            reply: dict[str, Any] = {"jsonrpc": "2.0", "id": message["id"], "result": {}}
+        else:
+            reply = {
+                "jsonrpc": "2.0",
+                "id": message["id"],
+                "error": {"code": METHOD_NOT_FOUND, "message": f"Method not supported by client: {message['method']}"},
+            }
+        try:
+            await self._post(reply, None)
+        except self.TransportError:
+            pass
+
+    async def _cancel_on_server(self, request_id: int, reason: str) -> None:
+        try:
+            await self.notify("notifications/cancelled", {"requestId": request_id, "reason": reason})
+        except self.TransportError:
+            pass  # the server is gone; nothing to cancel
@@ -24,6 +24,10 @@ def load_mcp_configs():
                     package=None,  # No package parameter for these configs
                     args=config.args,
                     func=config.wrapper,
+                    replicas=config.get("replicas", 1),
+                    stateful=config.get("stateful"),
+                    url=config.get("url"),
+                    headers=config.get("headers"),
                 )
         return True
     except Exception as e:
@@ -89,12 +93,17 @@ class McpConfigFile:
                 for name, server_data in servers_dict.items():
                     server_config = ServerConfig(
                         name=name,
-                        command=Command(
-                            server_data.get("command", "npx")
-                        ),  # Convert to Command enum
+                        # servers reached over streamable HTTP have a "url" instead of a command
+                        command=None
+                        if "url" in server_data
+                        else Command(server_data.get("command", "npx")),  # Convert to Command enum
                         args=server_data.get("args", []),
                         env=server_data.get("env", {}),
                         wrapper=UniversalMCPWrapper,
+                        replicas=max(1, int(server_data.get("replicas", 1))),
+                        stateful=server_data.get("stateful"),
+                        url=server_data.get("url"),
+                        headers=server_data.get("headers", {}),
                     )
                     server_configs.append(server_config)
 
@@ -1,15 +1,25 @@
-import json
+import copy
 import os
 import subprocess
+import threading
+import time
 from typing import Any, Callable, Optional
 
 from src.config import settings
+from src.mcp.config_watcher import McpConfigDiff, McpConfigWatcher, diff_configs
+from src.mcp.discovery_cache import McpDiscoveryCache
 from src.mcp.dynamically_tool_register import DynamicToolRegister
 from src.mcp.mcp_register_structure import (
     ServerConfig,
     Command,
-    MPC_TOOL_SERVER_MAPPING,
 )
+from src.mcp.http_transport import McpHttpTransport
+from src.mcp.native_filesystem import NativeFilesystem
+from src.mcp.pool import McpServerPool
+from src.mcp.result_store import McpResultStore
+from src.mcp.routing import McpRoutingTable
+from src.mcp.supervisor import McpSupervisor
+from src.mcp.transport import McpEventLoop, McpStdioTransport
 
 # ✅ Structured Debug Helpers
 from src.ui.diagnostics.debug_helpers import (
@@ -31,7 +41,14 @@ class MCP_Manager:
     # mcp.md configs
     mcp_enabled = None
     mcp_servers: dict[str, ServerConfig] = {}
-    running_servers: dict[str, subprocess.Popen] = {}
+    running_servers: dict[str, McpServerPool] = {}
+    # servers whose tools are registered; their process is (re)started on the first call
+    lazy_servers: set[str] = set()
+    _start_locks: dict[str, threading.Lock] = {}
+    _last_used: dict[str, float] = {}
+    _idle_timers: dict[str, threading.Timer] = {}
+    # one .mcp.json reload at a time (see apply_config)
+    _reload_lock = threading.Lock()
     response_id = 0
 
     def __new__(cls, *args, **kwargs):
@@ -51,6 +68,176 @@ class MCP_Manager:
         MCP_Manager.response_id += 1
         return MCP_Manager.response_id
 
+    @classmethod
+    def _request(
+        cls, name: str, method: str, params: dict, timeout_s: Optional[float] = None
+    ) -> dict[str, Any]:
+        """
+        Send one JSON-RPC request to a running server and wait for its response message.
+        Calls to one server are multiplexed by id (see McpStdioTransport), so they can overlap, and
+        spread over the server's replicas by its pool (see McpServerPool).
+        :raises McpStdioTransport.CallTimeout: no answer within MCP_TIMEOUT (the call is cancelled on the server).
+        :raises McpStdioTransport.ServerExited: the server process is gone.
+        :raises McpStdioTransport.ResponseTooLarge: the reply exceeded MCP_MAX_MESSAGE_MB.
+        """
+        pool = cls.running_servers[name]
+        return pool.request_sync(
+            method, params, timeout_s=timeout_s or settings.MCP_CONFIG.get("MCP_TIMEOUT")
+        )
+
+    @classmethod
+    def stderr_tail(cls, name: str, max_bytes: int = 2000) -> str:
+        """
+        Recent stderr output of a running server (for error reports).
+        :return: The last ``max_bytes`` of buffered stderr, or "" when the server is not running.
+        """
+        pool = cls.running_servers.get(name)
+        return pool.stderr_tail(max_bytes) if pool is not None else ""
+
+    @classmethod
+    def pool_report(cls) -> dict[str, dict[str, Any]]:
+        """
+        Per-replica calls, errors, queue depth and latency of every running server (for /stats).
+        :return: {server name: McpServerPool.report()}
+        """
+        return {name: pool.report() for name, pool in cls.running_servers.items()}
+
+    @classmethod
+    def get_server_for_tool(cls, tool_name: str) -> Optional[str]:
+        """
+        Server that offers a tool, from the routing table built by tools/list.
+        :param tool_name: Registered tool name, plain or namespaced as ``<server>__<tool>``.
+        :return: The server name, or None for an unknown tool.
+        """
+        route = McpRoutingTable.resolve(tool_name)
+        return route[0] if route is not None else None
+
+    @classmethod
+    def _rediscover(cls, name: str, index: int) -> None:
+        """
+        Pool recovery handler: a replacement process may be a newer package version with other tools,
+        so tools/list runs again. Called on the MCP loop, which tool_discovery blocks on.
+        """
+        if name not in cls.running_servers:
+            return
+        threading.Thread(target=cls.tool_discovery, args=(name,), name=f"mcp-rediscover-{name}", daemon=True).start()
+
+    @classmethod
+    def _is_stateful(cls, name: str) -> bool:
+        stateful = cls.mcp_servers[name].get("stateful")
+        if stateful is None:
+            return name in settings.MCP_CONFIG.get("MCP_STATEFUL_SERVERS", [])
+        return stateful
+
+    @classmethod
+    def _replica_count(cls, name: str) -> int:
+        """
+        Processes to start for a server. Stateful servers keep one: nothing sets a sticky affinity
+        key (McpServerPool.affinity) yet, so extra replicas would never receive a call.
+        """
+        replicas = cls.mcp_servers[name].get("replicas", 1)
+        if replicas > 1 and cls._is_stateful(name):
+            debug_warning(
+                heading="MCP • REPLICAS_IGNORED",
+                body=f"'{name}' is stateful; starting 1 process instead of {replicas}",
+                metadata={"server": name, "replicas": replicas},
+            )
+            return 1
+        return replicas
+
+    @classmethod
+    def register_cached_tools(cls, name: str) -> bool:
+        """
+        Register a server's tools from the discovery cache without starting it.
+        The server is then started lazily by the first call to one of its tools.
+        :return: True on a cache hit, False when the server has to be started to discover its tools.
+        """
+        server_info = cls.mcp_servers[name]
+        tools = McpDiscoveryCache.load(name, server_info)
+        if not tools:
+            return False
+        exposed_names = McpRoutingTable.update_server(name, [tool["name"] for tool in tools])
+        cls._log_conflicts(name, exposed_names)
+        # register_tool adds tool_name to the schemas in place; keep the cached copy clean
+        DynamicToolRegister.register_tool(
+            {"result": {"tools": copy.deepcopy(tools)}}, server_info.get("wrapper"), exposed_names
+        )
+        cls.lazy_servers.add(name)
+        debug_info(
+            heading="MCP • TOOLS_FROM_CACHE",
+            body=f"Registered {len(tools)} cached tools of '{name}'; the server starts on first use",
+            metadata={"server": name, "tools": [tool.get("name") for tool in tools]},
+        )
+        return True
+
+    @classmethod
+    def ensure_running(cls, name: str) -> bool:
+        """
+        Start a lazily registered server if it is not running (concurrent callers share one start)
+        and mark it as used for the idle-shutdown timer.
+        :return: True when the server is running.
+        """
+        with cls._start_locks.setdefault(name, threading.Lock()):
+            cls._last_used[name] = time.monotonic()
+            if cls.mcp_servers[name]["status"] == "running":
+                return True
+            if name not in cls.lazy_servers:
+                return False
+            debug_info(
+                heading="MCP • LAZY_START",
+                body=f"First call to '{name}' since its tools were registered; starting the server",
+                metadata={"server": name},
+            )
+            return bool(cls.start_server(name))
+
+    @classmethod
+    def _schedule_idle_shutdown(cls, name: str, delay_s: float) -> None:
+        previous = cls._idle_timers.pop(name, None)
+        if previous is not None:
+            previous.cancel()
+        timer = threading.Timer(delay_s, cls._idle_check, args=(name,))
+        timer.daemon = True
+        cls._idle_timers[name] = timer
+        timer.start()
+
+    @classmethod
+    def _idle_check(cls, name: str) -> None:
+        """Stop a lazily started server that has not been called for MCP_IDLE_SHUTDOWN_S."""
+        idle_limit_s = settings.MCP_CONFIG.get("MCP_IDLE_SHUTDOWN_S")
+        with cls._start_locks.setdefault(name, threading.Lock()):
+            pool = cls.running_servers.get(name)
+            if pool is None:
+                return
+            idle_s = time.monotonic() - cls._last_used.get(name, 0.0)
+            if pool.in_flight or idle_s < idle_limit_s:
+                cls._schedule_idle_shutdown(name, max(idle_limit_s - idle_s, 1.0))
+                return
+            debug_info(
+                heading="MCP • IDLE_SHUTDOWN",
+                body=f"Stopping '{name}' after {idle_s:.0f}s without calls; it restarts on the next call",
+                metadata={"server": name, "idle_s": round(idle_s, 1)},
+            )
+            cls.stop_server(name)
+
+    @staticmethod
+    def _log_conflicts(server: str, exposed_names: dict[str, str]) -> None:
+        renamed = {tool: exposed for tool, exposed in exposed_names.items() if tool != exposed}
+        if renamed:
+            debug_warning(
+                heading="MCP • TOOL_NAME_CONFLICT",
+                body=f"{len(renamed)} tool(s) of '{server}' are already offered by another server; namespaced",
+                metadata={"server": server, "renamed": renamed, "conflicts": McpRoutingTable.conflicts()},
+            )
+
+    @staticmethod
+    def _log_notification(server: str, message: dict[str, Any]) -> None:
+        """Notifications arrive separately from responses and never answer a pending call."""
+        debug_info(
+            heading="MCP • NOTIFICATION",
+            body=f"'{message.get('method')}' from server '{server}'",
+            metadata={"server": server, "params_preview": str(message.get("params"))[:200]},
+        )
+
     @classmethod
     def add_server(
         cls,
@@ -59,6 +246,10 @@ class MCP_Manager:
         package: Optional[str],
         args: list[str],
         func: Callable,
+        replicas: int = 1,
+        stateful: Optional[bool] = None,
+        url: Optional[str] = None,
+        headers: Optional[dict[str, str]] = None,
     ):
         """
         Add a server to the MCP manager.
@@ -67,6 +258,10 @@ class MCP_Manager:
         :param package: Command to run the server.
         :param args: List of arguments for the command.
         :param func: To assign the function to the llm's tools
+        :param replicas: Number of server processes calls are load-balanced over.
+        :param stateful: Keeps per-process state, so runs one replica; None = listed in MCP_STATEFUL_SERVERS.
+        :param url: Streamable-HTTP endpoint of a shared server; replaces runner/args (one MCP session per replica).
+        :param headers: HTTP headers for a ``url`` server (e.g. Authorization).
         """
 
         """
@@ -107,11 +302,15 @@ class MCP_Manager:
             wrapper=func,
             status="stopped",
             pid=None,
+            replicas=max(1, replicas),
+            stateful=stateful,
+            url=url,
+            headers=headers or {},
         )
         debug_info(
             heading="MCP • SERVER_ADDED",
-            body=f"Registered server '{name}' (runner={runner})",
-            metadata={"package": package, "args": args},
+            body=f"Registered server '{name}' ({f'url={url}' if url else f'runner={runner}'})",
+            metadata={"package": package, "args": args, "replicas": replicas},
         )
 
     @classmethod
@@ -128,81 +327,8 @@ class MCP_Manager:
             )
             return {}
 
-        tool_discovery_request = {
-            "jsonrpc": "2.0",
-            "id": MCP_Manager.generate_response_id(),
-            "method": "tools/list",
-            "params": {},
-        }
-
         try:
-            proc = MCP_Manager.running_servers[mcp_server_name]
-            proc.stdin.write(json.dumps(tool_discovery_request) + "\n")
-            proc.stdin.flush()
-
-            # 🔧 ENHANCED: Robust response reading with encoding handling
-            try:
-                response_line = proc.stdout.readline().strip()
-                if not response_line:
-                    debug_warning(
-                        heading="MCP • TOOL_DISCOVERY_EMPTY_RESPONSE",
-                        body="Server returned empty response for tools/list",
-                        metadata={"server": mcp_server_name},
-                    )
-                    return {}
-
-                # Handle potential encoding issues with multiple fallback strategies
-                if isinstance(response_line, bytes):
-                    # Try multiple encoding strategies for robust handling
-                    for encoding in ["utf-8", "utf-8-sig", "latin-1", "cp1252"]:
-                        try:
-                            response_line = response_line.decode(encoding)
-                            break
-                        except UnicodeDecodeError:
-                            continue
-                    else:
-                        # Final fallback: decode with error replacement
-                        response_line = response_line.decode("utf-8", errors="replace")
-                        debug_warning(
-                            heading="MCP • TOOL_DISCOVERY_ENCODING_FALLBACK",
-                            body="Used encoding fallback with character replacement",
-                            metadata={"server": mcp_server_name},
-                        )
-                elif isinstance(response_line, str):
-                    # Already a string, but might have encoding issues
-                    try:
-                        # Test if string is properly encoded by trying to encode/decode
-                        response_line.encode("utf-8")
-                    except UnicodeEncodeError:
-                        # Re-encode with error handling
-                        response_line = response_line.encode(
-                            "utf-8", errors="replace"
-                        ).decode("utf-8")
-                        debug_warning(
-                            heading="MCP • TOOL_DISCOVERY_STRING_ENCODING_FIX",
-                            body="Fixed string encoding issues",
-                            metadata={"server": mcp_server_name},
-                        )
-
-                response_line_json = json.loads(response_line)
-
-            except UnicodeDecodeError as encoding_error:
-                debug_error(
-                    heading="MCP • TOOL_DISCOVERY_ENCODING_ERROR",
-                    body=f"All encoding strategies failed: {encoding_error}",
-                    metadata={"server": mcp_server_name},
-                )
-                return {}
-            except json.JSONDecodeError as json_error:
-                debug_error(
-                    heading="MCP • TOOL_DISCOVERY_JSON_ERROR",
-                    body=f"JSON parsing failed: {json_error}",
-                    metadata={
-                        "server": mcp_server_name,
-                        "response_preview": str(response_line),
-                    },
-                )
-                return {}
+            response_line_json = cls._request(mcp_server_name, "tools/list", {})
 
             # 🔧 ENHANCED: Handle different response formats and error cases
             if "error" in response_line_json:
@@ -246,10 +372,29 @@ class MCP_Manager:
                     },
                 )
                 if tools_found:
-                    DynamicToolRegister.register_tool(
-                        response_line_json,
-                        MCP_Manager.mcp_servers[mcp_server_name].get("wrapper"),
+                    server_info = MCP_Manager.mcp_servers[mcp_server_name]
+                    cached = McpDiscoveryCache.load(mcp_server_name, server_info)
+                    # stored before register_tool adds tool_name to the schemas in place
+                    McpDiscoveryCache.store(
+                        mcp_server_name, server_info, tools_found, server_info.get("server_version")
+                    )
+                    # a restarted server only rebuilds its own routes
+                    exposed_names = McpRoutingTable.update_server(
+                        mcp_server_name, [t["name"] for t in tools_found]
                     )
+                    cls._log_conflicts(mcp_server_name, exposed_names)
+                    if mcp_server_name not in cls.lazy_servers:
+                        DynamicToolRegister.register_tool(
+                            response_line_json, server_info.get("wrapper"), exposed_names
+                        )
+                    elif cached is not None and [t.get("name") for t in cached] != [
+                        t.get("name") for t in tools_found
+                    ]:
+                        debug_warning(
+                            heading="MCP • DISCOVERY_CHANGED",
+                            body="Server tools differ from the cached ones; the cache is updated for the next session",
+                            metadata={"server": mcp_server_name},
+                        )
                 else:
                     debug_warning(
                         heading="MCP • NO_TOOLS",
@@ -275,6 +420,7 @@ class MCP_Manager:
                     "server": mcp_server_name,
                     "error_type": type(discovery_error).__name__,
                     "error_message": str(discovery_error)[:200],
+                    "stderr_tail": cls.stderr_tail(mcp_server_name),
                 },
             )
             return {}
@@ -291,6 +437,9 @@ class MCP_Manager:
                 server_info = MCP_Manager.mcp_servers[name]
                 runner = server_info["command"]
                 args = server_info.get("args", [])
+                replicas = cls._replica_count(name)
+                stateful = cls._is_stateful(name)
+                url = server_info.get("url")
 
                 # 🔧 DEBUG: Add comprehensive debugging
                 debug_info(
@@ -308,7 +457,9 @@ class MCP_Manager:
 
                 # Convert Command enum to its string value
                 try:
-                    if hasattr(runner, "value"):
+                    if url:
+                        command_str = url  # shared server over streamable HTTP; nothing is spawned
+                    elif hasattr(runner, "value"):
                         command_str = runner.value
                     else:
                         command_str = str(runner)
@@ -358,22 +509,36 @@ class MCP_Manager:
                     return False
 
                 try:
-                    # 🔧 FIX: Set proper encoding for subprocess communication
-                    server_process = subprocess.Popen(
-                        command,
-                        shell=True,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE,
-                        stdin=subprocess.PIPE,
-                        text=True,
-                        encoding="utf-8",  # Explicitly set UTF-8 encoding
-                        errors="replace",  # Handle encoding errors gracefully
-                        bufsize=1,
-                        cwd=working_dir,
-                        env=os.environ.copy(),
-                    )
+                    # asyncio transport per replica: responses are matched to requests by id,
+                    # stdout noise is dropped; the pool sends each call to the least-loaded replica
+                    max_message_bytes = settings.MCP_CONFIG.get("MCP_MAX_MESSAGE_MB") * 1024 * 1024
+
+                    def make_transport(index: int):
+                        # index -1 is the supervisor's warm standby
+                        label = f"{name}#standby" if index < 0 else name if replicas == 1 else f"{name}#{index}"
+                        if url:
+                            # one MCP session per replica on the shared server, over pooled connections
+                            return McpHttpTransport(
+                                label, url, headers=server_info.get("headers"), max_message_bytes=max_message_bytes
+                            )
+                        return McpStdioTransport(
+                            label,
+                            command,
+                            cwd=working_dir,
+                            env=os.environ.copy(),
+                            # stderr is drained continuously; the tail is kept for error reports
+                            stderr_limit_bytes=settings.MCP_CONFIG.get("MCP_STDERR_BUFFER_KB") * 1024,
+                            stderr_lines_per_second=settings.MCP_CONFIG.get("MCP_STDERR_LOG_RATE"),
+                            max_message_bytes=max_message_bytes,
+                        )
+
+                    server_process = McpServerPool(name, make_transport, replicas=replicas, sticky=stateful)
+                    server_process.start_sync()
+                    server_process.add_notification_handler(cls._log_notification)
+                    server_process.add_recovery_handler(cls._rediscover)
                     MCP_Manager.running_servers[name] = server_process
                     server_info["status"] = "running"
+                    server_info["pid"] = server_process.pid
 
                     debug_info(
                         heading="MCP • SERVER_PROCESS_STARTED",
@@ -381,6 +546,8 @@ class MCP_Manager:
                         metadata={
                             "server": name,
                             "pid": server_process.pid,
+                            "replicas": replicas,
+                            "sticky": stateful,
                             "command": str(command),
                             "working_dir": working_dir,
                         },
@@ -388,11 +555,9 @@ class MCP_Manager:
 
                     # Handshake / initialize
                     try:
-                        init_request = {
-                            "jsonrpc": "2.0",
-                            "id": MCP_Manager.generate_response_id(),
-                            "method": "initialize",
-                            "params": {
+                        # every replica gets its own handshake (initialize + notifications/initialized)
+                        init_response = server_process.initialize_sync(
+                            {
                                 "protocolVersion": "2024-11-05",
                                 "capabilities": {},
                                 "clientInfo": {
@@ -400,27 +565,29 @@ class MCP_Manager:
                                     "version": "1.0.0",
                                 },
                             },
-                        }
-                        server_process.stdin.write(json.dumps(init_request) + "\n")
-                        server_process.stdin.flush()
-                        init_response = server_process.stdout.readline()
+                            timeout_s=settings.MCP_CONFIG.get("MCP_TIMEOUT"),
+                        )
+                        server_info["server_version"] = (
+                            init_response.get("result", {}).get("serverInfo", {}).get("version")
+                        )
                         debug_info(
                             heading="MCP • SERVER_INITIALIZED",
                             body=f"Handshake completed for '{name}'",
-                            metadata={"init_response_preview": init_response[:120]},
+                            metadata={"init_response_preview": str(init_response)[:120]},
                         )
+                        if settings.MCP_CONFIG.get("MCP_HEALTH_CHECK_INTERVAL_S"):
+                            # health checks, restarts, one transparent retry per call, warm standby
+                            McpSupervisor.watch(name, server_process)
+                        if server_process.report()["start_errors"]:
+                            debug_warning(
+                                heading="MCP • REPLICAS_DEGRADED",
+                                body=f"{len(server_process.healthy)}/{replicas} replicas of '{name}' are running",
+                                metadata={"server": name, **server_process.report()},
+                            )
                         # Discover tools
                         try:
                             tools = cls.tool_discovery(name)
-                            if tools and "result" in tools:
-                                # map discovered tools to server
-                                MPC_TOOL_SERVER_MAPPING.update(
-                                    {
-                                        tool["name"]: name
-                                        for tool in tools["result"]["tools"]
-                                    }
-                                )  # working
-                            else:
+                            if not (tools and "result" in tools):
                                 debug_warning(
                                     heading="MCP • DISCOVERY_EMPTY",
                                     body="No tools returned after discovery",
@@ -453,9 +620,16 @@ class MCP_Manager:
                         debug_warning(
                             heading="MCP • INIT_FAILED",
                             body=f"Initialization failed: {init_error}",
-                            metadata={"server": name},
+                            metadata={"server": name, "stderr_tail": cls.stderr_tail(name)},
                         )
 
+                    if settings.MCP_CONFIG.get("MCP_LAZY_START") and McpRoutingTable.servers().get(name):
+                        # tools are registered: from now on the process may stop when idle and restart on demand
+                        cls.lazy_servers.add(name)
+                    if name in cls.lazy_servers and not stateful and settings.MCP_CONFIG.get("MCP_IDLE_SHUTDOWN_S"):
+                        cls._last_used.setdefault(name, time.monotonic())
+                        cls._schedule_idle_shutdown(name, settings.MCP_CONFIG.get("MCP_IDLE_SHUTDOWN_S"))
+
                     debug_info(
                         heading="MCP • SERVER_STARTED",
                         body=f"Started server '{name}'",
@@ -546,14 +720,24 @@ class MCP_Manager:
             msg = f"Server '{name}' not found"
             debug_error(heading="MCP • CALL_ERROR", body=msg, metadata={"server": name})
             return {"success": False, "error": msg}
-        if MCP_Manager.mcp_servers[name]["status"] != "running":
+        if NativeFilesystem.serves(MCP_Manager.mcp_servers[name], tool_name):
+            # hot filesystem tools run in-process; the server is not started for them
+            debug_info(
+                heading="MCP • NATIVE_TOOL_CALL",
+                body=f"Serving tool '{tool_name}' in-process",
+                metadata={"server": name, "arg_names": list(args), "args": McpResultStore.describe(args)},
+            )
+            result = NativeFilesystem.call(MCP_Manager.mcp_servers[name], tool_name, args)
+            return {"success": True, "data": McpResultStore.cap(name, tool_name, result)}
+        if not cls.ensure_running(name):
             msg = f"Server '{name}' is not running"
             debug_error(heading="MCP • CALL_ERROR", body=msg, metadata={"server": name})
             return {"success": False, "error": msg}
         debug_info(
             heading="MCP • TOOL_CALL",
             body=f"Calling tool '{tool_name}'",
-            metadata={"server": name, "args": args},
+            # sizes and hashes only: arguments may carry whole files (write_file)
+            metadata={"server": name, "arg_names": list(args), "args": McpResultStore.describe(args)},
         )
         proc = MCP_Manager.running_servers.get(name)
         if not proc:
@@ -561,107 +745,127 @@ class MCP_Manager:
             debug_error(heading="MCP • CALL_ERROR", body=msg, metadata={"server": name})
             return {"success": False, "error": msg}
         try:
-            mcp_request = {
-                "jsonrpc": "2.0",
-                "id": MCP_Manager.generate_response_id(),
-                "method": "tools/call",
-                "params": {"name": tool_name, "arguments": args},
-            }
-            proc.stdin.write(json.dumps(mcp_request) + "\n")
-            proc.stdin.flush()
-
-            # 🔧 FIX: Robust response reading with encoding handling
             try:
-                response_line = proc.stdout.readline().strip()
-                if not response_line:
-                    msg = f"No response from server '{name}'"
-                    debug_error(
-                        heading="MCP • CALL_ERROR", body=msg, metadata={"server": name}
-                    )
-                    return {"success": False, "error": msg}
-
-                # Handle potential encoding issues with multiple fallback strategies
-                if isinstance(response_line, bytes):
-                    # Try multiple encoding strategies for robust handling
-                    for encoding in ["utf-8", "utf-8-sig", "latin-1", "cp1252"]:
-                        try:
-                            response_line = response_line.decode(encoding)
-                            break
-                        except UnicodeDecodeError:
-                            continue
-                    else:
-                        # Final fallback: decode with error replacement
-                        response_line = response_line.decode("utf-8", errors="replace")
-                        debug_warning(
-                            heading="MCP • CALL_ENCODING_FALLBACK",
-                            body="Used encoding fallback with character replacement for tool call",
-                            metadata={"server": name, "tool": tool_name},
-                        )
-                elif isinstance(response_line, str):
-                    # Already a string, but might have encoding issues
-                    try:
-                        # Test if string is properly encoded by trying to encode/decode
-                        response_line.encode("utf-8")
-                    except UnicodeEncodeError:
-                        # Re-encode with error handling
-                        response_line = response_line.encode(
-                            "utf-8", errors="replace"
-                        ).decode("utf-8")
-                        debug_warning(
-                            heading="MCP • CALL_STRING_ENCODING_FIX",
-                            body="Fixed string encoding issues in tool call response",
-                            metadata={"server": name, "tool": tool_name},
-                        )
-
-            except UnicodeDecodeError as encoding_error:
-                msg = f"Encoding error reading response: {encoding_error}"
+                json_response = cls._request(
+                    name, "tools/call", {"name": tool_name, "arguments": args}
+                )
+            except McpStdioTransport.CallTimeout as timeout_error:
                 debug_error(
-                    heading="MCP • CALL_ENCODING_ERROR",
-                    body=msg,
-                    metadata={"server": name, "tool": tool_name},
+                    heading="MCP • CALL_TIMEOUT",
+                    body=timeout_error.message,
+                    metadata={"server": name, "tool": tool_name, "stderr_tail": cls.stderr_tail(name)},
                 )
-                return {"success": False, "error": msg}
-
-            try:
-                json_response = json.loads(response_line)
-                if "error" in json_response:
-                    msg = f"MCP server error: {json_response['error']}"
-                    debug_error(
-                        heading="MCP • TOOL_ERROR",
-                        body=msg,
-                        metadata={"server": name, "tool": tool_name},
-                    )
-                    return {"success": False, "error": msg}
-                if "result" in json_response:
-                    debug_info(
-                        heading="MCP • TOOL_SUCCESS",
-                        body="Tool executed successfully",
-                        metadata={"server": name, "tool": tool_name},
-                    )
-                    return {"success": True, "data": json_response["result"]}
-                debug_warning(
-                    heading="MCP • NO_RESULT_FIELD",
-                    body="Response missing 'result' field; returning raw payload",
+                return {"success": False, "error": timeout_error.message}
+            except McpStdioTransport.ResponseTooLarge as size_error:
+                debug_error(
+                    heading="MCP • RESPONSE_TOO_LARGE",
+                    body=size_error.message,
                     metadata={"server": name, "tool": tool_name},
                 )
-                return {"success": True, "data": json_response}
-            except json.JSONDecodeError as e:
-                msg = f"Invalid JSON response: {e}"
+                return {"success": False, "error": size_error.message}
+
+            if "error" in json_response:
+                msg = f"MCP server error: {json_response['error']}"
                 debug_error(
-                    heading="MCP • PARSE_ERROR",
+                    heading="MCP • TOOL_ERROR",
                     body=msg,
                     metadata={"server": name, "tool": tool_name},
                 )
-                return {"success": False, "error": msg, "raw_response": response_line}
+                return {"success": False, "error": msg}
+            if "result" in json_response:
+                result = json_response["result"]
+                debug_info(
+                    heading="MCP • TOOL_SUCCESS",
+                    body="Tool executed successfully",
+                    metadata={"server": name, "tool": tool_name, "result_chars": McpResultStore.content_size(result)},
+                )
+                # oversized results go to the blob store; the agent gets a preview and the path
+                return {"success": True, "data": McpResultStore.cap(name, tool_name, result)}
+            debug_warning(
+                heading="MCP • NO_RESULT_FIELD",
+                body="Response missing 'result' field; returning raw payload",
+                metadata={"server": name, "tool": tool_name},
+            )
+            return {"success": True, "data": json_response}
         except Exception as e:
             msg = f"Communication error: {e}"
             debug_error(
                 heading="MCP • COMM_ERROR",
                 body=msg,
-                metadata={"server": name, "tool": tool_name},
+                metadata={"server": name, "tool": tool_name, "stderr_tail": cls.stderr_tail(name)},
             )
             return {"success": False, "error": msg}
 
+    @classmethod
+    def apply_config(cls, server_configs: list[ServerConfig]) -> McpConfigDiff:
+        """
+        Reconcile the registered servers with a reloaded .mcp.json (see McpConfigWatcher).
+        Added servers are started, removed ones stopped, changed ones restarted; the other servers
+        keep running and keep their tools.
+        :param server_configs: Servers parsed by McpConfigFile.retrieve_config.
+        :return: The names added, removed and changed.
+        """
+        with cls._reload_lock:
+            loaded = {config["name"]: config for config in server_configs}
+            diff = diff_configs(cls.mcp_servers, server_configs)
+            for name in diff.removed + diff.changed:
+                cls.remove_server(name)
+            for name in diff.removed:
+                McpDiscoveryCache.invalidate(name)
+            for name in diff.added + diff.changed:
+                config = loaded[name]
+                cls.add_server(
+                    name,
+                    runner=config["command"],
+                    package=None,
+                    args=config["args"],
+                    func=config["wrapper"],
+                    replicas=config.get("replicas", 1),
+                    stateful=config.get("stateful"),
+                    url=config.get("url"),
+                    headers=config.get("headers"),
+                )
+                if not (settings.MCP_CONFIG.get("MCP_LAZY_START") and cls.register_cached_tools(name)):
+                    cls.start_server(name)
+            if not diff.empty:
+                from src.utils.context_window import ContextWindow
+
+                # rendered tool catalogues are keyed by tool names; a restarted server may describe them differently
+                ContextWindow.invalidate_tool_catalogues()
+                debug_info(
+                    heading="MCP • CONFIG_RELOADED",
+                    body=f"Applied the changed MCP config: {len(diff.added)} added, "
+                    f"{len(diff.removed)} removed, {len(diff.changed)} restarted",
+                    metadata=diff.as_dict(),
+                )
+            return diff
+
+    @classmethod
+    def remove_server(cls, name: str) -> None:
+        """
+        Stop a server and unregister it and its tools; the tools of other servers stay registered.
+        :param name: Name of the server to remove.
+        """
+        # the start lock keeps a concurrent lazy start from bringing the server back up meanwhile
+        with cls._start_locks.setdefault(name, threading.Lock()):
+            if name in cls.running_servers:
+                cls.stop_server(name)
+            idle_timer = cls._idle_timers.pop(name, None)
+            if idle_timer is not None:
+                idle_timer.cancel()
+            # registered names are taken before the routes go: a conflicting tool may be namespaced
+            exposed = [McpRoutingTable.exposed_name(name, tool) for tool in McpRoutingTable.servers().get(name, [])]
+            McpRoutingTable.remove_server(name)
+            DynamicToolRegister.unregister_tools(exposed)
+            cls.lazy_servers.discard(name)
+            cls._last_used.pop(name, None)
+            cls.mcp_servers.pop(name, None)
+        debug_info(
+            heading="MCP • SERVER_REMOVED",
+            body=f"Removed server '{name}' and {len(exposed)} tools",
+            metadata={"server": name, "tools": exposed},
+        )
+
     @classmethod
     def stop_server(cls, name: str) -> bool:
         """
@@ -677,9 +881,12 @@ class MCP_Manager:
             )
             return False
         proc = cls.running_servers[name]
+        McpSupervisor.unwatch(name)  # an intentional stop is not a crash
+        idle_timer = cls._idle_timers.pop(name, None)
+        if idle_timer is not None:
+            idle_timer.cancel()
         try:
-            proc.terminate()
-            proc.wait(timeout=5)
+            proc.close_sync(timeout_s=5)
             del cls.running_servers[name]
             cls.mcp_servers[name]["status"] = "stopped"
             debug_info(
@@ -742,7 +949,11 @@ class MCP_Manager:
         Stops all servers and handles any cleanup errors gracefully.
         """
         try:
+            McpConfigWatcher.stop()
             cls.stop_all_servers()
+            McpSupervisor.stop()
+            if any(server.get("url") for server in cls.mcp_servers.values()):
+                McpEventLoop.run(McpHttpTransport.aclose_client())
         except Exception as e:
             debug_error(
                 heading="MCP • CLEANUP_ERROR", body=f"Cleanup failed: {e}", metadata={}
@@ -760,7 +971,7 @@ class MCP_Manager:
             msg = f"Server '{server_name}' not found"
             debug_error(heading="MCP • URI_READ_ERROR", body=msg, metadata={"server": server_name})
             return {"success": False, "error": msg}
-        if MCP_Manager.mcp_servers[server_name]["status"] != "running":
+        if not cls.ensure_running(server_name):
             msg = f"Server '{server_name}' is not running"
             debug_error(heading="MCP • URI_READ_ERROR", body=msg, metadata={"server": server_name})
             return {"success": False, "error": msg}
@@ -775,97 +986,48 @@ class MCP_Manager:
             debug_error(heading="MCP • URI_READ_ERROR", body=msg, metadata={"server": server_name})
             return {"success": False, "error": msg}
         try:
-            mcp_uri_read_request = {
-                "jsonrpc": "2.0",
-                "id": MCP_Manager.generate_response_id(),
-                "method": "resources/read",
-                "params": {"uri": uri_resource},
-            }
-            proc.stdin.write(json.dumps(mcp_uri_read_request) + "\n")
-            proc.stdin.flush()
-            # 🔧 FIX: Robust response reading with encoding handling
             try:
-                response_line = proc.stdout.readline().strip()
-                if not response_line:
-                    msg = f"No response from server '{server_name}'"
-                    debug_error(
-                        heading="MCP • URI_READ_ERROR", body=msg, metadata={"server": server_name}
-                    )
-                    return {"success": False, "error": msg}
-
-                # Handle potential encoding issues with multiple fallback strategies
-                if isinstance(response_line, bytes):
-                    # Try multiple encoding strategies for robust handling
-                    for encoding in ["utf-8", "utf-8-sig", "latin-1", "cp1252"]:
-                        try:
-                            response_line = response_line.decode(encoding)
-                            break
-                        except UnicodeDecodeError:
-                            continue
-                    else:
-                        # Final fallback: decode with error replacement
-                        response_line = response_line.decode("utf-8", errors="replace")
-                        debug_warning(
-                            heading="MCP • URI_READ_ENCODING_FALLBACK",
-                            body="Used encoding fallback with character replacement for URI read",
-                            metadata={"server": server_name, "uri": uri_resource},
-                        )
-                elif isinstance(response_line, str):
-                    # Already a string, but might have encoding issues
-                    try:
-                        # Test if string is properly encoded by trying to encode/decode
-                        response_line.encode("utf-8")
-                    except UnicodeEncodeError:
-                        # Re-encode with error handling
-                        response_line = response_line.encode(
-                            "utf-8", errors="replace"
-                        ).decode("utf-8")
-                        debug_warning(
-                            heading="MCP • URI_READ_STRING_ENCODING_FIX",
-                            body="Fixed string encoding issues in URI read response",
-                            metadata={"server": server_name, "uri": uri_resource},
-                        )
-            except UnicodeDecodeError as encoding_error:
-                msg = f"Encoding error reading response: {encoding_error}"
+                json_response = cls._request(
+                    server_name, "resources/read", {"uri": uri_resource}
+                )
+            except McpStdioTransport.CallTimeout as timeout_error:
                 debug_error(
-                    heading="MCP • URI_READ_ENCODING_ERROR",
-                    body=msg,
-                    metadata={"server": server_name, "uri": uri_resource},
+                    heading="MCP • URI_READ_TIMEOUT",
+                    body=timeout_error.message,
+                    metadata={"server": server_name, "uri": uri_resource, "stderr_tail": cls.stderr_tail(server_name)},
                 )
-                return {"success": False, "error": msg}
-            try:
-                json_response = json.loads(response_line)
-                if "error" in json_response:
-                    msg = f"MCP server error: {json_response['error']}"
-                    debug_error(
-                        heading="MCP • URI_READ_TOOL_ERROR",
-                        body=msg,
-                        metadata={"server": server_name, "uri": uri_resource},
-                    )
-                    return {"success": False, "error": msg}
-                ## pass main successful response
-                if "result" in json_response:
-                    debug_info(
-                        heading="MCP • URI_READ_SUCCESS",
-                        body="URI resource read successfully",
-                        metadata={"server": server_name, "uri": uri_resource},
-                    )
-                    return {"success": True, "data": json_response["result"]}
-                debug_warning(
-                    heading="MCP • URI_READ_NO_RESULT_FIELD",
-                    body="Response missing 'result' field; returning raw payload",
+                return {"success": False, "error": timeout_error.message}
+            except McpStdioTransport.ResponseTooLarge as size_error:
+                debug_error(
+                    heading="MCP • RESPONSE_TOO_LARGE",
+                    body=size_error.message,
                     metadata={"server": server_name, "uri": uri_resource},
                 )
-                # return full response if no result field
-                return {"success": True, "data": json_response}
-            except json.JSONDecodeError as e:
-                msg = f"Invalid JSON response: {e}"
+                return {"success": False, "error": size_error.message}
+
+            if "error" in json_response:
+                msg = f"MCP server error: {json_response['error']}"
                 debug_error(
-                    heading="MCP • URI_READ_PARSE_ERROR",
+                    heading="MCP • URI_READ_TOOL_ERROR",
                     body=msg,
                     metadata={"server": server_name, "uri": uri_resource},
                 )
-                return {"success": False, "error": msg, "raw_response": response_line}
+                return {"success": False, "error": msg}
+            ## pass main successful response
+            if "result" in json_response:
+                debug_info(
+                    heading="MCP • URI_READ_SUCCESS",
+                    body="URI resource read successfully",
+                    metadata={"server": server_name, "uri": uri_resource},
+                )
+                return {"success": True, "data": McpResultStore.cap(server_name, uri_resource, json_response["result"])}
+            debug_warning(
+                heading="MCP • URI_READ_NO_RESULT_FIELD",
+                body="Response missing 'result' field; returning raw payload",
+                metadata={"server": server_name, "uri": uri_resource},
+            )
+            # return full response if no result field
+            return {"success": True, "data": json_response}
         except Exception as e:
             msg = f"Communication error: {e}"
             debug_error(
@@ -1,4 +1,4 @@
-from typing import TypedDict, List, Callable, Optional
+from typing import TypedDict, List, Callable, Optional, NotRequired
 from enum import Enum
 
 
@@ -13,13 +13,15 @@ class Command(str, Enum):
 
 class ServerConfig(TypedDict):
     name: str
-    command: Command
+    command: Optional[Command]  # None for servers reached over HTTP (see url)
     # package: str   ## e.g ("@modelcontextprotocol/server-github@latest")  now package would be included in the args of that mcp.md
     args: List[str]
     env: dict[str, str]
     wrapper: Callable
     status: Optional[str]  # e.g., "running", "stopped"
     pid: Optional[int]  # Process ID if the server is running
-
-
-MPC_TOOL_SERVER_MAPPING: dict[str, str] = {}  # key: tool_name, value: server_name
+    replicas: NotRequired[int]  # processes behind a load-balanced pool (default 1)
+    stateful: NotRequired[Optional[bool]]  # sticky routing; None = decided by MCP_STATEFUL_SERVERS
+    server_version: NotRequired[Optional[str]]  # serverInfo.version from the initialize handshake
+    url: NotRequired[Optional[str]]  # streamable-HTTP endpoint of a shared server instead of a child process
+    headers: NotRequired[dict[str, str]]  # sent with every HTTP request (e.g. Authorization)
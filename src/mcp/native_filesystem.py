@@ -0,0 +1,244 @@
+"""
+In-process implementation of the hottest @modelcontextprotocol/server-filesystem tools.
+
+Every filesystem call used to go universal_tool -> JSON-RPC over stdio -> a Node.js process ->
+back, for work that is a few system calls. NativeFilesystem serves the same tool names with the
+same arguments and result shapes directly in Python:
+
+    read_text_file (and its deprecated alias read_file), write_file, list_directory,
+    search_files, directory_tree
+
+MCP_Manager.call_mcp_server hands a call to this backend when the target server runs
+server-filesystem and the tool is listed in MCP_NATIVE_FILESYSTEM_TOOLS; any other tool (and
+every tool when the setting is empty) still goes to the server. The tools are still discovered
+from the server's tools/list (or the discovery cache), so the agent sees the same schemas; when
+only native tools are used, a lazily registered server is never started.
+
+The sandbox is the server's: the allowed directories are the directory arguments of its
+.mcp.json entry, paths are resolved against the project root like the server's working
+directory, and symlinks may not lead outside the allowed directories. Directories are walked
+with os.scandir, and head/tail reads of large files scan a memory map, so only the requested
+lines are decoded.
+
+Usage:
+    if NativeFilesystem.serves(server_config, "read_text_file"):
+        result = NativeFilesystem.call(server_config, "read_text_file", {"path": "README.md", "head": 20})
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import json
+import mmap
+import os
+from pathlib import Path
+from typing import Any, ClassVar
+
+from src.config import settings
+
+SERVER_PACKAGE = "server-filesystem"
+# head/tail reads of files at least this large scan a memory map instead of reading the file
+MMAP_THRESHOLD_BYTES = 1024 * 1024
+_GLOB_CHARACTERS = set("*?[")
+
+
+class NativeFilesystem:
+    """server-filesystem tools served in-process, sandboxed to the server's allowed directories."""
+
+    class AccessDenied(Exception):
+        def __init__(self, message: str):
+            self.message = message
+            super().__init__(self.message)
+
+    # tool name -> implementing method, called as method(base, allowed, args) -> result text
+    _tools: ClassVar[dict[str, str]] = {
+        "read_text_file": "read_text_file",
+        "read_file": "read_text_file",  # deprecated alias the server still offers
+        "write_file": "write_file",
+        "list_directory": "list_directory",
+        "search_files": "search_files",
+        "directory_tree": "directory_tree",
+    }
+
+    @classmethod
+    def serves(cls, server_config: dict[str, Any], tool: str) -> bool:
+        """True when a call to ``tool`` on this server is handled in-process."""
+        return (
+            tool in cls._tools
+            and tool in settings.MCP_CONFIG.get("MCP_NATIVE_FILESYSTEM_TOOLS", [])
+            and not server_config.get("url")
+            and any(SERVER_PACKAGE in str(arg) for arg in server_config.get("args", []))
+        )
+
+    @classmethod
+    def call(cls, server_config: dict[str, Any], tool: str, args: dict[str, Any]) -> dict[str, Any]:
+        """Run a tool; returns a tools/call result, with ``isError`` set as the server would."""
+        allowed = cls.allowed_directories(server_config)
+        try:
+            text = getattr(cls, cls._tools[tool])(Path(settings.BASE_DIR.parent), allowed, args)
+        except cls.AccessDenied as denied:
+            return cls._error(denied.message)
+        except (OSError, ValueError, TypeError, KeyError) as error:
+            return cls._error(str(error) if not isinstance(error, KeyError) else f"Missing argument: {error}")
+        return {"content": [{"type": "text", "text": text}]}
+
+    @staticmethod
+    def allowed_directories(server_config: dict[str, Any]) -> list[str]:
+        """The directory arguments after the server package, as real, case-normalised paths."""
+        args = [str(arg) for arg in server_config.get("args", [])]
+        package_index = next((index for index, arg in enumerate(args) if SERVER_PACKAGE in arg), len(args))
+        base = settings.BASE_DIR.parent
+        return [
+            os.path.normcase(os.path.realpath(base / Path(arg).expanduser()))
+            for arg in args[package_index + 1:]
+            if not arg.startswith("-")
+        ]
+
+    @classmethod
+    def resolve(cls, base: Path, allowed: list[str], requested: str) -> Path:
+        """Absolute path for ``requested`` (relative to ``base``), or AccessDenied outside the sandbox."""
+        absolute = os.path.normpath(base / Path(str(requested)).expanduser())
+        if not cls._within(absolute, allowed):
+            raise cls.AccessDenied(
+                f"Access denied - path outside allowed directories: {absolute} not in {', '.join(allowed)}"
+            )
+        if os.path.lexists(absolute):
+            real = os.path.realpath(absolute)
+            if not cls._within(real, allowed):
+                raise cls.AccessDenied("Access denied - symlink target outside allowed directories")
+            return Path(real)
+        # a file about to be created: its parent must exist inside the sandbox
+        parent = Path(absolute).parent
+        if not parent.is_dir():
+            raise ValueError(f"Parent directory does not exist: {parent}")
+        if not cls._within(os.path.realpath(parent), allowed):
+            raise cls.AccessDenied("Access denied - parent directory outside allowed directories")
+        return Path(absolute)
+
+    # ------------------------------------------------------------------ tools
+
+    @classmethod
+    def read_text_file(cls, base: Path, allowed: list[str], args: dict[str, Any]) -> str:
+        path = cls.resolve(base, allowed, args["path"])
+        head, tail = args.get("head"), args.get("tail")
+        if head is not None and tail is not None:
+            raise ValueError("Cannot specify both head and tail parameters simultaneously")
+        if head is None and tail is None:
+            return path.read_bytes().decode("utf-8", errors="replace")
+        lines = int(head if head is not None else tail)
+        with path.open("rb") as handle:
+            size = os.fstat(handle.fileno()).st_size
+            if size < MMAP_THRESHOLD_BYTES:
+                data = handle.read()
+                return _head(data, lines) if head is not None else _tail(data, lines)
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return _head(mapped, lines) if head is not None else _tail(mapped, lines)
+
+    @classmethod
+    def write_file(cls, base: Path, allowed: list[str], args: dict[str, Any]) -> str:
+        path = cls.resolve(base, allowed, args["path"])
+        with path.open("w", encoding="utf-8", newline="") as handle:
+            handle.write(args["content"])
+        return f"Successfully wrote to {args['path']}"
+
+    @classmethod
+    def list_directory(cls, base: Path, allowed: list[str], args: dict[str, Any]) -> str:
+        path = cls.resolve(base, allowed, args["path"])
+        with os.scandir(path) as entries:
+            listing = sorted((entry.name, entry.is_dir(follow_symlinks=False)) for entry in entries)
+        return "\n".join(f"{'[DIR]' if is_dir else '[FILE]'} {name}" for name, is_dir in listing)
+
+    @classmethod
+    def search_files(cls, base: Path, allowed: list[str], args: dict[str, Any]) -> str:
+        root = cls.resolve(base, allowed, args["path"])
+        pattern = str(args["pattern"])
+        exclude = list(args.get("excludePatterns") or [])
+        if _GLOB_CHARACTERS & set(pattern):
+            def matches(relative: str, name: str) -> bool:
+                return fnmatch.fnmatch(relative, pattern) or fnmatch.fnmatch(name, pattern)
+        else:
+            needle = pattern.lower()
+
+            def matches(relative: str, name: str) -> bool:
+                return needle in name.lower()
+
+        found = [
+            path for path, relative, name, _ in _walk(str(root), exclude, allowed) if matches(relative, name)
+        ]
+        return "\n".join(found) if found else "No matches found"
+
+    @classmethod
+    def directory_tree(cls, base: Path, allowed: list[str], args: dict[str, Any]) -> str:
+        root = cls.resolve(base, allowed, args["path"])
+        exclude = list(args.get("excludePatterns") or [])
+        tree: list[dict[str, Any]] = []
+        nodes = {str(root): tree}  # directory path -> its children list
+        for path, _relative, name, is_dir in _walk(str(root), exclude, allowed):
+            node: dict[str, Any] = {"name": name, "type": "directory" if is_dir else "file"}
+            if is_dir:
+                node["children"] = nodes[path] = []
+            nodes[str(Path(path).parent)].append(node)
+        return json.dumps(tree, indent=2)
+
+    # ------------------------------------------------------------------ internals
+
+    @staticmethod
+    def _within(path: str, allowed: list[str]) -> bool:
+        path = os.path.normcase(path)
+        return any(path == directory or path.startswith(directory.rstrip(os.sep) + os.sep) for directory in allowed)
+
+    @staticmethod
+    def _error(message: str) -> dict[str, Any]:
+        return {"content": [{"type": "text", "text": f"Error: {message}"}], "isError": True}
+
+
+def _walk(root: str, exclude: list[str], allowed: list[str]):
+    """(path, relative path, name, is_dir) below ``root`` depth first; symlinks are not followed."""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                listing = sorted(entries, key=lambda entry: entry.name)
+        except OSError:
+            continue  # unreadable directory: skipped, as the server does
+        subdirectories = []
+        for entry in listing:
+            relative = os.path.relpath(entry.path, root).replace(os.sep, "/")
+            if any(fnmatch.fnmatch(relative, pattern) or fnmatch.fnmatch(entry.name, pattern) for pattern in exclude):
+                continue
+            is_dir = entry.is_dir(follow_symlinks=False)
+            if entry.is_symlink() and not NativeFilesystem._within(os.path.realpath(entry.path), allowed):
+                continue
+            yield entry.path, relative, entry.name, is_dir
+            if is_dir:
+                subdirectories.append(entry.path)
+        stack.extend(reversed(subdirectories))
+
+
+def _head(data: Any, lines: int) -> str:
+    """First ``lines`` lines of a bytes-like buffer (bytes or mmap), found without splitting it."""
+    end = 0
+    for _ in range(lines):
+        newline = data.find(b"\n", end)
+        if newline < 0:
+            end = len(data)
+            break
+        end = newline + 1
+    chunk = data[:end]
+    return (chunk[:-1] if chunk.endswith(b"\n") else chunk).decode("utf-8", errors="replace")
+
+
+def _tail(data: Any, lines: int) -> str:
+    """Last ``lines`` lines of a bytes-like buffer (bytes or mmap), scanning back from the end."""
+    if lines <= 0:
+        return ""
+    end = len(data) - 1 if len(data) and data[-1:] == b"\n" else len(data)
+    cut = end
+    for _ in range(lines):
+        newline = data.rfind(b"\n", 0, cut)
+        if newline < 0:
+            cut = -1
+            break
+        cut = newline
+    return data[cut + 1:end].decode("utf-8", errors="replace")
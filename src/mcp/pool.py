@@ -0,0 +1,407 @@
+"""
+Replicated MCP servers with load-balanced calls.
+
+A server configured with ``"replicas": N`` in .mcp.json runs as N processes, each behind its own
+McpStdioTransport (or as N sessions on a shared server, see McpHttpTransport). Every call goes
+to the least-loaded healthy replica (fewest calls in flight, then lowest average latency), so
+parallel agent branches calling e.g. read_text_file no longer queue on one filesystem server.
+
+A sticky pool routes calls for servers that keep their state per process instead: calls made
+under the same affinity key always reach the same replica, and calls without a key go to the
+primary replica. MCP_Manager does not set affinity keys yet, so it starts stateful servers
+(``"stateful": true``, by default the ones in MCP_CONFIG["MCP_STATEFUL_SERVERS"]: memory,
+puppeteer) with a single replica and ignores their ``replicas`` setting.
+
+Usage:
+    pool = McpServerPool("filesystem", lambda index: McpStdioTransport(...), replicas=3)
+    pool.start_sync()                              # one process per replica
+    pool.initialize_sync(init_params, timeout_s=30)  # MCP handshake on every replica
+    reply = pool.request_sync("tools/call", {...}, timeout_s=30)
+
+    with McpServerPool.affinity("branch-2"):      # sticky routing key for stateful servers
+        MCP_Manager.call_mcp_server("puppeteer", "puppeteer_click", {...})
+
+    pool.report()   # per-replica calls, errors, queue depth and latency
+
+Recovery (enabled by MCP_Manager when the supervisor runs, see src/mcp/supervisor.py):
+    pool.auto_recover = True        # a call that loses its process is retried once on a fresh one
+    pool.enable_standby()           # keep one initialized spare process for near-instant failover
+    await pool.recover(index)       # replace a dead or wedged replica
+    pool.add_recovery_handler(lambda server, index: ...)   # e.g. rerun tool discovery
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import time
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Iterator, Optional
+
+from src.mcp.transport import McpEventLoop, McpStdioTransport
+
+# routing key for sticky (stateful) servers; set by callers that own a session, e.g. an agent branch
+_AFFINITY: contextvars.ContextVar[Optional[Hashable]] = contextvars.ContextVar("mcp_affinity", default=None)
+
+
+@dataclass
+class ReplicaStats:
+    calls: int = 0
+    errors: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+    latency_s: float = 0.0
+    max_latency_s: float = 0.0
+
+    @property
+    def avg_latency_s(self) -> float:
+        return self.latency_s / self.calls if self.calls else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "avg_latency_ms": round(self.avg_latency_s * 1000, 1),
+            "max_latency_ms": round(self.max_latency_s * 1000, 1),
+        }
+
+
+class McpServerPool:
+    """The replicas of one MCP server; all bookkeeping happens on the MCP event loop."""
+
+    def __init__(
+        self,
+        name: str,
+        factory: Callable[[int], McpStdioTransport],
+        replicas: int = 1,
+        sticky: bool = False,
+    ):
+        self.name = name
+        self.factory = factory
+        self.sticky = sticky
+        self.replicas: list[McpStdioTransport] = [factory(index) for index in range(max(1, replicas))]
+        self.stats: list[ReplicaStats] = [ReplicaStats() for _ in self.replicas]
+        self.start_errors: list[Optional[BaseException]] = [None] * len(self.replicas)
+        self.auto_recover = False
+        self.recoveries = 0  # replicas replaced after a crash or hang
+        self.failovers = 0  # of which served by the warm standby
+        self.standby: Optional[McpStdioTransport] = None
+        self._standby_enabled = False
+        self._init_params: Optional[dict[str, Any]] = None
+        self._init_timeout: Optional[float] = None
+        self._handlers: list[Callable[[str, dict[str, Any]], Any]] = []
+        self._recovery_handlers: list[Callable[[str, int], Any]] = []
+        self._recovering: dict[int, asyncio.Task] = {}
+        self._standby_task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    @staticmethod
+    @contextmanager
+    def affinity(key: Hashable) -> Iterator[None]:
+        """Route calls made inside the block to the same replica of every stateful server."""
+        token = _AFFINITY.set(key)
+        try:
+            yield
+        finally:
+            _AFFINITY.reset(token)
+
+    @property
+    def primary(self) -> McpStdioTransport:
+        return self.replicas[0]
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self.primary.pid
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def in_flight(self) -> int:
+        return sum(stats.in_flight for stats in self.stats)
+
+    @property
+    def healthy(self) -> list[int]:
+        return [index for index, replica in enumerate(self.replicas) if replica.running]
+
+    # ------------------------------------------------------------------ async API
+
+    def add_notification_handler(self, handler: Callable[[str, dict[str, Any]], Any]) -> None:
+        self._handlers.append(handler)  # replacement processes get them as well
+        for replica in self.replicas:
+            replica.add_notification_handler(handler)
+
+    def add_recovery_handler(self, handler: Callable[[str, int], Any]) -> None:
+        """``handler(server_name, index)`` is called on the MCP loop after replica ``index`` was replaced."""
+        self._recovery_handlers.append(handler)
+
+    async def start(self) -> None:
+        """
+        Start every replica process concurrently. Only a failing primary is fatal; other replicas
+        that fail are recorded in ``start_errors`` and skipped by routing.
+        """
+        results = await asyncio.gather(*(replica.start() for replica in self.replicas), return_exceptions=True)
+        self.start_errors = [result if isinstance(result, BaseException) else None for result in results]
+        if self.start_errors[0] is not None:
+            await self.close()
+            raise self.start_errors[0]
+
+    async def initialize(self, init_params: dict[str, Any], timeout_s: Optional[float] = None) -> dict[str, Any]:
+        """
+        Run the MCP handshake on every running replica; returns the primary's initialize response.
+        A secondary replica whose handshake fails is closed so that routing skips it.
+        """
+        self._init_params, self._init_timeout = init_params, timeout_s
+        running = self.healthy
+        if 0 not in running:
+            raise McpStdioTransport.ServerExited(f"MCP server '{self.name}' primary replica is not running")
+        results = await asyncio.gather(
+            *(self._initialize_replica(self.replicas[index], init_params, timeout_s) for index in running),
+            return_exceptions=True,
+        )
+        for index, result in zip(running, results):
+            if isinstance(result, BaseException):
+                self.start_errors[index] = result
+                if index != 0:
+                    await self.replicas[index].close()
+        if isinstance(results[0], BaseException):
+            raise results[0]
+        return results[0]
+
+    async def request(
+        self,
+        method: str,
+        params: Optional[dict[str, Any]] = None,
+        timeout_s: Optional[float] = None,
+        affinity: Optional[Hashable] = None,
+    ) -> dict[str, Any]:
+        index = self._pick(affinity)
+        replica = self.replicas[index]
+        if self.auto_recover and not replica.running:
+            await self.recover(index, replica)
+        try:
+            return await self._request_replica(index, method, params, timeout_s)
+        except ConnectionError:
+            # the process died under the call: retry once on a fresh process
+            if not self.auto_recover or self._closed:
+                raise
+            await self.recover(index, replica)
+            return await self._request_replica(index, method, params, timeout_s)
+
+    async def recover(self, index: int, failed: Optional[McpStdioTransport] = None) -> None:
+        """
+        Replace replica ``index`` with the warm standby, or else with a freshly started process.
+        Concurrent callers (e.g. several calls that lost the same process) share one replacement;
+        with ``failed`` given, nothing happens when that process was already replaced.
+        """
+        if failed is not None and self.replicas[index] is not failed and self.replicas[index].running:
+            return
+        task = self._recovering.get(index)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(self._replace(index), name=f"mcp-recover-{self.name}")
+            self._recovering[index] = task
+            task.add_done_callback(lambda _: self._recovering.pop(index, None))
+        await asyncio.shield(task)
+
+    async def check_health(self, timeout_s: float) -> list[tuple[int, McpStdioTransport]]:
+        """Ping every replica; returns (index, process) of dead replicas and of replicas that did not answer."""
+
+        async def probe(replica: McpStdioTransport) -> bool:
+            if not replica.running:
+                return False
+            try:
+                await replica.request("ping", None, timeout_s)  # an error response still proves liveness
+                return True
+            except McpStdioTransport.TransportError:
+                return False
+
+        replicas = list(self.replicas)
+        results = await asyncio.gather(*(probe(replica) for replica in replicas))
+        unhealthy = [(index, replica) for index, (replica, alive) in enumerate(zip(replicas, results)) if not alive]
+        if self._standby_enabled and (self.standby is None or not self.standby.running):
+            self._refill_standby()
+        return unhealthy
+
+    def enable_standby(self) -> None:
+        """Keep one initialized spare process; call after ``initialize``."""
+        self._standby_enabled = True
+        McpEventLoop.loop().call_soon_threadsafe(self._refill_standby)
+
+    async def notify(self, method: str, params: Optional[dict[str, Any]] = None) -> None:
+        """Send a notification to every healthy replica."""
+        await asyncio.gather(*(self.replicas[index].notify(method, params) for index in self.healthy))
+
+    async def close(self, timeout_s: float = 5) -> None:
+        self._closed = True
+        pending = [task for task in (self._standby_task, *self._recovering.values()) if task is not None]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        spares = [self.standby] if self.standby is not None else []
+        await asyncio.gather(*(replica.close(timeout_s) for replica in self.replicas + spares), return_exceptions=True)
+
+    # ------------------------------------------------------------------ sync wrappers
+
+    def start_sync(self) -> None:
+        McpEventLoop.run(self.start())
+
+    def initialize_sync(self, init_params: dict[str, Any], timeout_s: Optional[float] = None) -> dict[str, Any]:
+        return McpEventLoop.run(self.initialize(init_params, timeout_s))
+
+    def request_sync(
+        self,
+        method: str,
+        params: Optional[dict[str, Any]] = None,
+        timeout_s: Optional[float] = None,
+        affinity: Optional[Hashable] = None,
+    ) -> dict[str, Any]:
+        # the affinity key lives in the caller's context, not in the MCP loop's
+        key = affinity if affinity is not None else _AFFINITY.get()
+        return McpEventLoop.run(self.request(method, params, timeout_s, key))
+
+    def notify_sync(self, method: str, params: Optional[dict[str, Any]] = None) -> None:
+        McpEventLoop.run(self.notify(method, params))
+
+    def close_sync(self, timeout_s: float = 5) -> None:
+        McpEventLoop.run(self.close(timeout_s))
+
+    # ------------------------------------------------------------------ routing and reporting
+
+    def _pick(self, affinity: Optional[Hashable]) -> int:
+        healthy = self.healthy
+        if not healthy and not self.auto_recover:
+            raise McpStdioTransport.ServerExited(f"MCP server '{self.name}' has no running replica")
+        if self.sticky:
+            if affinity is None:
+                index = 0
+            else:
+                # stable across runs (hash() of a str is salted per process)
+                index = zlib.crc32(repr(affinity).encode()) % len(self.replicas)
+            if index not in healthy and not self.auto_recover:
+                # a sticky replica that died has lost its state anyway; fail instead of moving the session
+                raise McpStdioTransport.ServerExited(f"MCP server '{self.name}' replica {index} is not running")
+            return index  # recovered before use when it is not running
+        if not healthy:
+            return 0  # recovered before use
+        return min(healthy, key=lambda index: (self.stats[index].in_flight, self.stats[index].avg_latency_s, index))
+
+    def stderr_tail(self, max_bytes: int = 2000) -> str:
+        """Recent stderr of every replica (labelled when there are several)."""
+        if len(self.replicas) == 1:
+            return self.primary.stderr.tail(max_bytes)
+        share = max_bytes // len(self.replicas)
+        return "\n".join(
+            f"[replica {index}]\n{tail}"
+            for index, replica in enumerate(self.replicas)
+            if (tail := replica.stderr.tail(share))
+        )
+
+    def report(self) -> dict[str, Any]:
+        return {
+            "sticky": self.sticky,
+            "healthy": len(self.healthy),
+            "recoveries": self.recoveries,
+            "failovers": self.failovers,
+            "standby": None if not self._standby_enabled else bool(self.standby and self.standby.running),
+            "start_errors": [repr(error) for error in self.start_errors if error is not None],
+            "replicas": [
+                {"replica": index, "pid": replica.pid, "running": replica.running, **self.stats[index].as_dict()}
+                for index, replica in enumerate(self.replicas)
+            ],
+        }
+
+    async def _request_replica(
+        self, index: int, method: str, params: Optional[dict[str, Any]], timeout_s: Optional[float]
+    ) -> dict[str, Any]:
+        stats = self.stats[index]
+        stats.in_flight += 1
+        stats.max_in_flight = max(stats.max_in_flight, stats.in_flight)
+        started = time.perf_counter()
+        try:
+            return await self.replicas[index].request(method, params, timeout_s)
+        except (McpStdioTransport.TransportError, ConnectionError):
+            stats.errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            stats.in_flight -= 1
+            stats.calls += 1
+            stats.latency_s += elapsed
+            stats.max_latency_s = max(stats.max_latency_s, elapsed)
+
+    async def _replace(self, index: int) -> None:
+        old = self.replicas[index]
+        standby, self.standby = self.standby, None
+        if standby is not None and standby.running:
+            replacement = standby
+            self.failovers += 1
+        else:
+            if standby is not None:
+                await standby.close()
+            replacement = await self._spawn(index)
+        self.replicas[index] = replacement
+        self.start_errors[index] = None
+        self.recoveries += 1
+        self._log_recovery(self.name, index, old.pid, replacement.pid, replacement is standby)
+        if self._standby_enabled:
+            self._refill_standby()
+        await old.close(2)  # kills a wedged process; a dead one is just reaped
+        for handler in list(self._recovery_handlers):
+            handler(self.name, index)
+
+    async def _spawn(self, index: int) -> McpStdioTransport:
+        """Start and initialize a new process for slot ``index`` (-1 for the standby)."""
+        if self._init_params is None:
+            raise McpStdioTransport.ServerExited(f"MCP server '{self.name}' was never initialized")
+        replica = self.factory(index)
+        for handler in self._handlers:
+            replica.add_notification_handler(handler)
+        try:
+            await replica.start()
+            await self._initialize_replica(replica, self._init_params, self._init_timeout)
+        except BaseException:
+            await replica.close(2)
+            raise
+        return replica
+
+    def _refill_standby(self) -> None:
+        """Start a new standby in the background unless one is ready or starting (MCP loop only)."""
+        if self._closed or (self._standby_task is not None and not self._standby_task.done()):
+            return
+        if self.standby is not None and self.standby.running:
+            return
+
+        async def refill() -> None:
+            stale, self.standby = self.standby, None
+            if stale is not None:
+                await stale.close(2)
+            try:
+                self.standby = await self._spawn(-1)
+            except Exception:
+                pass  # failover falls back to a fresh process; the next health check retries
+
+        self._standby_task = asyncio.get_running_loop().create_task(refill(), name=f"mcp-standby-{self.name}")
+
+    @staticmethod
+    def _log_recovery(server: str, index: int, old_pid: Optional[int], new_pid: Optional[int], standby: bool) -> None:
+        from src.ui.diagnostics.debug_helpers import debug_warning
+
+        debug_warning(
+            heading="MCP • REPLICA_REPLACED",
+            body=f"Replica {index} of '{server}' was replaced by "
+                 f"{'the warm standby' if standby else 'a new process'}",
+            metadata={"server": server, "replica": index, "old_pid": old_pid, "new_pid": new_pid},
+        )
+
+    @staticmethod
+    async def _initialize_replica(
+        replica: McpStdioTransport, init_params: dict[str, Any], timeout_s: Optional[float]
+    ) -> dict[str, Any]:
+        init_response = await replica.request("initialize", init_params, timeout_s)
+        await replica.notify("notifications/initialized")
+        return init_response
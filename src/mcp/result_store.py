@@ -0,0 +1,155 @@
+"""
+Size cap for MCP tool results, with oversized results spilled to an on-disk blob store.
+
+A directory_tree or read_multiple_files on a large repository returns megabytes that used to be
+copied whole into the agent's context, the ToolResponseManager history and the log. A result
+whose content exceeds MCP_RESULT_MAX_KB is now written to MCP_RESULT_BLOB_DIR (streamed to the
+file chunk by chunk with JSONEncoder.iterencode, never built as one string) and replaced by a
+preview of its first MCP_RESULT_PREVIEW_KB plus a note with the blob's path and size, so the
+agent can still read the rest from disk. Only the newest MCP_RESULT_BLOB_MAX_FILES blobs are
+kept.
+
+describe() gives the size and hash of a payload for log metadata, in place of the payload.
+
+Usage:
+    result = McpResultStore.cap("filesystem", "directory_tree", result)   # unchanged when small
+    McpResultStore.describe(arguments)   # {"bytes": 1234, "sha256": "9f2c61d0a4b7e813"}
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, ClassVar
+
+from src.config import settings
+
+# content item fields that carry the payload: text, base64 images/audio, embedded resources
+_PAYLOAD_FIELDS = ("text", "data", "blob")
+_ENCODER = json.JSONEncoder(ensure_ascii=False, default=str)
+_UNSAFE_FILENAME = re.compile(r"[^\w.-]")
+
+
+class McpResultStore:
+    """Caps tool results for the agent and keeps the full payloads of capped ones on disk."""
+
+    _lock: ClassVar[threading.Lock] = threading.Lock()
+
+    @staticmethod
+    def directory() -> Path:
+        return Path(settings.MCP_CONFIG.get("MCP_RESULT_BLOB_DIR"))
+
+    @staticmethod
+    def items(result: Any) -> list[dict[str, Any]]:
+        """Content items of a tools/call ("content") or resources/read ("contents") result."""
+        if not isinstance(result, dict):
+            return []
+        items = result.get("content", result.get("contents"))
+        return [item for item in items if isinstance(item, dict)] if isinstance(items, list) else []
+
+    @classmethod
+    def content_size(cls, result: Any) -> int:
+        """Characters of payload in a result's content items, measured without serializing it."""
+        return sum(
+            len(item[field]) for item in cls.items(result) for field in _PAYLOAD_FIELDS
+            if isinstance(item.get(field), str)
+        )
+
+    @staticmethod
+    def describe(payload: Any) -> dict[str, Any]:
+        """Size in bytes and sha256 prefix of a payload, for log metadata instead of the payload itself."""
+        digest = hashlib.sha256()
+        size = 0
+        chunks = [payload] if isinstance(payload, (str, bytes)) else _ENCODER.iterencode(payload)
+        for chunk in chunks:
+            data = chunk if isinstance(chunk, bytes) else chunk.encode("utf-8", errors="replace")
+            digest.update(data)
+            size += len(data)
+        return {"bytes": size, "sha256": digest.hexdigest()[:16]}
+
+    @classmethod
+    def cap(cls, server: str, tool: str, result: Any) -> Any:
+        """``result`` itself when its content is within MCP_RESULT_MAX_KB, else a preview of it."""
+        limit = settings.MCP_CONFIG.get("MCP_RESULT_MAX_KB") * 1024
+        size = cls.content_size(result)
+        if limit <= 0 or size <= limit:
+            return result
+        blob = cls.store(server, result)
+        preview = cls._preview(result, int(settings.MCP_CONFIG.get("MCP_RESULT_PREVIEW_KB") * 1024))
+        note = (
+            f"[Result truncated: '{tool}' on '{server}' returned {size:,} characters, above the "
+            f"{limit // 1024} KB limit; only the beginning is shown. The full result ({blob['bytes']:,} bytes "
+            f"of JSON) is stored at {blob['path']}]"
+        )
+        item: dict[str, Any] = {"type": "text", "text": f"{preview}\n\n{note}"}
+        if "content" in result:
+            capped: dict[str, Any] = {"content": [item]}
+        else:  # resources/read keeps its shape so URI readers still find contents[0]["text"]
+            capped = {"contents": [{"uri": cls.items(result)[0].get("uri"), "mimeType": "text/plain", **item}]}
+        if result.get("isError"):
+            capped["isError"] = True
+        capped["_meta"] = {"truncated": True, "blob": blob}
+        cls._log_capped(server, tool, size, blob)
+        return capped
+
+    @classmethod
+    def store(cls, server: str, result: Any) -> dict[str, Any]:
+        """Write a result to the blob store; returns its path, size in bytes and sha256."""
+        directory = cls.directory()
+        directory.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        # write-then-rename: the final name needs the hash, and readers never see a partial blob
+        with tempfile.NamedTemporaryFile("wb", dir=directory, suffix=".tmp", delete=False) as handle:
+            for chunk in _ENCODER.iterencode(result):
+                data = chunk.encode("utf-8", errors="replace")
+                handle.write(data)
+                digest.update(data)
+                size += len(data)
+        sha256 = digest.hexdigest()
+        path = directory / f"{_UNSAFE_FILENAME.sub('_', server)}-{sha256[:16]}.json"
+        with cls._lock:
+            Path(handle.name).replace(path)
+            cls._prune(directory)
+        return {"path": str(path), "bytes": size, "sha256": sha256}
+
+    @classmethod
+    def _preview(cls, result: Any, budget: int) -> str:
+        parts = []
+        for item in cls.items(result):
+            if budget <= 0:
+                break
+            text = item.get("text")
+            if isinstance(text, str):
+                parts.append(text[:budget])
+                budget -= len(parts[-1])
+            else:
+                parts.append(f"[{item.get('mimeType') or item.get('type', 'binary')} content omitted]")
+        return "\n".join(parts)
+
+    @staticmethod
+    def _prune(directory: Path) -> None:
+        """Keep the newest MCP_RESULT_BLOB_MAX_FILES blobs."""
+        blobs = []
+        for path in directory.glob("*.json"):
+            try:
+                blobs.append((path.stat().st_mtime_ns, path))
+            except OSError:
+                continue  # removed meanwhile
+        blobs.sort(reverse=True)
+        for _, path in blobs[settings.MCP_CONFIG.get("MCP_RESULT_BLOB_MAX_FILES"):]:
+            path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _log_capped(server: str, tool: str, size: int, blob: dict[str, Any]) -> None:
+        from src.ui.diagnostics.debug_helpers import debug_info
+
+        debug_info(
+            heading="MCP • RESULT_CAPPED",
+            body=f"Result of '{tool}' ({size} characters) stored as a blob; the agent gets a preview",
+            metadata={"server": server, "tool": tool, "bytes": blob["bytes"], "sha256": blob["sha256"][:16]},
+        )
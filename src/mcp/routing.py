@@ -0,0 +1,123 @@
+"""
+Tool-to-server routing table built from tools/list responses.
+
+Every tool a server reports is routed to that server, and a lookup is a single dict access.
+Two servers may offer a tool of the same name. The first server to register the tool keeps the
+plain name. Tools that conflict are also reachable under a namespaced name,
+``<server>__<tool>``, and that is the name a later server's copy is registered under. No server
+is ever probed to find out whether it has a tool.
+
+When a server restarts and reports its tools again, only that server's entries are rebuilt.
+
+Usage:
+    McpRoutingTable.update_server("filesystem", ["read_file", "write_file"])
+    McpRoutingTable.update_server("github", ["read_file", "create_issue"])   # read_file conflicts
+
+    McpRoutingTable.resolve("read_file")           # ("filesystem", "read_file")
+    McpRoutingTable.resolve("github__read_file")   # ("github", "read_file")
+    McpRoutingTable.exposed_name("github", "read_file")   # "github__read_file"
+    McpRoutingTable.conflicts()                    # {"read_file": ["filesystem", "github"]}
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import ClassVar, Iterable, Optional
+
+NAMESPACE_SEPARATOR = "__"
+
+
+class McpRoutingTable:
+    """Class-level routing table shared by the MCP manager and the universal MCP tool."""
+
+    # exposed tool name -> (server, tool name on that server)
+    _routes: ClassVar[dict[str, tuple[str, str]]] = {}
+    # server -> tool names it reported, in order
+    _server_tools: ClassVar[dict[str, list[str]]] = {}
+    _lock: ClassVar[threading.Lock] = threading.Lock()
+
+    @staticmethod
+    def qualified_name(server: str, tool: str) -> str:
+        return f"{server}{NAMESPACE_SEPARATOR}{tool}"
+
+    @classmethod
+    def update_server(cls, server: str, tools: Iterable[str]) -> dict[str, str]:
+        """
+        Replace the routes of one server with the tools it just reported.
+        :return: {tool name on the server: exposed name} for the server's tools.
+        """
+        tools = list(dict.fromkeys(tools))
+        with cls._lock:
+            cls._drop(server, keep=set(tools))
+            cls._server_tools[server] = tools
+            for tool in tools:
+                owner = cls._routes.get(tool)
+                if owner is None:
+                    cls._routes[tool] = (server, tool)
+                elif owner[0] != server:
+                    # conflict: both copies become reachable under their namespaced names
+                    cls._routes[cls.qualified_name(owner[0], tool)] = owner
+                    cls._routes[cls.qualified_name(server, tool)] = (server, tool)
+            return {tool: cls._exposed_name(server, tool) for tool in tools}
+
+    @classmethod
+    def remove_server(cls, server: str) -> None:
+        with cls._lock:
+            cls._drop(server, keep=set())
+            cls._server_tools.pop(server, None)
+
+    @classmethod
+    def resolve(cls, name: str) -> Optional[tuple[str, str]]:
+        """(server, tool name on that server) for an exposed or namespaced tool name, or None."""
+        return cls._routes.get(name)
+
+    @classmethod
+    def exposed_name(cls, server: str, tool: str) -> str:
+        """The name a server's tool is registered under: plain unless another server owns it."""
+        return cls._exposed_name(server, tool)
+
+    @classmethod
+    def tools(cls) -> list[str]:
+        """Every resolvable tool name."""
+        return list(cls._routes)
+
+    @classmethod
+    def servers(cls) -> dict[str, list[str]]:
+        return {server: list(tools) for server, tools in cls._server_tools.items()}
+
+    @classmethod
+    def conflicts(cls) -> dict[str, list[str]]:
+        """Tool names reported by more than one server -> those servers."""
+        offered: dict[str, list[str]] = {}
+        for server, tools in cls._server_tools.items():
+            for tool in tools:
+                offered.setdefault(tool, []).append(server)
+        return {tool: servers for tool, servers in offered.items() if len(servers) > 1}
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._routes.clear()
+            cls._server_tools.clear()
+
+    @classmethod
+    def _exposed_name(cls, server: str, tool: str) -> str:
+        owner = cls._routes.get(tool)
+        return tool if owner is None or owner[0] == server else cls.qualified_name(server, tool)
+
+    @classmethod
+    def _drop(cls, server: str, keep: set[str]) -> None:
+        """Remove the routes of a server's tools that are not in ``keep`` (caller holds the lock)."""
+        for tool in cls._server_tools.get(server, []):
+            if tool in keep:
+                continue
+            cls._routes.pop(cls.qualified_name(server, tool), None)
+            if cls._routes.get(tool) == (server, tool):
+                del cls._routes[tool]
+                # another server offering the tool takes over the plain name
+                heir = next(
+                    (other for other, tools in cls._server_tools.items() if other != server and tool in tools),
+                    None,
+                )
+                if heir is not None:
+                    cls._routes[tool] = (heir, tool)
@@ -0,0 +1,147 @@
+"""
+Health checks and automatic restarts for running MCP servers.
+
+A crashed or hung MCP server used to surface as "not running" / "No response" tool errors, and
+the agent spent LLM calls on recovery strategies for an infrastructure failure. The supervisor
+runs on the MCP event loop and pings every replica of every watched server each
+MCP_HEALTH_CHECK_INTERVAL_S with the protocol's cheap ``ping`` request. A replica that has exited,
+or that does not answer within MCP_HEALTH_CHECK_TIMEOUT_S (wedged), is replaced through
+McpServerPool.recover. Repeated failures of the same replica back off exponentially up to
+MCP_RESTART_BACKOFF_MAX_S, so a server that cannot start is not respawned in a tight loop.
+
+Watched pools also recover on the call path: a call whose process dies is retried once on a
+fresh process. Servers in MCP_STANDBY_SERVERS keep a warm standby for near-instant failover.
+After every replacement MCP_Manager reruns tools/list, so routes and registered tools follow
+the new process (McpServerPool.add_recovery_handler).
+
+Usage:
+    McpSupervisor.watch("filesystem", pool)   # starts the supervisor task on first use
+    McpSupervisor.unwatch("filesystem")       # before an intentional stop
+    McpSupervisor.report()                    # restarts and failures per server
+    McpSupervisor.stop()
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, ClassVar, Optional
+
+from src.config import settings
+from src.mcp.pool import McpServerPool
+from src.mcp.transport import McpEventLoop
+
+RESTART_BACKOFF_BASE_S = 1.0
+
+
+class McpSupervisor:
+    """Class-level watchdog over the running MCP server pools."""
+
+    _pools: ClassVar[dict[str, McpServerPool]] = {}
+    _task: ClassVar[Optional[asyncio.Task]] = None
+    # (server, replica index) -> consecutive failed checks / monotonic time of the next allowed restart
+    _failures: ClassVar[dict[tuple[str, int], int]] = {}
+    _next_restart: ClassVar[dict[tuple[str, int], float]] = {}
+    _restarts: ClassVar[dict[str, int]] = {}
+    _last_error: ClassVar[dict[str, str]] = {}
+
+    @classmethod
+    def watch(cls, name: str, pool: McpServerPool) -> None:
+        pool.auto_recover = True
+        if name in settings.MCP_CONFIG.get("MCP_STANDBY_SERVERS", []):
+            pool.enable_standby()
+        cls._pools[name] = pool
+        McpEventLoop.loop().call_soon_threadsafe(cls._ensure_task)
+
+    @classmethod
+    def unwatch(cls, name: str) -> None:
+        pool = cls._pools.pop(name, None)
+        if pool is not None:
+            pool.auto_recover = False
+        for key in [key for key in cls._failures if key[0] == name]:
+            cls._failures.pop(key, None)
+            cls._next_restart.pop(key, None)
+
+    @classmethod
+    def stop(cls) -> None:
+        cls._pools.clear()
+        task, cls._task = cls._task, None
+        if task is not None:
+            McpEventLoop.loop().call_soon_threadsafe(task.cancel)
+
+    @classmethod
+    def report(cls) -> dict[str, Any]:
+        return {
+            name: {
+                "restarts": cls._restarts.get(name, 0),
+                "failing_replicas": sorted(index for (server, index), count in cls._failures.items()
+                                           if server == name and count),
+                "last_error": cls._last_error.get(name),
+            }
+            for name in cls._pools
+        }
+
+    @classmethod
+    def _ensure_task(cls) -> None:
+        """Start the supervisor loop (MCP loop only)."""
+        if cls._task is None or cls._task.done():
+            cls._task = asyncio.get_running_loop().create_task(cls._run(), name="mcp-supervisor")
+
+    @classmethod
+    async def _run(cls) -> None:
+        while cls._pools:
+            await asyncio.sleep(settings.MCP_CONFIG.get("MCP_HEALTH_CHECK_INTERVAL_S"))
+            await asyncio.gather(
+                *(cls.check(name, pool) for name, pool in list(cls._pools.items())),
+                return_exceptions=True,
+            )
+
+    @classmethod
+    async def check(cls, name: str, pool: McpServerPool) -> None:
+        """One health check of a server; replaces unhealthy replicas whose backoff has expired."""
+        unhealthy = await pool.check_health(settings.MCP_CONFIG.get("MCP_HEALTH_CHECK_TIMEOUT_S"))
+        failed_indexes = {index for index, _ in unhealthy}
+        for index in range(len(pool.replicas)):
+            if index not in failed_indexes:
+                cls._failures.pop((name, index), None)
+                cls._next_restart.pop((name, index), None)
+        now = time.monotonic()
+        for index, replica in unhealthy:
+            if pool.closed:
+                return  # stopped meanwhile
+            key = (name, index)
+            if now < cls._next_restart.get(key, 0.0):
+                continue
+            failures = cls._failures[key] = cls._failures.get(key, 0) + 1
+            backoff_s = min(
+                RESTART_BACKOFF_BASE_S * 2 ** (failures - 1),
+                settings.MCP_CONFIG.get("MCP_RESTART_BACKOFF_MAX_S"),
+            )
+            cls._next_restart[key] = now + backoff_s
+            state = "exited" if not replica.running else "did not answer ping"
+            try:
+                await pool.recover(index, replica)
+                cls._restarts[name] = cls._restarts.get(name, 0) + 1
+                cls._log_restart(name, index, state, None)
+            except Exception as error:
+                cls._last_error[name] = repr(error)
+                cls._log_restart(name, index, state, error, backoff_s)
+
+    @staticmethod
+    def _log_restart(
+        server: str, index: int, state: str, error: Optional[BaseException], backoff_s: float = 0.0
+    ) -> None:
+        from src.ui.diagnostics.debug_helpers import debug_error, debug_info
+
+        if error is None:
+            debug_info(
+                heading="MCP • SUPERVISOR_RESTART",
+                body=f"Replica {index} of '{server}' {state}; replaced",
+                metadata={"server": server, "replica": index},
+            )
+        else:
+            debug_error(
+                heading="MCP • SUPERVISOR_RESTART_FAILED",
+                body=f"Replica {index} of '{server}' {state}; restart failed, next try in {backoff_s:.0f}s",
+                metadata={"server": server, "replica": index, "error": repr(error)},
+            )
@@ -0,0 +1,453 @@
+"""
+Multiplexed asyncio JSON-RPC transport for MCP stdio servers.
+
+Every server gets one McpStdioTransport. A reader task reads the server's stdout line by line
+and routes each message:
+
+    - responses ("id" + "result"/"error")   -> the future of the pending request with that id
+    - notifications ("method", no "id")     -> notification handlers and a bounded backlog
+    - server requests ("method" + "id")     -> answered ("ping") or rejected (method not found)
+    - anything that is not JSON (log lines) -> logged and dropped
+
+so many calls to one server can be in flight at once, a stray log line never corrupts a reply
+and a hung server only costs the per-call timeout (the server is then told with a
+"notifications/cancelled" notification).
+
+stdout is read in READ_CHUNK_BYTES chunks, so a multi-megabyte reply never has to fit the stream
+buffer. A reply above ``max_message_bytes`` is discarded while it is read and its call fails
+with ResponseTooLarge instead of waiting for the timeout.
+
+A second task drains stderr, so a chatty server can never fill the pipe and block. Its lines
+go to a StderrCapture: the last ``stderr_limit_bytes`` are kept for error reports and lines
+are forwarded to the log (MCP category) at most ``stderr_lines_per_second`` per second.
+
+All transports run on one background event loop (McpEventLoop); the ``*_sync`` wrappers block
+the calling thread on it, which keeps MCP_Manager's synchronous API unchanged.
+
+Usage:
+    transport = McpStdioTransport("filesystem", ["npx", "-y", "@modelcontextprotocol/server-filesystem", "."])
+    transport.start_sync()
+    reply = transport.request_sync("tools/list", {}, timeout_s=30)   # the JSON-RPC response message
+    transport.stderr.tail()                                        # recent stderr for an error report
+    transport.close_sync()
+"""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import inspect
+import itertools
+import json
+import os
+import re
+import subprocess
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, ClassVar, Coroutine, Optional
+
+# stream buffer size; longer stdout lines (large tools/call results) are read chunk by chunk
+READ_CHUNK_BYTES = 1024 * 1024
+MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+# the id of a discarded oversized reply: {"jsonrpc":"2.0","id":7,... (Python SDK) or ...,"id":7} (TypeScript SDK)
+_HEAD_ID = re.compile(rb'^\s*\{\s*"jsonrpc"\s*:\s*"2\.0"\s*,\s*"id"\s*:\s*(\d+)')
+_TAIL_ID = re.compile(rb'"id"\s*:\s*(\d+)\s*\}\s*$')
+NOTIFICATION_BACKLOG = 100
+
+METHOD_NOT_FOUND = -32601
+
+STDERR_LIMIT_BYTES = 64 * 1024
+STDERR_LINES_PER_SECOND = 20.0
+
+
+class McpEventLoop:
+    """The background event loop thread that runs every MCP transport."""
+
+    _loop: ClassVar[Optional[asyncio.AbstractEventLoop]] = None
+    _thread: ClassVar[Optional[threading.Thread]] = None
+    _lock: ClassVar[threading.Lock] = threading.Lock()
+
+    @classmethod
+    def loop(cls) -> asyncio.AbstractEventLoop:
+        with cls._lock:
+            if cls._loop is None or cls._loop.is_closed():
+                cls._loop = asyncio.new_event_loop()
+                cls._thread = threading.Thread(target=cls._loop.run_forever, name="mcp-transport", daemon=True)
+                cls._thread.start()
+            return cls._loop
+
+    @classmethod
+    def submit(cls, coroutine: Coroutine[Any, Any, Any]) -> Future:
+        """Schedule ``coroutine`` on the MCP loop from any thread."""
+        return asyncio.run_coroutine_threadsafe(coroutine, cls.loop())
+
+    @classmethod
+    def run(cls, coroutine: Coroutine[Any, Any, Any]) -> Any:
+        """Run ``coroutine`` on the MCP loop and block until it finishes (never call from the MCP loop)."""
+        return cls.submit(coroutine).result()
+
+    @classmethod
+    def shutdown(cls) -> None:
+        with cls._lock:
+            loop, cls._loop = cls._loop, None
+            thread, cls._thread = cls._thread, None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            if thread is not None:
+                thread.join(timeout=5)
+            loop.close()
+
+
+class StderrCapture:
+    """Ring buffer of a server's recent stderr plus rate-limited forwarding of its lines to the log."""
+
+    def __init__(
+        self,
+        server: str,
+        limit_bytes: int = STDERR_LIMIT_BYTES,
+        lines_per_second: float = STDERR_LINES_PER_SECOND,
+        forward: Optional[Callable[[str, str], None]] = None,
+    ):
+        self.server = server
+        self.limit_bytes = limit_bytes
+        self.lines_per_second = lines_per_second
+        self.forward = forward or self._log_line
+        self.total_lines = 0
+        self.suppressed = 0  # lines not forwarded since the last forwarded one
+        self._lines: collections.deque[tuple[str, int]] = collections.deque()
+        self._size = 0
+        self._allowance = lines_per_second  # token bucket: bursts of up to one second's worth
+        self._last_refill = time.monotonic()
+
+    def add(self, line: str) -> None:
+        self.total_lines += 1
+        self._keep(line)
+        if not self._take_token():
+            self.suppressed += 1
+            return
+        if self.suppressed:
+            self.forward(self.server, f"... {self.suppressed} stderr line(s) not logged (rate limit)")
+            self.suppressed = 0
+        self.forward(self.server, line)
+
+    def tail(self, max_bytes: Optional[int] = None) -> str:
+        """The buffered stderr, optionally only its last ``max_bytes``."""
+        text = "\n".join(line for line, _ in self._lines)
+        if max_bytes is not None and len(text) > max_bytes:
+            return text[-max_bytes:]
+        return text
+
+    def _keep(self, line: str) -> None:
+        size = len(line.encode("utf-8", errors="replace")) + 1
+        if size > self.limit_bytes:
+            line = line[-self.limit_bytes:]
+            size = self.limit_bytes
+        self._lines.append((line, size))
+        self._size += size
+        while self._size > self.limit_bytes:
+            self._size -= self._lines.popleft()[1]
+
+    def _take_token(self) -> bool:
+        now = time.monotonic()
+        self._allowance = min(
+            self.lines_per_second, self._allowance + (now - self._last_refill) * self.lines_per_second
+        )
+        self._last_refill = now
+        if self._allowance < 1:
+            return False
+        self._allowance -= 1
+        return True
+
+    @staticmethod
+    def _log_line(server: str, line: str) -> None:
+        from src.ui.diagnostics.debug_helpers import debug_info
+
+        debug_info(heading="MCP • STDERR", body=line, metadata={"server": server})
+
+
+class McpStdioTransport:
+    """JSON-RPC 2.0 over the stdin/stdout of one MCP server process."""
+
+    class TransportError(Exception):
+        def __init__(self, message: str):
+            self.message = message
+            super().__init__(self.message)
+
+    class CallTimeout(TransportError, TimeoutError):
+        """No response within the call timeout; the request was cancelled on the server."""
+
+    class ServerExited(TransportError, ConnectionError):
+        """The server closed stdout (exited) with requests still pending."""
+
+    class ResponseTooLarge(TransportError):
+        """The reply exceeded max_message_bytes and was discarded."""
+
+    def __init__(
+        self,
+        name: str,
+        command: list[str],
+        cwd: Optional[str] = None,
+        env: Optional[dict[str, str]] = None,
+        stderr_limit_bytes: int = STDERR_LIMIT_BYTES,
+        stderr_lines_per_second: float = STDERR_LINES_PER_SECOND,
+        max_message_bytes: int = MAX_MESSAGE_BYTES,
+    ):
+        self.name = name
+        self.command = command
+        self.cwd = cwd
+        self.env = env
+        self.max_message_bytes = max_message_bytes
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.notifications: collections.deque[dict[str, Any]] = collections.deque(maxlen=NOTIFICATION_BACKLOG)
+        self.skipped_lines = 0  # stdout lines that were not JSON-RPC messages
+        self.stderr = StderrCapture(name, stderr_limit_bytes, stderr_lines_per_second)
+        self._ids = itertools.count(1)
+        self._pending: dict[int, asyncio.Future] = {}
+        self._handlers: list[Callable[[str, dict[str, Any]], Any]] = []
+        self._write_lock: Optional[asyncio.Lock] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._stderr_reader: Optional[asyncio.Task] = None
+        self._closed = False
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self.process.pid if self.process is not None else None
+
+    @property
+    def running(self) -> bool:
+        return self.process is not None and self.process.returncode is None and not self._closed
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    def add_notification_handler(self, handler: Callable[[str, dict[str, Any]], Any]) -> None:
+        """``handler(server_name, message)`` is called on the MCP loop for every notification."""
+        self._handlers.append(handler)
+
+    # ------------------------------------------------------------------ async API
+
+    async def start(self) -> None:
+        pipes = dict(
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=self.cwd,
+            env=self.env,
+            limit=READ_CHUNK_BYTES,
+        )
+        if os.name == "nt":
+            # npx/uvx are .cmd shims on Windows and need the shell, as with Popen(shell=True)
+            self.process = await asyncio.create_subprocess_shell(subprocess.list2cmdline(self.command), **pipes)
+        else:
+            self.process = await asyncio.create_subprocess_exec(*self.command, **pipes)
+        self._write_lock = asyncio.Lock()
+        self._closed = False
+        loop = asyncio.get_running_loop()
+        self._reader = loop.create_task(self._read_loop(), name=f"mcp-reader-{self.name}")
+        self._stderr_reader = loop.create_task(self._drain_stderr(), name=f"mcp-stderr-{self.name}")
+
+    async def request(self, method: str, params: Optional[dict[str, Any]] = None, timeout_s: Optional[float] = None) -> dict[str, Any]:
+        """Send a request and wait up to ``timeout_s`` for the response message with its id (``result`` or ``error``)."""
+        if not self.running:
+            raise self.ServerExited(f"MCP server '{self.name}' is not running")
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            await self._send({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params or {}})
+            return await asyncio.wait_for(future, timeout_s)
+        except asyncio.TimeoutError:
+            await self._cancel_on_server(request_id, f"timed out after {timeout_s}s")
+            raise self.CallTimeout(f"MCP server '{self.name}' did not answer '{method}' within {timeout_s}s") from None
+        except asyncio.CancelledError:
+            await self._cancel_on_server(request_id, "cancelled by client")
+            raise
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def notify(self, method: str, params: Optional[dict[str, Any]] = None) -> None:
+        message: dict[str, Any] = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            message["params"] = params
+        await self._send(message)
+
+    async def close(self, timeout_s: float = 5) -> None:
+        self._closed = True
+        process = self.process
+        if process is None:
+            return
+        if process.returncode is None:
+            if process.stdin is not None and not process.stdin.is_closing():
+                process.stdin.close()
+            process.terminate()
+            try:
+                await asyncio.wait_for(process.wait(), timeout_s)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+        readers = [task for task in (self._reader, self._stderr_reader) if task is not None]
+        await asyncio.gather(*readers, return_exceptions=True)
+        self._fail_pending(f"MCP server '{self.name}' was stopped")
+
+    # ------------------------------------------------------------------ sync wrappers
+
+    def start_sync(self) -> None:
+        McpEventLoop.run(self.start())
+
+    def request_sync(self, method: str, params: Optional[dict[str, Any]] = None, timeout_s: Optional[float] = None) -> dict[str, Any]:
+        return McpEventLoop.run(self.request(method, params, timeout_s))
+
+    def notify_sync(self, method: str, params: Optional[dict[str, Any]] = None) -> None:
+        McpEventLoop.run(self.notify(method, params))
+
+    def close_sync(self, timeout_s: float = 5) -> None:
+        McpEventLoop.run(self.close(timeout_s))
+
+    # ------------------------------------------------------------------ internals
+
+    async def _send(self, message: dict[str, Any]) -> None:
+        process = self.process
+        if process is None or process.stdin is None or process.stdin.is_closing():
+            raise self.ServerExited(f"MCP server '{self.name}' stdin is closed")
+        async with self._write_lock:  # one message per line, never interleaved
+            process.stdin.write((json.dumps(message) + "\n").encode("utf-8"))
+            await process.stdin.drain()
+
+    async def _cancel_on_server(self, request_id: int, reason: str) -> None:
+        try:
+            await self.notify("notifications/cancelled", {"requestId": request_id, "reason": reason})
+        except (self.TransportError, ConnectionError, OSError):
+            pass  # the server is gone; nothing to cancel
+
+    async def _read_loop(self) -> None:
+        stdout = self.process.stdout
+        try:
+            while True:
+                line = await self._read_line(stdout)
+                if line is None:
+                    continue  # oversized, already discarded
+                if not line:
+                    break
+                await self._dispatch(line)
+        finally:
+            self._closed = True  # stdout is gone: no reply can arrive anymore
+            self._fail_pending(f"MCP server '{self.name}' exited")
+
+    async def _read_line(self, stdout: asyncio.StreamReader) -> Optional[bytes]:
+        """Next stdout line of any length (b"" at EOF), or None when it exceeded max_message_bytes."""
+        chunks: list[bytes] = []
+        size = 0
+        head = tail = b""
+        while True:
+            complete = True
+            try:
+                chunk = await stdout.readuntil(b"\n")
+            except asyncio.IncompleteReadError as eof:
+                chunk = eof.partial
+            except asyncio.LimitOverrunError as overrun:
+                # no newline within the buffer: take what is buffered and keep reading
+                chunk = await stdout.readexactly(overrun.consumed)
+                complete = False
+            if not head:
+                head = chunk[:256]
+            tail = (tail + chunk[-256:])[-256:]
+            size += len(chunk)
+            if size <= self.max_message_bytes:
+                chunks.append(chunk)
+            else:
+                chunks.clear()  # discard as we go; only head and tail are kept to find the id
+            if complete:
+                break
+        if size > self.max_message_bytes:
+            self._reject_oversized(head, tail, size)
+            return None
+        return chunks[0] if len(chunks) == 1 else b"".join(chunks)
+
+    def _reject_oversized(self, head: bytes, tail: bytes, size: int) -> None:
+        self.skipped_lines += 1
+        reason = f"MCP server '{self.name}' sent a {size} byte message, above the {self.max_message_bytes} byte limit"
+        match = _HEAD_ID.match(head) or _TAIL_ID.search(tail)
+        future = self._pending.get(int(match.group(1))) if match else None
+        if future is not None and not future.done():
+            future.set_exception(self.ResponseTooLarge(reason))
+        else:
+            self._log_noise(self.name, reason)
+
+    async def _drain_stderr(self) -> None:
+        """Read stderr continuously so a chatty server never blocks on a full pipe."""
+        stderr = self.process.stderr
+        while True:
+            try:
+                line = await stderr.readline()
+            except ValueError:
+                continue  # a line beyond READ_CHUNK_BYTES was discarded
+            if not line:
+                break
+            text = line.decode("utf-8", errors="replace").rstrip()
+            if not text:
+                continue
+            try:
+                self.stderr.add(text)
+            except Exception:
+                pass  # a failing log forwarder must never stop the drain, or the pipe fills up again
+
+    async def _dispatch(self, line: bytes) -> None:
+        if not line or line.isspace():
+            return
+        try:
+            # parsed from the raw line: a large reply is not also copied as decoded and stripped text
+            message = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            message = None
+        if not isinstance(message, dict):
+            self.skipped_lines += 1
+            self._log_noise(self.name, line.decode("utf-8", errors="replace").strip())
+            return
+
+        if "method" not in message:
+            future = self._pending.get(message.get("id"))
+            if future is not None and not future.done():
+                future.set_result(message)
+            return
+        if "id" in message:
+            await self._answer_server_request(message)
+            return
+        self.notifications.append(message)
+        for handler in list(self._handlers):
+            try:
+                result = handler(self.name, message)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as handler_error:  # a broken handler must not stop the reader
+                self._log_noise(self.name, f"notification handler failed: {handler_error!r}")
+
+    async def _answer_server_request(self, message: dict[str, Any]) -> None:
+        if message["method"] == "ping":
+            reply: dict[str, Any] = {"jsonrpc": "2.0", "id": message["id"], "result": {}}
+        else:
+            reply = {
+                "jsonrpc": "2.0",
+                "id": message["id"],
+                "error": {"code": METHOD_NOT_FOUND, "message": f"Method not supported by client: {message['method']}"},
+            }
+        try:
+            await self._send(reply)
+        except (self.TransportError, ConnectionError, OSError):
+            pass
+
+    def _fail_pending(self, reason: str) -> None:
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(self.ServerExited(reason))
+
+    @staticmethod
+    def _log_noise(server: str, text: str) -> None:
+        from src.ui.diagnostics.debug_helpers import debug_warning
+
+        debug_warning(
+            heading="MCP • STDOUT_NOISE",
+            body="Ignored a stdout line that is not a JSON-RPC message",
+            metadata={"server": server, "line_preview": text[:200]},
+        )
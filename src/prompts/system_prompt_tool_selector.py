@@ -16,6 +16,9 @@ You are a TOOL SELECTOR with advanced JSON schema parsing and intelligent parame
 **Available Tools:**
 {tools_context}
 
+**Conversation Context (resolve references like "that file" or "the same query" from here):**
+{history}
+
 **🧠 INTELLIGENT PARAMETER EXTRACTION:**
 - You ARE extracting parameters mentioned in the user's request
 - You ARE analyzing JSON schemas to understand ALL required parameters
@@ -119,13 +122,13 @@ User: "what is machine learning?"
 """
 
 
-def get_tool_selector_prompt(tools_context: str, history: list, content: str) -> str:
+def get_tool_selector_prompt(tools_context: str, history: str, content: str) -> str:
     """
     Get the formatted tool selector prompt with dynamic content.
 
     Args:
         tools_context: Available tools and their schemas
-        history: Conversation history
+        history: Rendered conversation context (see ContextWindow.build)
         content: Current user message
 
     Returns:
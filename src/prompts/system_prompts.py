@@ -455,7 +455,7 @@ class PromptManager:
         return self.system_prompts.ai_assistant(history, latest_message, tools)
 
     def get_tool_selector_prompt(
-        self, tools_context: str, history: list, content: str
+        self, tools_context: str, history: str, content: str
     ) -> str:
         """Get tool selector prompt."""
         # Import here to avoid circular imports
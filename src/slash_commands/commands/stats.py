@@ -0,0 +1,109 @@
+from ..protocol import SlashCommand, CommandResult, CommandOption
+from ..on_run_time_register import OnRunTimeRegistry
+from ...mcp.manager import MCP_Manager
+from ...utils.llm_scheduler import LLMScheduler
+from ...utils.llm_usage import LLMUsage
+from ...utils.speculation import SpeculativeChat
+
+
+def register_stats_command() -> None:
+    """Function to register the /stats command in the OnRunTimeRegistry."""
+    stats_command = SlashCommand(
+        command="stats",
+        options=[CommandOption(name="reset", description="reset the session LLM usage counters after showing them")],
+        requirements=None,
+        description="Show LLM token usage, latency and request-queue statistics for this session.",
+        handler=stats_handler
+    )
+    registry = OnRunTimeRegistry()
+    try:
+        registry.register(stats_command)
+    except registry.CommandAlreadyRegisteredError:
+        # Command is already registered; we can choose to log this or ignore it.
+        pass
+
+
+def stats_handler(command: SlashCommand, options: CommandOption | None) -> CommandResult:
+    """Handler function to display the session LLM usage summary.
+    e.g. /stats or /stats --reset
+    :param command: The SlashCommand object for stats
+    :param options: CommandOption for stats flags, or None
+    :return: CommandResult with the formatted summary (the raw summary dict is in data)
+    """
+    try:
+        summary = LLMUsage.session_summary()
+        scheduler = LLMScheduler.report()
+        if options and options.name == "reset":
+            LLMUsage.reset_session()
+        speculation = SpeculativeChat.report()
+        message = f"{format_usage_summary(summary)}\n\n{format_scheduler_report(scheduler)}"
+        if speculation["started"]:
+            message += f"\n\n{format_speculation_report(speculation)}"
+        mcp_pools = MCP_Manager.pool_report()
+        if mcp_pools:
+            message += f"\n\n{format_mcp_pool_report(mcp_pools)}"
+        return CommandResult(success=True, message=message,
+                             data={**summary, "scheduler": scheduler, "speculation": speculation,
+                                   "mcp_pools": mcp_pools})
+    except Exception as e:
+        return CommandResult(success=False, message="Failed to read LLM usage statistics.", error={"error": str(e)})
+
+
+def format_usage_summary(summary: dict) -> str:
+    """Render a usage summary (see UsageAccumulator.summary) as plain text tables."""
+    if not summary["calls"]:
+        return "No LLM calls recorded in this session yet."
+    lines = [
+        f"LLM usage: {summary['calls']} calls, {summary['prompt_tokens']} prompt + "
+        f"{summary['completion_tokens']} completion tokens, {summary['latency_s']}s, "
+        f"{summary['cache_hits']} prompt-cache hits",
+    ]
+    for title, key in (("By node", "by_node"), ("By model", "by_model"), ("By call site", "by_call_site")):
+        lines.append(f"\n{title}:")
+        for name, group in summary[key].items():
+            lines.append(
+                f"  {name:<32} {group['calls']:>5} calls {group['prompt_tokens']:>8} in "
+                f"{group['completion_tokens']:>7} out {group['latency_s']:>8.2f}s"
+            )
+    return "\n".join(lines)
+
+
+def format_scheduler_report(report: dict) -> str:
+    """Render LLMScheduler.report() (queue depth and wait time per priority class) as plain text."""
+    lines = [f"LLM request budget: {report['window_usage']}/{report['rate_limit_per_minute']} used in the last minute"]
+    for lane in ("interactive", "agent", "background"):
+        stats = report[lane]
+        lines.append(
+            f"  {lane:<12} {stats['queued']:>3} queued (max {stats['max_queued']}) {stats['granted']:>5} granted "
+            f"avg wait {stats['avg_wait_s']:.2f}s max {stats['max_wait_s']:.2f}s"
+        )
+    return "\n".join(lines)
+
+
+def format_speculation_report(report: dict) -> str:
+    """Render SpeculativeChat.report() (adoption rate, TTFT saved, wasted tokens) as plain text."""
+    return (
+        f"Speculative chat: {report['adopted']}/{report['started']} adopted, {report['cancelled']} cancelled, "
+        f"{report['failed']} failed\n"
+        f"  time to first token saved: {report['ttft_saved_s']:.2f}s total, {report['avg_ttft_saved_s']:.2f}s avg\n"
+        f"  wasted tokens (estimated): {report['wasted_prompt_tokens']} prompt + "
+        f"{report['wasted_completion_tokens']} completion"
+    )
+
+
+def format_mcp_pool_report(report: dict) -> str:
+    """Render MCP_Manager.pool_report() (queue depth and latency per server replica) as plain text."""
+    lines = ["MCP servers:"]
+    for server, pool in report.items():
+        routing = "sticky" if pool["sticky"] else "least-loaded"
+        lines.append(
+            f"  {server} ({pool['healthy']}/{len(pool['replicas'])} replicas running, {routing}, "
+            f"{pool['recoveries']} restarts, {pool['failovers']} standby failovers)"
+        )
+        for replica in pool["replicas"]:
+            lines.append(
+                f"    #{replica['replica']:<3} {replica['calls']:>5} calls {replica['errors']:>3} errors "
+                f"{replica['in_flight']:>2} in flight (max {replica['max_in_flight']}) "
+                f"avg {replica['avg_latency_ms']:.1f}ms max {replica['max_latency_ms']:.1f}ms"
+            )
+    return "\n".join(lines)
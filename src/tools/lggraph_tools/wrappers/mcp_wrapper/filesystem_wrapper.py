@@ -10,6 +10,7 @@ class FileSystemWrapper:
 
     def __init__(self, **kwargs):
         from src.tools.lggraph_tools.tool_response_manager import ToolResponseManager
+        from src.mcp.result_store import McpResultStore
 
         self.file_path = kwargs.get("path", None)
         """
@@ -29,7 +30,7 @@ class FileSystemWrapper:
             heading="MCP_WRAPPER • FILESYSTEM",
             body="MCP server result received",
             metadata={
-                "result_preview": str(result)[:100],
+                "result": McpResultStore.describe(result),
                 "result_type": type(result).__name__,
             },
         )
@@ -21,6 +21,7 @@ class UniversalMCPWrapper:
             universal_tool,
         )
         from src.config import settings
+        from src.mcp.result_store import McpResultStore
 
         self.server_url = kwargs.get("server_url", None)
         self.action = kwargs.get("tool_name", None)
@@ -60,13 +61,13 @@ class UniversalMCPWrapper:
             heading="MCP_WRAPPER • UNIVERSAL",
             body="MCP server result received",
             metadata={
-                "result_preview": str(result),
+                "result": McpResultStore.describe(result),
                 "result_type": type(result).__name__,
             },
         )
 
-        # Handle the result and create appropriate AI message
-        if result and not str(result).startswith("Error:")  :
+        # Handle the result and create appropriate AI message (only a string result can be an error text)
+        if result and not (isinstance(result, str) and result.startswith("Error:")):
             content = f"✅ **Action '{self.action}' completed successfully.**\n\nResult: {final_content}"
             ToolResponseManager().set_response([settings.AIMessage(content=content)])
         else:
@@ -0,0 +1,93 @@
+"""
+Live, token-by-token display of a streamed AI message.
+
+The message is shown in the same panel style as print_message(sender="ai") and re-rendered
+as Markdown while it grows. Markdown is re-parsed at most CHAT_STREAM_RENDER_FPS times per
+second, however fast tokens arrive; a spinner is shown until the first text arrives.
+
+Usage:
+    with StreamingMessageView(settings.console) as view:
+        for chunk in stream:
+            view.append(extractor.feed(chunk))
+        view.finish(final_text)
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Optional
+
+from rich.align import Align
+from rich.console import Console, Group, RenderableType
+from rich.live import Live
+from rich.markdown import Markdown
+from rich.panel import Panel
+from rich.spinner import Spinner
+
+from src.config import settings
+
+
+class StreamingMessageView:
+    """Rich Live panel for one streamed AI message."""
+
+    def __init__(self, console: Console, fps: Optional[float] = None, title: str = "🤖 [AI]"):
+        self.console = console
+        self.fps = fps or settings.CHAT_STREAM_RENDER_FPS
+        self.title = title
+        self.text = ""
+        self.frames = 0  # Markdown re-renders (for diagnostics)
+        self._last_render = 0.0
+        self._live: Optional[Live] = None
+
+    def __enter__(self) -> "StreamingMessageView":
+        self._live = Live(
+            self._panel(Spinner("dots", text="Thinking...", style="bold green")),
+            console=self.console,
+            refresh_per_second=self.fps,
+            transient=False,
+        )
+        self._live.__enter__()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._live is not None:
+            self._live.__exit__(*exc_info)
+            self._live = None
+
+    def append(self, text: str) -> None:
+        """Add streamed text; the Markdown is rebuilt only when a new frame is due."""
+        if not text:
+            return
+        self.text += text
+        now = time.perf_counter()
+        if now - self._last_render >= 1.0 / self.fps:
+            self._render()
+            self._last_render = now
+
+    def reset(self) -> None:
+        """Drop the text shown so far (e.g. when a failed speculative reply is regenerated)."""
+        self.text = ""
+        self._last_render = 0.0
+
+    def finish(self, final_text: Optional[str] = None) -> None:
+        """Render the final message (e.g. the parsed field when the stream was not the expected JSON)."""
+        if final_text is not None:
+            self.text = final_text
+        self._render(refresh=True)
+        if settings.ENABLE_SOUND_NOTIFICATIONS:
+            import winsound  # Windows only, like print_message
+
+            winsound.Beep(7200, 200)
+
+    def _render(self, refresh: bool = False) -> None:
+        if self._live is None:
+            return
+        self.frames += 1
+        self._live.update(self._panel(Markdown(self.text.strip() or " ")), refresh=refresh)
+
+    def _panel(self, body: RenderableType) -> Panel:
+        return Panel(
+            Align.left(Group(self.title, body)),
+            border_style="bold green",
+            padding=(1, 2),
+        )
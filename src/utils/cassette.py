@@ -0,0 +1,283 @@
+"""
+Record/replay cassettes for LLM and tool calls.
+
+In record mode every ModelManager.invoke/ainvoke response and every
+ToolExecutionHelpers.exeCuteTool result of a run is captured, together with its latency,
+into a compact gzipped JSON cassette. In replay mode the same calls are served back from
+the cassette (with the original or zero latency), so an AgentGraphCore workflow can be
+re-run deterministically without a model server or side-effecting tools.
+
+Calls are matched by a digest of their request (model, messages, schema / tool name and
+parameters). Prompts that embed run-specific text (timestamps, paths) would never match
+again, so a miss falls back to the next unconsumed recording with the same kind and label
+(call site or tool name), in recording order.
+
+Usage:
+    with Cassette.record("runs/goal.cassette.json.gz", meta={"goal": goal}):
+        graph.invoke(initial_state)
+
+    with Cassette.replay("runs/goal.cassette.json.gz", latency="zero") as cassette:
+        graph.invoke(initial_state)
+    cassette.report()  # served / fuzzy / missed counts
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, ClassVar, Iterator, Optional
+
+OFF = "off"
+RECORD = "record"
+REPLAY = "replay"
+
+LLM = "llm"
+TOOL = "tool"
+
+FORMAT_VERSION = 1
+
+
+def request_digest(kind: str, request: Any) -> str:
+    """Stable short digest of a request payload (non-JSON values are keyed by their str())."""
+    encoded = json.dumps([kind, request], sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class CassetteEntry:
+    """One recorded call."""
+
+    kind: str
+    label: str
+    key: str
+    response: Any
+    latency_s: float
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"kind": self.kind, "label": self.label, "key": self.key,
+                "response": self.response, "latency_s": round(self.latency_s, 4)}
+
+
+@dataclass
+class CassetteFile:
+    """Cassette contents plus the replay cursor."""
+
+    path: Path
+    meta: dict[str, Any] = field(default_factory=dict)
+    entries: list[CassetteEntry] = field(default_factory=list)
+    served: int = 0
+    fuzzy: int = 0
+    missed: int = 0
+    _by_key: dict[tuple[str, str], deque] = field(default_factory=dict, repr=False)
+    _by_label: dict[tuple[str, str], deque] = field(default_factory=dict, repr=False)
+    _consumed: set[int] = field(default_factory=set, repr=False)
+
+    @classmethod
+    def load(cls, path: Path | str) -> "CassetteFile":
+        path = Path(path)
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            data = json.load(file)
+        if data.get("version") != FORMAT_VERSION:
+            raise Cassette.CassetteError(f"Unsupported cassette version {data.get('version')!r} in {path}")
+        cassette = cls(path=path, meta=data.get("meta", {}),
+                       entries=[CassetteEntry(**entry) for entry in data.get("entries", [])])
+        for index, entry in enumerate(cassette.entries):
+            cassette._by_key.setdefault((entry.kind, entry.key), deque()).append(index)
+            cassette._by_label.setdefault((entry.kind, entry.label), deque()).append(index)
+        return cassette
+
+    def save(self) -> Path:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"version": FORMAT_VERSION, "meta": self.meta, "entries": [e.to_dict() for e in self.entries]}
+        with gzip.open(self.path, "wt", encoding="utf-8") as file:
+            json.dump(data, file, separators=(",", ":"), ensure_ascii=False)
+        return self.path
+
+    def take(self, kind: str, label: str, key: str) -> Optional[CassetteEntry]:
+        """Pop the recording for a request: exact digest first, then next unconsumed with the same label."""
+        for queue, exact in ((self._by_key.get((kind, key)), True), (self._by_label.get((kind, label)), False)):
+            while queue:
+                index = queue.popleft()
+                if index in self._consumed:
+                    continue
+                self._consumed.add(index)
+                self.served += 1
+                self.fuzzy += int(not exact)
+                return self.entries[index]
+        self.missed += 1
+        return None
+
+    def report(self) -> dict[str, Any]:
+        return {
+            "path": str(self.path),
+            "entries": len(self.entries),
+            "llm_calls": sum(1 for e in self.entries if e.kind == LLM),
+            "tool_calls": sum(1 for e in self.entries if e.kind == TOOL),
+            "served": self.served,
+            "fuzzy": self.fuzzy,
+            "missed": self.missed,
+            "unused": len(self.entries) - len(self._consumed),
+        }
+
+
+class Cassette:
+    """The active cassette; call sites route live calls through ``through``/``through_async``."""
+
+    class CassetteError(Exception):
+        def __init__(self, message: str):
+            self.message = message
+            super().__init__(self.message)
+
+    class CassetteMissError(CassetteError, LookupError):
+        """Replay found no recording for a call (strict replay only)."""
+
+    mode: ClassVar[str] = OFF
+    latency: ClassVar[str] = "original"
+    strict: ClassVar[bool] = False
+    _active: ClassVar[Optional[CassetteFile]] = None
+    _lock: ClassVar[threading.Lock] = threading.Lock()
+
+    @classmethod
+    def active(cls) -> bool:
+        return cls.mode != OFF
+
+    @classmethod
+    @contextmanager
+    def record(cls, path: Path | str, meta: Optional[dict[str, Any]] = None) -> Iterator[CassetteFile]:
+        """Capture every wrapped call made inside the block; the cassette is written on exit."""
+        cassette = CassetteFile(path=Path(path), meta={"recorded_at": time.time(), **(meta or {})})
+        cls._activate(RECORD, cassette)
+        try:
+            yield cassette
+        finally:
+            cls._deactivate()
+            cassette.save()
+
+    @classmethod
+    @contextmanager
+    def replay(cls, path: Path | str, latency: str = "original", strict: bool = False) -> Iterator[CassetteFile]:
+        """
+        Serve wrapped calls from a cassette.
+
+        Args:
+            path: Cassette file written by record().
+            latency: "original" sleeps for the recorded latency, "zero" answers immediately.
+            strict: Raise CassetteMissError on an unmatched call instead of running it live.
+        """
+        if latency not in ("original", "zero"):
+            raise cls.CassetteError(f"latency must be 'original' or 'zero', got {latency!r}")
+        cassette = CassetteFile.load(path)
+        cls._activate(REPLAY, cassette, latency=latency, strict=strict)
+        try:
+            yield cassette
+        finally:
+            cls._deactivate()
+
+    @classmethod
+    def _activate(cls, mode: str, cassette: CassetteFile, latency: str = "original", strict: bool = False) -> None:
+        with cls._lock:
+            if cls._active is not None:
+                raise cls.CassetteError(f"A cassette is already active ({cls._active.path})")
+            cls.mode, cls._active, cls.latency, cls.strict = mode, cassette, latency, strict
+
+    @classmethod
+    def _deactivate(cls) -> None:
+        with cls._lock:
+            cls.mode, cls._active, cls.latency, cls.strict = OFF, None, "original", False
+
+    @classmethod
+    def through(
+        cls,
+        kind: str,
+        label: str,
+        request: Any,
+        call: Callable[[], Any],
+        encode: Callable[[Any], Any] = lambda value: value,
+        decode: Callable[[Any], Any] = lambda value: value,
+    ) -> Any:
+        """
+        Run ``call`` through the active cassette.
+
+        Args:
+            kind: LLM or TOOL.
+            label: Call site or tool name (fallback match key).
+            request: JSON-like request payload; its digest is the exact match key.
+            call: The live call.
+            encode: Turns the live result into JSON-serialisable data for recording.
+            decode: Turns recorded data back into the value the caller expects.
+        """
+        cassette = cls._active
+        if cassette is None:
+            return call()
+        key = request_digest(kind, request)
+        if cls.mode == REPLAY:
+            entry = cls._take(cassette, kind, label, key)
+            if entry is not None:
+                if cls.latency == "original":
+                    time.sleep(entry.latency_s)
+                return decode(entry.response)
+            return call()
+        started = time.perf_counter()
+        result = call()
+        cls._append(cassette, CassetteEntry(kind, label, key, encode(result), time.perf_counter() - started))
+        return result
+
+    @classmethod
+    async def through_async(
+        cls,
+        kind: str,
+        label: str,
+        request: Any,
+        call: Callable[[], Awaitable[Any]],
+        encode: Callable[[Any], Any] = lambda value: value,
+        decode: Callable[[Any], Any] = lambda value: value,
+    ) -> Any:
+        """Async variant of through(); ``call`` returns an awaitable."""
+        cassette = cls._active
+        if cassette is None:
+            return await call()
+        key = request_digest(kind, request)
+        if cls.mode == REPLAY:
+            entry = cls._take(cassette, kind, label, key)
+            if entry is not None:
+                if cls.latency == "original":
+                    await asyncio.sleep(entry.latency_s)
+                return decode(entry.response)
+            return await call()
+        started = time.perf_counter()
+        result = await call()
+        cls._append(cassette, CassetteEntry(kind, label, key, encode(result), time.perf_counter() - started))
+        return result
+
+    @classmethod
+    def _take(cls, cassette: CassetteFile, kind: str, label: str, key: str) -> Optional[CassetteEntry]:
+        with cls._lock:
+            entry = cassette.take(kind, label, key)
+        if entry is None:
+            if cls.strict:
+                raise cls.CassetteMissError(f"No recorded {kind} call for '{label}' in {cassette.path}")
+            cls._log_miss(cassette, kind, label, key)
+        return entry
+
+    @staticmethod
+    def _log_miss(cassette: CassetteFile, kind: str, label: str, key: str) -> None:
+        from src.ui.diagnostics.debug_helpers import debug_warning
+
+        debug_warning(
+            heading="CASSETTE • REPLAY_MISS",
+            body=f"No recorded {kind} call for '{label}', running it live",
+            metadata={"kind": kind, "label": label, "key": key, "cassette": str(cassette.path)},
+        )
+
+    @classmethod
+    def _append(cls, cassette: CassetteFile, entry: CassetteEntry) -> None:
+        with cls._lock:
+            cassette.entries.append(entry)
@@ -0,0 +1,215 @@
+"""
+Conversation context window for the chat-level nodes (chatBot, classifier, tool selector).
+
+Instead of joining the whole message history into every prompt, the nodes get:
+    - a rolling summary of older turns, and
+    - the most recent turns verbatim, sized by a token budget (CONTEXT_HISTORY_TOKENS).
+
+The summary is cached and extended incrementally: when turns fall out of the verbatim
+window they are folded into the existing summary (one small-model call), and the window is
+then shrunk to half the budget so the next few turns need no summarisation at all. The
+cache is validated against a digest of the summarised prefix, so a cleared or rewritten
+history simply starts a new summary.
+
+Tool catalogues are rendered once per tool set and cached as well.
+
+Usage:
+    context = ContextWindow.build(messages[:-1])
+    prompt = f"**Conversation Context:**\n{context.render()}"
+
+    catalogue = ContextWindow.tool_catalogue(ToolAssign.get_tools_list(), with_schemas=False)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, ClassVar, Optional, Sequence
+
+from src.config import settings
+
+CHARS_PER_TOKEN = 4
+
+SUMMARY_PROMPT = """You maintain a running summary of a conversation between a user and an AI assistant.
+Merge the new turns into the existing summary. Keep facts, names, file paths, decisions, tool results
+and open questions the assistant may need later; drop greetings and repetition.
+Answer with the updated summary only, as plain text of at most {max_words} words."""
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (about four characters per token)."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def format_turn(message: Any) -> str:
+    content = message.get("content", "") if isinstance(message, dict) else getattr(message, "content", message)
+    role = message.get("role", "message") if isinstance(message, dict) else getattr(message, "type", "message")
+    return f"{role}: {content}"
+
+
+def _digest(turns: Sequence[str]) -> str:
+    digest = hashlib.sha1()
+    for turn in turns:
+        digest.update(turn.encode("utf-8", "replace"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+@dataclass
+class ConversationContext:
+    """Summary of older turns plus the recent turns verbatim."""
+
+    summary: str = ""
+    recent: list[str] = field(default_factory=list)
+    summarized_turns: int = 0
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.summary) + sum(estimate_tokens(turn) for turn in self.recent)
+
+    def render(self, empty: str = "No previous messages in this conversation.") -> str:
+        if not self.summary and not self.recent:
+            return empty
+        parts = []
+        if self.summary:
+            parts.append(f"Summary of the earlier conversation ({self.summarized_turns} turns):\n{self.summary}")
+        if self.recent:
+            parts.append("Recent turns:\n" + "\n".join(self.recent))
+        return "\n\n".join(parts)
+
+
+@dataclass
+class _SummaryCache:
+    covered: int = 0  # leading turns folded into the summary
+    fingerprint: str = _digest([])
+    summary: str = ""
+
+
+class ContextWindow:
+    """Cached rolling summary and tool catalogues; ``summarizer(previous_summary, new_turns)`` is replaceable."""
+
+    _cache: ClassVar[_SummaryCache] = _SummaryCache()
+    _catalogues: ClassVar[dict[tuple, str]] = {}
+    _lock: ClassVar[threading.RLock] = threading.RLock()
+    summarizer: ClassVar[Optional[Callable[[str, list[str]], str]]] = None
+
+    @classmethod
+    def build(cls, messages: Sequence[Any], budget_tokens: Optional[int] = None) -> ConversationContext:
+        """
+        Build the prompt context for a history (usually ``messages[:-1]``).
+
+        Args:
+            messages: LangChain messages (or role/content dicts), oldest first.
+            budget_tokens: Verbatim window budget; defaults to CONTEXT_HISTORY_TOKENS.
+        """
+        budget = budget_tokens or settings.CONTEXT_HISTORY_TOKENS
+        turns = [format_turn(message) for message in messages]
+        if not turns:
+            return ConversationContext()
+
+        with cls._lock:
+            cache = cls._cache
+            if cache.covered > len(turns) or _digest(turns[:cache.covered]) != cache.fingerprint:
+                cache = _SummaryCache()  # history was cleared or rewritten
+
+            if cls._split(turns, cache.covered, budget) > cache.covered:
+                # fold down to half the budget so the following turns fit without another summary call
+                fold_to = cls._split(turns, cache.covered, budget // 2)
+                summary = cls._summarize(cache.summary, turns[cache.covered:fold_to])
+                cache = _SummaryCache(covered=fold_to, fingerprint=_digest(turns[:fold_to]), summary=summary)
+            cls._cache = cache
+
+        recent = turns[cache.covered:]
+        if recent and estimate_tokens(recent[-1]) > budget:
+            recent[-1] = recent[-1][: budget * CHARS_PER_TOKEN] + " …[truncated]"
+        return ConversationContext(summary=cache.summary, recent=recent, summarized_turns=cache.covered)
+
+    @staticmethod
+    def _split(turns: list[str], covered: int, budget: int) -> int:
+        """Index of the first turn that fits in the verbatim window (the newest turn always stays)."""
+        used = 0
+        for index in range(len(turns) - 1, covered - 1, -1):
+            used += estimate_tokens(turns[index])
+            if used > budget:
+                return min(index + 1, len(turns) - 1)
+        return covered
+
+    @classmethod
+    def _summarize(cls, previous: str, new_turns: list[str]) -> str:
+        limit = settings.CONTEXT_SUMMARY_TOKENS * CHARS_PER_TOKEN
+        try:
+            summary = (cls.summarizer or cls._llm_summarize)(previous, new_turns).strip()
+            if summary:
+                return summary[:limit]
+        except Exception as summary_error:
+            cls._log_summary_failure(summary_error, len(new_turns))
+        # extractive fallback: clipped turns appended to the previous summary, newest text kept
+        clipped = [turn if len(turn) <= 300 else turn[:300] + " …" for turn in new_turns]
+        return "\n".join(filter(None, [previous, *clipped]))[-limit:]
+
+    @staticmethod
+    def _log_summary_failure(error: Exception, new_turns: int) -> None:
+        from src.ui.diagnostics.debug_helpers import debug_warning
+
+        debug_warning(
+            heading="CONTEXT_WINDOW • SUMMARY_FAILED",
+            body=f"Falling back to an extractive summary: {error}",
+            metadata={"new_turns": new_turns, "error_type": type(error).__name__},
+        )
+
+    @staticmethod
+    def _llm_summarize(previous: str, new_turns: list[str]) -> str:
+        from src.utils.model_manager import ModelManager
+
+        client = ModelManager(
+            model=settings.CONTEXT_SUMMARY_MODEL,
+            backend="openai",
+            temperature=0,
+            max_tokens=settings.CONTEXT_SUMMARY_TOKENS,
+        )
+        response = client.invoke(
+            [
+                settings.HumanMessage(content=SUMMARY_PROMPT.format(max_words=settings.CONTEXT_SUMMARY_TOKENS * 3 // 4)),
+                settings.HumanMessage(
+                    content=f"Existing summary:\n{previous or '(none)'}\n\nNew turns:\n" + "\n".join(new_turns)
+                ),
+            ],
+            call_site="context_summary",
+        )
+        return str(response.content)
+
+    @classmethod
+    def tool_catalogue(cls, tools: Sequence[Any], with_schemas: bool = False) -> str:
+        """Rendered tool list (name, description and optionally the argument schema), cached per tool set."""
+        if not tools:
+            return "No tools available."
+        key = (with_schemas, *(tool.name for tool in tools))
+        with cls._lock:
+            catalogue = cls._catalogues.get(key)
+        if catalogue is None:
+            if with_schemas:
+                from src.utils.argument_schema_util import get_tool_argument_schema
+
+                entries = [
+                    f"Tool: {tool.name}\nDescription: {tool.description}\nParameters: {get_tool_argument_schema(tool)}"
+                    for tool in tools
+                ]
+            else:
+                entries = [f"Tool: {tool.name}\nDescription: {tool.description}" for tool in tools]
+            catalogue = "\n\n".join(entries)
+            with cls._lock:
+                cls._catalogues[key] = catalogue
+        return catalogue
+
+    @classmethod
+    def invalidate_tool_catalogues(cls) -> None:
+        """Drop the rendered catalogues, e.g. after MCP servers were reconfigured (descriptions may change)."""
+        with cls._lock:
+            cls._catalogues.clear()
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls._lock:
+            cls._cache = _SummaryCache()
+            cls._catalogues.clear()
@@ -0,0 +1,322 @@
+"""
+Per-endpoint adaptive concurrency limiting, circuit breaking and retry backoff for LLM calls.
+
+OpenAIIntegration used one set of class-level breaker counters for every model and retried
+with fixed sleeps, so under a partial outage all threads retried in lockstep and one bad
+model tripped the breaker for all of them. Each (endpoint, model) pair now gets:
+
+- an AIMD concurrency limiter: the in-flight limit grows by one per "window" of successes
+  and is multiplied by a decrease factor on 429 / 5xx / timeouts,
+- a circuit breaker that opens after consecutive failures and goes half-open after its
+  timeout, letting exactly one probe request through before closing (or re-opening),
+
+and retries share a jittered exponential backoff (full jitter) bounded by the caller's deadline.
+
+Usage:
+    guard = EndpointGuard.for_endpoint(base_url, model)
+    if not guard.breaker.allow_request():
+        ...  # fallback
+    deadline = EndpointGuard.deadline_in(settings.OPENAI_TIMEOUT)
+    with guard.limiter.slot(deadline):
+        ...  # request
+    guard.record(outcome)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, ClassVar, Iterator, Optional
+
+from src.config import settings
+
+# outcome labels passed to EndpointGuard.record
+SUCCESS = "success"
+OVERLOAD = "overload"  # 429, 5xx, timeouts, connection errors: shrink capacity
+FAILURE = "failure"  # other errors: count towards the breaker, capacity unchanged
+
+# async waiters poll for a free slot, backing off from the first to the second interval
+ASYNC_POLL_INITIAL_S = 0.005
+ASYNC_POLL_MAX_S = 0.1
+
+
+class AdaptiveLimiter:
+    """AIMD in-flight limit for one endpoint/model."""
+
+    def __init__(
+        self,
+        initial_limit: float,
+        min_limit: float = 1,
+        max_limit: float = 64,
+        decrease_factor: float = 0.5,
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = float(min_limit)
+        self.max_limit = float(max_limit)
+        self.decrease_factor = decrease_factor
+        self.in_flight = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, deadline: Optional[float] = None) -> None:
+        """Block until a slot is free; raises DeadlineExceededError when the deadline passes first."""
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise EndpointGuard.DeadlineExceededError(f"no concurrency slot (limit {int(self.limit)})")
+                self._condition.wait(remaining)
+            self.in_flight += 1
+
+    def try_acquire(self) -> bool:
+        """Take a slot if one is free, without waiting."""
+        with self._condition:
+            if self.in_flight >= int(self.limit):
+                return False
+            self.in_flight += 1
+            return True
+
+    async def acquire_async(self, deadline: Optional[float] = None) -> None:
+        """
+        Async variant of acquire that waits on the event loop (asyncio.sleep) instead of a thread.
+
+        A cancelled waiter never holds a slot: the slot is taken by the non-awaiting try_acquire.
+        """
+        delay = ASYNC_POLL_INITIAL_S
+        while not self.try_acquire():
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise EndpointGuard.DeadlineExceededError(f"no concurrency slot (limit {int(self.limit)})")
+            await asyncio.sleep(delay if remaining is None else min(delay, remaining))
+            delay = min(delay * 2, ASYNC_POLL_MAX_S)
+
+    def release(self, outcome: str = SUCCESS) -> None:
+        with self._condition:
+            self.in_flight = max(self.in_flight - 1, 0)
+            if outcome == SUCCESS:
+                # additive increase: +1 after roughly one limit's worth of successes
+                self.limit = min(self.limit + 1 / self.limit, self.max_limit)
+            elif outcome == OVERLOAD:
+                self.limit = max(self.limit * self.decrease_factor, self.min_limit)
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self, deadline: Optional[float] = None) -> Iterator["_Slot"]:
+        """Hold a slot for the block; set ``slot.outcome`` to adapt the limit (defaults to failure on error)."""
+        self.acquire(deadline)
+        held = _Slot()
+        try:
+            yield held
+        except BaseException:
+            if held.outcome == SUCCESS:
+                held.outcome = FAILURE
+            raise
+        finally:
+            self.release(held.outcome)
+
+    @asynccontextmanager
+    async def slot_async(self, deadline: Optional[float] = None) -> AsyncIterator["_Slot"]:
+        """Async variant of slot; waiting never blocks the event loop and is safe to cancel."""
+        await self.acquire_async(deadline)
+        held = _Slot()
+        try:
+            yield held
+        except BaseException:
+            if held.outcome == SUCCESS:
+                held.outcome = FAILURE
+            raise
+        finally:
+            self.release(held.outcome)
+
+
+@dataclass
+class _Slot:
+    outcome: str = SUCCESS
+
+
+class CircuitBreaker:
+    """Closed → open after ``max_failures`` consecutive failures → half-open single probe → closed/open."""
+
+    CLOSED: ClassVar[str] = "closed"
+    OPEN: ClassVar[str] = "open"
+    HALF_OPEN: ClassVar[str] = "half_open"
+
+    def __init__(self, max_failures: int, open_timeout: float):
+        self.max_failures = max_failures
+        self.open_timeout = open_timeout
+        self.state = self.CLOSED
+        self.failure_count = 0
+        self.open_until: Optional[float] = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """True when a request may be sent (in half-open state only the single probe is allowed)."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if self.open_until is not None and time.monotonic() < self.open_until:
+                    return False
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self) -> bool:
+        """Returns True when this success closed an open/half-open breaker."""
+        with self._lock:
+            recovered = self.state != self.CLOSED or self.failure_count > 0
+            self.state = self.CLOSED
+            self.failure_count = 0
+            self.open_until = None
+            self._probe_in_flight = False
+            return recovered
+
+    def record_failure(self) -> bool:
+        """Returns True when this failure opened the breaker."""
+        with self._lock:
+            self.failure_count += 1
+            if self.state == self.HALF_OPEN or self.failure_count >= self.max_failures:
+                opened = self.state != self.OPEN
+                self.state = self.OPEN
+                self.open_until = time.monotonic() + self.open_timeout
+                self._probe_in_flight = False
+                return opened
+            return False
+
+    def release_probe(self) -> None:
+        """Give back a half-open probe whose request never reached the endpoint (e.g. deadline exceeded)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "failure_count": self.failure_count,
+                "open_for_s": round(max(self.open_until - time.monotonic(), 0), 2) if self.open_until else 0,
+            }
+
+
+@dataclass
+class EndpointGuard:
+    """Limiter + breaker for one (endpoint, model) pair, plus the shared registry and backoff helpers."""
+
+    class DeadlineExceededError(TimeoutError):
+        """Raised when a call (queueing or retrying) would run past the caller's deadline."""
+
+        def __init__(self, message: str = ""):
+            full_message = f"Deadline exceeded: {message}" if message else "Deadline exceeded"
+            super().__init__(full_message)
+            self.message = message
+
+    endpoint: str
+    model: str
+    limiter: AdaptiveLimiter
+    breaker: CircuitBreaker
+    counters: dict[str, int] = field(default_factory=lambda: {SUCCESS: 0, OVERLOAD: 0, FAILURE: 0})
+
+    _registry: ClassVar[dict[tuple[str, str], "EndpointGuard"]] = {}
+    _registry_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    @classmethod
+    def for_endpoint(cls, endpoint: str, model: str) -> "EndpointGuard":
+        key = (endpoint, model)
+        with cls._registry_lock:
+            guard = cls._registry.get(key)
+            if guard is None:
+                guard = cls(
+                    endpoint=endpoint,
+                    model=model,
+                    limiter=AdaptiveLimiter(
+                        initial_limit=settings.LLM_CONCURRENCY_INITIAL,
+                        min_limit=settings.LLM_CONCURRENCY_MIN,
+                        max_limit=settings.LLM_CONCURRENCY_MAX,
+                    ),
+                    breaker=CircuitBreaker(
+                        max_failures=settings.LLM_BREAKER_MAX_FAILURES,
+                        open_timeout=settings.LLM_BREAKER_OPEN_SECONDS,
+                    ),
+                )
+                cls._registry[key] = guard
+            return guard
+
+    def record(self, outcome: str) -> None:
+        """Feed a request outcome to the breaker (the limiter learns it through its slot)."""
+        self.counters[outcome] += 1
+        if outcome == SUCCESS:
+            if self.breaker.record_success():
+                self._log("info", "OPENAI • CIRCUIT_BREAKER_RESET", "Endpoint recovered - circuit closed")
+        elif self.breaker.record_failure():
+            self._log("critical", "OPENAI • CIRCUIT_BREAKER_OPEN", "Circuit breaker opened for endpoint")
+
+    @staticmethod
+    def classify(error: BaseException) -> str:
+        """OVERLOAD for rate limits, server errors, timeouts and connection errors; FAILURE otherwise."""
+        if isinstance(error, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+            return OVERLOAD
+        status = getattr(error, "status_code", None)
+        if status is None:
+            status = getattr(getattr(error, "response", None), "status_code", None)
+        if isinstance(status, int):
+            return OVERLOAD if status == 429 or status >= 500 else FAILURE
+        name = type(error).__name__
+        if name in ("APITimeoutError", "APIConnectionError", "RateLimitError", "InternalServerError"):
+            return OVERLOAD
+        return FAILURE
+
+    @staticmethod
+    def deadline_in(seconds: float) -> float:
+        """Absolute (monotonic) deadline ``seconds`` from now."""
+        return time.monotonic() + seconds
+
+    @staticmethod
+    def backoff_delay(attempt: int, deadline: Optional[float] = None) -> float:
+        """
+        Full-jitter exponential backoff for retry ``attempt`` (1-based), capped by settings
+        and by the time left before the deadline. Raises DeadlineExceededError when no time is left.
+        """
+        ceiling = min(settings.LLM_RETRY_BASE_DELAY * 2 ** (attempt - 1), settings.LLM_RETRY_MAX_DELAY)
+        delay = random.uniform(0, ceiling)
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise EndpointGuard.DeadlineExceededError(f"no time left for retry {attempt}")
+            delay = min(delay, remaining)
+        return delay
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "limit": round(self.limiter.limit, 2),
+            "in_flight": self.limiter.in_flight,
+            **self.breaker.snapshot(),
+            **self.counters,
+        }
+
+    @classmethod
+    def report(cls) -> dict[str, dict[str, Any]]:
+        """Limiter and breaker state per endpoint/model."""
+        with cls._registry_lock:
+            guards = list(cls._registry.values())
+        return {f"{guard.endpoint}#{guard.model}": guard.snapshot() for guard in guards}
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls._registry_lock:
+            cls._registry.clear()
+
+    def _log(self, level: str, heading: str, body: str) -> None:
+        from src.ui.diagnostics.debug_helpers import debug_critical, debug_info
+
+        log = debug_critical if level == "critical" else debug_info
+        log(
+            heading=heading,
+            body=f"{body}: {self.model}",
+            metadata={"endpoint": self.endpoint, "model": self.model, **self.snapshot()},
+        )
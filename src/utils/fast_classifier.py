@@ -0,0 +1,302 @@
+"""
+Local fast-path classifier for the llm / tool / agent router.
+
+classify_message_type used to pay a full LLM round-trip for every non-slash message. Most
+messages are easy ("hi", "translate ...", "agent mode: ..."), so they are answered locally:
+
+    1. keyword rules for explicit overrides and unambiguous phrasings, then
+    2. a multinomial logistic regression over hashed word uni/bigrams and a few shape
+       features, trained at first use from the labelled seed set in
+       src/utils/data/message_classifier_seed.jsonl (pure Python, a few hundred ms).
+
+Both return a confidence; only results at or above FAST_CLASSIFIER_THRESHOLD short-circuit
+the LLM router. Short referential follow-ups ("ok run it") are never classified locally once
+there is history (see is_follow_up), since only the history-aware router can resolve them.
+When FAST_CLASSIFIER_ONNX_PATH points at an exported model (see export_onnx) and onnxruntime
+is installed, the model is scored with onnxruntime instead.
+
+Usage:
+    if history and is_follow_up(text):
+        ...  # leave it to the LLM router
+    result = FastClassifier.classify("search the web for the latest python release")
+    if result.confident:
+        return {"message_type": result.label}
+
+    FastClassifier.report()  # local hits vs LLM fallbacks
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import random
+import re
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, ClassVar, Iterable, Optional
+
+from src.config import settings
+
+LABELS = ("llm", "tool", "agent")
+FEATURE_DIM = 1 << 14
+SEED_PATH = Path(__file__).resolve().parent / "data" / "message_classifier_seed.jsonl"
+
+_WORD = re.compile(r"[a-z0-9_./'-]+")
+_PATH_OR_FILE = re.compile(r"\b[\w-]+\.(?:md|txt|py|json|ya?ml|csv|toml|pdf|env)\b|[\w-]+/[\w./-]+")
+_URL = re.compile(r"https?://|www\.")
+# short replies that only make sense against the previous turn ("ok run it", "do that again")
+_FOLLOW_UP = re.compile(
+    r"^(ok|okay|yes|yeah|sure|go ahead|do it|now|and|then|also)\b|\b(it|that|this|those|them|again|same|above|previous)\b"
+)
+FOLLOW_UP_MAX_WORDS = 6
+
+# (pattern, label, confidence) - first match wins; explicit user overrides come first
+RULES: tuple[tuple[re.Pattern, str, float], ...] = (
+    (re.compile(r"\b(agent mode|use (the )?agent|switch to agent|^agent\b[:,]?)"), "agent", 0.97),
+    (re.compile(r"\b(use (the )?(ai|assistant|llm)|just answer from your knowledge)\b"), "llm", 0.97),
+    (re.compile(r"\b(rag search|search (in )?(the |my )?(knowledge base|document|docs|pdf))\b"), "tool", 0.95),
+    (re.compile(r"^translate\b(?!.*\b(and|then)\s+\w)"), "tool", 0.93),
+    (re.compile(r"^(?!.*\b(and|then)\s+\w).*\b(what time is it|(current|local) time|what('?s| is) the (weather|forecast)|"
+                r"(weather|forecast) (in|for|today|tomorrow|tonight|right now|now)\b)"), "tool", 0.9),
+    (re.compile(r"^(hi|hello|hey|thanks|thank you|good (morning|night|evening)|ok|okay|cool)\b[!.,]?\s*\w{0,12}[!.?]?$"), "llm", 0.95),
+    (re.compile(r"^(explain|clarify|elaborate|summari[sz]e|rephrase)\b.*\b(that|this|it|above|previous|last|earlier|so far)\b"), "llm", 0.92),
+)
+
+
+def features(text: str) -> dict[int, float]:
+    """Hashed bag of words/bigrams plus shape flags (crc32, so stable across processes)."""
+    lowered = text.lower().strip()
+    words = _WORD.findall(lowered)
+    tokens = [f"w:{word}" for word in words]
+    tokens += [f"b:{first} {second}" for first, second in zip(words, words[1:])]
+    if words:
+        tokens.append(f"first:{words[0]}")
+    if _PATH_OR_FILE.search(lowered):
+        tokens.append("flag:path")
+    if _URL.search(lowered):
+        tokens.append("flag:url")
+    if lowered.endswith("?"):
+        tokens.append("flag:question")
+    if re.search(r"\b(and then|then|and save|and write|step by step)\b", lowered):
+        tokens.append("flag:multistep")
+    tokens.append(f"len:{min(len(words) // 4, 5)}")
+
+    vector: dict[int, float] = {}
+    for token in tokens:
+        index = zlib.crc32(token.encode("utf-8")) % FEATURE_DIM
+        vector[index] = vector.get(index, 0.0) + 1.0
+    norm = math.sqrt(sum(value * value for value in vector.values())) or 1.0
+    return {index: value / norm for index, value in vector.items()}
+
+
+def is_follow_up(text: str) -> bool:
+    """True for short referential replies that the context-free fast path must leave to the LLM router."""
+    lowered = text.lower().strip()
+    return len(_WORD.findall(lowered)) <= FOLLOW_UP_MAX_WORDS and bool(_FOLLOW_UP.search(lowered))
+
+
+def _softmax(scores: list[float]) -> list[float]:
+    top = max(scores)
+    exps = [math.exp(score - top) for score in scores]
+    total = sum(exps)
+    return [value / total for value in exps]
+
+
+@dataclass
+class LogisticModel:
+    """Sparse multinomial logistic regression over hashed features."""
+
+    weights: dict[int, list[float]]
+    bias: list[float]
+
+    def probabilities(self, vector: dict[int, float]) -> list[float]:
+        scores = list(self.bias)
+        for index, value in vector.items():
+            row = self.weights.get(index)
+            if row is not None:
+                for label in range(len(LABELS)):
+                    scores[label] += row[label] * value
+        return _softmax(scores)
+
+    @classmethod
+    def train(
+        cls,
+        examples: Iterable[tuple[str, str]],
+        epochs: int = 40,
+        learning_rate: float = 0.5,
+        l2: float = 1e-4,
+        seed: int = 0,
+    ) -> "LogisticModel":
+        data = [(features(text), LABELS.index(label)) for text, label in examples]
+        model = cls(weights={}, bias=[0.0] * len(LABELS))
+        rng = random.Random(seed)
+        for epoch in range(epochs):
+            rng.shuffle(data)
+            rate = learning_rate / (1 + epoch * 0.1)
+            for vector, target in data:
+                probabilities = model.probabilities(vector)
+                gradient = [probabilities[label] - (label == target) for label in range(len(LABELS))]
+                for label in range(len(LABELS)):
+                    model.bias[label] -= rate * gradient[label]
+                for index, value in vector.items():
+                    row = model.weights.setdefault(index, [0.0] * len(LABELS))
+                    for label in range(len(LABELS)):
+                        row[label] -= rate * (gradient[label] * value + l2 * row[label])
+        return model
+
+
+@dataclass
+class FastClassification:
+    """Local classification result."""
+
+    label: str
+    confidence: float
+    source: str  # "rule", "model" or "onnx"
+    latency_ms: float
+    threshold: float
+
+    @property
+    def confident(self) -> bool:
+        return self.confidence >= self.threshold
+
+
+def load_examples(path: Path | str = SEED_PATH) -> list[tuple[str, str]]:
+    """Read a labelled JSON-lines file ({"text": ..., "label": "llm" | "tool" | "agent"})."""
+    examples = []
+    with Path(path).open(encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                row = json.loads(line)
+                examples.append((row["text"], row["label"]))
+    return examples
+
+
+class FastClassifier:
+    """The lazily trained local model, optional ONNX session and local-vs-fallback counts."""
+
+    _model: ClassVar[Optional[LogisticModel]] = None
+    _onnx_session: ClassVar[Any] = None
+    _lock: ClassVar[threading.Lock] = threading.Lock()
+    _stats: ClassVar[dict[str, int]] = {"local": 0, "fallback": 0}
+
+    @classmethod
+    def classify(cls, text: str, threshold: Optional[float] = None) -> FastClassification:
+        """Classify a message locally; check ``.confident`` before trusting the label."""
+        threshold = settings.FAST_CLASSIFIER_THRESHOLD if threshold is None else threshold
+        started = time.perf_counter()
+        lowered = text.lower().strip()
+        for pattern, label, confidence in RULES:
+            if pattern.search(lowered):
+                return cls._result(label, confidence, "rule", started, threshold)
+
+        session = cls._get_onnx_session()
+        if session is not None:
+            probabilities = cls._onnx_probabilities(session, features(text))
+            source = "onnx"
+        else:
+            probabilities = cls.model().probabilities(features(text))
+            source = "model"
+        best = max(range(len(LABELS)), key=probabilities.__getitem__)
+        return cls._result(LABELS[best], probabilities[best], source, started, threshold)
+
+    @classmethod
+    def _result(cls, label: str, confidence: float, source: str, started: float, threshold: float) -> FastClassification:
+        result = FastClassification(label, round(confidence, 4), source, (time.perf_counter() - started) * 1000, threshold)
+        with cls._lock:
+            cls._stats["local" if result.confident else "fallback"] += 1
+        return result
+
+    @classmethod
+    def model(cls) -> LogisticModel:
+        """The logistic model, trained from the seed set on first use."""
+        if cls._model is None:
+            with cls._lock:
+                if cls._model is None:
+                    cls._model = LogisticModel.train(load_examples())
+        return cls._model
+
+    @classmethod
+    def prewarm(cls) -> None:
+        """Train the model in a background thread so the first message does not pay for it."""
+        if settings.FAST_CLASSIFIER_ENABLED and cls._model is None:
+            threading.Thread(target=cls.model, name="fast-classifier-train", daemon=True).start()
+
+    @classmethod
+    def _get_onnx_session(cls) -> Any:
+        if not settings.FAST_CLASSIFIER_ONNX_PATH:
+            return None
+        if cls._onnx_session is None:
+            try:
+                import onnxruntime
+
+                cls._onnx_session = onnxruntime.InferenceSession(
+                    settings.FAST_CLASSIFIER_ONNX_PATH, providers=["CPUExecutionProvider"]
+                )
+            except Exception as onnx_error:
+                from src.ui.diagnostics.debug_helpers import debug_warning
+
+                debug_warning(
+                    heading="FAST_CLASSIFIER • ONNX_UNAVAILABLE",
+                    body=f"Using the built-in model instead: {onnx_error}",
+                    metadata={"path": settings.FAST_CLASSIFIER_ONNX_PATH, "error_type": type(onnx_error).__name__},
+                )
+                cls._onnx_session = False
+        return cls._onnx_session or None
+
+    @staticmethod
+    def _onnx_probabilities(session: Any, vector: dict[int, float]) -> list[float]:
+        import numpy as np
+
+        dense = np.zeros((1, FEATURE_DIM), dtype=np.float32)
+        for index, value in vector.items():
+            dense[0, index] = value
+        return [float(p) for p in session.run(None, {"features": dense})[0][0]]
+
+    @classmethod
+    def report(cls) -> dict[str, Any]:
+        with cls._lock:
+            stats = dict(cls._stats)
+        total = stats["local"] + stats["fallback"]
+        return {**stats, "local_rate": round(stats["local"] / total, 3) if total else 0.0}
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls._lock:
+            cls._model = None
+            cls._onnx_session = None
+            cls._stats = {"local": 0, "fallback": 0}
+
+
+def export_onnx(model: LogisticModel, path: Path | str) -> Path:
+    """
+    Export the model as an ONNX graph (features[1, FEATURE_DIM] -> probabilities[1, 3]).
+
+    Needs the ``onnx`` and ``numpy`` packages (only for exporting; scoring needs onnxruntime).
+    """
+    import numpy as np
+    import onnx
+    from onnx import TensorProto, helper, numpy_helper
+
+    weights = np.zeros((FEATURE_DIM, len(LABELS)), dtype=np.float32)
+    for index, row in model.weights.items():
+        weights[index] = row
+    graph = helper.make_graph(
+        [
+            helper.make_node("MatMul", ["features", "W"], ["scores"]),
+            helper.make_node("Add", ["scores", "B"], ["logits"]),
+            helper.make_node("Softmax", ["logits"], ["probabilities"], axis=1),
+        ],
+        "message_classifier",
+        [helper.make_tensor_value_info("features", TensorProto.FLOAT, [1, FEATURE_DIM])],
+        [helper.make_tensor_value_info("probabilities", TensorProto.FLOAT, [1, len(LABELS)])],
+        initializer=[
+            numpy_helper.from_array(weights, "W"),
+            numpy_helper.from_array(np.asarray(model.bias, dtype=np.float32), "B"),
+        ],
+    )
+    path = Path(path)
+    onnx.save(helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)]), path)
+    return path
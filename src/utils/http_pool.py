@@ -0,0 +1,185 @@
+"""
+Tuned, pre-warmed HTTP connection pool for the LLM endpoint.
+
+The OpenAI SDK otherwise builds its own default httpx clients, so the first LLM call of a
+session pays DNS, TCP and TLS setup. LLMHttpPool owns one sync and one async httpx client
+(HTTP/2 through the ``httpx[http2]`` dependency, sized keep-alive limits, connect/read
+timeouts from settings) that every OpenAI client of the process is built on, and can open
+the first connection in the background while the banner prints.
+
+httpx keeps separate connection pools for sync and async clients (async connections are
+bound to an event loop), so both clients share limits, timeouts and statistics rather than
+sockets. Statistics count requests and newly opened connections per client; every other
+request reused a kept-alive connection.
+
+Usage:
+    client = OpenAI(base_url=..., api_key=..., http_client=LLMHttpPool.sync_client())
+    LLMHttpPool.prewarm(base_url)
+    LLMHttpPool.stats()
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import threading
+from typing import Any, ClassVar, Optional
+
+import httpx
+
+from src.config import settings
+
+
+class LLMHttpPool:
+    """The shared sync and async httpx clients behind every OpenAIIntegration client."""
+
+    _sync_client: ClassVar[Optional[httpx.Client]] = None
+    _async_client: ClassVar[Optional[httpx.AsyncClient]] = None
+    _lock: ClassVar[threading.Lock] = threading.Lock()
+    _stats: ClassVar[dict[str, dict[str, int]]] = {}
+    _prewarm_thread: ClassVar[Optional[threading.Thread]] = None
+
+    @staticmethod
+    def http2_enabled() -> bool:
+        """HTTP/2 needs h2 (from httpx[http2]); an install without it falls back to HTTP/1.1 keep-alive."""
+        return settings.OPENAI_HTTP2 and importlib.util.find_spec("h2") is not None
+
+    @staticmethod
+    def limits() -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=settings.OPENAI_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OPENAI_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=settings.OPENAI_POOL_KEEPALIVE_EXPIRY,
+        )
+
+    @staticmethod
+    def timeout() -> httpx.Timeout:
+        return httpx.Timeout(settings.OPENAI_TIMEOUT, connect=settings.OPENAI_CONNECT_TIMEOUT)
+
+    @classmethod
+    def sync_client(cls) -> httpx.Client:
+        """The shared sync client (created on first use)."""
+        with cls._lock:
+            if cls._sync_client is None or cls._sync_client.is_closed:
+                cls._sync_client = httpx.Client(
+                    http2=cls.http2_enabled(),
+                    limits=cls.limits(),
+                    timeout=cls.timeout(),
+                    event_hooks={"request": [cls._sync_request_hook]},
+                )
+            return cls._sync_client
+
+    @classmethod
+    def async_client(cls) -> httpx.AsyncClient:
+        """The shared async client (created on first use)."""
+        with cls._lock:
+            if cls._async_client is None or cls._async_client.is_closed:
+                cls._async_client = httpx.AsyncClient(
+                    http2=cls.http2_enabled(),
+                    limits=cls.limits(),
+                    timeout=cls.timeout(),
+                    event_hooks={"request": [cls._async_request_hook]},
+                )
+            return cls._async_client
+
+    @classmethod
+    def prewarm(cls, base_url: str, api_key: Optional[str] = None) -> threading.Thread:
+        """
+        Open a kept-alive connection to the endpoint in a background thread.
+
+        A lightweight GET on ``{base_url}/models`` performs DNS, TCP, TLS (and the HTTP/2
+        handshake); the connection is then reused by the first real LLM call. Failures are
+        only logged - the first call simply opens its own connection.
+        """
+        with cls._lock:
+            if cls._prewarm_thread is not None and cls._prewarm_thread.is_alive():
+                return cls._prewarm_thread
+            cls._prewarm_thread = threading.Thread(
+                target=cls._prewarm, args=(base_url, api_key), name="llm-pool-prewarm", daemon=True
+            )
+            cls._prewarm_thread.start()
+            return cls._prewarm_thread
+
+    @classmethod
+    def _prewarm(cls, base_url: str, api_key: Optional[str]) -> None:
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else None
+        try:
+            response = cls.sync_client().get(f"{base_url.rstrip('/')}/models", headers=headers)
+            response.close()
+        except httpx.HTTPError as prewarm_error:
+            from src.ui.diagnostics.debug_helpers import debug_warning
+
+            debug_warning(
+                heading="OPENAI • POOL_PREWARM_FAILED",
+                body=f"Connection pre-warm failed: {prewarm_error}",
+                metadata={"error_type": type(prewarm_error).__name__, "base_url": base_url},
+            )
+
+    @classmethod
+    def stats(cls) -> dict[str, Any]:
+        """Requests, new connections and reuses per client."""
+        with cls._lock:
+            report: dict[str, Any] = {"http2": cls.http2_enabled()}
+            for name, counters in cls._stats.items():
+                report[name] = {**counters, "reused": max(counters["requests"] - counters["new_connections"], 0)}
+            return report
+
+    @classmethod
+    def log_stats(cls) -> dict[str, Any]:
+        """Send the pool statistics to the debug log and return them."""
+        from src.ui.diagnostics.debug_helpers import debug_info
+
+        report = cls.stats()
+        debug_info(
+            heading="OPENAI • CONNECTION_POOL_STATS",
+            body="LLM endpoint connection reuse",
+            metadata=report,
+        )
+        return report
+
+    @classmethod
+    def close(cls) -> None:
+        """Close the sync client; the async client is closed by aclose (it needs a running loop)."""
+        with cls._lock:
+            if cls._sync_client is not None:
+                cls._sync_client.close()
+                cls._sync_client = None
+
+    @classmethod
+    async def aclose(cls) -> None:
+        with cls._lock:
+            client, cls._async_client = cls._async_client, None
+        if client is not None:
+            await client.aclose()
+
+    @classmethod
+    def reset_stats(cls) -> None:
+        with cls._lock:
+            cls._stats.clear()
+
+    # ------------------------------------------------------------------ accounting
+
+    @classmethod
+    def _count(cls, client: str, event: str) -> None:
+        with cls._lock:
+            counters = cls._stats.setdefault(client, {"requests": 0, "new_connections": 0})
+            counters[event] += 1
+
+    @classmethod
+    def _sync_request_hook(cls, request: httpx.Request) -> None:
+        cls._count("sync", "requests")
+
+        def trace(event_name: str, info: dict) -> None:
+            if event_name == "connection.connect_tcp.complete":
+                cls._count("sync", "new_connections")
+
+        request.extensions["trace"] = trace
+
+    @classmethod
+    async def _async_request_hook(cls, request: httpx.Request) -> None:
+        cls._count("async", "requests")
+
+        async def trace(event_name: str, info: dict) -> None:
+            if event_name == "connection.connect_tcp.complete":
+                cls._count("async", "new_connections")
+
+        request.extensions["trace"] = trace
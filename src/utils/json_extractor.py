@@ -0,0 +1,443 @@
+"""
+Single-pass JSON extraction from LLM responses.
+
+Replaces the old convert_to_json strategy (full parse, markdown regex, then two separate
+character loops that called json.loads on every balanced span) with one scan that:
+
+- jumps straight to plausible JSON openers ("{" followed by a key or "}", "[" followed by a value)
+  with a compiled regex instead of visiting every character
+- decodes candidates in place, so a valid object is parsed once and never re-scanned
+- understands JSON strings and escapes, so braces inside string values never break balancing
+- stops at the first valid top-level object (arrays are kept as a fallback, objects win)
+- optionally filters candidates with a schema hint (type, required keys or a pydantic model)
+- optionally repairs common model mistakes: trailing commas, single quotes,
+  Python literals (True/False/None) and a truncated tail
+
+Whole documents and repaired fragments are parsed with orjson; candidates embedded in prose
+are decoded with the stdlib C decoder's raw_decode, which (unlike orjson) can stop at the
+end of the first value and report where it ended.
+
+Usage:
+    result = extract_json(llm_text, schema_hint={"message_type"})
+    if result is not None:
+        data, method = result.value, result.method
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional, Union
+
+try:
+    import orjson
+
+    _loads = orjson.loads
+    _DECODE_ERRORS: tuple = (orjson.JSONDecodeError, TypeError)
+except ImportError:  # orjson is a declared dependency; stdlib keeps the extractor usable without it
+    _loads = json.loads
+    _DECODE_ERRORS = (json.JSONDecodeError, TypeError)
+
+SchemaHint = Union[type, Iterable[str], None]
+
+_raw_decode = json.JSONDecoder().raw_decode
+
+# "{" that can start an object / "[" that can start an array (single quotes allowed for repair)
+_OPENERS = re.compile(r"\{(?=\s*[\"'}])|\[(?=\s*[\"'\[{\]\-0-9tfnTFN])")
+_STRUCTURAL = re.compile(r'["{}\[\]]')
+_DQ_STRING = re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL)
+_SQ_STRING = re.compile(r"'(?:[^'\\]|\\.)*'", re.DOTALL)
+_CLOSER_FOR = {"{": "}", "[": "]"}
+
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+# a single quote only opens a string where a JSON value or key may start
+_SINGLE_QUOTE_OPEN = re.compile(r"(?<=[\[{:,])\s*'")
+_DANGLING_SEPARATOR = re.compile(r"(,|:)\s*$")
+_DANGLING_KEY = re.compile(r'(,|(?<=\{))\s*"[^"]*"\s*:?\s*$')
+_PY_LITERALS = re.compile(r"\b(True|False|None)\b")
+_PY_LITERAL_MAP = {"True": "true", "False": "false", "None": "null"}
+
+_FAILED = object()
+
+
+@dataclass
+class ExtractionResult:
+    """Parsed JSON value plus the strategy that produced it (for debug metadata)."""
+
+    value: Any
+    method: str  # "direct", "scan", "repair" or "truncated_repair"
+
+
+def extract_json(
+    text: str, schema_hint: SchemaHint = None, repair: bool = True
+) -> Optional[ExtractionResult]:
+    """
+    Extract the first usable JSON value from an LLM response.
+
+    Args:
+        text: Raw model output (may contain prose, markdown fences or several JSON fragments).
+        schema_hint: ``dict``/``list`` to require a type, an iterable of keys every accepted
+            object must contain, or a pydantic model class (its required fields are used).
+        repair: Try to fix trailing commas, single quotes, Python literals and truncated tails.
+
+    Returns:
+        ExtractionResult, or None when nothing usable was found.
+    """
+    if not text:
+        return None
+
+    # fast path: the whole response is JSON
+    value = _try_parse(text)
+    if value is not _FAILED and _matches(value, schema_hint):
+        return ExtractionResult(value, "direct")
+
+    fallback: Optional[ExtractionResult] = None
+    truncation_tried = False
+    pos = 0
+    while True:
+        opener = _OPENERS.search(text, pos)
+        if opener is None:
+            break
+        start = opener.start()
+
+        # valid JSON is decoded in place without a separate balancing pass
+        try:
+            value, end = _raw_decode(text, start)
+            method = "scan"
+            end -= 1
+        except json.JSONDecodeError:
+            end, stack = _scan_span(text, start)
+            if end is None:
+                # unbalanced until end of text: the response was cut off
+                if repair and stack and not truncation_tried:
+                    truncation_tried = True  # only the outermost truncated span is worth closing
+                    value = _try_parse(_close_truncated(text[start:], stack))
+                    if value is not _FAILED and _matches(value, schema_hint):
+                        return ExtractionResult(value, "truncated_repair")
+                # keep looking for a complete fragment nested inside the truncated one
+                pos = start + 1
+                continue
+            value = _try_parse(repair_json(text[start : end + 1])) if repair else _FAILED
+            method = "repair"
+
+        if value is not _FAILED and _matches(value, schema_hint):
+            if isinstance(value, dict) or schema_hint is not None:
+                return ExtractionResult(value, method)
+            if fallback is None:
+                fallback = ExtractionResult(value, method)
+        pos = end + 1
+
+    return fallback
+
+
+def repair_json(fragment: str) -> str:
+    """
+    Fix the most common model mistakes in a JSON fragment.
+
+    Converts single-quoted strings to double-quoted ones, maps Python literals to JSON
+    and removes trailing commas. Content inside double-quoted strings is never touched.
+    """
+    out: list[str] = []
+    i = 0
+    length = len(fragment)
+    next_single = -2  # cached position of the next single quote that opens a string
+    while i < length:
+        char = fragment[i]
+        if char == '"' or char == "'":
+            match = (_DQ_STRING if char == '"' else _SQ_STRING).match(fragment, i)
+            end = match.end() if match else length  # unterminated string runs to the end
+            body = fragment[i + 1 : end - 1 if match else end]
+            if char == "'":
+                body = body.replace("\\'", "'").replace('"', '\\"')
+            out.append('"' + body + '"')
+            i = end
+            continue
+        # copy the run of non-string characters in one go
+        if next_single != -1 and next_single < i:
+            single = _SINGLE_QUOTE_OPEN.search(fragment, i)
+            next_single = single.end() - 1 if single else -1
+        next_double = fragment.find('"', i)
+        candidates = [p for p in (next_double, next_single) if p != -1]
+        next_quote = min(candidates) if candidates else length
+        out.append(_fix_bare_segment(fragment[i:next_quote]))
+        i = next_quote
+    return "".join(out)
+
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class StreamingFieldExtractor:
+    """
+    Incrementally decode one top-level string field from a streamed JSON object.
+
+    Feed the raw chunks as they arrive; ``feed`` returns the newly decoded part of the field
+    value (escapes, including split ``\\uXXXX`` sequences and surrogate pairs, are resolved).
+    Text before the object (prose, markdown fences) is skipped; the object starts at the first
+    "{" followed by optional whitespace and a '"', so braces in prose ("use {x}") do not count.
+    Keys and values of nested objects never match, only the first occurrence of the field is
+    streamed, and unpaired surrogate escapes decode to U+FFFD.
+
+    Usage:
+        extractor = StreamingFieldExtractor("response")
+        for chunk in stream:
+            render(extractor.feed(chunk))
+        extractor.value, extractor.complete
+    """
+
+    def __init__(self, field: str = "response"):
+        self.field = field
+        self.value = ""
+        self.complete = False  # closing quote of the field value was seen
+        self._stack: list[str] = []
+        self._closed = False  # the top-level object ended
+        self._opening = False  # a "{" that may start the object, pending the next non-space character
+        self._expect_key = False
+        self._in_string = False
+        self._role = ""  # "key", "target" or "other" for the string being read
+        self._key: list[str] = []
+        self._last_key: Optional[str] = None
+        self._escape = False
+        self._hex: Optional[str] = None
+        self._high_surrogate: Optional[int] = None
+
+    @property
+    def started(self) -> bool:
+        """True once the field value has started streaming."""
+        return bool(self.value) or self.complete or self._role == "target"
+
+    def feed(self, chunk: str) -> str:
+        out: list[str] = []
+        for char in chunk:
+            if self._closed:
+                break
+            if not self._stack:
+                if not (self._opening and char == '"'):
+                    if not (self._opening and char.isspace()):
+                        self._opening = char == "{"
+                    continue
+                self._opening = False
+                self._stack.append("{")
+                self._expect_key = True
+            if self._in_string:
+                self._string_char(char, out)
+            elif char == '"':
+                self._in_string = True
+                top_level = len(self._stack) == 1
+                if self._stack[-1] == "{" and self._expect_key:
+                    self._role = "key"
+                    self._key = []
+                elif top_level and self._last_key == self.field and not self.complete:
+                    self._role = "target"
+                else:
+                    self._role = "other"
+            elif char in "{[":
+                self._stack.append(char)
+                self._expect_key = char == "{"
+            elif char in "}]":
+                self._stack.pop()
+                self._expect_key = False
+                self._closed = not self._stack
+            elif char == ":":
+                self._expect_key = False
+            elif char == "," and self._stack[-1] == "{":
+                self._expect_key = True
+        text = "".join(out)
+        self.value += text
+        return text
+
+    def _string_char(self, char: str, out: list[str]) -> None:
+        if self._hex is not None:
+            self._hex += char
+            if len(self._hex) == 4:
+                self._emit_codepoint(int(self._hex, 16) if all(c in "0123456789abcdefABCDEF" for c in self._hex) else 0xFFFD, out)
+                self._hex = None
+            return
+        if self._escape:
+            self._escape = False
+            if char == "u":
+                self._hex = ""
+            else:
+                self._emit(_ESCAPES.get(char, char), out)
+            return
+        if char == "\\":
+            self._escape = True
+        elif char == '"':
+            self._in_string = False
+            self._flush_surrogate(out)
+            if self._role == "key" and len(self._stack) == 1:
+                self._last_key = "".join(self._key)
+            elif self._role == "target":
+                self.complete = True
+            self._role = ""
+        else:
+            self._emit(char, out)
+
+    def _emit_codepoint(self, codepoint: int, out: list[str]) -> None:
+        if 0xD800 <= codepoint <= 0xDBFF:
+            self._flush_surrogate(out)
+            self._high_surrogate = codepoint
+        elif 0xDC00 <= codepoint <= 0xDFFF and self._high_surrogate is not None:
+            high, self._high_surrogate = self._high_surrogate, None
+            self._emit(chr(0x10000 + ((high - 0xD800) << 10) + (codepoint - 0xDC00)), out)
+        elif 0xDC00 <= codepoint <= 0xDFFF:
+            self._emit("\ufffd", out)  # low surrogate without a high one
+        else:
+            self._emit(chr(codepoint), out)
+
+    def _flush_surrogate(self, out: list[str]) -> None:
+        if self._high_surrogate is not None:
+            self._high_surrogate = None
+            self._emit("\ufffd", out)
+
+    def _emit(self, text: str, out: list[str]) -> None:
+        if self._high_surrogate is not None and text:
+            self._flush_surrogate(out)
+        if self._role == "key":
+            self._key.append(text)
+        elif self._role == "target":
+            out.append(text)
+
+
+class StreamingArrayExtractor:
+    """
+    Incrementally cut the elements out of the first JSON array in a streamed response.
+
+    ``feed`` returns the elements that closed in this chunk, decoded (with repair when the
+    element alone does not parse). Objects and arrays are returned as soon as their closing
+    bracket arrives, scalars when the following "," or "]" does. Text before the first "["
+    is skipped; elements that cannot be decoded are counted in ``skipped``.
+
+    Usage:
+        extractor = StreamingArrayExtractor()
+        for chunk in stream:
+            for element in extractor.feed(chunk):
+                handle(element)
+        extractor.complete
+    """
+
+    def __init__(self):
+        self.started = False  # the opening "[" was seen
+        self.complete = False  # the closing "]" was seen
+        self.skipped = 0
+        self._element: list[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> list[Any]:
+        elements: list[Any] = []
+        for char in chunk:
+            if self.complete:
+                break
+            if not self.started:
+                if char == "[":
+                    self.started = True
+                    self._depth = 1
+                continue
+            if self._in_string:
+                self._element.append(char)
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+            if self._depth == 1 and char in ",]":
+                self._close_element(elements)
+                self.complete = char == "]"
+                continue
+            self._element.append(char)
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 1:
+                    self._close_element(elements)
+        return elements
+
+    def _close_element(self, elements: list[Any]) -> None:
+        fragment = "".join(self._element).strip()
+        self._element = []
+        if not fragment:
+            return
+        value = _try_parse(fragment)
+        if value is _FAILED:
+            value = _try_parse(repair_json(fragment))
+        if value is _FAILED:
+            self.skipped += 1
+        else:
+            elements.append(value)
+
+
+def _scan_span(text: str, start: int) -> tuple[Optional[int], list[str]]:
+    """
+    Find the index of the bracket closing the span opened at ``start``.
+
+    Returns (end_index, []) when balanced, or (None, open_stack) when the text ends first.
+    The open stack ends with "\"" when the text was cut off inside a string.
+    """
+    stack = [text[start]]
+    pos = start + 1
+    while True:
+        match = _STRUCTURAL.search(text, pos)
+        if match is None:
+            return None, stack
+        char = match.group()
+        if char == '"':
+            string = _DQ_STRING.match(text, match.start())
+            if string is None:
+                return None, stack + ['"']
+            pos = string.end()
+            continue
+        pos = match.end()
+        if char in "{[":
+            stack.append(char)
+        elif _CLOSER_FOR[stack[-1]] != char:
+            # mismatched closer: not a JSON span
+            return None, []
+        else:
+            stack.pop()
+            if not stack:
+                return match.start(), []
+
+
+def _close_truncated(fragment: str, stack: list[str]) -> str:
+    """Close an unterminated string and every open bracket of a truncated fragment."""
+    if stack[-1] == '"':
+        fragment += '"'
+        stack = stack[:-1]
+    fragment = repair_json(fragment).rstrip()
+    # drop a dangling separator, or an object key that never got its value
+    if stack[-1] == "{":
+        fragment = _DANGLING_KEY.sub("", fragment)
+    fragment = _DANGLING_SEPARATOR.sub("", fragment)
+    return fragment + "".join(_CLOSER_FOR[o] for o in reversed(stack))
+
+
+def _try_parse(candidate: str) -> Any:
+    try:
+        return _loads(candidate)
+    except _DECODE_ERRORS:
+        return _FAILED
+
+
+def _matches(value: Any, schema_hint: SchemaHint) -> bool:
+    if schema_hint is None:
+        return True
+    if isinstance(schema_hint, type):
+        fields = getattr(schema_hint, "model_fields", None)
+        if fields is None:
+            return isinstance(value, schema_hint)
+        required = [name for name, info in fields.items() if info.is_required()]
+        return isinstance(value, dict) and all(name in value for name in required)
+    return isinstance(value, dict) and all(key in value for key in schema_hint)
+
+
+def _fix_bare_segment(segment: str) -> str:
+    segment = _PY_LITERALS.sub(lambda m: _PY_LITERAL_MAP[m.group()], segment)
+    return _TRAILING_COMMA.sub(r"\1", segment)
@@ -0,0 +1,252 @@
+"""
+Central admission scheduler for LLM requests with priority lanes.
+
+Every OpenAI-compatible call must get a grant from the shared request budget
+(LLM_RATE_LIMIT_PER_MINUTE in a sliding 60 s window) before it is sent. Waiting requests
+are granted strictly by priority class, then arrival order:
+
+    INTERACTIVE (the user's chat turn) > AGENT (agent-mode workflows) > BACKGROUND (ingestion)
+
+Background requests additionally leave LLM_INTERACTIVE_RESERVE grants of each window
+untouched, so queued bulk work yields as soon as an interactive turn arrives instead of
+having already drained the budget.
+
+The priority of a call comes from a ContextVar, so it is set once around a unit of work
+(asyncio tasks and LangGraph nodes inherit it) rather than threaded through every call.
+
+Usage:
+    with LLMScheduler.priority(Priority.BACKGROUND):
+        asyncio.run(process_chunks_with_immediate_saving(chunks, prompt_openai_for_triples))
+    wait_s = LLMScheduler.acquire()  # done by OpenAIIntegration before each request
+    LLMScheduler.report()
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Any, ClassVar, Iterator, Optional
+
+from src.config import settings
+
+
+class Priority(IntEnum):
+    """Lower value is served first."""
+
+    INTERACTIVE = 0
+    AGENT = 1
+    BACKGROUND = 2
+
+
+_current_priority: ContextVar[Priority] = ContextVar("llm_priority", default=Priority.AGENT)
+
+# async waiters poll for their grant, backing off from the first to the second interval
+ASYNC_POLL_INITIAL_S = 0.005
+ASYNC_POLL_MAX_S = 0.1
+
+
+@dataclass
+class LaneStats:
+    """Queue depth and wait-time counters for one priority class."""
+
+    queued: int = 0
+    max_queued: int = 0
+    granted: int = 0
+    total_wait_s: float = 0.0
+    max_wait_s: float = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "granted": self.granted,
+            "avg_wait_s": round(self.total_wait_s / self.granted, 3) if self.granted else 0.0,
+            "max_wait_s": round(self.max_wait_s, 3),
+        }
+
+
+class LLMScheduler:
+    """The shared per-minute request budget and the priority-ordered queue waiting on it."""
+
+    WINDOW_SECONDS: ClassVar[float] = 60.0
+
+    _condition: ClassVar[threading.Condition] = threading.Condition()
+    _waiting: ClassVar[list[tuple[int, int]]] = []  # heap of (priority, sequence)
+    _sequence: ClassVar[Iterator[int]] = itertools.count()
+    _grants: ClassVar[deque[float]] = deque()
+    _stats: ClassVar[dict[Priority, LaneStats]] = {priority: LaneStats() for priority in Priority}
+
+    @classmethod
+    @contextmanager
+    def priority(cls, priority: Priority) -> Iterator[None]:
+        """Run the block's LLM calls in a priority class."""
+        token = _current_priority.set(priority)
+        try:
+            yield
+        finally:
+            _current_priority.reset(token)
+
+    @classmethod
+    def current_priority(cls) -> Priority:
+        return _current_priority.get()
+
+    @classmethod
+    def acquire(cls, priority: Optional[Priority] = None, deadline: Optional[float] = None) -> float:
+        """
+        Block until the request may be sent and return the time spent waiting.
+
+        Args:
+            priority: Priority class; defaults to the context's class (see priority()).
+            deadline: Absolute time.monotonic() deadline; EndpointGuard.DeadlineExceededError
+                is raised when no grant is available before it.
+        """
+        priority = Priority(cls.current_priority() if priority is None else priority)
+        started = time.monotonic()
+        with cls._condition:
+            ticket = cls._enqueue(priority)
+            try:
+                while not cls._try_grant(ticket, started):
+                    now = time.monotonic()
+                    # wake when the oldest grant leaves the window (or when another request is granted)
+                    timeout = cls._grants[0] + cls.WINDOW_SECONDS - now if cls._grants else None
+                    if deadline is not None:
+                        remaining = deadline - now
+                        cls._check_deadline(priority, remaining)
+                        timeout = remaining if timeout is None else min(timeout, remaining)
+                    cls._condition.wait(timeout)
+            except BaseException:
+                cls._dequeue(ticket)
+                raise
+        return time.monotonic() - started
+
+    @classmethod
+    async def acquire_async(cls, priority: Optional[Priority] = None, deadline: Optional[float] = None) -> float:
+        """
+        acquire() for coroutines; waits on the event loop (asyncio.sleep) instead of a thread.
+
+        The ticket keeps its place in the priority queue while the coroutine polls, and the
+        grant is only taken by the non-awaiting _try_grant, so a cancelled waiter never holds one.
+        """
+        priority = Priority(cls.current_priority() if priority is None else priority)
+        started = time.monotonic()
+        with cls._condition:
+            ticket = cls._enqueue(priority)
+        delay = ASYNC_POLL_INITIAL_S
+        try:
+            while True:
+                with cls._condition:
+                    if cls._try_grant(ticket, started):
+                        return time.monotonic() - started
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None:
+                        cls._check_deadline(priority, remaining)
+                await asyncio.sleep(delay if remaining is None else min(delay, remaining))
+                delay = min(delay * 2, ASYNC_POLL_MAX_S)
+        except BaseException:
+            with cls._condition:
+                cls._dequeue(ticket)
+            raise
+
+    @classmethod
+    def window_usage(cls) -> int:
+        """Grants issued in the current window."""
+        with cls._condition:
+            cls._expire(time.monotonic())
+            return len(cls._grants)
+
+    @classmethod
+    def report(cls) -> dict[str, Any]:
+        """Queue depth and wait times per priority class, plus window usage."""
+        with cls._condition:
+            cls._expire(time.monotonic())
+            return {
+                "window_usage": len(cls._grants),
+                "rate_limit_per_minute": settings.LLM_RATE_LIMIT_PER_MINUTE,
+                **{priority.name.lower(): cls._stats[priority].as_dict() for priority in Priority},
+            }
+
+    @classmethod
+    def log_report(cls) -> dict[str, Any]:
+        """Send the current report to the debug log and return it."""
+        from src.ui.diagnostics.debug_helpers import debug_info
+
+        report = cls.report()
+        debug_info(
+            heading="OPENAI • SCHEDULER_REPORT",
+            body="LLM request queue depth and wait time per priority class",
+            metadata=report,
+        )
+        return report
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls._condition:
+            cls._waiting.clear()
+            cls._grants.clear()
+            cls._stats = {priority: LaneStats() for priority in Priority}
+            cls._condition.notify_all()
+
+    @classmethod
+    def _enqueue(cls, priority: Priority) -> tuple[int, int]:
+        """Queue a ticket for priority; call with _condition held."""
+        ticket = (int(priority), next(cls._sequence))
+        heapq.heappush(cls._waiting, ticket)
+        lane = cls._stats[priority]
+        lane.queued += 1
+        lane.max_queued = max(lane.max_queued, lane.queued)
+        return ticket
+
+    @classmethod
+    def _try_grant(cls, ticket: tuple[int, int], started: float) -> bool:
+        """Grant the ticket if it is first in line and the budget allows; call with _condition held."""
+        now = time.monotonic()
+        cls._expire(now)
+        priority = Priority(ticket[0])
+        if cls._waiting[0] != ticket or len(cls._grants) >= cls._budget(priority):
+            return False
+        heapq.heappop(cls._waiting)
+        cls._grants.append(now)
+        lane = cls._stats[priority]
+        lane.queued -= 1
+        waited = now - started
+        lane.granted += 1
+        lane.total_wait_s += waited
+        lane.max_wait_s = max(lane.max_wait_s, waited)
+        # the next waiter may be admissible right away
+        cls._condition.notify_all()
+        return True
+
+    @classmethod
+    def _dequeue(cls, ticket: tuple[int, int]) -> None:
+        """Drop an abandoned ticket (deadline, cancellation); call with _condition held."""
+        cls._waiting.remove(ticket)
+        heapq.heapify(cls._waiting)
+        cls._stats[Priority(ticket[0])].queued -= 1
+        cls._condition.notify_all()
+
+    @staticmethod
+    def _check_deadline(priority: Priority, remaining: float) -> None:
+        if remaining <= 0:
+            from src.utils.endpoint_guard import EndpointGuard
+
+            raise EndpointGuard.DeadlineExceededError(f"no {priority.name.lower()} LLM grant")
+
+    @classmethod
+    def _budget(cls, priority: Priority) -> int:
+        limit = settings.LLM_RATE_LIMIT_PER_MINUTE
+        if priority == Priority.BACKGROUND:
+            return max(limit - settings.LLM_INTERACTIVE_RESERVE, 1)
+        return limit
+
+    @classmethod
+    def _expire(cls, now: float) -> None:
+        while cls._grants and now - cls._grants[0] >= cls.WINDOW_SECONDS:
+            cls._grants.popleft()
@@ -0,0 +1,231 @@
+"""
+Per-call token and latency accounting for LLM calls.
+
+Every LLM call (OpenAI-compatible API or Ollama) records prompt/completion tokens, latency,
+model, cache hit and call-site label into a context-scoped accumulator. The accumulator and
+the current node label live in ContextVars, so they follow the work through LangGraph nodes
+(LangGraph runs nodes in a copy of the caller's context) and never leak between workflows.
+
+A session-wide accumulator collects everything for the /stats slash command.
+
+Usage:
+    token = LLMUsage.start_workflow("agent_node")
+    with LLMUsage.node("subAGENT_goal_validator"):
+        ...  # LLM calls made here are attributed to the node
+    accumulator = LLMUsage.end_workflow(token)
+    LLMUsage.log_summary(accumulator)
+    LLMUsage.export_jsonl(accumulator)
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, ClassVar, Iterator, Optional
+
+from src.config import settings
+
+
+@dataclass
+class LLMCallRecord:
+    """A single LLM call."""
+
+    timestamp: float
+    workflow: str
+    node: str
+    call_site: str
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    cached_tokens: int = 0
+    latency_s: float = 0.0
+    cache_hit: bool = False
+    stream: bool = False
+
+
+@dataclass
+class UsageAccumulator:
+    """Thread-safe collection of call records with per-node / per-model summaries."""
+
+    label: str = "session"
+    records: list[LLMCallRecord] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, record: LLMCallRecord) -> None:
+        with self._lock:
+            self.records.append(record)
+
+    def snapshot(self) -> list[LLMCallRecord]:
+        with self._lock:
+            return list(self.records)
+
+    def summary(self) -> dict[str, Any]:
+        """Totals plus breakdowns by node and by model."""
+        records = self.snapshot()
+
+        def aggregate(key: str) -> dict[str, dict[str, Any]]:
+            groups: dict[str, dict[str, Any]] = {}
+            for record in records:
+                group = groups.setdefault(
+                    getattr(record, key),
+                    {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "latency_s": 0.0, "cache_hits": 0},
+                )
+                group["calls"] += 1
+                group["prompt_tokens"] += record.prompt_tokens
+                group["completion_tokens"] += record.completion_tokens
+                group["latency_s"] = round(group["latency_s"] + record.latency_s, 3)
+                group["cache_hits"] += int(record.cache_hit)
+            return dict(sorted(groups.items(), key=lambda item: -(item[1]["prompt_tokens"] + item[1]["completion_tokens"])))
+
+        return {
+            "label": self.label,
+            "calls": len(records),
+            "prompt_tokens": sum(r.prompt_tokens for r in records),
+            "completion_tokens": sum(r.completion_tokens for r in records),
+            "total_tokens": sum(r.total_tokens for r in records),
+            "latency_s": round(sum(r.latency_s for r in records), 3),
+            "cache_hits": sum(1 for r in records if r.cache_hit),
+            "by_node": aggregate("node"),
+            "by_model": aggregate("model"),
+            "by_call_site": aggregate("call_site"),
+        }
+
+
+_current_accumulator: ContextVar[Optional[UsageAccumulator]] = ContextVar("llm_usage_accumulator", default=None)
+_current_node: ContextVar[str] = ContextVar("llm_usage_node", default="unattributed")
+
+
+class LLMUsage:
+    """Session-wide usage totals plus the current workflow's accumulator and node label."""
+
+    _session: ClassVar[UsageAccumulator] = UsageAccumulator(label="session")
+
+    @classmethod
+    def start_workflow(cls, label: str) -> Token:
+        """Open a fresh accumulator for the current context; pass the token to end_workflow."""
+        return _current_accumulator.set(UsageAccumulator(label=label))
+
+    @classmethod
+    def end_workflow(cls, token: Token) -> Optional[UsageAccumulator]:
+        """Close the accumulator opened by start_workflow and return it."""
+        accumulator = _current_accumulator.get()
+        _current_accumulator.reset(token)
+        return accumulator
+
+    @classmethod
+    @contextmanager
+    def node(cls, label: str) -> Iterator[None]:
+        """Attribute LLM calls made inside the block to a graph node."""
+        token = _current_node.set(label)
+        try:
+            yield
+        finally:
+            _current_node.reset(token)
+
+    @classmethod
+    def current_node(cls) -> str:
+        return _current_node.get()
+
+    @classmethod
+    def record(
+        cls,
+        model: str,
+        latency_s: float,
+        usage: Any = None,
+        call_site: str = "default",
+        stream: bool = False,
+    ) -> LLMCallRecord:
+        """
+        Record one LLM call.
+
+        Args:
+            model: Model that served the call.
+            latency_s: Wall-clock latency of the request.
+            usage: OpenAI ``usage`` object/dict or LangChain ``usage_metadata`` dict (may be None).
+            call_site: Call-site label (e.g. "goal_validator").
+            stream: True for streaming calls (token counts come from the final usage chunk, if sent).
+        """
+        prompt, completion, total, cached = cls._read_usage(usage)
+        accumulator = _current_accumulator.get()
+        record = LLMCallRecord(
+            timestamp=time.time(),
+            workflow=accumulator.label if accumulator else "session",
+            node=_current_node.get(),
+            call_site=call_site,
+            model=model,
+            prompt_tokens=prompt,
+            completion_tokens=completion,
+            total_tokens=total or prompt + completion,
+            cached_tokens=cached,
+            latency_s=round(latency_s, 4),
+            cache_hit=cached > 0,
+            stream=stream,
+        )
+        cls._session.add(record)
+        if accumulator is not None:
+            accumulator.add(record)
+        return record
+
+    @staticmethod
+    def _read_usage(usage: Any) -> tuple[int, int, int, int]:
+        if usage is None:
+            return 0, 0, 0, 0
+
+        def read(source: Any, *names: str) -> int:
+            for name in names:
+                value = source.get(name) if isinstance(source, dict) else getattr(source, name, None)
+                if value:
+                    return int(value)
+            return 0
+
+        prompt = read(usage, "prompt_tokens", "input_tokens")
+        completion = read(usage, "completion_tokens", "output_tokens")
+        total = read(usage, "total_tokens")
+        details = (
+            usage.get("prompt_tokens_details") or usage.get("input_token_details")
+            if isinstance(usage, dict)
+            else getattr(usage, "prompt_tokens_details", None)
+        )
+        cached = read(details, "cached_tokens", "cache_read") if details else 0
+        return prompt, completion, total, cached
+
+    @classmethod
+    def session_summary(cls) -> dict[str, Any]:
+        return cls._session.summary()
+
+    @classmethod
+    def reset_session(cls) -> None:
+        cls._session = UsageAccumulator(label="session")
+
+    @classmethod
+    def log_summary(cls, accumulator: Optional[UsageAccumulator]) -> Optional[dict[str, Any]]:
+        """Send a workflow summary to the debug log and return it."""
+        if accumulator is None or not accumulator.records:
+            return None
+        from src.ui.diagnostics.debug_helpers import debug_info
+
+        summary = accumulator.summary()
+        debug_info(
+            heading="LLM_USAGE • WORKFLOW_SUMMARY",
+            body=f"{summary['calls']} LLM calls, {summary['total_tokens']} tokens, {summary['latency_s']}s in {summary['label']}",
+            metadata=summary,
+        )
+        return summary
+
+    @classmethod
+    def export_jsonl(cls, accumulator: Optional[UsageAccumulator], path: Optional[Path] = None) -> Optional[Path]:
+        """Append the accumulator's call records to the usage JSON-lines file."""
+        if accumulator is None or not accumulator.records:
+            return None
+        path = Path(path or settings.LLM_USAGE_LOG_PATH)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a", encoding="utf-8") as file:
+            for record in accumulator.snapshot():
+                file.write(json.dumps(asdict(record)) + "\n")
+        return path
@@ -0,0 +1,301 @@
+"""
+Model cascade for routing-style LLM call sites.
+
+Most decisions made by the routing nodes (message classification, goal validation,
+complexity analysis and tool recommendation) are easy, yet they all run on the large
+planning model. The cascade answers them with a small fast model first, asks it for a
+structured confidence score, and escalates to the call site's normal large-model path
+only when the confidence is below the profile's threshold (or the answer is unusable).
+
+Profiles live in ``settings.MODEL_PROFILES`` keyed by call-site label. The cascade is off
+unless ``settings.MODEL_CASCADE_ENABLED`` is set: an escalated call makes two requests
+(small, then large) against the shared per-minute rate limit.
+
+Usage:
+    result = ModelCascade.run(
+        "goal_validator",
+        system_prompt,
+        human_prompt,
+        escalate=lambda: ModelManager.convert_to_json(ModelManager().invoke([...]).content),
+        validator=lambda r: isinstance(r, dict) and "goal_achieved" in r,
+    )
+
+    ModelCascade.report()  # per call-site escalation rate and latency savings
+"""
+
+from __future__ import annotations
+
+import collections
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, ClassVar, Optional
+
+from src.config import settings
+from src.ui.diagnostics.debug_helpers import debug_info, debug_warning
+
+# accepted small-model latencies kept per call site for the latency-saved estimate
+LATENCY_SAMPLES = 1000
+
+CONFIDENCE_ENVELOPE_INSTRUCTION = """
+
+**CONFIDENCE REPORTING (MANDATORY):**
+Wrap your answer in this JSON envelope and return nothing else:
+{"answer": <the exact JSON you were asked to return>, "confidence": <number between 0.0 and 1.0>}
+Use a low confidence when the request is ambiguous, needs information you do not have, or you are guessing."""
+
+
+@dataclass
+class ModelProfile:
+    """Cascade configuration for a single call site."""
+
+    call_site: str
+    backend: str = "openai"  # "openai" (API endpoint) or "ollama" (local)
+    small_model: str = settings.CASCADE_SMALL_MODEL
+    threshold: float = settings.CASCADE_CONFIDENCE_THRESHOLD
+    enabled: bool = True
+
+    @classmethod
+    def for_call_site(cls, call_site: str) -> "ModelProfile":
+        profile = settings.MODEL_PROFILES.get(call_site)
+        if profile is None:
+            return cls(call_site=call_site, enabled=False)
+        return cls(
+            call_site=call_site,
+            backend=profile.get("backend", "openai"),
+            small_model=profile.get("small_model", settings.CASCADE_SMALL_MODEL),
+            threshold=float(profile.get("threshold", settings.CASCADE_CONFIDENCE_THRESHOLD)),
+            enabled=settings.MODEL_CASCADE_ENABLED and profile.get("enabled", True),
+        )
+
+
+@dataclass
+class CascadeStats:
+    """Running counters for one call site."""
+
+    calls: int = 0
+    small_accepted: int = 0
+    escalations: int = 0
+    small_latency_total: float = 0.0
+    large_latency_total: float = 0.0
+    large_calls: int = 0
+    accepted_small_latencies: collections.deque[float] = field(
+        default_factory=lambda: collections.deque(maxlen=LATENCY_SAMPLES)
+    )
+
+    @property
+    def escalation_rate(self) -> float:
+        return self.escalations / self.calls if self.calls else 0.0
+
+    @property
+    def avg_large_latency(self) -> float:
+        return self.large_latency_total / self.large_calls if self.large_calls else 0.0
+
+    @property
+    def estimated_latency_saved(self) -> float:
+        """
+        Large-model latency avoided by accepted small answers (based on observed large latency),
+        extrapolated from the most recent LATENCY_SAMPLES accepted answers.
+        """
+        if not self.large_calls or not self.accepted_small_latencies:
+            return 0.0
+        samples = self.accepted_small_latencies
+        saved_per_answer = sum(max(0.0, self.avg_large_latency - s) for s in samples) / len(samples)
+        return saved_per_answer * self.small_accepted
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "small_accepted": self.small_accepted,
+            "escalations": self.escalations,
+            "escalation_rate": round(self.escalation_rate, 3),
+            "avg_small_latency_s": round(self.small_latency_total / self.calls, 3) if self.calls else 0.0,
+            "avg_large_latency_s": round(self.avg_large_latency, 3),
+            "estimated_latency_saved_s": round(self.estimated_latency_saved, 3),
+        }
+
+
+class ModelCascade:
+    """Per call-site escalation statistics and cached Ollama clients for small-model-first calls."""
+
+    _stats: ClassVar[dict[str, CascadeStats]] = {}
+    _lock: ClassVar[threading.Lock] = threading.Lock()
+    _ollama_clients: ClassVar[dict[str, Any]] = {}
+
+    @classmethod
+    def run(
+        cls,
+        call_site: str,
+        system_prompt: str,
+        user_prompt: str,
+        escalate: Callable[[], Any],
+        validator: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """
+        Answer a call site with the small model, escalating when needed.
+
+        Args:
+            call_site: Profile key in settings.MODEL_PROFILES (also the stats label).
+            system_prompt: System prompt of the call site (unchanged).
+            user_prompt: User prompt of the call site (unchanged).
+            escalate: Zero-arg callable running the call site's existing large-model path;
+                must return the parsed JSON result.
+            validator: Optional check that the small model's answer has the shape the caller needs.
+
+        Returns:
+            The parsed JSON answer (dict or list) from whichever tier answered.
+        """
+        profile = ModelProfile.for_call_site(call_site)
+        stats = cls._get_stats(call_site)
+
+        if not profile.enabled:
+            return cls._run_large(stats, escalate, count_call=True)
+
+        small_start = time.perf_counter()
+        answer, confidence, reason = cls._ask_small_model(profile, system_prompt, user_prompt)
+        small_latency = time.perf_counter() - small_start
+
+        accepted = reason is None and confidence >= profile.threshold
+        if accepted and validator is not None:
+            try:
+                accepted = bool(validator(answer))
+            except Exception:
+                accepted = False
+            if not accepted:
+                reason = "answer failed call-site validation"
+        elif reason is None and not accepted:
+            reason = f"confidence {confidence:.2f} below threshold {profile.threshold:.2f}"
+
+        with cls._lock:
+            stats.calls += 1
+            stats.small_latency_total += small_latency
+            if accepted:
+                stats.small_accepted += 1
+                stats.accepted_small_latencies.append(small_latency)
+            else:
+                stats.escalations += 1
+
+        if accepted:
+            debug_info(
+                heading="MODEL_CASCADE • SMALL_ACCEPTED",
+                body=f"{call_site} answered by {profile.small_model}",
+                metadata={
+                    "call_site": call_site,
+                    "confidence": confidence,
+                    "threshold": profile.threshold,
+                    "latency_s": round(small_latency, 3),
+                },
+            )
+            return answer
+
+        debug_info(
+            heading="MODEL_CASCADE • ESCALATED",
+            body=f"{call_site} escalated to large model: {reason}",
+            metadata={
+                "call_site": call_site,
+                "small_model": profile.small_model,
+                "confidence": confidence,
+                "threshold": profile.threshold,
+                "small_latency_s": round(small_latency, 3),
+            },
+        )
+        return cls._run_large(stats, escalate, count_call=False)
+
+    @classmethod
+    def _run_large(cls, stats: CascadeStats, escalate: Callable[[], Any], count_call: bool) -> Any:
+        large_start = time.perf_counter()
+        try:
+            return escalate()
+        finally:
+            with cls._lock:
+                if count_call:
+                    stats.calls += 1
+                stats.large_calls += 1
+                stats.large_latency_total += time.perf_counter() - large_start
+
+    @classmethod
+    def _ask_small_model(
+        cls, profile: ModelProfile, system_prompt: str, user_prompt: str
+    ) -> tuple[Any, float, Optional[str]]:
+        """
+        Query the small model and unwrap the confidence envelope.
+
+        Returns:
+            (answer, confidence, failure_reason) - failure_reason is None when the envelope was usable.
+        """
+        from src.utils.model_manager import ModelManager
+
+        messages = [
+            {"role": "system", "content": system_prompt + CONFIDENCE_ENVELOPE_INSTRUCTION},
+            {"role": "user", "content": user_prompt},
+        ]
+        try:
+            if profile.backend == "ollama":
+                raw = cls._get_ollama_client(profile.small_model).invoke(
+                    [(m["role"], m["content"]) for m in messages]
+                ).content
+            else:
+                # pooled API client for the small model (shares the OpenAIIntegration HTTP pool)
+                small_client = ModelManager(
+                    model=profile.small_model,
+                    backend="openai",
+                    temperature=0,
+                    max_tokens=settings.CASCADE_SMALL_MAX_TOKENS,
+                )
+                raw = small_client.invoke(
+                    [settings.HumanMessage(content=m["content"]) for m in messages]
+                ).content
+        except Exception as small_error:
+            debug_warning(
+                heading="MODEL_CASCADE • SMALL_MODEL_ERROR",
+                body=f"Small model call failed for {profile.call_site}: {small_error}",
+                metadata={"call_site": profile.call_site, "error_type": type(small_error).__name__},
+            )
+            return None, 0.0, f"small model error: {type(small_error).__name__}"
+
+        envelope = ModelManager.convert_to_json(raw)
+        if not isinstance(envelope, dict) or "answer" not in envelope:
+            return None, 0.0, "missing confidence envelope"
+        try:
+            confidence = float(envelope.get("confidence", 0.0))
+        except (TypeError, ValueError):
+            return envelope.get("answer"), 0.0, "non-numeric confidence"
+        if confidence > 1.0:  # tolerate percentages
+            confidence = confidence / 100.0
+        return envelope["answer"], confidence, None
+
+    @classmethod
+    def _get_ollama_client(cls, model: str):
+        if model not in cls._ollama_clients:
+            from langchain_ollama import ChatOllama
+
+            cls._ollama_clients[model] = ChatOllama(model=model, format="json", temperature=0)
+        return cls._ollama_clients[model]
+
+    @classmethod
+    def _get_stats(cls, call_site: str) -> CascadeStats:
+        with cls._lock:
+            return cls._stats.setdefault(call_site, CascadeStats())
+
+    @classmethod
+    def report(cls) -> dict[str, dict[str, Any]]:
+        """Per call-site escalation rate and latency savings."""
+        with cls._lock:
+            return {site: stats.as_dict() for site, stats in cls._stats.items()}
+
+    @classmethod
+    def log_report(cls) -> dict[str, dict[str, Any]]:
+        """Send the current report to the debug log and return it."""
+        report = cls.report()
+        if report:
+            debug_info(
+                heading="MODEL_CASCADE • REPORT",
+                body="Cascade escalation rates and latency savings per call site",
+                metadata=report,
+            )
+        return report
+
+    @classmethod
+    def reset_stats(cls) -> None:
+        with cls._lock:
+            cls._stats.clear()
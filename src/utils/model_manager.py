@@ -1,6 +1,7 @@
 import json
 import os
 import subprocess
+import threading
 import time
 from typing import ClassVar, Optional, Any, Iterator, Union
 
@@ -8,9 +9,14 @@ from langchain_core.language_models import LanguageModelInput
 from langchain_core.messages import BaseMessageChunk, BaseMessage, AIMessageChunk
 from langchain_core.runnables import RunnableConfig
 from langchain_ollama import ChatOllama
+from pydantic import PrivateAttr
 
 from src.config import settings
+from src.utils.cassette import LLM, Cassette
+from src.utils.json_extractor import SchemaHint, extract_json
+from src.utils.llm_usage import LLMUsage
 from src.utils.open_ai_integration import OpenAIIntegration
+from src.utils.structured_output import StructuredOutput
 from src.ui.diagnostics.debug_helpers import debug_info, debug_warning, debug_error
 
 # 🎨 Rich Traceback Integration (updated path after refactor)
@@ -33,13 +39,19 @@ except ImportError:  # Fallback (older path compatibility)
 
 class ModelManager(ChatOllama):
     """
-    Singleton class for managing Ollama model loading and switching.
+    Registry of model clients for Ollama and OpenAI-compatible models.
 
     Inherits from ChatOllama and provides methods to load, stop, and invoke models.
-    Ensures only one model is active at a time and manages the current model state.
+    Every distinct (backend, model, generation params) configuration gets its own pooled
+    client, so ``ModelManager(model=..., temperature=0.3, max_tokens=1000)`` is honoured
+    instead of silently returning the first instance. All API clients share the single
+    OpenAIIntegration (and therefore one HTTP connection pool); Ollama still keeps only
+    one model loaded at a time.
     """
 
-    instance: ClassVar[Optional["ModelManager"]] = None
+    instance: ClassVar[Optional["ModelManager"]] = None  # first client created (backward compatibility)
+    _registry: ClassVar[dict[tuple, "ModelManager"]] = {}
+    _registry_lock: ClassVar[threading.Lock] = threading.Lock()
     current_model: ClassVar[Optional[str]] = None
     _openai_integration: ClassVar[Optional[OpenAIIntegration]] = None
     _is_openai_mode: ClassVar[bool] = False
@@ -51,13 +63,47 @@ class ModelManager(ChatOllama):
     ]
     api_model_list: ClassVar[list[str]] = [settings.GPT_MODEL, settings.KIMI_MODEL]
 
+    # per-client configuration (set once in __init__)
+    _initialized: bool = PrivateAttr(default=False)
+    _backend: str = PrivateAttr(default="ollama")
+    _api_model: Optional[str] = PrivateAttr(default=None)
+    _generation_params: dict[str, Any] = PrivateAttr(default_factory=dict)
+
+    @classmethod
+    def registry_key(cls, **kwargs: Any) -> tuple:
+        """
+        Build the registry key for a client configuration.
+
+        Backend is "openai" for models in api_model_list (or when ``backend="openai"`` is passed,
+        e.g. for the cascade's small API model) and "ollama" otherwise.
+        """
+        model = kwargs.get("model") or settings.API_DEFAULT_API_MODEL
+        backend = kwargs.get("backend") or (
+            "openai" if model in cls.api_model_list else "ollama"
+        )
+        max_tokens = kwargs.get("max_tokens", kwargs.get("num_predict"))
+        return (
+            backend,
+            model,
+            kwargs.get("temperature"),
+            max_tokens,
+            kwargs.get("top_p"),
+            kwargs.get("format"),
+        )
+
     def __new__(cls, *args: Any, **kwargs: Any) -> "ModelManager":
         """
-        Ensures only one instance of ModelManager exists (Singleton pattern).
+        Returns the pooled client for this configuration, creating it on first use.
         """
-        if cls.instance is None:
-            cls.instance = super(ModelManager, cls).__new__(cls)
-        return cls.instance
+        key = cls.registry_key(**kwargs)
+        with cls._registry_lock:
+            client = cls._registry.get(key)
+            if client is None:
+                client = super(ModelManager, cls).__new__(cls)
+                cls._registry[key] = client
+                if cls.instance is None:
+                    cls.instance = client
+        return client
 
     @rich_exception_handler("ModelManager Initialization")
     def __init__(self, *args, **kwargs):
@@ -70,27 +116,40 @@ class ModelManager(ChatOllama):
         """
         try:
             if getattr(self, "_initialized", False):
-                # If instance already exists, skip re-initialization
+                # Pooled client for this configuration already exists, skip re-initialization
                 return
 
-            self._initialized = True
-
             # Check if this should use OpenAI integration
             if len(kwargs) == 0 or "model" not in kwargs:
                 kwargs["model"] = settings.API_DEFAULT_API_MODEL
-            if kwargs.get("model") in ModelManager.api_model_list:
+            backend = ModelManager.registry_key(**kwargs)[0]
+            kwargs.pop("backend", None)
+            if backend == "openai":
                 try:
-                    # For OpenAI models, create integration and mark as OpenAI mode
-                    ModelManager._openai_integration = OpenAIIntegration(
-                        api_key=kwargs.get("api_key", settings.OPEN_AI_API_KEY),
-                        model=kwargs.get("model", settings.API_DEFAULT_API_MODEL),
-                    )
+                    # All API clients share one OpenAIIntegration (one HTTP connection pool)
+                    if ModelManager._openai_integration is None:
+                        ModelManager._openai_integration = OpenAIIntegration(
+                            api_key=kwargs.get("api_key", settings.OPEN_AI_API_KEY),
+                            model=kwargs.get("model", settings.API_DEFAULT_API_MODEL),
+                        )
                     ModelManager._is_openai_mode = True
                     # Still initialize ChatOllama with a default model to avoid issues
                     super().__init__(
                         model=settings.DEFAULT_MODEL,
-                        **{k: v for k, v in kwargs.items() if k != "model"},
+                        **{
+                            k: v
+                            for k, v in kwargs.items()
+                            if k not in ("model", "api_key", "max_tokens")
+                        },
                     )
+                    self._backend = "openai"
+                    self._api_model = kwargs["model"]
+                    self._generation_params = {
+                        k: kwargs[k]
+                        for k in ("temperature", "max_tokens", "top_p")
+                        if kwargs.get(k) is not None
+                    }
+                    self._initialized = True
                 except Exception as openai_error:
                     RichTracebackManager.handle_exception(
                         openai_error,
@@ -105,11 +164,13 @@ class ModelManager(ChatOllama):
                     raise
             else:
                 try:
-                    # Initialize as regular ChatOllama instance
-                    ModelManager._openai_integration = None
-                    ModelManager._is_openai_mode = False
+                    # Initialize as regular ChatOllama instance (max_tokens maps to num_predict)
+                    if "max_tokens" in kwargs:
+                        kwargs.setdefault("num_predict", kwargs.pop("max_tokens"))
                     super().__init__(*args, **kwargs)
+                    self._backend = "ollama"
                     ModelManager.load_model(kwargs.get("model", settings.DEFAULT_MODEL))
+                    self._initialized = True
                 except Exception as ollama_error:
                     RichTracebackManager.handle_exception(
                         ollama_error,
@@ -139,6 +200,28 @@ class ModelManager(ChatOllama):
         """Property to access the OpenAI integration."""
         return ModelManager._openai_integration
 
+    @property
+    def uses_openai(self) -> bool:
+        """True when this client is served by the OpenAI-compatible API."""
+        return self._backend == "openai" and ModelManager._openai_integration is not None
+
+    @classmethod
+    def registered_clients(cls) -> list[tuple]:
+        """Registry keys of every pooled client created so far."""
+        with cls._registry_lock:
+            return list(cls._registry.keys())
+
+    @classmethod
+    def prewarm(cls) -> None:
+        """
+        Create the default API client and pre-warm its endpoint connection in the background.
+        Call before slow startup work (banner, tool tables); no-op when the default model runs on Ollama.
+        """
+        if cls.registry_key(model=settings.API_DEFAULT_API_MODEL)[0] != "openai":
+            return
+        cls()
+        OpenAIIntegration.prewarm_connection()
+
     @classmethod
     @rich_exception_handler("Model Cleanup")
     def cleanup_all_models(cls):
@@ -157,6 +240,9 @@ class ModelManager(ChatOllama):
                 OpenAIIntegration.cleanup()
                 cls._openai_integration = None
                 cls._is_openai_mode = False
+                with cls._registry_lock:
+                    cls._registry.clear()
+                    cls.instance = None
                 debug_info(
                     "MODEL_MANAGER • CLEANUP_SUCCESS",
                     "OpenAI integration cleanup completed",
@@ -274,6 +360,23 @@ class ModelManager(ChatOllama):
             )
             os.system(f"ollama stop {cls.current_model}")
 
+    @staticmethod
+    def _to_openai_messages(input: LanguageModelInput) -> list[dict[str, str]]:
+        """
+        Convert invoke input to chat messages: first element is the system message, the rest are user messages.
+        """
+        if not isinstance(input, list):
+            return [{"role": "user", "content": getattr(input, "content", str(input))}]
+
+        def content_of(msg: Any) -> str:
+            if isinstance(msg, dict):
+                return str(msg.get("content", msg))
+            return msg.content if hasattr(msg, "content") else str(msg)
+
+        return [{"role": "system", "content": content_of(input[0])}] + [
+            {"role": "user", "content": content_of(msg)} for msg in input[1:]
+        ]
+
     def invoke(
         self,
         input: LanguageModelInput,
@@ -289,39 +392,129 @@ class ModelManager(ChatOllama):
             input (LanguageModelInput): The input message(s) for the model.
             config (Optional[RunnableConfig]): Optional configuration for the run.
             stop (Optional[list[str]]): Optional stop sequences.
-            **kwargs: Additional keyword arguments.
+            **kwargs: Additional keyword arguments. ``response_format`` (pydantic model or JSON schema)
+                switches to structured output; the message content is then the validated JSON
+                (empty when no valid answer could be produced). ``call_site`` labels the call
+                for usage accounting and structured-output statistics.
 
         Returns:
             BaseMessage: The response from the model.
         """
-        if (
-            ModelManager._is_openai_mode
-            and ModelManager._openai_integration is not None
-        ):
-            # If using OpenAIIntegration, delegate to it
+        response_format = kwargs.pop("response_format", None)
+        call_site = kwargs.pop("call_site", "default")
+        if Cassette.active():
+            # record/replay the response (content only) for deterministic re-runs
+            return Cassette.through(
+                LLM,
+                call_site,
+                self._cassette_request(input, response_format),
+                lambda: self._invoke_live(input, config, stop, response_format, call_site, **kwargs),
+                encode=lambda message: message.content,
+                decode=lambda content: settings.AIMessage(content=content),
+            )
+        return self._invoke_live(input, config, stop, response_format, call_site, **kwargs)
+
+    def _invoke_live(
+        self,
+        input: LanguageModelInput,
+        config: Optional[RunnableConfig],
+        stop: Optional[list[str]],
+        response_format: Any,
+        call_site: str,
+        **kwargs: Any,
+    ) -> BaseMessage | Any:
+        if self.uses_openai:
+            # If using OpenAIIntegration, delegate to it with this client's model and generation params
             # if input is a list, treat the first element as system message then the rest as user messages
-            if isinstance(input, list) and len(input) > 0:
-                system_message = (
-                    input[0].content if hasattr(input[0], "content") else str(input[0])
-                )
-                user_messages = [
-                    msg.content if hasattr(msg, "content") else str(msg)
-                    for msg in input[1:]
-                ]
-                messages = [{"role": "system", "content": system_message}] + [
-                    {"role": "user", "content": msg} for msg in user_messages
-                ]
-                open_ai_response = ModelManager._openai_integration.generate_text(
-                    messages=messages
-                )
-            else:
-                # If input is not a list, treat it as a single user message
-                open_ai_response = ModelManager._openai_integration.generate_text(
-                    prompt=getattr(input, "content", str(input))
-                )
-            return settings.AIMessage(content=str(open_ai_response))
+            open_ai_response = ModelManager._openai_integration.generate_text(
+                messages=self._to_openai_messages(input),
+                model=self._api_model,
+                response_format=response_format,
+                call_site=call_site,
+                **self._generation_params,
+            )
+            return settings.AIMessage(content=self._structured_content(open_ai_response, response_format))
         else:
-            return super().invoke(input=input, config=config, stop=stop, **kwargs)
+            if response_format is not None:
+                # Ollama constrains generation with the schema passed as format
+                kwargs["format"] = StructuredOutput.json_schema(response_format)
+            call_started = time.perf_counter()
+            response = super().invoke(input=input, config=config, stop=stop, **kwargs)
+            LLMUsage.record(
+                model=self.model,
+                latency_s=time.perf_counter() - call_started,
+                usage=getattr(response, "usage_metadata", None),
+                call_site=call_site,
+            )
+            return response
+
+    async def ainvoke(
+        self,
+        input: LanguageModelInput,
+        config: Optional[RunnableConfig] = None,
+        *,
+        stop: Optional[list[str]] = None,
+        **kwargs: Any,
+    ) -> BaseMessage | Any:
+        """
+        Async invoke; same arguments and structured-output options as invoke.
+        """
+        response_format = kwargs.pop("response_format", None)
+        call_site = kwargs.pop("call_site", "default")
+        if Cassette.active():
+            return await Cassette.through_async(
+                LLM,
+                call_site,
+                self._cassette_request(input, response_format),
+                lambda: self._ainvoke_live(input, config, stop, response_format, call_site, **kwargs),
+                encode=lambda message: message.content,
+                decode=lambda content: settings.AIMessage(content=content),
+            )
+        return await self._ainvoke_live(input, config, stop, response_format, call_site, **kwargs)
+
+    async def _ainvoke_live(
+        self,
+        input: LanguageModelInput,
+        config: Optional[RunnableConfig],
+        stop: Optional[list[str]],
+        response_format: Any,
+        call_site: str,
+        **kwargs: Any,
+    ) -> BaseMessage | Any:
+        if self.uses_openai:
+            open_ai_response = await ModelManager._openai_integration.generate_text_async(
+                messages=self._to_openai_messages(input),
+                model=self._api_model,
+                response_format=response_format,
+                call_site=call_site,
+                **self._generation_params,
+            )
+            return settings.AIMessage(content=self._structured_content(open_ai_response, response_format))
+        if response_format is not None:
+            kwargs["format"] = StructuredOutput.json_schema(response_format)
+        call_started = time.perf_counter()
+        response = await super().ainvoke(input=input, config=config, stop=stop, **kwargs)
+        LLMUsage.record(
+            model=self.model,
+            latency_s=time.perf_counter() - call_started,
+            usage=getattr(response, "usage_metadata", None),
+            call_site=call_site,
+        )
+        return response
+
+    def _cassette_request(self, input: LanguageModelInput, response_format: Any) -> dict[str, Any]:
+        """Request payload identifying an invoke call in a cassette."""
+        return {
+            "model": self._api_model if self.uses_openai else self.model,
+            "messages": self._to_openai_messages(input),
+            "response_format": getattr(response_format, "__name__", response_format),
+        }
+
+    @staticmethod
+    def _structured_content(response: Any, response_format: Any) -> str:
+        if response_format is None:
+            return str(response)
+        return "" if response is None else json.dumps(response)
 
     def stream(
         self,
@@ -343,16 +536,18 @@ class ModelManager(ChatOllama):
         Returns:
             Iterator[BaseMessageChunk]: An iterator yielding message chunks.
         """
-        if (
-            ModelManager._is_openai_mode
-            and ModelManager._openai_integration is not None
-        ):
+        if self.uses_openai:
             # If using OpenAIIntegration, delegate to it
+            if isinstance(input, list) and (len(input) > 1 or isinstance(input[0], dict)):
+                # system + user messages, as in invoke()
+                request = {"messages": self._to_openai_messages(input)}
+            else:
+                request = {"prompt": input[0].content if isinstance(input, list) else input.content}
             open_ai_response = ModelManager._openai_integration.generate_text(
-                prompt=getattr(input[0], "content")
-                if isinstance(input, list) and not isinstance(input[0], dict)
-                else input.content,
+                **request,
                 stream=True,
+                model=self._api_model,
+                **self._generation_params,
             )
             return self._normalize_streaming_response(open_ai_response)
         return super().stream(input=input, config=config, stop=stop, **kwargs)
@@ -385,13 +580,18 @@ class ModelManager(ChatOllama):
 
     @classmethod
     def convert_to_json(
-        cls, response: Union[str, dict, list, BaseMessage]
+        cls,
+        response: Union[str, dict, list, BaseMessage],
+        schema_hint: SchemaHint = None,
+        repair: bool = True,
     ) -> Union[dict, list]:
         """
-        🔧 ENHANCED v4.0: JSON extraction with COMPLETELY ISOLATED system_logging (no recursion possible)
+        🔧 ENHANCED v5.0: single-pass JSON extraction (see src/utils/json_extractor.py)
 
         Args:
             response: Response to convert (can be string, dict, list, or BaseMessage)
+            schema_hint: Optional type, required keys or pydantic model used to pick the right candidate
+            repair: Fix trailing commas, single quotes and truncated tails instead of failing
 
         Returns:
             dict or list: The extracted JSON object or fallback structure
@@ -426,99 +626,18 @@ class ModelManager(ChatOllama):
             )
             return {"content": "empty_response"}
 
-        # Try 1: Direct JSON parsing (highest priority)
-        try:
-            parsed = json.loads(content)
-            debug_info(
-                "MODEL_MANAGER • JSON_CONVERSION_DIRECT",
-                "Direct JSON parsing successful",
-                {
-                    "response_type": type(parsed).__name__,
-                    "conversion_method": "direct_parsing",
-                },
-            )
-            return parsed
-        except (json.JSONDecodeError, TypeError):
-            pass
-
-        # Try 2: Extract from markdown code blocks
-        import re
-
-        markdown_pattern = r"```(?:json)?\s*(\{.*?\}|\[.*?\])\s*```"
-        markdown_match = re.search(markdown_pattern, content, re.DOTALL)
-        if markdown_match:
-            try:
-                parsed = json.loads(markdown_match.group(1))
-                debug_info(
-                    "MODEL_MANAGER • JSON_CONVERSION_MARKDOWN",
-                    "JSON extracted from markdown code block",
-                    {
-                        "response_type": type(parsed).__name__,
-                        "conversion_method": "markdown_extraction",
-                    },
-                )
-                return parsed
-            except json.JSONDecodeError:
-                pass
-
-        # Try 3: Find JSON objects with proper brace matching (prioritize objects for agent_mode)
-        json_objects = []
-
-        # Look for JSON objects first (priority for agent mode compliance)
-        brace_count = 0
-        start_pos = -1
-        for i, char in enumerate(content):
-            if char == "{":
-                if brace_count == 0:
-                    start_pos = i
-                brace_count += 1
-            elif char == "}":
-                brace_count -= 1
-                if brace_count == 0 and start_pos != -1:
-                    try:
-                        json_str = content[start_pos : i + 1]
-                        parsed = json.loads(json_str)
-                        json_objects.append(("object", parsed))
-                    except json.JSONDecodeError:
-                        pass
-                    start_pos = -1
-
-        # Then look for JSON arrays
-        bracket_count = 0
-        start_pos = -1
-        for i, char in enumerate(content):
-            if char == "[":
-                if bracket_count == 0:
-                    start_pos = i
-                bracket_count += 1
-            elif char == "]":
-                bracket_count -= 1
-                if bracket_count == 0 and start_pos != -1:
-                    try:
-                        json_str = content[start_pos : i + 1]
-                        parsed = json.loads(json_str)
-                        json_objects.append(("array", parsed))
-                    except json.JSONDecodeError:
-                        pass
-                    start_pos = -1
-
-        # Return first valid JSON object found (prefer objects over arrays for agent compliance)
-        if json_objects:
-            # Sort to prioritize objects over arrays
-            json_objects.sort(key=lambda x: 0 if x[0] == "object" else 1)
-            json_type, parsed_json = json_objects[0]
-
+        extracted = extract_json(content, schema_hint=schema_hint, repair=repair)
+        if extracted is not None:
             debug_info(
                 "MODEL_MANAGER • JSON_CONVERSION_EXTRACTED",
-                f"JSON {json_type} extracted via pattern matching",
+                f"JSON extracted via {extracted.method}",
                 {
-                    "response_type": type(parsed_json).__name__,
-                    "conversion_method": f"pattern_matching_{json_type}",
-                    "objects_found": len([x for x in json_objects if x[0] == "object"]),
-                    "arrays_found": len([x for x in json_objects if x[0] == "array"]),
+                    "response_type": type(extracted.value).__name__,
+                    "conversion_method": extracted.method,
+                    "content_length": len(content),
                 },
             )
-            return parsed_json
+            return extracted.value
 
         # Fallback: wrap content with enhanced error information
         debug_warning(
@@ -1,14 +1,17 @@
 ﻿import asyncio
-import gc
 import json
 import threading
 import time
 from typing import Any, Optional, Iterator, Union, overload, List, Dict
 
 import winsound
-from openai import OpenAI, AsyncOpenAI
+from openai import OpenAI, AsyncOpenAI, BadRequestError, UnprocessableEntityError
 
-from src.config.settings import OPEN_AI_API_KEY, OPENAI_TIMEOUT
+from src.config.settings import OPEN_AI_API_KEY, OPENAI_BASE_URL, OPENAI_TIMEOUT
+from src.utils.endpoint_guard import OVERLOAD, SUCCESS, CircuitBreaker, EndpointGuard
+from src.utils.http_pool import LLMHttpPool
+from src.utils.llm_scheduler import LLMScheduler
+from src.utils.llm_usage import LLMUsage
 from src.utils.listeners.rich_status_listen import RichStatusListener
 
 
@@ -22,21 +25,33 @@ class OpenAIIntegration:
     IMPORTANT: The number of requests must be less than 30 per minute to comply with rate limits.
     """
 
+    class UnsupportedRequestOptionError(RuntimeError):
+        """Raised when the endpoint rejects optional request parameters (e.g. a structured-output mode)."""
+
+        def __init__(self, message: str = ""):
+            full_message = f"Unsupported request option: {message}" if message else "Unsupported request option"
+            super().__init__(full_message)
+            self.message = message
+
     instance: Optional["OpenAIIntegration"] = None
+    # fallback kinds generate_text returns instead of raising (see is_fallback_response)
+    _GENERATE_FALLBACK_KINDS = (
+        "circuit_breaker", "rate_limit", "timeout", "502", "unexpected", "api_error", "max_attempts", "unknown"
+    )
     _async_lock: Optional[AsyncOpenAI] = None
     requests_count: int = 0
     _last_request_time: Optional[float] = None
 
-    # 🔧 FIX: Add error handling attributes for circuit breaker pattern
-    _failure_count: int = 0
-    _circuit_open: bool = False
-    _circuit_open_until: Optional[float] = None
-    _max_failures: int = 5  # Changed from 3 to 5 to match test expectations
-    _circuit_timeout: int = 10  # seconds
+    # circuit breaking and adaptive concurrency are per endpoint/model (see EndpointGuard)
 
     _thread_lock = threading.Lock()
     _client_lock = asyncio.Lock()
 
+    # generation defaults used when a caller does not pass its own parameters
+    DEFAULT_TEMPERATURE: float = 0.7
+    DEFAULT_TOP_P: float = 1
+    DEFAULT_MAX_TOKENS: int = 4096
+
     def __new__(cls, *args: Any, **kwargs: Any) -> "OpenAIIntegration":
         """
         Ensures only one instance of OpenAIIntegration exists (Singleton pattern).
@@ -62,7 +77,7 @@ class OpenAIIntegration:
         self._initialized = True
         key = api_key or OPEN_AI_API_KEY
         self.model = model or "openai/gpt-oss-120b"
-        self.base_url = "https://integrate.api.nvidia.com/v1"
+        self.base_url = OPENAI_BASE_URL
 
         if not key:
             raise ValueError(
@@ -71,9 +86,25 @@ class OpenAIIntegration:
 
         self.api_key = key
         self.client = OpenAI(
-            base_url=self.base_url, api_key=key, timeout=OPENAI_TIMEOUT, max_retries=2
+            base_url=self.base_url,
+            api_key=key,
+            timeout=LLMHttpPool.timeout(),  # keeps the pool's separate connect timeout
+            max_retries=2,
+            http_client=LLMHttpPool.sync_client(),
         )
 
+    @classmethod
+    def prewarm_connection(cls) -> None:
+        """
+        Open the first connection to the endpoint in the background (e.g. while the banner prints),
+        so the first LLM call does not pay DNS/TCP/TLS setup. No-op when the integration is not in use.
+        """
+        from src.config import settings
+
+        if cls.instance is None or not settings.OPENAI_PREWARM:
+            return
+        LLMHttpPool.prewarm(cls.instance.base_url, cls.instance.api_key)
+
     async def _get_async_client(self) -> AsyncOpenAI:
         """
         Get or create async client with proper lifecycle management.
@@ -86,8 +117,9 @@ class OpenAIIntegration:
                 self._async_lock = AsyncOpenAI(
                     base_url=self.base_url,
                     api_key=self.api_key,
-                    timeout=OPENAI_TIMEOUT,
+                    timeout=LLMHttpPool.timeout(),
                     max_retries=2,
+                    http_client=LLMHttpPool.async_client(),
                 )
         return self._async_lock
 
@@ -125,7 +157,15 @@ class OpenAIIntegration:
             prompt: Optional[str] = None,
             messages: Optional[list[dict[str, str]]] = None,
             stream: bool = False,
-    ) -> Union[str, Iterator[str]]:
+            model: Optional[str] = None,
+            temperature: Optional[float] = None,
+            top_p: Optional[float] = None,
+            max_tokens: Optional[int] = None,
+            response_format: Optional[Union[type, dict]] = None,
+            call_site: str = "default",
+            request_options: Optional[Dict[str, Any]] = None,
+            deadline: Optional[float] = None,
+    ) -> Union[str, Iterator[str], dict, list, None]:
         """
         Generate text from the OpenAI API.
 
@@ -133,30 +173,59 @@ class OpenAIIntegration:
             prompt (str): The prompt to send to the model.
             stream (bool): Whether to stream the response. Defaults to False.
             messages (list[dict[str, str]]): Optional list of message dictionaries for chat completions.
+            model (Optional[str]): Per-call model override (e.g. the small model of a cascade). Defaults to self.model.
+            temperature, top_p, max_tokens: Per-call generation parameters. Default to the class DEFAULT_* values.
+            response_format: Optional pydantic model class or JSON schema; switches to structured mode
+                (see generate_structured) and returns the validated dict/list instead of text.
+            call_site: Label used for usage accounting and structured-output statistics.
+            request_options: Extra chat.completions.create kwargs (used by structured mode).
+            deadline: Absolute time.monotonic() deadline for the call including queueing and retries
+                (see EndpointGuard.deadline_in). Defaults to LLM_CALL_DEADLINE from now.
 
         Returns:
             If stream is True: an iterator of response content strings (NO separate reasoning field).
             If stream is False: a single response content string (NO separate reasoning field).
+            If response_format is given: the validated JSON value, or None when it could not be produced.
 
         NOTE: The response does NOT include a separate 'reasoning' field. If you require reasoning, instruct the model in the system prompt to include reasoning in the content.
         """
-        # 🔧 FIX: Check circuit breaker first
-        if self._is_circuit_open():
+        if response_format is not None:
+            return self.generate_structured(
+                response_format,
+                prompt=prompt,
+                messages=messages,
+                call_site=call_site,
+                model=model,
+                temperature=temperature,
+                top_p=top_p,
+                max_tokens=max_tokens,
+            )
+
+        # check before the breaker and the scheduler: a half-open probe claimed here would never be released
+        if not prompt and not messages:
+            raise ValueError("Prompt cannot be empty.")
+
+        # 🔧 FIX: Check the endpoint/model circuit breaker first (half-open lets one probe through)
+        guard = self._guard(model)
+        if not guard.breaker.allow_request():
             from src.ui.diagnostics.debug_helpers import debug_warning
 
             debug_warning(
                 heading="OPENAI • CIRCUIT_BREAKER_BLOCK",
                 body="Request blocked by circuit breaker",
-                metadata={"circuit_open_until": self._circuit_open_until},
+                metadata={"model": guard.model, **guard.snapshot()},
             )
             return self._get_fallback_response("circuit_breaker")
+        from src.config import settings
 
-        # rate limit management
-        # first increment the request count
-        OpenAIIntegration()._manage_requests_sync()
+        deadline = deadline or EndpointGuard.deadline_in(settings.LLM_CALL_DEADLINE)
 
-        if not prompt and not messages:
-            raise ValueError("Prompt cannot be empty.")
+        # rate limit management: wait for a grant from the shared, priority-ordered budget
+        try:
+            OpenAIIntegration()._manage_requests_sync(deadline)
+        except EndpointGuard.DeadlineExceededError:
+            guard.breaker.release_probe()
+            return self._get_fallback_response("rate_limit")
 
         # Enhanced system_logging for debugging
         from src.ui.diagnostics.debug_helpers import debug_api_call
@@ -190,24 +259,33 @@ class OpenAIIntegration:
                     metadata={"attempt": attempt, "stream": stream},
                 )
 
+                call_started = time.perf_counter()
                 if prompt or (messages and len(messages) < 2):
                     prompt = messages[0]["content"] if messages else prompt
-                    completion = self.client.chat.completions.create(
-                        model=self.model,
-                        messages=[{"role": "user", "content": prompt}],
-                        temperature=0.7,
-                        top_p=1,
-                        max_tokens=4096,
-                        stream=stream,
-                    )
+                    api_messages = [{"role": "user", "content": prompt}]
                 else:
-                    completion = self.client.chat.completions.create(
-                        model=self.model,
-                        messages=messages,
-                        temperature=0.7,
-                        top_p=1,
-                        max_tokens=4096,
-                        stream=stream,
+                    api_messages = messages
+                # the adaptive limiter bounds in-flight calls per endpoint/model and learns from the outcome
+                with guard.limiter.slot(deadline) as slot:
+                    try:
+                        completion = self.client.chat.completions.create(
+                            model=model or self.model,
+                            messages=api_messages,
+                            stream=stream,
+                            **self._stream_options(stream),
+                            **self._generation_params(temperature, top_p, max_tokens),
+                            **(request_options or {}),
+                        )
+                    except Exception as call_error:
+                        slot.outcome = EndpointGuard.classify(call_error)
+                        raise
+                if not stream:
+                    # streamed calls are recorded when the stream is exhausted or closed
+                    LLMUsage.record(
+                        model=model or self.model,
+                        latency_s=time.perf_counter() - call_started,
+                        usage=getattr(completion, "usage", None),
+                        call_site=call_site,
                     )
 
                 # Enhanced response system_logging
@@ -224,19 +302,42 @@ class OpenAIIntegration:
                 )
 
                 # Record success for circuit breaker
-                self._record_success()
+                guard.record(SUCCESS)
 
                 if stream:
-                    return self._handle_streaming_response(completion)
+                    return self._recorded_stream(completion, model or self.model, call_site, call_started)
                 else:
                     return self._handle_non_streaming_response_with_debugging(
-                        completion
+                        completion, model or self.model
                     )
 
+            except EndpointGuard.DeadlineExceededError as deadline_error:
+                # queueing or retrying would overrun the caller's budget; not an endpoint failure
+                from src.ui.diagnostics.debug_helpers import debug_error
+
+                debug_error(
+                    heading="OPENAI • DEADLINE_EXCEEDED",
+                    body=f"Call deadline exceeded on attempt {attempt}: {deadline_error}",
+                    metadata={"attempt": attempt, "model": guard.model, **guard.snapshot()},
+                )
+                guard.breaker.release_probe()
+                return self._get_fallback_response("timeout")
+
             except Exception as e:
                 from src.ui.diagnostics.debug_helpers import debug_error
 
+                if self._rejects_request_options(e, request_options):
+                    # the endpoint named a structured-output parameter; let the caller drop it
+                    guard.breaker.release_probe()
+                    raise OpenAIIntegration.UnsupportedRequestOptionError(str(e)) from e
+
                 error_str = str(e)
+                outcome = EndpointGuard.classify(e)
+
+                # Record failure for the endpoint/model breaker; stop retrying once it opened
+                guard.record(outcome)
+                if guard.breaker.state != CircuitBreaker.CLOSED:
+                    return self._get_fallback_response("circuit_breaker")
 
                 # Handle specific NVIDIA API errors
                 if "'NoneType' object is not iterable" in error_str:
@@ -245,21 +346,7 @@ class OpenAIIntegration:
                         body=f"Unexpected error on attempt {attempt}: {error_str}",
                         metadata={"attempt": attempt, "error_type": type(e).__name__},
                     )
-
-                    # Record failure
-                    self._record_failure()
-
-                    if attempt < max_attempts:
-                        attempt += 1
-                        continue
-                    else:
-                        debug_error(
-                            heading="OPENAI • UNEXPECTED_FAILURE",
-                            body=f"Unexpected error in generate_text: {error_str}",
-                            metadata={"error_type": type(e).__name__},
-                        )
-                        # Return a fallback response instead of crashing
-                        return self._get_fallback_response("unexpected")
+                    fallback_type = "unexpected"
 
                 elif "502" in error_str or "Error code: 502" in error_str:
                     debug_error(
@@ -267,18 +354,7 @@ class OpenAIIntegration:
                         body=f"502 error on attempt {attempt}: {error_str}",
                         metadata={"attempt": attempt, "error_code": "502"},
                     )
-
-                    # Record failure
-                    self._record_failure()
-
-                    if attempt < max_attempts:
-                        time.sleep(
-                            2 ** (attempt - 1)
-                        )  # Exponential backoff: 1s, 2s, 4s
-                        attempt += 1
-                        continue
-                    else:
-                        return self._get_fallback_response("502")
+                    fallback_type = "502"
 
                 elif (
                         "BadRequestError" in error_str
@@ -290,52 +366,209 @@ class OpenAIIntegration:
                         body=f"API error on attempt {attempt}: {error_str}",
                         metadata={"attempt": attempt, "error_type": type(e).__name__},
                     )
-
-                    # Record failure
-                    self._record_failure()
-
-                    if attempt < max_attempts:
-                        time.sleep(1)  # Brief delay before retry
-                        attempt += 1
-                        continue
-                    else:
-                        return self._get_fallback_response("api_error")
+                    fallback_type = "api_error"
 
                 else:
-                    # Record failure for unknown errors too
-                    self._record_failure()
+                    fallback_type = "rate_limit" if outcome == OVERLOAD and "429" in error_str else "unknown"
 
-                    # For unknown errors, if this isn't the last attempt, continue trying
-                    if attempt < max_attempts:
-                        attempt += 1
-                        time.sleep(1)
-                        continue
-                    else:
-                        # Return fallback instead of re-raising
-                        return self._get_fallback_response("unknown")
+                if attempt >= max_attempts:
+                    # Return a fallback response instead of crashing
+                    return self._get_fallback_response(fallback_type)
+                try:
+                    # full-jitter exponential backoff so concurrent callers do not retry in lockstep
+                    time.sleep(EndpointGuard.backoff_delay(attempt, deadline))
+                except EndpointGuard.DeadlineExceededError:
+                    return self._get_fallback_response("timeout")
+                attempt += 1
 
         # Should never reach here, but safety fallback
         return self._get_fallback_response("max_attempts")
 
+    def generate_structured(
+            self,
+            response_format: Union[type, dict],
+            prompt: Optional[str] = None,
+            messages: Optional[list[dict[str, str]]] = None,
+            call_site: str = "default",
+            model: Optional[str] = None,
+            temperature: Optional[float] = None,
+            top_p: Optional[float] = None,
+            max_tokens: Optional[int] = None,
+    ) -> Union[dict, list, None]:
+        """
+        Generate a JSON value that validates against a pydantic model or JSON schema.
+
+        Uses the endpoint's guided-decoding / JSON modes when available (downgrading per model
+        when a mode is rejected), validates the answer and makes at most one targeted repair call.
+
+        Returns:
+            The validated value (pydantic models are returned as dicts), or None on failure.
+        """
+        from src.utils.structured_output import StructuredOutput
+
+        target_model = model or self.model
+        base_messages = StructuredOutput.with_schema_instruction(
+            messages or [{"role": "user", "content": prompt}], response_format
+        )
+        params = {
+            "model": target_model,
+            "temperature": temperature,
+            "top_p": top_p,
+            "max_tokens": max_tokens,
+            "call_site": call_site,
+        }
+
+        mode = StructuredOutput.mode_for(target_model)
+        while True:
+            options = StructuredOutput.request_options(mode, response_format)
+            try:
+                raw = self.generate_text(messages=base_messages, request_options=options, **params)
+                break
+            except OpenAIIntegration.UnsupportedRequestOptionError:
+                mode = StructuredOutput.downgrade(target_model, mode)
+
+        if self.is_fallback_response(raw):
+            # the call itself failed; a repair call would only fail the same way
+            StructuredOutput.record(call_site, first_pass_valid=False, repaired=False, repair_ok=False)
+            return None
+
+        value, error = StructuredOutput.parse_and_validate(raw, response_format)
+        if error is None:
+            StructuredOutput.record(call_site, first_pass_valid=True, repaired=False, repair_ok=False)
+            return value
+
+        repair_raw = self.generate_text(
+            messages=StructuredOutput.repair_messages(base_messages, raw, error),
+            request_options=options,
+            **params,
+        )
+        value, repair_error = StructuredOutput.parse_and_validate(repair_raw, response_format)
+        StructuredOutput.record(call_site, first_pass_valid=False, repaired=True, repair_ok=repair_error is None)
+        if repair_error is not None:
+            from src.ui.diagnostics.debug_helpers import debug_warning
+
+            debug_warning(
+                heading="OPENAI • STRUCTURED_OUTPUT_FAILED",
+                body=f"Structured output for {call_site} failed validation after repair: {repair_error}",
+                metadata={"call_site": call_site, "mode": mode, "first_error": error},
+            )
+            return None
+        return value
+
+    async def generate_structured_async(
+            self,
+            response_format: Union[type, dict],
+            prompt: Optional[str] = None,
+            messages: Optional[List[Dict[str, str]]] = None,
+            call_site: str = "default",
+            model: Optional[str] = None,
+            temperature: Optional[float] = None,
+            top_p: Optional[float] = None,
+            max_tokens: Optional[int] = None,
+    ) -> Union[dict, list, None]:
+        """
+        Async counterpart of generate_structured.
+        """
+        from src.utils.structured_output import StructuredOutput
+
+        target_model = model or self.model
+        base_messages = StructuredOutput.with_schema_instruction(
+            messages or [{"role": "user", "content": prompt}], response_format
+        )
+        params = {
+            "model": target_model,
+            "temperature": temperature,
+            "top_p": top_p,
+            "max_tokens": max_tokens,
+            "call_site": call_site,
+        }
+
+        mode = StructuredOutput.mode_for(target_model)
+        while True:
+            options = StructuredOutput.request_options(mode, response_format)
+            try:
+                raw = await self.generate_text_async(messages=base_messages, request_options=options, **params)
+                break
+            except OpenAIIntegration.UnsupportedRequestOptionError:
+                mode = StructuredOutput.downgrade(target_model, mode)
+
+        if self.is_fallback_response(raw):
+            # the call itself failed; a repair call would only fail the same way
+            StructuredOutput.record(call_site, first_pass_valid=False, repaired=False, repair_ok=False)
+            return None
+
+        value, error = StructuredOutput.parse_and_validate(raw, response_format)
+        if error is None:
+            StructuredOutput.record(call_site, first_pass_valid=True, repaired=False, repair_ok=False)
+            return value
+
+        repair_raw = await self.generate_text_async(
+            messages=StructuredOutput.repair_messages(base_messages, raw, error),
+            request_options=options,
+            **params,
+        )
+        value, repair_error = StructuredOutput.parse_and_validate(repair_raw, response_format)
+        StructuredOutput.record(call_site, first_pass_valid=False, repaired=True, repair_ok=repair_error is None)
+        if repair_error is not None:
+            from src.ui.diagnostics.debug_helpers import debug_warning
+
+            debug_warning(
+                heading="OPENAI • STRUCTURED_OUTPUT_FAILED",
+                body=f"Structured output for {call_site} failed validation after repair: {repair_error}",
+                metadata={"call_site": call_site, "mode": mode, "first_error": error},
+            )
+            return None
+        return value
+
     async def generate_text_async(
-            self, prompt: str = None, messages: Optional[List[Dict[str, str]]] = None
-    ) -> str:
+            self,
+            prompt: str = None,
+            messages: Optional[List[Dict[str, str]]] = None,
+            model: Optional[str] = None,
+            temperature: Optional[float] = None,
+            top_p: Optional[float] = None,
+            max_tokens: Optional[int] = None,
+            response_format: Optional[Union[type, dict]] = None,
+            call_site: str = "default",
+            request_options: Optional[Dict[str, Any]] = None,
+            deadline: Optional[float] = None,
+    ) -> Union[str, dict, list, None]:
         """
         Asynchronously generate text from the OpenAI API with enhanced error handling.
 
+        Rate-limit, server and timeout errors are retried with jittered backoff until the deadline.
+
         Args:
             prompt (str): The prompt to send to the model.
             messages (Optional[List[Dict[str, str]]]): Optional list of message dictionaries for chat completions.
+            model, temperature, top_p, max_tokens: Per-call overrides, same as generate_text.
+            response_format, call_site, request_options: Structured-output options, same as generate_text.
+            deadline: Absolute time.monotonic() deadline, same as generate_text.
 
         Returns:
-            str: The generated text response.
+            str: The generated text response (validated JSON value when response_format is given).
 
         Raises:
             ValueError: If OpenAI integration not initialized or invalid parameters.
             Exception: If API call fails or no content found.
         """
-        # rate limit management
-        await OpenAIIntegration()._manage_requests_async()
+        if response_format is not None:
+            return await self.generate_structured_async(
+                response_format,
+                prompt=prompt,
+                messages=messages,
+                call_site=call_site,
+                model=model,
+                temperature=temperature,
+                top_p=top_p,
+                max_tokens=max_tokens,
+            )
+
+        from src.config import settings
+
+        deadline = deadline or EndpointGuard.deadline_in(settings.LLM_CALL_DEADLINE)
+        # rate limit management: wait for a grant from the shared, priority-ordered budget
+        await OpenAIIntegration()._manage_requests_async(deadline)
 
         if not hasattr(self, "_initialized"):
             raise ValueError("OpenAI integration not initialized")
@@ -369,28 +602,64 @@ class OpenAIIntegration:
             else:
                 api_messages = [{"role": "user", "content": prompt}]
 
-            # Add timeout wrapper for async call
-            completion = await asyncio.wait_for(
-                async_client.chat.completions.create(
-                    model=self.model,
-                    messages=api_messages,
-                    temperature=0.7,
-                    top_p=1,
-                    max_tokens=4096,
-                    stream=False,
-                ),
-                timeout=OPENAI_TIMEOUT,
+            guard = self._guard(model)
+            if not guard.breaker.allow_request():
+                raise RuntimeError(f"circuit breaker open for {guard.model}")
+            attempt = 1
+            while True:
+                try:
+                    # Add timeout wrapper for async call (never past the caller's deadline)
+                    call_started = time.perf_counter()
+                    async with guard.limiter.slot_async(deadline) as slot:
+                        try:
+                            completion = await asyncio.wait_for(
+                                async_client.chat.completions.create(
+                                    model=model or self.model,
+                                    messages=api_messages,
+                                    stream=False,
+                                    **self._generation_params(temperature, top_p, max_tokens),
+                                    **(request_options or {}),
+                                ),
+                                timeout=min(OPENAI_TIMEOUT, max(deadline - time.monotonic(), 0.001)),
+                            )
+                        except Exception as call_error:
+                            slot.outcome = EndpointGuard.classify(call_error)
+                            raise
+                    guard.record(SUCCESS)
+                    break
+                except EndpointGuard.DeadlineExceededError:
+                    guard.breaker.release_probe()
+                    raise
+                except Exception as call_error:
+                    if self._rejects_request_options(call_error, request_options):
+                        guard.breaker.release_probe()
+                        raise
+                    outcome = EndpointGuard.classify(call_error)
+                    guard.record(outcome)
+                    if outcome != OVERLOAD or guard.breaker.state != CircuitBreaker.CLOSED or attempt >= 5:
+                        raise
+                    # full-jitter exponential backoff, bounded by the deadline
+                    await asyncio.sleep(EndpointGuard.backoff_delay(attempt, deadline))
+                    attempt += 1
+            LLMUsage.record(
+                model=model or self.model,
+                latency_s=time.perf_counter() - call_started,
+                usage=getattr(completion, "usage", None),
+                call_site=call_site,
             )
 
             # Enhanced response system_logging
             # if settings.socket_con:
             #     settings.socket_con.send_error(f"[DEBUG] OpenAI async API call completed successfully")
 
-            return self._handle_non_streaming_response_with_debugging(completion)
+            return self._handle_non_streaming_response_with_debugging(completion, model or self.model)
 
         except Exception as e:
             from src.ui.diagnostics.debug_helpers import debug_error
 
+            if self._rejects_request_options(e, request_options):
+                raise OpenAIIntegration.UnsupportedRequestOptionError(str(e)) from e
+
             debug_error(
                 heading="OPENAI • API_CALL_FAILED",
                 body=f"OpenAI async call failed: {e}",
@@ -399,7 +668,13 @@ class OpenAIIntegration:
             raise Exception(f"OpenAI async API call failed: {e}")
 
     async def generate_text_async_streaming(
-            self, prompt: str, messages: Optional[List[Dict[str, str]]] = None
+            self,
+            prompt: str,
+            messages: Optional[List[Dict[str, str]]] = None,
+            model: Optional[str] = None,
+            temperature: Optional[float] = None,
+            top_p: Optional[float] = None,
+            max_tokens: Optional[int] = None,
     ) -> Iterator[str]:
         """
         Asynchronously generate streaming text from the OpenAI API.
@@ -407,6 +682,7 @@ class OpenAIIntegration:
         Args:
             prompt (str): The prompt to send to the model.
             messages (Optional[List[Dict[str, str]]]): Optional list of message dictionaries for chat completions.
+            model, temperature, top_p, max_tokens: Per-call overrides, same as generate_text.
 
         Yields:
             str: Content chunks from the streaming response.
@@ -438,25 +714,34 @@ class OpenAIIntegration:
                 api_messages = [{"role": "user", "content": prompt}]
 
             # Add timeout wrapper for async streaming call
+            call_started = time.perf_counter()
             completion = await asyncio.wait_for(
                 async_client.chat.completions.create(
-                    model=self.model,
+                    model=model or self.model,
                     messages=api_messages,
-                    temperature=0.7,
-                    top_p=1,
-                    max_tokens=4096,
                     stream=True,
+                    **self._stream_options(True),
+                    **self._generation_params(temperature, top_p, max_tokens),
                 ),
                 timeout=OPENAI_TIMEOUT,
             )
 
+            usage = None
             async for chunk in completion:
+                # with include_usage the last chunk carries the token counts (and no choices)
+                usage = getattr(chunk, "usage", None) or usage
                 if (
                         chunk.choices
                         and chunk.choices[0].delta
                         and chunk.choices[0].delta.content
                 ):
                     yield chunk.choices[0].delta.content
+            LLMUsage.record(
+                model=model or self.model,
+                latency_s=time.perf_counter() - call_started,
+                usage=usage,
+                stream=True,
+            )
 
         except Exception as e:
             from src.ui.diagnostics.debug_helpers import debug_error
@@ -488,12 +773,45 @@ class OpenAIIntegration:
         return await cls.instance.generate_text_async(prompt)
 
     @staticmethod
-    def _handle_streaming_response(completion) -> Iterator[str]:
+    def _stream_options(stream: bool) -> Dict[str, Any]:
+        """Ask for a final usage chunk on streamed calls so their tokens are accounted as well."""
+        return {"stream_options": {"include_usage": True}} if stream else {}
+
+    @staticmethod
+    def _recorded_stream(completion, model: str, call_site: str, call_started: float) -> Iterator[str]:
+        """
+        Yield a streamed completion's content; the call's latency and usage (from the final usage
+        chunk, see _stream_options) are recorded once the stream ends or is closed.
+        """
+        usage = []
+
+        def tap():
+            for chunk in completion:
+                if getattr(chunk, "usage", None) is not None:
+                    usage.append(chunk.usage)
+                yield chunk
+
+        try:
+            yield from OpenAIIntegration._handle_streaming_response(
+                tap() if completion is not None else None, model
+            )
+        finally:
+            LLMUsage.record(
+                model=model,
+                latency_s=time.perf_counter() - call_started,
+                usage=usage[-1] if usage else None,
+                call_site=call_site,
+                stream=True,
+            )
+
+    @staticmethod
+    def _handle_streaming_response(completion, model: Optional[str] = None) -> Iterator[str]:
         """
         Handle streaming responses from the OpenAI API.
 
         Args:
             completion: The streaming completion object from OpenAI.
+            model: The model that was called; failures count against its circuit breaker.
 
         Yields:
             str: Content chunks from the response (NO separate reasoning field).
@@ -563,12 +881,14 @@ class OpenAIIntegration:
             # Record failure for circuit breaker
             OpenAIIntegration.requests_count += 1  # Ensure request is counted
             instance = OpenAIIntegration()
-            instance._record_failure()
+            instance._record_failure(model)
 
     @staticmethod
-    def _handle_non_streaming_response_with_debugging(completion) -> str:
+    def _handle_non_streaming_response_with_debugging(completion, model: Optional[str] = None) -> str:
         """
         Enhanced response handler with debugging for NVIDIA API compatibility.
+
+        ``model`` is the model that was called; failures count against its circuit breaker.
         """
         # 🔧 FIX: Comprehensive None checking first
         if completion is None:
@@ -581,7 +901,7 @@ class OpenAIIntegration:
             )
             # Record failure for circuit breaker
             instance = OpenAIIntegration()
-            instance._record_failure()
+            instance._record_failure(model)
             raise Exception("API returned None completion object")
 
         # 🔧 FIX: Enhanced choices validation
@@ -612,7 +932,7 @@ class OpenAIIntegration:
                 )
                 # Record failure for circuit breaker
                 instance = OpenAIIntegration()
-                instance._record_failure()
+                instance._record_failure(model)
                 raise Exception("No choices found in API response")
 
             # 🔧 FIX: Enhanced message validation
@@ -650,7 +970,7 @@ class OpenAIIntegration:
             )
             # Record failure for circuit breaker
             instance = OpenAIIntegration()
-            instance._record_failure()
+            instance._record_failure(model)
             raise Exception(f"API response structure error: {structure_error}")
 
         # Content extraction with enhanced fallback handling
@@ -728,7 +1048,7 @@ class OpenAIIntegration:
 
         # Record failure for circuit breaker
         instance = OpenAIIntegration()
-        instance._record_failure()
+        instance._record_failure(model)
 
         # Return a fallback response instead of raising an exception
         return '{"error": "No content available", "fallback": true}'
@@ -774,10 +1094,11 @@ class OpenAIIntegration:
 
             # Create a separate client to avoid recursion
             extractor_client = OpenAI(
-                base_url="https://integrate.api.nvidia.com/v1",
+                base_url=OPENAI_BASE_URL,
                 api_key=OPEN_AI_API_KEY,
-                timeout=OPENAI_TIMEOUT,
+                timeout=LLMHttpPool.timeout(),
                 max_retries=1,
+                http_client=LLMHttpPool.sync_client(),
             )
 
             # Make the extraction API call
@@ -875,129 +1196,64 @@ class OpenAIIntegration:
         """
         if cls.instance:
             await cls.instance._close_async_client()
+        await LLMHttpPool.aclose()
 
     @classmethod
-    def _manage_requests_sync(cls) -> None:
+    def _manage_requests_sync(cls, deadline: Optional[float] = None) -> None:
         """
-        Manage the number of requests to OpenAI API to comply with rate limits.
-        This method ensures that no more than 30 requests are made 60 sec.
+        Wait for a grant from the shared LLM request budget (no more than LLM_RATE_LIMIT_PER_MINUTE
+        requests per 60 sec, see LLMScheduler). Waiting requests are served by priority class
+        (interactive > agent > background), so a chat turn never queues behind background work.
 
         IMPORTANT: THIS METHOD SHOULD BE CALLED BEFORE EACH OPENAI API REQUEST TO ENSURE COMPLIANCE WITH RATE LIMITS.
         IMPORTANT: THIS IS A SYNCHRONOUS METHOD, SO IT SHOULD BE USED IN SYNC CONTEXTS ONLY.
-        :return: fuck the cpu for waiting
         """
-        from src.config import settings
-
-        with cls._thread_lock:
-            OpenAIIntegration.requests_count += 1
-            eval_listener: RichStatusListener = settings.listeners.get("eval", None)
-            # if eval_listener is not None:
-            #     eval_listener.emit_on_variable_change(
-            #         OpenAIIntegration,
-            #         "status",
-            #         f"{eval_listener.get_last_event().meta_data.get('new_value')}",
-            #         f"{eval_listener.get_last_event().meta_data.get('new_value')} @"
-            #         f"request count :- {cls.requests_count}",
-            #     )
-            if OpenAIIntegration.requests_count == 1:
-                OpenAIIntegration._last_request_time = time.perf_counter()
-            current_time = time.perf_counter()
-            if OpenAIIntegration.requests_count >= 30:
-                elapsed_time = current_time - OpenAIIntegration._last_request_time
-                if elapsed_time < 60:
-                    wait_time = 60 - elapsed_time
-                    from src.ui.diagnostics.debug_helpers import debug_critical
-
-                    debug_critical(
-                        heading="OPENAI • RATE_LIMIT",
-                        body="API rate limit hit - waiting for reset",
-                        metadata={
-                            "wait_time": wait_time,
-                            "context": "sync_rate_limiting",
-                        },
-                    )
-                    if eval_listener is not None:
-                        eval_listener.emit_on_variable_change(
-                            OpenAIIntegration,
-                            "None",
-                            "None",
-                            f"Rate limit hit - waiting for reset {wait_time} seconds"
-                            f"no of requests :- {cls.requests_count}",
-                        )
-                    time.sleep(wait_time)
-                    OpenAIIntegration.requests_count = 0
-                    OpenAIIntegration._last_request_time = time.perf_counter()
-                else:
-                    OpenAIIntegration.requests_count = 0
-                    OpenAIIntegration._last_request_time = time.perf_counter()
+        waited = LLMScheduler.acquire(deadline=deadline)
+        cls._after_grant(waited, "sync_rate_limiting")
 
     @classmethod
-    async def _manage_requests_async(cls):
+    async def _manage_requests_async(cls, deadline: Optional[float] = None):
         """
-        Manage the number of requests to OpenAI API to comply with rate limits.
-        This method ensures that no more than 30 requests are made 60 sec.
+        Async variant of _manage_requests_sync; the event loop keeps running while the request waits.
 
         IMPORTANT: THIS METHOD SHOULD BE CALLED BEFORE EACH OPENAI API REQUEST TO ENSURE COMPLIANCE WITH RATE LIMITS.
-        :return: fuck the asynchronicity
         """
-        # 🔧 FIX: Proper async context management
-        from src.config import settings
+        waited = await LLMScheduler.acquire_async(deadline=deadline)
+        cls._after_grant(waited, "async_rate_limiting")
 
-        # Use proper async lock instead of sync lock
-        async with cls._client_lock:
-            OpenAIIntegration.requests_count += 1
-            eval_listener: RichStatusListener = settings.listeners.get("eval", None)
-
-            if eval_listener is not None:
-                eval_listener.emit_on_variable_change(
-                    OpenAIIntegration,
-                    "status",
-                    f"Processing request {cls.requests_count}",
-                    f"API request {cls.requests_count} in progress",
-                )
-
-            if OpenAIIntegration.requests_count == 1:
-                OpenAIIntegration._last_request_time = time.perf_counter()
-
-            current_time = time.perf_counter()
-
-            if OpenAIIntegration.requests_count >= 30:
-                elapsed_time = current_time - OpenAIIntegration._last_request_time
-                if elapsed_time < 60:
-                    wait_time = 60 - elapsed_time
-                    # make update that we hit rate limit
-                    from src.ui.diagnostics.debug_helpers import debug_critical
-
-                    debug_critical(
-                        heading="OPENAI • RATE_LIMIT",
-                        body="API rate limit hit - waiting for reset",
-                        metadata={
-                            "wait_time": wait_time,
-                            "context": "async_rate_limiting",
-                        },
-                    )
+    @classmethod
+    def _after_grant(cls, waited: float, context: str) -> None:
+        """Publish window usage and report requests that had to wait for the budget."""
+        from src.config import settings
 
-                    if eval_listener is not None:
-                        eval_listener.emit_on_variable_change(
-                            OpenAIIntegration,
-                            "None",
-                            "None",
-                            f"Rate limit hit - waiting for reset {wait_time} seconds, requests: {cls.requests_count}",
-                        )
+        OpenAIIntegration.requests_count = LLMScheduler.window_usage()
+        if waited < 1:
+            return
+        priority = LLMScheduler.current_priority().name.lower()
+        from src.ui.diagnostics.debug_helpers import debug_critical
 
-                    await asyncio.sleep(wait_time)
-                    OpenAIIntegration.requests_count = 0
-                    OpenAIIntegration._last_request_time = time.perf_counter()
-                else:
-                    OpenAIIntegration.requests_count = 0
-                    OpenAIIntegration._last_request_time = time.perf_counter()
+        debug_critical(
+            heading="OPENAI • RATE_LIMIT",
+            body="API rate limit hit - request waited for the shared budget",
+            metadata={"wait_time": round(waited, 2), "priority": priority, "context": context},
+        )
+        eval_listener: RichStatusListener = settings.listeners.get("eval", None)
+        if eval_listener is not None:
+            eval_listener.emit_on_variable_change(
+                OpenAIIntegration,
+                "None",
+                "None",
+                f"Rate limit hit - waited {waited:.1f} seconds ({priority}), requests: {cls.requests_count}",
+            )
 
     @classmethod
     def cleanup(cls) -> None:
         """
         Clean up the OpenAI client instance and release resources.
-        Enhanced with async cleanup.
+        Enhanced with async cleanup; closes the shared connection pool after logging its statistics.
         """
+        if LLMHttpPool.stats().keys() - {"http2"}:
+            LLMHttpPool.log_stats()
         if cls.instance and hasattr(cls.instance, "client"):
             try:
                 cls.instance.client.close()
@@ -1023,9 +1279,42 @@ class OpenAIIntegration:
                 # Not in async context, skip async cleanup
                 pass
 
+        LLMHttpPool.close()
         cls.instance = None
         cls._async_lock = None
-        gc.collect()
+
+    @classmethod
+    def _generation_params(
+            cls,
+            temperature: Optional[float] = None,
+            top_p: Optional[float] = None,
+            max_tokens: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Build the sampling parameters for a completion call, filling gaps with the class defaults.
+        """
+        return {
+            "temperature": cls.DEFAULT_TEMPERATURE if temperature is None else temperature,
+            "top_p": cls.DEFAULT_TOP_P if top_p is None else top_p,
+            "max_tokens": cls.DEFAULT_MAX_TOKENS if max_tokens is None else max_tokens,
+        }
+
+    @staticmethod
+    def _rejects_request_options(error: BaseException, request_options: Optional[Dict[str, Any]]) -> bool:
+        """True when a bad-request error is the endpoint rejecting the structured-output options."""
+        from src.utils.structured_output import StructuredOutput
+
+        return (
+            bool(request_options)
+            and isinstance(error, (BadRequestError, UnprocessableEntityError))
+            and StructuredOutput.rejects_options(error)
+        )
+
+    def is_fallback_response(self, text: Any) -> bool:
+        """True when ``text`` is one of the canned answers generate_text returns after a failed call."""
+        return isinstance(text, str) and text in {
+            self._get_fallback_response(kind) for kind in self._GENERATE_FALLBACK_KINDS
+        }
 
     def _get_fallback_response(self, error_type: str = "unknown") -> str:
         """
@@ -1070,74 +1359,37 @@ class OpenAIIntegration:
 
             return fallback_messages.get(error_type, fallback_messages["unknown"])
 
-    def _is_circuit_open(self) -> bool:
+    def _guard(self, model: Optional[str] = None) -> EndpointGuard:
+        """Adaptive limiter and circuit breaker for this endpoint and model."""
+        return EndpointGuard.for_endpoint(self.base_url, model or self.model)
+
+    def _is_circuit_open(self, model: Optional[str] = None) -> bool:
         """
-        Check if circuit breaker is open (preventing API calls).
+        Check if the circuit breaker for the endpoint/model is open (preventing API calls).
+
+        A half-open breaker lets one probe request through, so a False result may claim that probe.
 
         Returns:
             bool: True if circuit is open, False if closed
         """
-        if not OpenAIIntegration._circuit_open:
-            return False
-
-        # Check if circuit timeout has expired
-        if (
-                OpenAIIntegration._circuit_open_until
-                and time.time() > OpenAIIntegration._circuit_open_until
-        ):
-            OpenAIIntegration._circuit_open = False
-            OpenAIIntegration._circuit_open_until = None
-            OpenAIIntegration._failure_count = 0
-            from src.ui.diagnostics.debug_helpers import debug_info
+        return not self._guard(model).breaker.allow_request()
 
-            debug_info(
-                heading="OPENAI • CIRCUIT_BREAKER_RESET",
-                body="Circuit breaker reset after timeout",
-                metadata={"timeout_duration": OpenAIIntegration._circuit_timeout},
-            )
-            return False
-
-        return True
-
-    def _record_failure(self):
-        """Record an API failure and potentially open circuit breaker."""
-        OpenAIIntegration._failure_count += 1
+    def _record_failure(self, model: Optional[str] = None):
+        """Record an API failure for the endpoint/model and potentially open its circuit breaker."""
+        guard = self._guard(model)
+        guard.record("failure")
 
         from src.ui.diagnostics.debug_helpers import debug_warning
 
         debug_warning(
             heading="OPENAI • API_FAILURE_RECORDED",
-            body=f"API failure recorded (count: {OpenAIIntegration._failure_count}/{OpenAIIntegration._max_failures})",
-            metadata={
-                "failure_count": OpenAIIntegration._failure_count,
-                "max_failures": OpenAIIntegration._max_failures,
-            },
+            body=f"API failure recorded (count: {guard.breaker.failure_count}/{guard.breaker.max_failures})",
+            metadata={"model": guard.model, **guard.snapshot()},
         )
 
-        if OpenAIIntegration._failure_count >= OpenAIIntegration._max_failures:
-            OpenAIIntegration._circuit_open = True
-            OpenAIIntegration._circuit_open_until = (
-                    time.time() + OpenAIIntegration._circuit_timeout
-            )
-            from src.ui.diagnostics.debug_helpers import debug_critical
-
-            debug_critical(
-                heading="OPENAI • CIRCUIT_BREAKER_OPEN",
-                body=f"Circuit breaker opened after {OpenAIIntegration._failure_count} failures",
-                metadata={"timeout_duration": OpenAIIntegration._circuit_timeout},
-            )
-
-    def _record_success(self):
-        """Record an API success and reset failure count."""
-        if OpenAIIntegration._failure_count > 0:
-            from src.ui.diagnostics.debug_helpers import debug_info
-
-            debug_info(
-                heading="OPENAI • API_RECOVERY",
-                body="API call successful - resetting failure count",
-                metadata={"previous_failures": OpenAIIntegration._failure_count},
-            )
-            OpenAIIntegration._failure_count = 0
+    def _record_success(self, model: Optional[str] = None):
+        """Record an API success and close the endpoint/model circuit breaker."""
+        self._guard(model).record(SUCCESS)
 
     @property
     def requests_count_property(self) -> int:
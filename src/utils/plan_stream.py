@@ -0,0 +1,209 @@
+"""
+Initial plans consumed while the planner LLM is still generating them.
+
+The agent's initial planner used to wait for the complete JSON array of tasks before the
+first task could be classified. A PlanStream runs the streamed planner call in a background
+thread, cuts every array element out of the stream the moment it closes
+(StreamingArrayExtractor) and hands it to an ``accept`` callback, which validates it and
+turns it into a task (or drops it by returning None). The workflow starts on the first
+accepted task; the task planner node collects the others as they arrive.
+
+When the stream ends the full response is parsed once more (reconciliation) and compared
+with the elements already offered: every element the incremental parser could not cut out,
+wherever it sits in the array, is offered as well, so no element of the response is lost.
+Recovered elements arrive last, so the task order can differ from the array's. A response
+without a single accepted element leaves the plan empty and the planner falls back to its
+blocking retry loop.
+
+Elements dropped after the first accepted one cannot restart the plan, because the workflow
+is already running. Instead the optional ``replan`` callback runs once after reconciliation
+and returns the elements that replace them (for the agent: a blocking planner call with the
+same validation feedback as the blocking retry), which are offered like streamed ones.
+
+Usage:
+    plan = PlanStream(accept, replan).start(produce)   # produce(plan) -> iterable of text chunks
+    first_tasks = plan.wait(timeout=settings.PLANNER_STREAM_DEADLINE)   # [] when nothing was accepted
+    PlanStream.activate(plan)
+
+    new_tasks = PlanStream.collect(wait=not pending_tasks)   # task planner node
+    PlanStream.is_streaming()                                # routers
+"""
+
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+from typing import Any, Callable, ClassVar, Iterable, Optional
+
+from src.utils.json_extractor import StreamingArrayExtractor, extract_json
+
+
+class PlanStream:
+    """One streamed plan, plus the active plan the task planner collects from."""
+
+    _active: ClassVar[Optional["PlanStream"]] = None
+    _lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(
+        self,
+        accept: Callable[[int, Any], Optional[Any]],
+        replan: Optional[Callable[["PlanStream"], Optional[Iterable[Any]]]] = None,
+    ):
+        self.accept = accept  # (element index, element) -> task, or None to drop the element
+        self.replan = replan  # (plan) -> elements replacing dropped ones, called once after reconciliation
+        self.content = ""
+        self.received = 0  # array elements offered to accept
+        self.accepted = 0
+        self.reconciled = 0  # elements only recovered from the full response
+        self.replanned = 0  # elements returned by replan
+        self.error: Optional[BaseException] = None
+        self.started_at = time.perf_counter()
+        self.first_task_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._ready: list[Any] = []
+        self._streamed: list[Any] = []  # elements cut out of the stream, compared in _reconcile
+        self._condition = threading.Condition()
+        self._cancelled = threading.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.finished_at is not None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def start(self, produce: Callable[["PlanStream"], Iterable[str]]) -> "PlanStream":
+        """Run ``produce`` in a background thread, in a copy of the caller's context (usage attribution)."""
+        context = contextvars.copy_context()
+        threading.Thread(target=context.run, args=(self._run, produce), name="plan-stream", daemon=True).start()
+        return self
+
+    def wait(self, timeout: Optional[float] = None) -> list[Any]:
+        """Block until a task is ready or the stream ended; returns (and clears) the ready tasks."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._ready or self.finished, timeout)
+            ready, self._ready = self._ready, []
+            return ready
+
+    def take(self) -> list[Any]:
+        """Return (and clear) the tasks accepted so far without waiting."""
+        with self._condition:
+            ready, self._ready = self._ready, []
+            return ready
+
+    def _run(self, produce: Callable[["PlanStream"], Iterable[str]]) -> None:
+        extractor = StreamingArrayExtractor()
+        chunks = produce(self)
+        try:
+            for chunk in chunks:
+                if self.cancelled:
+                    break
+                self.content += chunk
+                for element in extractor.feed(chunk):
+                    self._streamed.append(element)
+                    self._offer(element)
+            if not self.cancelled:
+                self._reconcile()
+            if not self.cancelled and self.replan is not None:
+                for element in self.replan(self) or ():
+                    self.replanned += 1
+                    self._offer(element)
+        except Exception as error:  # the planner falls back to its blocking path
+            self.error = error
+        finally:
+            # closing the generator closes the underlying HTTP stream of a cancelled plan
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+            with self._condition:
+                self.finished_at = time.perf_counter()
+                self._condition.notify_all()
+
+    def _offer(self, element: Any) -> None:
+        index, self.received = self.received, self.received + 1
+        task = self.accept(index, element)
+        if task is None:
+            return
+        with self._condition:
+            self.accepted += 1
+            if self.first_task_at is None:
+                self.first_task_at = time.perf_counter()
+            self._ready.append(task)
+            self._condition.notify_all()
+
+    def _reconcile(self) -> None:
+        """The full response is the source of truth for elements the incremental parser missed."""
+        result = extract_json(self.content)
+        elements = result.value if result is not None and isinstance(result.value, list) else []
+        streamed = list(self._streamed)
+        for element in elements:
+            if element in streamed:
+                streamed.remove(element)  # already offered (duplicates count separately)
+                continue
+            self.reconciled += 1
+            self._offer(element)
+
+    def report(self) -> dict[str, Any]:
+        end = self.finished_at or time.perf_counter()
+        return {
+            "elements": self.received,
+            "accepted": self.accepted,
+            "reconciled": self.reconciled,
+            "replanned": self.replanned,
+            "first_task_s": round(self.first_task_at - self.started_at, 3) if self.first_task_at else None,
+            "generation_s": round(end - self.started_at, 3),
+            "error": repr(self.error) if self.error else None,
+        }
+
+    @classmethod
+    def activate(cls, plan: "PlanStream") -> None:
+        """Make ``plan`` the one collected by the task planner (a stale one is cancelled)."""
+        with cls._lock:
+            stale, cls._active = cls._active, plan
+        if stale is not None and stale is not plan:
+            stale.cancel()
+
+    @classmethod
+    def collect(cls, wait: bool = False, timeout: Optional[float] = None) -> list[Any]:
+        """Tasks of the active plan that arrived since the last call; ``wait`` blocks for the next one."""
+        plan = cls._active
+        if plan is None:
+            return []
+        ready = plan.wait(timeout) if wait else plan.take()
+        if plan.finished:
+            ready += plan.take()
+            with cls._lock:
+                if cls._active is plan:
+                    cls._active = None
+            cls._log_report(plan)
+        return ready
+
+    @classmethod
+    def is_streaming(cls) -> bool:
+        """True while the active plan may still produce tasks."""
+        plan = cls._active
+        return plan is not None and not plan.cancelled
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            plan, cls._active = cls._active, None
+        if plan is not None:
+            plan.cancel()
+
+    @staticmethod
+    def _log_report(plan: "PlanStream") -> None:
+        from src.ui.diagnostics.debug_helpers import debug_info
+
+        report = plan.report()
+        debug_info(
+            heading="PLAN_STREAM • REPORT",
+            body=f"{report['accepted']}/{report['elements']} planned tasks accepted, first after "
+                 f"{report['first_task_s']}s of {report['generation_s']}s generation",
+            metadata=report,
+        )
@@ -0,0 +1,228 @@
+"""
+Speculative chat responses generated in parallel with message classification.
+
+A plain chat reply normally costs two serial LLM latencies: the classifier's routing call,
+then the chatBot generation. With SPECULATIVE_CHAT_ENABLED the classifier starts the chatBot
+generation in a background thread at the moment it sends its own LLM request:
+
+    - classified 'llm'  -> the chatBot node adopts the running (or finished) generation
+    - 'tool' / 'agent'  -> the generation is cancelled and its stream closed
+
+Per speculation the module records time-to-first-token saved (how much earlier the first
+token was available than a fresh call from the chatBot node would have produced it) and
+the tokens wasted by cancelled generations (estimated from the streamed text).
+
+Usage:
+    SpeculativeChat.start(key, producer)   # producer(speculation) -> full response text
+    ...
+    SpeculativeChat.resolve(key, adopt=message_type == "llm")
+    speculation = SpeculativeChat.take(key)  # in the chatBot node; None when nothing usable
+    content = speculation.result() if speculation else None
+
+    SpeculativeChat.report()
+"""
+
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, ClassVar, Hashable, Optional
+
+from src.config import settings
+
+CHARS_PER_TOKEN = 4
+
+
+@dataclass
+class Speculation:
+    """One speculative generation running in a background thread."""
+
+    key: Hashable
+    started_at: float = field(default_factory=time.perf_counter)
+    first_token_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    prompt_tokens: int = 0
+    content: str = ""
+    error: Optional[BaseException] = None
+    adopted_at: Optional[float] = None
+    settled: bool = False
+    _cancelled: threading.Event = field(default_factory=threading.Event, repr=False)
+    _done: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def add_chunk(self, chunk: str) -> None:
+        """Called by the producer for every streamed chunk."""
+        if chunk and self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        self.content += chunk
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the generation has finished (or ``timeout`` passed); the value of ``done``."""
+        return self._done.wait(timeout)
+
+    def result(self, timeout: Optional[float] = None) -> Optional[str]:
+        """Wait for the generation; None when it failed, was cancelled or timed out."""
+        if not self.wait(timeout):
+            return None
+        if self.error is not None or self.cancelled:
+            return None
+        return self.content
+
+    @property
+    def completion_tokens(self) -> int:
+        return len(self.content) // CHARS_PER_TOKEN
+
+
+@dataclass
+class SpeculationStats:
+    started: int = 0
+    adopted: int = 0
+    cancelled: int = 0
+    failed: int = 0
+    ttft_saved_s: float = 0.0
+    wasted_prompt_tokens: int = 0
+    wasted_completion_tokens: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "started": self.started,
+            "adopted": self.adopted,
+            "cancelled": self.cancelled,
+            "failed": self.failed,
+            "avg_ttft_saved_s": round(self.ttft_saved_s / self.adopted, 3) if self.adopted else 0.0,
+            "ttft_saved_s": round(self.ttft_saved_s, 3),
+            "wasted_prompt_tokens": self.wasted_prompt_tokens,
+            "wasted_completion_tokens": self.wasted_completion_tokens,
+        }
+
+
+class SpeculativeChat:
+    """The pending speculative chatBot reply for the current turn, if any."""
+
+    _pending: ClassVar[Optional[Speculation]] = None
+    _stats: ClassVar[SpeculationStats] = SpeculationStats()
+    _lock: ClassVar[threading.Lock] = threading.Lock()
+
+    @classmethod
+    def enabled(cls) -> bool:
+        return settings.SPECULATIVE_CHAT_ENABLED
+
+    @classmethod
+    def start(cls, key: Hashable, producer: Callable[[Speculation], str]) -> Speculation:
+        """
+        Start ``producer`` in a background thread (in a copy of the caller's context, so usage
+        attribution and request priority follow it). The producer streams into
+        ``speculation.add_chunk`` and should stop early once ``speculation.cancelled`` is set.
+        """
+        speculation = Speculation(key=key)
+        with cls._lock:
+            stale, cls._pending = cls._pending, speculation
+            cls._stats.started += 1
+        if stale is not None:
+            stale.cancel()
+            cls._settle(stale)
+
+        def run() -> None:
+            try:
+                speculation.content = producer(speculation) or speculation.content
+            except BaseException as error:  # reported through result()
+                speculation.error = error
+            finally:
+                speculation.finished_at = time.perf_counter()
+                cls._settle(speculation)
+                speculation._done.set()  # last, so waiters see the final statistics
+
+        context = contextvars.copy_context()
+        threading.Thread(target=context.run, args=(run,), name="speculative-chat", daemon=True).start()
+        return speculation
+
+    @classmethod
+    def resolve(cls, key: Hashable, adopt: bool) -> None:
+        """Keep the speculation for ``key`` for the chatBot node (adopt=True), or cancel it."""
+        if adopt:
+            return
+        speculation = cls._pop(key)
+        if speculation is not None:
+            speculation.cancel()
+            cls._settle(speculation)
+
+    @classmethod
+    def take(cls, key: Hashable) -> Optional[Speculation]:
+        """Adopt the pending speculation for ``key`` (chatBot node); None when there is none."""
+        speculation = cls._pop(key)
+        if speculation is not None:
+            speculation.adopted_at = time.perf_counter()
+            cls._settle(speculation)
+        return speculation
+
+    @classmethod
+    def _pop(cls, key: Hashable) -> Optional[Speculation]:
+        with cls._lock:
+            speculation = cls._pending
+            if speculation is None or speculation.key != key:
+                return None
+            cls._pending = None
+            return speculation
+
+    @classmethod
+    def _settle(cls, speculation: Speculation) -> None:
+        """Account a speculation once it is both finished and adopted/cancelled (called from either side)."""
+        with cls._lock:
+            if speculation.settled or speculation.finished_at is None:
+                return
+            if speculation.cancelled:
+                speculation.settled = True
+                cls._stats.cancelled += 1
+                cls._stats.wasted_prompt_tokens += speculation.prompt_tokens
+                cls._stats.wasted_completion_tokens += speculation.completion_tokens
+            elif speculation.adopted_at is not None:
+                speculation.settled = True
+                if speculation.error is not None:
+                    cls._stats.failed += 1
+                    return
+                cls._stats.adopted += 1
+                if speculation.first_token_at is not None:
+                    # baseline: a fresh call from the chatBot node would see its first token ttft seconds later
+                    ttft = speculation.first_token_at - speculation.started_at
+                    cls._stats.ttft_saved_s += min(ttft, speculation.adopted_at - speculation.started_at)
+
+    @classmethod
+    def report(cls) -> dict[str, Any]:
+        with cls._lock:
+            return cls._stats.as_dict()
+
+    @classmethod
+    def log_report(cls) -> dict[str, Any]:
+        report = cls.report()
+        if report["started"]:
+            from src.ui.diagnostics.debug_helpers import debug_info
+
+            debug_info(
+                heading="SPECULATIVE_CHAT • REPORT",
+                body=f"{report['adopted']}/{report['started']} speculative replies adopted, "
+                     f"avg TTFT saved {report['avg_ttft_saved_s']}s, "
+                     f"{report['wasted_prompt_tokens'] + report['wasted_completion_tokens']} tokens wasted",
+                metadata=report,
+            )
+        return report
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls._lock:
+            pending, cls._pending = cls._pending, None
+            cls._stats = SpeculationStats()
+        if pending is not None:
+            pending.cancel()
+            pending.settled = True
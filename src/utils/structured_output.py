@@ -0,0 +1,235 @@
+"""
+Structured (schema-constrained) output for OpenAI-compatible calls.
+
+Agent prompts ask for "ONLY JSON" and then depend on convert_to_json fallbacks; a parse
+failure costs a fallback heuristic or a whole new graph cycle. Structured calls instead:
+
+1. send the schema to the endpoint using the best decoding mode it supports
+   (NVIDIA guided_json, OpenAI json_schema, plain json_object, or prompt-only),
+   downgrading per model when the endpoint rejects a mode,
+2. extract and validate the answer against the pydantic model / JSON schema,
+3. make a single targeted repair call (the validation error is fed back) when validation fails.
+
+Failure and repair rates are tracked per call site.
+
+Usage:
+    result = OpenAIIntegration().generate_text(
+        messages=messages, response_format=GoalValidationResult, call_site="goal_validator"
+    )
+    StructuredOutput.report()
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from dataclasses import dataclass
+from typing import Any, ClassVar, Optional, Union
+
+from src.config import settings
+from src.utils.json_extractor import extract_json
+
+ResponseFormat = Union[type, dict]
+
+# strongest constraint first; "prompt" always works
+MODE_ORDER = ["guided_json", "json_schema", "json_object", "prompt"]
+# request parameters the decoding modes add; an endpoint rejecting a mode names one of them
+OPTION_PARAMETERS = ("response_format", "json_schema", "json_object", "guided_json", "nvext", "extra_body")
+
+
+@dataclass
+class StructuredOutputStats:
+    """Running counters for one call site."""
+
+    calls: int = 0
+    first_pass_valid: int = 0
+    repairs: int = 0
+    repair_successes: int = 0
+    failures: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "first_pass_valid": self.first_pass_valid,
+            "repairs": self.repairs,
+            "repair_successes": self.repair_successes,
+            "failures": self.failures,
+            "repair_rate": round(self.repairs / self.calls, 3) if self.calls else 0.0,
+            "failure_rate": round(self.failures / self.calls, 3) if self.calls else 0.0,
+        }
+
+
+class StructuredOutput:
+    """Decoding mode per model, schema validation and per call-site repair statistics."""
+
+    _stats: ClassVar[dict[str, StructuredOutputStats]] = {}
+    _mode_by_model: ClassVar[dict[str, str]] = {}
+    _lock: ClassVar[threading.Lock] = threading.Lock()
+
+    @staticmethod
+    def json_schema(response_format: ResponseFormat) -> dict:
+        """JSON schema for a pydantic model class or a schema dict."""
+        if isinstance(response_format, dict):
+            return response_format
+        return response_format.model_json_schema()
+
+    @staticmethod
+    def schema_name(response_format: ResponseFormat) -> str:
+        if isinstance(response_format, dict):
+            return response_format.get("title", "response")
+        return response_format.__name__
+
+    @classmethod
+    def mode_for(cls, model: str) -> str:
+        """Decoding mode to try first for a model (configured mode unless it was downgraded)."""
+        with cls._lock:
+            mode = cls._mode_by_model.get(model, settings.STRUCTURED_OUTPUT_MODE)
+        return mode if mode in MODE_ORDER else "prompt"
+
+    @classmethod
+    def downgrade(cls, model: str, failed_mode: str) -> str:
+        """Remember that a model rejected a mode and return the next weaker one."""
+        next_mode = MODE_ORDER[min(MODE_ORDER.index(failed_mode) + 1, len(MODE_ORDER) - 1)]
+        with cls._lock:
+            cls._mode_by_model[model] = next_mode
+        from src.ui.diagnostics.debug_helpers import debug_warning
+
+        debug_warning(
+            heading="OPENAI • STRUCTURED_MODE_DOWNGRADED",
+            body=f"{model} rejected structured mode '{failed_mode}', using '{next_mode}'",
+            metadata={"model": model, "failed_mode": failed_mode, "next_mode": next_mode},
+        )
+        return next_mode
+
+    @classmethod
+    def request_options(cls, mode: str, response_format: ResponseFormat) -> dict[str, Any]:
+        """Extra chat.completions.create kwargs for a decoding mode."""
+        schema = cls.json_schema(response_format)
+        if mode == "guided_json":
+            return {"extra_body": {"nvext": {"guided_json": schema}}}
+        if mode == "json_schema":
+            return {
+                "response_format": {
+                    "type": "json_schema",
+                    "json_schema": {"name": cls.schema_name(response_format), "schema": schema},
+                }
+            }
+        if mode == "json_object" and schema.get("type", "object") == "object":
+            return {"response_format": {"type": "json_object"}}
+        return {}
+
+    @staticmethod
+    def rejects_options(error: BaseException) -> bool:
+        """
+        True when a 400/422 error names a structured-output parameter.
+
+        Other bad requests (context length, content filtering) say nothing about the mode and
+        must not downgrade it.
+        """
+        message = str(error).lower()
+        return any(parameter in message for parameter in OPTION_PARAMETERS)
+
+    @classmethod
+    def with_schema_instruction(
+        cls, messages: list[dict[str, str]], response_format: ResponseFormat
+    ) -> list[dict[str, str]]:
+        """Append the schema to the system message (or add one) so every mode sees it."""
+        instruction = (
+            "\n\nReturn ONLY a JSON value that validates against this JSON schema:\n"
+            + json.dumps(cls.json_schema(response_format))
+        )
+        messages = [dict(m) for m in messages]
+        if messages and messages[0].get("role") == "system":
+            messages[0]["content"] = f"{messages[0]['content']}{instruction}"
+        else:
+            messages.insert(0, {"role": "system", "content": instruction.strip()})
+        return messages
+
+    @classmethod
+    def parse_and_validate(
+        cls, raw: Any, response_format: ResponseFormat
+    ) -> tuple[Any, Optional[str]]:
+        """
+        Extract JSON from a raw response and validate it.
+
+        Returns:
+            (value, error) - error is None when the value is valid; pydantic models are
+            returned as plain dicts (model_dump) so callers keep working with dicts.
+        """
+        if isinstance(raw, (dict, list)):
+            candidate = raw
+        else:
+            extracted = extract_json(str(raw or ""))
+            if extracted is None:
+                return None, "response did not contain JSON"
+            candidate = extracted.value
+
+        if isinstance(response_format, dict):
+            import jsonschema
+
+            try:
+                jsonschema.validate(candidate, response_format)
+            except jsonschema.ValidationError as validation_error:
+                return candidate, validation_error.message
+            return candidate, None
+
+        from pydantic import ValidationError
+
+        try:
+            return response_format.model_validate(candidate).model_dump(), None
+        except ValidationError as validation_error:
+            return candidate, str(validation_error)
+
+    @classmethod
+    def repair_messages(
+        cls, messages: list[dict[str, str]], bad_output: Any, error: str
+    ) -> list[dict[str, str]]:
+        """Conversation for the single targeted repair call."""
+        return messages + [
+            {"role": "assistant", "content": str(bad_output)},
+            {
+                "role": "user",
+                "content": "Your previous answer failed validation: "
+                f"{error}\nReturn the corrected JSON only, with no explanation.",
+            },
+        ]
+
+    @classmethod
+    def record(cls, call_site: str, first_pass_valid: bool, repaired: bool, repair_ok: bool) -> None:
+        with cls._lock:
+            stats = cls._stats.setdefault(call_site, StructuredOutputStats())
+            stats.calls += 1
+            if first_pass_valid:
+                stats.first_pass_valid += 1
+            if repaired:
+                stats.repairs += 1
+                if repair_ok:
+                    stats.repair_successes += 1
+            if not first_pass_valid and not repair_ok:
+                stats.failures += 1
+
+    @classmethod
+    def report(cls) -> dict[str, dict[str, Any]]:
+        """Per call-site failure and repair rates."""
+        with cls._lock:
+            return {site: stats.as_dict() for site, stats in cls._stats.items()}
+
+    @classmethod
+    def log_report(cls) -> dict[str, dict[str, Any]]:
+        """Send the current report to the debug log and return it."""
+        report = cls.report()
+        if report:
+            from src.ui.diagnostics.debug_helpers import debug_info
+
+            debug_info(
+                heading="OPENAI • STRUCTURED_OUTPUT_REPORT",
+                body="Structured output failure and repair rates per call site",
+                metadata=report,
+            )
+        return report
+
+    @classmethod
+    def reset_stats(cls) -> None:
+        with cls._lock:
+            cls._stats.clear()
+            cls._mode_by_model.clear()
@@ -0,0 +1,101 @@
+"""
+Tests for the shared LLM connection pool.
+
+Tests:
+- Pool configuration (limits, timeouts, HTTP/2 fallback)
+- Client sharing and re-creation after close
+- Reuse statistics and background pre-warm
+"""
+import pytest
+from unittest.mock import patch
+
+httpx = pytest.importorskip("httpx")
+
+
+@pytest.fixture
+def pool():
+    from src.utils.http_pool import LLMHttpPool
+
+    LLMHttpPool.close()
+    LLMHttpPool.reset_stats()
+    yield LLMHttpPool
+    LLMHttpPool.close()
+    LLMHttpPool.reset_stats()
+
+
+class TestPoolConfiguration:
+    """Test limits, timeouts and client sharing."""
+
+    def test_limits_and_timeouts_come_from_settings(self, pool):
+        from src.config import settings
+
+        limits = pool.limits()
+        timeout = pool.timeout()
+
+        assert limits.max_connections == settings.OPENAI_POOL_MAX_CONNECTIONS
+        assert limits.max_keepalive_connections == settings.OPENAI_POOL_MAX_KEEPALIVE
+        assert timeout.connect == settings.OPENAI_CONNECT_TIMEOUT
+        assert timeout.read == settings.OPENAI_TIMEOUT
+
+    def test_http2_is_on_with_the_declared_extra(self, pool):
+        pytest.importorskip("h2")
+        from src.config import settings
+
+        with patch.object(settings, "OPENAI_HTTP2", True):
+            assert pool.http2_enabled() is True
+
+    def test_http2_falls_back_without_h2(self, pool):
+        with patch("src.utils.http_pool.importlib.util.find_spec", return_value=None):
+            assert pool.http2_enabled() is False
+
+    def test_sync_client_is_shared(self, pool):
+        assert pool.sync_client() is pool.sync_client()
+
+    def test_closed_client_is_recreated(self, pool):
+        first = pool.sync_client()
+        pool.close()
+
+        assert first.is_closed
+        assert pool.sync_client() is not first
+
+
+class TestPoolStatistics:
+    """Test connection reuse accounting."""
+
+    def test_reuse_is_requests_minus_new_connections(self, pool):
+        for _ in range(3):
+            request = httpx.Request("POST", "https://example.invalid/v1/chat/completions")
+            pool._sync_request_hook(request)
+        request.extensions["trace"]("connection.connect_tcp.complete", {})
+
+        stats = pool.stats()
+
+        assert stats["sync"] == {"requests": 3, "new_connections": 1, "reused": 2}
+
+    def test_other_trace_events_are_ignored(self, pool):
+        request = httpx.Request("GET", "https://example.invalid/v1/models")
+        pool._sync_request_hook(request)
+        request.extensions["trace"]("http11.send_request_headers.started", {})
+
+        assert pool.stats()["sync"]["new_connections"] == 0
+
+
+class TestPrewarm:
+    """Test background pre-warm."""
+
+    def test_prewarm_failure_is_logged_not_raised(self, pool):
+        with patch.object(pool, "sync_client") as sync_client, patch(
+            "src.ui.diagnostics.debug_helpers.debug_warning"
+        ) as warning:
+            sync_client.return_value.get.side_effect = httpx.ConnectError("unreachable")
+            pool.prewarm("https://example.invalid/v1").join(timeout=5)
+
+        warning.assert_called_once()
+
+    def test_prewarm_requests_models_endpoint(self, pool):
+        with patch.object(pool, "sync_client") as sync_client:
+            pool.prewarm("https://example.invalid/v1/", api_key="key").join(timeout=5)
+
+        sync_client.return_value.get.assert_called_once_with(
+            "https://example.invalid/v1/models", headers={"Authorization": "Bearer key"}
+        )
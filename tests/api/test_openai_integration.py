@@ -5,6 +5,8 @@ Tests:
 - Client creation
 - Text generation
 - Error handling
+- Usage records (latency and tokens) for streamed calls
+- Rejected calls leave the half-open probe free
 """
 import pytest
 from unittest.mock import Mock, patch
@@ -85,5 +87,67 @@ class TestOpenAIErrorHandling:
                 pass  # Acceptable
 
 
+class TestOpenAIStreamingUsage:
+    """Test latency accounting of streamed calls."""
+
+    def test_stream_is_recorded_when_exhausted(self, openai_integration, mock_openai_client):
+        """The latency of a streamed call should cover the whole stream, not just its headers."""
+        from types import SimpleNamespace
+        from src.utils.endpoint_guard import EndpointGuard
+
+        EndpointGuard.reset()  # earlier error tests may have opened the breaker
+        chunks = [
+            SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+            for text in ("Hel", "lo")
+        ]
+        with patch.object(openai_integration, 'client', mock_openai_client), \
+                patch("src.utils.open_ai_integration.LLMUsage.record") as record:
+            mock_openai_client.chat.completions.create.return_value = iter(chunks)
+            stream = openai_integration.generate_text("Test", stream=True)
+
+            record.assert_not_called()
+            assert "".join(stream) == "Hello"
+
+        record.assert_called_once()
+        assert record.call_args.kwargs["stream"] is True
+
+    def test_stream_records_the_final_usage_chunk(self, openai_integration, mock_openai_client):
+        """Streamed calls ask for usage and record the token counts of the last chunk."""
+        from types import SimpleNamespace
+        from src.utils.endpoint_guard import EndpointGuard
+
+        EndpointGuard.reset()
+        usage = SimpleNamespace(prompt_tokens=12, completion_tokens=2, total_tokens=14)
+        chunks = [
+            SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="Hi"))], usage=None),
+            SimpleNamespace(choices=[], usage=usage),
+        ]
+        with patch.object(openai_integration, 'client', mock_openai_client), \
+                patch("src.utils.open_ai_integration.LLMUsage.record") as record:
+            mock_openai_client.chat.completions.create.return_value = iter(chunks)
+            assert "".join(openai_integration.generate_text("Test", stream=True)) == "Hi"
+
+        create_kwargs = mock_openai_client.chat.completions.create.call_args.kwargs
+        assert create_kwargs["stream_options"] == {"include_usage": True}
+        assert record.call_args.kwargs["usage"] is usage
+
+
+class TestOpenAIBreakerProbe:
+    """Test that rejected calls do not hold the half-open probe."""
+
+    def test_empty_prompt_does_not_claim_the_probe(self, openai_integration):
+        import time
+        from src.utils.endpoint_guard import CircuitBreaker, EndpointGuard
+
+        EndpointGuard.reset()
+        breaker = openai_integration._guard(None).breaker
+        breaker.state, breaker.open_until = CircuitBreaker.OPEN, time.monotonic() - 1
+
+        with pytest.raises(ValueError):
+            openai_integration.generate_text("")
+
+        assert breaker.allow_request() is True  # the probe is still free
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
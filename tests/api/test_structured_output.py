@@ -0,0 +1,160 @@
+"""
+Tests for structured output mode.
+
+Tests:
+- Schema validation (pydantic model and JSON schema)
+- Decoding-mode request options and per-model downgrade
+- Single repair call and per call-site statistics
+- Only errors naming a structured-output parameter downgrade the mode
+"""
+import asyncio
+
+import httpx
+import pytest
+from unittest.mock import AsyncMock, patch
+from openai import BadRequestError
+from pydantic import BaseModel
+
+
+class GoalCheck(BaseModel):
+    goal_achieved: bool
+    reasoning: str = ""
+
+
+@pytest.fixture
+def structured():
+    from src.utils.structured_output import StructuredOutput
+
+    StructuredOutput.reset_stats()
+    yield StructuredOutput
+    StructuredOutput.reset_stats()
+
+
+class TestStructuredValidation:
+    """Test parsing and validation."""
+
+    def test_pydantic_model_validation(self, structured):
+        """Valid JSON should come back as a plain dict."""
+        value, error = structured.parse_and_validate('Sure: {"goal_achieved": true}', GoalCheck)
+        assert error is None
+        assert value == {"goal_achieved": True, "reasoning": ""}
+
+    def test_pydantic_model_validation_error(self, structured):
+        """Wrong types should produce a validation error."""
+        _, error = structured.parse_and_validate('{"goal_achieved": "maybe"}', GoalCheck)
+        assert error is not None
+
+    def test_json_schema_validation(self, structured):
+        """Dict schemas should be validated with jsonschema."""
+        schema = {"type": "array", "items": {"type": "string"}}
+        assert structured.parse_and_validate('["read_file"]', schema) == (["read_file"], None)
+        assert structured.parse_and_validate('[1]', schema)[1] is not None
+
+
+class TestStructuredModes:
+    """Test decoding-mode selection."""
+
+    def test_guided_json_options(self, structured):
+        """guided_json should send the schema through nvext."""
+        options = structured.request_options("guided_json", GoalCheck)
+        assert options["extra_body"]["nvext"]["guided_json"]["required"] == ["goal_achieved"]
+
+    def test_json_object_skipped_for_array_schema(self, structured):
+        """JSON object mode cannot express arrays, so no option is sent."""
+        assert structured.request_options("json_object", {"type": "array"}) == {}
+
+    def test_downgrade_is_remembered_per_model(self, structured):
+        """A rejected mode should not be retried for the same model."""
+        first = structured.mode_for("model-a")
+        next_mode = structured.downgrade("model-a", first)
+        assert structured.mode_for("model-a") == next_mode
+        assert structured.mode_for("model-b") == first
+
+
+class TestGenerateStructured:
+    """Test OpenAIIntegration.generate_structured."""
+
+    def test_unsupported_mode_then_repair(self, openai_integration, structured):
+        """Rejected modes downgrade, invalid answers get exactly one repair call."""
+        from src.utils.open_ai_integration import OpenAIIntegration
+
+        responses = [
+            OpenAIIntegration.UnsupportedRequestOptionError("guided_json not supported"),
+            '{"reasoning": "goal_achieved is missing"}',
+            '{"goal_achieved": true, "reasoning": "file written"}',
+        ]
+        with patch.object(openai_integration, "generate_text", side_effect=responses) as generate:
+            result = openai_integration.generate_structured(
+                GoalCheck, prompt="check", call_site="goal_validator"
+            )
+
+        assert result == {"goal_achieved": True, "reasoning": "file written"}
+        assert generate.call_count == 3
+        stats = structured.report()["goal_validator"]
+        assert stats["repairs"] == 1
+        assert stats["repair_successes"] == 1
+        assert stats["failures"] == 0
+
+    def test_failed_repair_returns_none(self, openai_integration, structured):
+        """When the repair is still invalid the caller gets None and a failure is counted."""
+        with patch.object(openai_integration, "generate_text", side_effect=["no json", "still no json"]):
+            result = openai_integration.generate_structured(
+                GoalCheck, prompt="check", call_site="goal_validator"
+            )
+
+        assert result is None
+        assert structured.report()["goal_validator"]["failure_rate"] == 1.0
+
+    def test_failed_call_is_not_repaired(self, openai_integration, structured):
+        """A fallback answer from a failed call should not trigger a repair call."""
+        fallback = openai_integration._get_fallback_response("max_attempts")
+        with patch.object(openai_integration, "generate_text", return_value=fallback) as generate:
+            result = openai_integration.generate_structured(
+                GoalCheck, prompt="check", call_site="goal_validator"
+            )
+
+        assert result is None
+        assert generate.call_count == 1
+        assert structured.report()["goal_validator"]["failures"] == 1
+
+    def test_failed_async_call_is_not_repaired(self, openai_integration, structured):
+        """The async path short-circuits on a fallback answer as well."""
+        fallback = openai_integration._get_fallback_response("max_attempts")
+        with patch.object(openai_integration, "generate_text_async", new=AsyncMock(return_value=fallback)) as generate:
+            result = asyncio.run(openai_integration.generate_structured_async(
+                GoalCheck, prompt="check", call_site="goal_validator"
+            ))
+
+        assert result is None
+        assert generate.await_count == 1
+        assert structured.report()["goal_validator"]["failures"] == 1
+
+
+def _bad_request(message):
+    response = httpx.Response(400, request=httpx.Request("POST", "http://llm/v1/chat/completions"))
+    return BadRequestError(message, response=response, body=None)
+
+
+class TestRejectedOptions:
+    """Test which bad requests count as a rejected structured-output mode."""
+
+    def test_error_naming_the_parameter(self):
+        from src.utils.open_ai_integration import OpenAIIntegration
+
+        error = _bad_request("Error code: 400 - 'response_format' of type 'json_schema' is not supported")
+        assert OpenAIIntegration._rejects_request_options(error, {"response_format": {"type": "json_schema"}})
+
+    def test_unrelated_bad_request(self):
+        from src.utils.open_ai_integration import OpenAIIntegration
+
+        error = _bad_request("Error code: 400 - This model's maximum context length is 8192 tokens")
+        assert not OpenAIIntegration._rejects_request_options(error, {"response_format": {"type": "json_object"}})
+
+    def test_without_request_options(self):
+        from src.utils.open_ai_integration import OpenAIIntegration
+
+        assert not OpenAIIntegration._rejects_request_options(_bad_request("response_format invalid"), None)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,115 @@
+"""
+Tests for the offline stub LLM server (benchmarks/stub_llm_server.py).
+
+Tests:
+- Rule matching, scripted rotation and usage reporting
+- Streaming responses (server-sent events)
+- Error injection (429, 502, truncated JSON) and latency sampling
+"""
+import json
+import random
+import urllib.error
+import urllib.request
+
+import pytest
+
+from benchmarks.stub_llm_server import StubLLMServer, sample_latency
+
+
+def _post(server, payload):
+    request = urllib.request.Request(
+        f"{server.base_url}/chat/completions",
+        data=json.dumps(payload).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+    return urllib.request.urlopen(request, timeout=5)
+
+
+@pytest.fixture
+def script():
+    return {
+        "rules": [
+            {"name": "planner", "match": "strategic planner", "response": [{"task_id": 1, "tool_name": "x"}]},
+            {"name": "chat", "match": ".*", "responses": ["first", "second"]},
+        ]
+    }
+
+
+class TestCompletions:
+    """Test plain chat completions."""
+
+    def test_matching_rule_answers_with_json(self, script):
+        with StubLLMServer(script) as server:
+            body = json.load(_post(server, {"model": "m", "messages": [{"role": "system", "content": "You are a strategic planner"}]}))
+
+        assert json.loads(body["choices"][0]["message"]["content"]) == [{"task_id": 1, "tool_name": "x"}]
+        assert body["usage"]["total_tokens"] > 0
+        assert server.stats.as_dict()["requests"] == {"planner": 1}
+
+    def test_responses_rotate(self, script):
+        with StubLLMServer(script) as server:
+            answers = [
+                json.load(_post(server, {"messages": [{"role": "user", "content": "hi"}]}))["choices"][0]["message"]["content"]
+                for _ in range(3)
+            ]
+
+        assert answers == ["first", "second", "first"]
+
+    def test_models_endpoint(self, script):
+        with StubLLMServer(script) as server:
+            body = json.load(urllib.request.urlopen(f"{server.base_url}/models", timeout=5))
+
+        assert body["data"][0]["id"] == "stub"
+
+
+class TestStreaming:
+    """Test server-sent event streaming."""
+
+    def test_stream_reassembles_content(self, script):
+        with StubLLMServer(script) as server:
+            response = _post(server, {"messages": [{"role": "user", "content": "hi"}], "stream": True,
+                                      "stream_options": {"include_usage": True}})
+            events = [line[6:] for line in response.read().decode().splitlines() if line.startswith("data: ")]
+
+        assert events[-1] == "[DONE]"
+        chunks = [json.loads(event) for event in events[:-1]]
+        content = "".join(c["choices"][0]["delta"].get("content", "") for c in chunks if c["choices"])
+        assert content == "first"
+        assert chunks[-1]["usage"]["completion_tokens"] > 0
+
+
+class TestErrorInjection:
+    """Test injected failures and latency sampling."""
+
+    @pytest.mark.parametrize("status", ["429", "502"])
+    def test_injected_status(self, status):
+        script = {"rules": [{"match": ".*", "response": "x", "errors": {status: 1.0}}]}
+        with StubLLMServer(script) as server:
+            with pytest.raises(urllib.error.HTTPError) as error:
+                _post(server, {"messages": [{"role": "user", "content": "hi"}]})
+
+        assert error.value.code == int(status)
+        assert server.stats.as_dict()["injected"] == {status: 1}
+
+    def test_truncated_json(self):
+        script = {"rules": [{"match": ".*", "response": {"goal_achieved": True, "reasoning": "done" * 20},
+                             "errors": {"truncate": 1.0}}]}
+        with StubLLMServer(script, seed=1) as server:
+            content = json.load(_post(server, {"messages": [{"role": "user", "content": "hi"}]}))["choices"][0]["message"]["content"]
+
+        with pytest.raises(json.JSONDecodeError):
+            json.loads(content)
+
+    @pytest.mark.parametrize(
+        "spec, low, high",
+        [
+            ({"dist": "fixed", "value": 0.25}, 0.25, 0.25),
+            ({"dist": "uniform", "low": 0.1, "high": 0.2}, 0.1, 0.2),
+            ({"dist": "normal", "mean": 0.0, "stddev": 1.0}, 0.0, 10.0),
+        ],
+    )
+    def test_latency_distributions(self, spec, low, high):
+        rng = random.Random(3)
+        samples = [sample_latency(spec, rng) for _ in range(100)]
+
+        assert all(low <= sample <= high for sample in samples)
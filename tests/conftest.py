@@ -44,6 +44,16 @@ def model_manager():
     return ModelManager(model=settings.DEFAULT_MODEL)
 
 
+@pytest.fixture
+def message_classes():
+    """Install the langchain message classes that ChatInitializer normally sets on settings."""
+    from langchain_core.messages import AIMessage, HumanMessage
+    from src.config import settings
+
+    with patch.object(settings, "HumanMessage", HumanMessage), patch.object(settings, "AIMessage", AIMessage):
+        yield
+
+
 # ============================================================================
 # MCP FIXTURES
 # ============================================================================
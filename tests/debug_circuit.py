@@ -8,24 +8,24 @@ if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 
+from src.utils.endpoint_guard import EndpointGuard
 from src.utils.open_ai_integration import OpenAIIntegration
 
 # Reset state
-OpenAIIntegration._failure_count = 0
-OpenAIIntegration._circuit_open = False
-OpenAIIntegration._circuit_open_until = None
+EndpointGuard.reset()
 
 integration = OpenAIIntegration()
+breaker = integration._guard().breaker
 
 print(
-    f"Initial state: count={OpenAIIntegration._failure_count}, open={OpenAIIntegration._circuit_open}"
+    f"Initial state: count={breaker.failure_count}, state={breaker.state}"
 )
 
 # Simulate failures
 for i in range(6):
     integration._record_failure()
     print(
-        f"After failure {i + 1}: count={OpenAIIntegration._failure_count}, open={OpenAIIntegration._circuit_open}"
+        f"After failure {i + 1}: count={breaker.failure_count}, state={breaker.state}"
     )
 
-print(f"\nFinal: max_failures={OpenAIIntegration._max_failures}")
+print(f"\nFinal: max_failures={breaker.max_failures}")
@@ -35,9 +35,10 @@ def test_openai_basic_functionality():
 
         # Test class variables
         print("   2. Testing class variables...")
-        print(f"      - Failure count: {OpenAIIntegration._failure_count}")
-        print(f"      - Circuit open: {OpenAIIntegration._circuit_open}")
-        print(f"      - Max failures: {OpenAIIntegration._max_failures}")
+        breaker = integration._guard().breaker
+        print(f"      - Failure count: {breaker.failure_count}")
+        print(f"      - Circuit state: {breaker.state}")
+        print(f"      - Max failures: {breaker.max_failures}")
         print("   ? Class variables accessible")
 
         # Test circuit breaker methods
@@ -120,22 +121,23 @@ def test_openai_error_scenarios():
     try:
         from src.utils.open_ai_integration import OpenAIIntegration
 
+        from src.utils.endpoint_guard import EndpointGuard
+
         # Reset state for clean testing
-        OpenAIIntegration._failure_count = 0
-        OpenAIIntegration._circuit_open = False
-        OpenAIIntegration._circuit_open_until = None
+        EndpointGuard.reset()
 
         integration = OpenAIIntegration()
+        breaker = integration._guard().breaker
 
         # Test 1: Circuit breaker functionality
         print("   1. Testing circuit breaker...")
         for i in range(6):  # Trigger circuit breaker
             integration._record_failure()
             print(
-                f"      Failure {i + 1}: count={OpenAIIntegration._failure_count}, open={OpenAIIntegration._circuit_open}"
+                f"      Failure {i + 1}: count={breaker.failure_count}, state={breaker.state}"
             )
 
-        if OpenAIIntegration._circuit_open:
+        if breaker.state == breaker.OPEN:
             print("   ? Circuit breaker working correctly")
         else:
             print("   ? Circuit breaker not opening")
@@ -152,10 +154,6 @@ def test_openai_error_scenarios():
 
         # Test 3: Reset and recovery
         print("   3. Testing recovery...")
-        OpenAIIntegration._failure_count = 0
-        OpenAIIntegration._circuit_open = False
-        OpenAIIntegration._circuit_open_until = None
-
         integration._record_success()
         is_blocked = integration._is_circuit_open()
         if not is_blocked:
@@ -0,0 +1,119 @@
+"""
+Shared fixtures for the MCP transport, pool and supervisor tests.
+
+FAKE_SERVER is a small fake MCP server (a Python subprocess) whose behaviour is chosen per
+call by the tool name, so one script serves every test:
+
+    echo / any name   reply {"content": name, "args": ..., "pid": ..., "method": ...}
+    {"seconds": n}    sleep n seconds before replying (calls are handled concurrently)
+    hang              never reply
+    wedge             stop answering anything, pings included
+    exit              exit the process
+    crash_once        exit the process unless the file arguments["marker"] exists (then create it)
+    big               reply with arguments["size"] bytes of data
+    chatty            write arguments["lines"] lines to stderr first
+
+Every reply is preceded by a log line on stdout and a notifications/progress message, and a
+notifications/cancelled is echoed back as a test/saw_cancel notification.
+"""
+import sys
+import textwrap
+
+import pytest
+from unittest.mock import patch
+
+FAKE_SERVER = textwrap.dedent(
+    """
+    import json, os, sys, threading, time
+
+    lock = threading.Lock()
+    wedged = threading.Event()
+
+    def send(message):
+        with lock:
+            sys.stdout.write(json.dumps(message) + "\\n")
+            sys.stdout.flush()
+
+    def handle(request):
+        params = request.get("params") or {}
+        name = params.get("name")
+        args = params.get("arguments", {})
+        time.sleep(args.get("seconds", 0))
+        if name == "hang":
+            return
+        elif name == "exit":
+            os._exit(0)
+        elif name == "crash_once" and not os.path.exists(args["marker"]):
+            open(args["marker"], "w").close()
+            os._exit(1)
+        elif name == "big":
+            args = {"data": "x" * args["size"]}
+        elif name == "chatty":
+            # far more than a pipe buffer: blocks forever unless stderr is drained
+            for i in range(args["lines"]):
+                sys.stderr.write("noise %d %s\\n" % (i, "x" * 100))
+            sys.stderr.flush()
+        send({"jsonrpc": "2.0", "method": "notifications/progress", "params": {"tool": name}})
+        send({"jsonrpc": "2.0", "id": request["id"],
+              "result": {"content": name, "args": args, "pid": os.getpid(), "method": request["method"]}})
+
+    for line in sys.stdin:
+        request = json.loads(line)
+        if request.get("method") == "notifications/cancelled":
+            send({"jsonrpc": "2.0", "method": "test/saw_cancel", "params": request["params"]})
+            continue
+        if "id" not in request or wedged.is_set():
+            continue
+        if (request.get("params") or {}).get("name") == "wedge":
+            wedged.set()
+            continue
+        print("server log line: handling", request["method"], flush=True)
+        threading.Thread(target=handle, args=(request,), daemon=True).start()
+    """
+)
+
+INIT_PARAMS = {"protocolVersion": "2024-11-05", "capabilities": {}, "clientInfo": {"name": "test", "version": "1"}}
+
+
+@pytest.fixture
+def fake_server_command(tmp_path):
+    """Command line that runs FAKE_SERVER."""
+    script = tmp_path / "fake_mcp_server.py"
+    script.write_text(FAKE_SERVER)
+    return [sys.executable, str(script)]
+
+
+@pytest.fixture
+def quiet_mcp_logs():
+    """Silence stdout noise, stderr forwarding and recovery logging of MCP processes."""
+    from src.mcp.pool import McpServerPool
+    from src.mcp.transport import McpStdioTransport, StderrCapture
+
+    with patch.object(McpStdioTransport, "_log_noise"), patch.object(StderrCapture, "_log_line"), \
+            patch.object(McpServerPool, "_log_recovery"):
+        yield
+
+
+@pytest.fixture
+def make_pool(fake_server_command, quiet_mcp_logs):
+    """Factory for started and initialized pools of FAKE_SERVER replicas; closed after the test."""
+    from src.mcp.pool import McpServerPool
+    from src.mcp.transport import McpStdioTransport
+
+    pools = []
+
+    def make(replicas=1, sticky=False, factory=None):
+        pool = McpServerPool(
+            "fake",
+            factory or (lambda index: McpStdioTransport(f"fake#{index}", fake_server_command)),
+            replicas=replicas,
+            sticky=sticky,
+        )
+        pool.start_sync()
+        pool.initialize_sync(INIT_PARAMS, timeout_s=10)
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        pool.close_sync()
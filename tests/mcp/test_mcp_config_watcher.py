@@ -0,0 +1,85 @@
+"""
+Tests for the .mcp.json hot reload.
+
+Tests:
+- Diff of registered servers against a reloaded config (added, removed, changed)
+- Only start-relevant fields count as a change
+- The watcher reloads when the config file is saved; an empty file is ignored
+"""
+import json
+import time
+
+import pytest
+from unittest.mock import patch
+
+from src.config import settings
+from src.mcp.config_watcher import McpConfigWatcher, diff_configs
+from src.mcp.mcp_register_structure import Command
+
+
+def _server(name, **overrides):
+    config = {"name": name, "command": Command.NPX, "args": [f"{name}-pkg@1.0.0"], "env": {}, "headers": {}, "replicas": 1}
+    config.update(overrides)
+    return config
+
+
+class TestDiff:
+    """Test the config diff."""
+
+    def test_added_removed_and_changed(self):
+        current = {"fs": _server("fs"), "github": _server("github"), "memory": _server("memory")}
+        loaded = [_server("fs"), _server("github", args=["github-pkg@2.0.0"]), _server("search", url="http://x/mcp")]
+
+        diff = diff_configs(current, loaded)
+
+        assert diff.added == ["search"]
+        assert diff.removed == ["memory"]
+        assert diff.changed == ["github"]
+
+    def test_unchanged_config_is_empty(self):
+        current = {"fs": _server("fs", status="running", pid=42)}
+
+        assert diff_configs(current, [_server("fs")]).empty
+
+    @pytest.mark.parametrize(
+        "change",
+        [{"command": Command.UVX}, {"replicas": 2}, {"stateful": True}, {"headers": {"Authorization": "x"}}],
+    )
+    def test_start_fields_are_changes(self, change):
+        assert diff_configs({"fs": _server("fs")}, [_server("fs", **change)]).changed == ["fs"]
+
+    def test_env_and_defaults_are_not_changes(self):
+        current = {"fs": _server("fs", headers=None, replicas=None)}
+
+        assert diff_configs(current, [_server("fs", env={"TOKEN": "rotated"})]).empty
+
+
+class TestWatcher:
+    """Test reloading on file changes."""
+
+    def test_saving_the_file_triggers_a_reload(self, tmp_path):
+        config_path = tmp_path / ".mcp.json"
+        config_path.write_text(json.dumps({"servers": {}}))
+        with patch.dict(settings.MCP_CONFIG, {"MCP_CONFIG_PATH": config_path, "MCP_CONFIG_RELOAD_DEBOUNCE_MS": 50}), \
+                patch.object(McpConfigWatcher, "reload") as reload:
+            McpConfigWatcher.start()
+            try:
+                time.sleep(0.5)  # let the watcher subscribe
+                (tmp_path / "unrelated.txt").write_text("ignored")
+                config_path.write_text(json.dumps({"servers": {"fs": {"command": "npx"}}}))
+                deadline = time.monotonic() + 5
+                while not reload.called and time.monotonic() < deadline:
+                    time.sleep(0.05)
+            finally:
+                McpConfigWatcher.stop()
+
+        assert reload.called
+
+    def test_empty_file_is_ignored(self):
+        with patch("src.mcp.load_config.McpConfigFile.retrieve_config", return_value=None), \
+                patch("src.mcp.manager.MCP_Manager.apply_config") as apply_config, \
+                patch.object(McpConfigWatcher, "_log_invalid") as log_invalid:
+            assert McpConfigWatcher.reload() is None
+
+        apply_config.assert_not_called()
+        log_invalid.assert_called_once()
@@ -0,0 +1,110 @@
+"""
+Tests for the on-disk MCP tool discovery cache.
+
+Tests:
+- Package version extraction from npx/uvx args
+- Fingerprints change with command, args and package version, not with env values
+- Hits, misses, TTL expiry of unpinned packages and invalidation
+"""
+import time
+
+import pytest
+from unittest.mock import patch
+
+from src.config import settings
+from src.mcp.discovery_cache import McpDiscoveryCache
+from src.mcp.mcp_register_structure import Command
+
+TOOLS = [{"name": "read_file", "description": "Read a file", "inputSchema": {"type": "object", "properties": {}}}]
+
+
+@pytest.fixture(autouse=True)
+def cache_file(tmp_path):
+    path = tmp_path / "mcp_discovery_cache.json"
+    with patch.dict(
+        settings.MCP_CONFIG,
+        {"MCP_DISCOVERY_CACHE_PATH": path, "MCP_DISCOVERY_CACHE_TTL_HOURS": 24},
+    ):
+        yield path
+
+
+def _config(*args, **env):
+    return {"command": Command.NPX, "args": list(args), "env": env}
+
+
+class TestPackageVersion:
+    """Test version extraction from server args."""
+
+    @pytest.mark.parametrize(
+        "args, version",
+        [
+            (["-y", "@modelcontextprotocol/server-github@0.6.2"], "0.6.2"),
+            (["-y", "@modelcontextprotocol/server-github@latest"], None),
+            (["-y", "@modelcontextprotocol/server-github"], None),
+            (["mcp-server-git==2025.1.14"], "2025.1.14"),
+            (["server.py", "--port", "8080"], None),
+        ],
+    )
+    def test_package_version(self, args, version):
+        assert McpDiscoveryCache.package_version(args) == version
+
+
+class TestFingerprint:
+    """Test cache keys."""
+
+    def test_args_and_version_change_the_key(self):
+        base = McpDiscoveryCache.fingerprint(_config("-y", "pkg@1.0.0"))
+
+        assert McpDiscoveryCache.fingerprint(_config("-y", "pkg@1.0.1")) != base
+        assert McpDiscoveryCache.fingerprint(_config("-y", "pkg@1.0.0", "/workspace")) != base
+        assert McpDiscoveryCache.fingerprint({**_config("-y", "pkg@1.0.0"), "command": Command.UVX}) != base
+
+    def test_env_values_do_not_change_the_key(self):
+        old_token = McpDiscoveryCache.fingerprint(_config("pkg@1.0.0", TOKEN="a"))
+
+        assert McpDiscoveryCache.fingerprint(_config("pkg@1.0.0", TOKEN="b")) == old_token
+        assert McpDiscoveryCache.fingerprint(_config("pkg@1.0.0", OTHER="a")) != old_token
+
+
+class TestLoadAndStore:
+    """Test cache hits and misses."""
+
+    def test_miss_without_file(self):
+        assert McpDiscoveryCache.load("github", _config("pkg@1.0.0")) is None
+
+    def test_hit_after_store(self, cache_file):
+        McpDiscoveryCache.store("github", _config("pkg@1.0.0"), TOOLS, server_version="1.0.0")
+
+        assert cache_file.exists()
+        assert McpDiscoveryCache.load("github", _config("pkg@1.0.0")) == TOOLS
+
+    def test_changed_config_misses(self):
+        McpDiscoveryCache.store("github", _config("pkg@1.0.0"), TOOLS)
+
+        assert McpDiscoveryCache.load("github", _config("pkg@2.0.0")) is None
+
+    def test_unpinned_entries_expire(self):
+        McpDiscoveryCache.store("github", _config("pkg@latest"), TOOLS)
+        McpDiscoveryCache.store("pinned", _config("pkg@1.0.0"), TOOLS)
+
+        with patch("src.mcp.discovery_cache.time.time", return_value=time.time() + 25 * 3600):
+            assert McpDiscoveryCache.load("github", _config("pkg@latest")) is None
+            assert McpDiscoveryCache.load("pinned", _config("pkg@1.0.0")) == TOOLS
+
+    def test_invalidate(self):
+        McpDiscoveryCache.store("github", _config("pkg@1.0.0"), TOOLS)
+        McpDiscoveryCache.store("memory", _config("mem@1.0.0"), TOOLS)
+
+        McpDiscoveryCache.invalidate("github")
+        assert McpDiscoveryCache.load("github", _config("pkg@1.0.0")) is None
+        assert McpDiscoveryCache.load("memory", _config("mem@1.0.0")) == TOOLS
+
+        McpDiscoveryCache.invalidate()
+        assert McpDiscoveryCache.load("memory", _config("mem@1.0.0")) is None
+
+    def test_corrupt_file_is_a_miss(self, cache_file):
+        cache_file.write_text("{not json", encoding="utf-8")
+
+        assert McpDiscoveryCache.load("github", _config("pkg@1.0.0")) is None
+        McpDiscoveryCache.store("github", _config("pkg@1.0.0"), TOOLS)
+        assert McpDiscoveryCache.load("github", _config("pkg@1.0.0")) == TOOLS
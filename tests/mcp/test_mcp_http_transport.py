@@ -0,0 +1,189 @@
+"""
+Tests for the MCP streamable-HTTP transport.
+
+Runs a local HTTP MCP stand-in (http.server in a thread) that assigns session ids, answers with
+JSON or SSE streams and can expire sessions.
+
+Tests:
+- Session id assignment and reuse; DELETE on close
+- JSON and SSE responses; notifications inside an SSE stream
+- Keep-alive connection reuse across calls and sessions
+- Expired sessions and unreachable servers surface as ServerExited; the pool opens a new session
+"""
+import itertools
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from unittest.mock import patch
+
+from src.config import settings
+from src.mcp.http_transport import McpHttpTransport
+from src.mcp.pool import McpServerPool
+from src.mcp.transport import McpEventLoop, McpStdioTransport
+
+INIT_PARAMS = {"protocolVersion": "2025-03-26", "capabilities": {}, "clientInfo": {"name": "test", "version": "1"}}
+
+
+class StandIn:
+    """State of the fake server, shared by its request handlers."""
+
+    def __init__(self):
+        self.sessions: set[str] = set()
+        self.deleted: list[str] = []
+        self.connections: set[int] = set()
+        self.session_ids = itertools.count(1)
+        self.lock = threading.Lock()
+
+
+def make_handler(state: StandIn):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            state.connections.add(id(self.connection))
+            message = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            session = self.headers.get("Mcp-Session-Id")
+            if message.get("method") == "initialize":
+                with state.lock:
+                    session = f"session-{next(state.session_ids)}"
+                    state.sessions.add(session)
+                return self._json({"jsonrpc": "2.0", "id": message["id"], "result": {"serverInfo": {}}}, session)
+            if session not in state.sessions:
+                return self._reply(404, b"unknown session", "text/plain")
+            if "id" not in message:
+                return self._reply(202, b"", "text/plain")
+            if message["method"] == "tools/call" and message["params"]["name"] == "stream":
+                events = [
+                    {"jsonrpc": "2.0", "method": "notifications/progress", "params": {"progress": 1}},
+                    {"jsonrpc": "2.0", "id": message["id"], "result": {"session": session, "streamed": True}},
+                ]
+                body = "".join(f"event: message\ndata: {json.dumps(event)}\n\n" for event in events)
+                return self._reply(200, body.encode(), "text/event-stream")
+            return self._json({"jsonrpc": "2.0", "id": message["id"], "result": {"session": session}})
+
+        def do_DELETE(self):
+            session = self.headers.get("Mcp-Session-Id")
+            state.deleted.append(session)
+            state.sessions.discard(session)
+            self._reply(200, b"", "text/plain")
+
+        def _json(self, payload, session=None):
+            self._reply(200, json.dumps(payload).encode(), "application/json", session)
+
+        def _reply(self, status, body, content_type, session=None):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            if session:
+                self.send_header("Mcp-Session-Id", session)
+            self.end_headers()
+            self.wfile.write(body)
+
+    return Handler
+
+
+@pytest.fixture
+def stand_in():
+    state = StandIn()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    state.url = f"http://127.0.0.1:{server.server_address[1]}/mcp"
+    with patch.dict(
+        settings.MCP_CONFIG,
+        {"MCP_HTTP_MAX_CONNECTIONS": 4, "MCP_HTTP_KEEPALIVE_EXPIRY_S": 30, "MCP_HTTP_CONNECT_TIMEOUT_S": 2},
+    ):
+        yield state
+        McpEventLoop.run(McpHttpTransport.aclose_client())
+    server.shutdown()
+
+
+@pytest.fixture
+def transport(stand_in):
+    transport = McpHttpTransport("fake", stand_in.url)
+    transport.start_sync()
+    transport.request_sync("initialize", INIT_PARAMS, timeout_s=5)
+    yield transport
+    transport.close_sync()
+
+
+def _call(transport, name="echo"):
+    return transport.request_sync("tools/call", {"name": name, "arguments": {}}, timeout_s=5)["result"]
+
+
+class TestSession:
+    """Test MCP session handling."""
+
+    def test_initialize_assigns_a_session(self, transport):
+        assert transport.session_id == "session-1"
+        assert transport.running
+        assert transport.pid is None
+
+    def test_session_is_sent_with_every_call(self, transport):
+        transport.notify_sync("notifications/initialized")
+
+        assert _call(transport) == {"session": "session-1"}
+
+    def test_close_deletes_the_session(self, stand_in, transport):
+        transport.close_sync()
+
+        assert stand_in.deleted == ["session-1"]
+        assert not transport.running
+
+
+class TestResponses:
+    """Test JSON and SSE answers."""
+
+    def test_sse_stream_carries_notifications_and_the_response(self, transport):
+        seen = []
+        transport.add_notification_handler(lambda server, message: seen.append(message["method"]))
+
+        assert _call(transport, "stream") == {"session": "session-1", "streamed": True}
+        assert seen == ["notifications/progress"]
+
+    def test_connections_are_reused(self, stand_in, transport):
+        for _ in range(5):
+            _call(transport)
+        other = McpHttpTransport("other", stand_in.url)
+        other.start_sync()
+        other.request_sync("initialize", INIT_PARAMS, timeout_s=5)
+
+        assert len(stand_in.connections) == 1  # calls and sessions share the kept-alive connection
+        other.close_sync()
+
+
+class TestFailures:
+    """Test expired sessions and unreachable servers."""
+
+    def test_expired_session_surfaces_as_server_exited(self, stand_in, transport):
+        stand_in.sessions.clear()
+
+        with pytest.raises(McpStdioTransport.ServerExited):
+            _call(transport)
+        assert not transport.running
+
+    def test_unreachable_server_surfaces_as_server_exited(self):
+        transport = McpHttpTransport("gone", "http://127.0.0.1:9/mcp")
+        transport.start_sync()
+        with patch.dict(settings.MCP_CONFIG, {"MCP_HTTP_MAX_CONNECTIONS": 4, "MCP_HTTP_KEEPALIVE_EXPIRY_S": 30,
+                                              "MCP_HTTP_CONNECT_TIMEOUT_S": 2}):
+            with pytest.raises(McpStdioTransport.ServerExited):
+                transport.request_sync("initialize", INIT_PARAMS, timeout_s=5)
+
+    def test_pool_opens_a_new_session_after_expiry(self, stand_in):
+        pool = McpServerPool("fake", lambda index: McpHttpTransport(f"fake#{index}", stand_in.url))
+        pool.start_sync()
+        pool.initialize_sync(INIT_PARAMS, timeout_s=5)
+        pool.auto_recover = True
+        stand_in.sessions.clear()
+
+        with patch.object(McpServerPool, "_log_recovery"):
+            result = pool.request_sync("tools/call", {"name": "echo", "arguments": {}}, timeout_s=5)["result"]
+
+        assert result == {"session": "session-2"}
+        assert pool.recoveries == 1
+        pool.close_sync()
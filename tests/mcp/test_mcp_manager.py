@@ -5,6 +5,10 @@ Tests:
 - Server registration
 - Server starting/stopping
 - Server health validation
+- Stateful servers start a single replica
+- Tool rediscovery after a replica is recovered
+- Tools registered from the discovery cache and lazy server start
+- Incremental reconfiguration from a reloaded .mcp.json
 """
 import pytest
 from unittest.mock import Mock, patch, AsyncMock
@@ -112,6 +116,203 @@ class TestMCPServerHealth:
         assert True  # MCP_Manager exists
 
 
+class TestMCPReplicas:
+    """Test the replica count started per server."""
+
+    @pytest.fixture
+    def manager(self):
+        from src.mcp.manager import MCP_Manager
+        from src.mcp.mcp_register_structure import Command
+
+        original_servers = dict(MCP_Manager.mcp_servers)
+        MCP_Manager.add_server(name="plain", runner=Command.NPX, package=None, args=[], func=Mock(), replicas=3)
+        MCP_Manager.add_server(
+            name="stateful", runner=Command.NPX, package=None, args=[], func=Mock(), replicas=3, stateful=True
+        )
+        try:
+            yield MCP_Manager
+        finally:
+            MCP_Manager.mcp_servers = original_servers
+
+    def test_stateless_server_keeps_its_replicas(self, manager):
+        assert manager._replica_count("plain") == 3
+
+    def test_stateful_server_runs_one_replica(self, manager):
+        with patch("src.mcp.manager.debug_warning") as warning:
+            assert manager._replica_count("stateful") == 1
+
+        assert warning.call_args.kwargs["heading"] == "MCP • REPLICAS_IGNORED"
+
+
+class TestMCPRecovery:
+    """Test tool rediscovery after the pool replaced a replica."""
+
+    def test_recovered_server_is_rediscovered(self):
+        import threading
+
+        from src.mcp.manager import MCP_Manager
+
+        discovered = threading.Event()
+        with patch.dict(MCP_Manager.running_servers, {"recovered": Mock()}), \
+                patch.object(MCP_Manager, "tool_discovery", side_effect=lambda name: discovered.set()) as discovery:
+            MCP_Manager._rediscover("recovered", 0)
+            assert discovered.wait(2)
+
+        discovery.assert_called_once_with("recovered")
+
+    def test_stopped_server_is_not_rediscovered(self):
+        from src.mcp.manager import MCP_Manager
+
+        with patch.object(MCP_Manager, "tool_discovery") as discovery:
+            MCP_Manager._rediscover("not_running", 0)
+
+        discovery.assert_not_called()
+
+
+class TestMCPLazyStart:
+    """Test cached tool registration and lazy start."""
+
+    @pytest.fixture
+    def lazy_server(self):
+        from src.mcp.manager import MCP_Manager
+        from src.mcp.mcp_register_structure import Command
+
+        original_servers = dict(MCP_Manager.mcp_servers)
+        original_lazy = set(MCP_Manager.lazy_servers)
+        MCP_Manager.add_server(name="lazy_server", runner=Command.NPX, package=None, args=["pkg@1.0.0"], func=Mock())
+        try:
+            yield MCP_Manager
+        finally:
+            MCP_Manager.mcp_servers = original_servers
+            MCP_Manager.lazy_servers = original_lazy
+
+    def test_cache_miss_registers_nothing(self, lazy_server):
+        with patch("src.mcp.manager.McpDiscoveryCache.load", return_value=None), \
+                patch("src.mcp.manager.DynamicToolRegister.register_tool") as register:
+            assert lazy_server.register_cached_tools("lazy_server") is False
+
+        register.assert_not_called()
+        assert "lazy_server" not in lazy_server.lazy_servers
+
+    def test_cache_hit_registers_without_starting(self, lazy_server):
+        tools = [{"name": "lazy_tool", "description": "d", "inputSchema": {"type": "object"}}]
+        with patch("src.mcp.manager.McpDiscoveryCache.load", return_value=tools), \
+                patch("src.mcp.manager.DynamicToolRegister.register_tool") as register, \
+                patch.object(lazy_server, "start_server") as start:
+            assert lazy_server.register_cached_tools("lazy_server") is True
+
+        register.assert_called_once()
+        start.assert_not_called()
+        assert "lazy_server" in lazy_server.lazy_servers
+        assert lazy_server.mcp_servers["lazy_server"]["status"] == "stopped"
+
+    def test_first_call_starts_the_server_once(self, lazy_server):
+        lazy_server.lazy_servers.add("lazy_server")
+
+        def start(name):
+            lazy_server.mcp_servers[name]["status"] = "running"
+            return True
+
+        with patch.object(lazy_server, "start_server", side_effect=start) as start_server:
+            assert lazy_server.ensure_running("lazy_server") is True
+            assert lazy_server.ensure_running("lazy_server") is True
+
+        start_server.assert_called_once_with("lazy_server")
+
+    def test_unregistered_stopped_server_is_not_started(self, lazy_server):
+        with patch.object(lazy_server, "start_server") as start_server:
+            assert lazy_server.ensure_running("lazy_server") is False
+
+        start_server.assert_not_called()
+
+
+class TestMCPHotReload:
+    """Test apply_config: only added, removed and changed servers are touched."""
+
+    @pytest.fixture
+    def manager(self):
+        from src.mcp.manager import MCP_Manager
+        from src.mcp.mcp_register_structure import Command
+        from src.mcp.routing import McpRoutingTable
+
+        original_servers = dict(MCP_Manager.mcp_servers)
+        MCP_Manager.mcp_servers = {}
+        for name in ("keep", "drop", "edit"):
+            MCP_Manager.add_server(name=name, runner=Command.NPX, package=None, args=[f"{name}@1.0.0"], func=Mock())
+            McpRoutingTable.update_server(name, [f"{name}_tool"])
+        try:
+            with patch("src.mcp.manager.McpDiscoveryCache.invalidate"), \
+                    patch("src.utils.context_window.ContextWindow.invalidate_tool_catalogues"):
+                yield MCP_Manager
+        finally:
+            for name in ("keep", "drop", "edit", "new"):
+                McpRoutingTable.remove_server(name)
+            MCP_Manager.mcp_servers = original_servers
+
+    @staticmethod
+    def _config(name, version="1.0.0"):
+        from src.mcp.mcp_register_structure import Command
+
+        return {"name": name, "command": Command.NPX, "args": [f"{name}@{version}"], "env": {}, "wrapper": Mock()}
+
+    def test_only_affected_servers_are_touched(self, manager):
+        with patch.object(manager, "start_server") as start, \
+                patch.object(manager, "register_cached_tools", return_value=False), \
+                patch("src.mcp.manager.DynamicToolRegister.unregister_tools") as unregister:
+            diff = manager.apply_config([self._config("keep"), self._config("edit", "2.0.0"), self._config("new")])
+
+        assert diff.as_dict() == {"added": ["new"], "removed": ["drop"], "changed": ["edit"]}
+        assert sorted(call.args[0] for call in start.call_args_list) == ["edit", "new"]
+        unregistered = [name for call in unregister.call_args_list for name in call.args[0]]
+        assert sorted(unregistered) == ["drop_tool", "edit_tool"]
+        assert set(manager.mcp_servers) == {"keep", "edit", "new"}
+        assert manager.mcp_servers["edit"]["args"] == ["edit@2.0.0"]
+
+    def test_removed_server_is_stopped_and_unrouted(self, manager):
+        from src.mcp.routing import McpRoutingTable
+
+        manager.running_servers["drop"] = Mock()
+        with patch.object(manager, "stop_server", side_effect=lambda name: manager.running_servers.pop(name)) as stop, \
+                patch("src.mcp.manager.DynamicToolRegister.unregister_tools"):
+            manager.apply_config([self._config("keep"), self._config("edit")])
+
+        stop.assert_called_once_with("drop")
+        assert McpRoutingTable.resolve("drop_tool") is None
+        assert McpRoutingTable.resolve("keep_tool") == ("keep", "keep_tool")
+
+    def test_reregistered_tools_replace_and_unregister_from_the_agent_list(self):
+        from src.mcp.dynamically_tool_register import DynamicToolRegister
+        from src.tools.lggraph_tools.tool_assign import ToolAssign
+
+        def tools_list(version):
+            schema = {"type": "object", "properties": {}}
+            return {"result": {"tools": [{"name": "hot_tool", "description": version, "inputSchema": schema}]}}
+
+        original_registered = list(DynamicToolRegister.tool_list)
+        original_assigned = getattr(ToolAssign, "_tool_list", None)
+        ToolAssign._tool_list = []
+        try:
+            DynamicToolRegister.register_tool(tools_list("v1"), Mock())
+            DynamicToolRegister.register_tool(tools_list("v2"), Mock())
+
+            registered = [tool for tool in DynamicToolRegister.tool_list if tool.name == "hot_tool"]
+            assert [tool.description.strip() for tool in registered] == ["v2"]
+            assert [tool.name for tool in ToolAssign._tool_list] == ["hot_tool"]
+
+            DynamicToolRegister.unregister_tools(["hot_tool"])
+            assert all(tool.name != "hot_tool" for tool in DynamicToolRegister.tool_list)
+            assert ToolAssign._tool_list == []
+        finally:
+            DynamicToolRegister.tool_list[:] = original_registered
+            ToolAssign._tool_list = original_assigned
+
+    def test_unchanged_config_does_nothing(self, manager):
+        with patch.object(manager, "start_server") as start, patch.object(manager, "remove_server") as remove:
+            assert manager.apply_config([self._config(name) for name in ("keep", "drop", "edit")]).empty
+
+        start.assert_not_called()
+        remove.assert_not_called()
+
 
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
@@ -0,0 +1,197 @@
+"""
+Tests for the in-process filesystem tools.
+
+Tests:
+- Which calls are served natively (server package, tool list setting, HTTP servers)
+- read_text_file head/tail, from memory and from a memory map
+- write_file, list_directory, search_files and directory_tree results
+- The sandbox: relative escapes, outside paths and symlinks leading out
+- call_mcp_server serves native tools without starting the server
+"""
+import json
+import os
+
+import pytest
+from unittest.mock import Mock, patch
+
+from src.config import settings
+from src.mcp import native_filesystem
+from src.mcp.native_filesystem import NativeFilesystem
+
+ALL_TOOLS = ["read_text_file", "read_file", "write_file", "list_directory", "search_files", "directory_tree"]
+
+
+def _config(*directories):
+    return {
+        "name": "filesystem",
+        "command": "npx",
+        "args": ["-y", "@modelcontextprotocol/server-filesystem", *map(str, directories)],
+    }
+
+
+@pytest.fixture
+def sandbox(tmp_path):
+    root = tmp_path / "sandbox"
+    (root / "src" / "pkg").mkdir(parents=True)
+    (root / "src" / "main.py").write_text("print('hi')\n")
+    (root / "src" / "pkg" / "util.py").write_text("x = 1\n")
+    (root / "notes.md").write_text("one\ntwo\nthree\nfour\n")
+    (root / "node_modules").mkdir()
+    (root / "node_modules" / "dep.js").write_text("")
+    (tmp_path / "secret.txt").write_text("outside")
+    # the sandbox is the project root: relative paths resolve against it
+    with patch.dict(settings.MCP_CONFIG, {"MCP_NATIVE_FILESYSTEM_TOOLS": ALL_TOOLS}), \
+            patch.object(settings, "BASE_DIR", root / "src"):
+        yield root
+
+
+def _text(sandbox, tool, **args):
+    result = NativeFilesystem.call(_config(sandbox), tool, args)
+    assert not result.get("isError"), result
+    return result["content"][0]["text"]
+
+
+def _error(sandbox, tool, **args):
+    result = NativeFilesystem.call(_config(sandbox), tool, args)
+    assert result["isError"] is True
+    return result["content"][0]["text"]
+
+
+class TestServes:
+    """Test which calls are handled in-process."""
+
+    def test_filesystem_server_tools(self, sandbox):
+        assert NativeFilesystem.serves(_config(sandbox), "read_text_file")
+        assert not NativeFilesystem.serves(_config(sandbox), "move_file")
+
+    def test_other_servers_and_http_servers(self, sandbox):
+        assert not NativeFilesystem.serves({"args": ["@modelcontextprotocol/server-memory"]}, "read_text_file")
+        assert not NativeFilesystem.serves({**_config(sandbox), "url": "http://x/mcp"}, "read_text_file")
+
+    def test_setting_limits_the_tools(self, sandbox):
+        with patch.dict(settings.MCP_CONFIG, {"MCP_NATIVE_FILESYSTEM_TOOLS": ["list_directory"]}):
+            assert NativeFilesystem.serves(_config(sandbox), "list_directory")
+            assert not NativeFilesystem.serves(_config(sandbox), "read_text_file")
+
+
+class TestRead:
+    """Test read_text_file."""
+
+    def test_whole_file(self, sandbox):
+        assert _text(sandbox, "read_text_file", path=str(sandbox / "notes.md")) == "one\ntwo\nthree\nfour\n"
+        assert _text(sandbox, "read_file", path=str(sandbox / "notes.md")) == "one\ntwo\nthree\nfour\n"
+
+    @pytest.mark.parametrize("threshold", [1024 * 1024, 1])  # read into memory / memory map
+    def test_head_and_tail(self, sandbox, threshold):
+        path = str(sandbox / "notes.md")
+        with patch.object(native_filesystem, "MMAP_THRESHOLD_BYTES", threshold):
+            assert _text(sandbox, "read_text_file", path=path, head=2) == "one\ntwo"
+            assert _text(sandbox, "read_text_file", path=path, tail=2) == "three\nfour"
+            assert _text(sandbox, "read_text_file", path=path, head=10) == "one\ntwo\nthree\nfour"
+            assert _text(sandbox, "read_text_file", path=path, tail=0) == ""
+
+    def test_head_and_tail_together_is_an_error(self, sandbox):
+        message = _error(sandbox, "read_text_file", path=str(sandbox / "notes.md"), head=1, tail=1)
+
+        assert "both head and tail" in message
+
+
+class TestWriteAndList:
+    """Test write_file and list_directory."""
+
+    def test_write_file(self, sandbox):
+        path = sandbox / "src" / "new.txt"
+
+        assert _text(sandbox, "write_file", path=str(path), content="a\r\nb") == f"Successfully wrote to {path}"
+        assert path.read_bytes() == b"a\r\nb"
+
+    def test_list_directory(self, sandbox):
+        assert _text(sandbox, "list_directory", path=str(sandbox)) == (
+            "[DIR] node_modules\n[FILE] notes.md\n[DIR] src"
+        )
+
+
+class TestSearchAndTree:
+    """Test search_files and directory_tree."""
+
+    def test_substring_search_is_case_insensitive(self, sandbox):
+        found = _text(sandbox, "search_files", path=str(sandbox), pattern="UTIL")
+
+        assert found == str(sandbox / "src" / "pkg" / "util.py")
+
+    def test_glob_search_with_exclude(self, sandbox):
+        found = _text(sandbox, "search_files", path=str(sandbox), pattern="**/*.*", excludePatterns=["node_modules"])
+
+        assert found.splitlines() == [
+            str(sandbox / "src" / "main.py"),
+            str(sandbox / "src" / "pkg" / "util.py"),
+        ]
+
+    def test_no_matches(self, sandbox):
+        assert _text(sandbox, "search_files", path=str(sandbox), pattern="missing") == "No matches found"
+
+    def test_directory_tree(self, sandbox):
+        tree = json.loads(_text(sandbox, "directory_tree", path=str(sandbox / "src")))
+
+        assert tree == [
+            {"name": "main.py", "type": "file"},
+            {"name": "pkg", "type": "directory", "children": [{"name": "util.py", "type": "file"}]},
+        ]
+
+
+class TestSandbox:
+    """Test that paths stay inside the allowed directories."""
+
+    def test_relative_escape(self, sandbox):
+        message = _error(sandbox, "read_text_file", path=str(sandbox / ".." / "secret.txt"))
+
+        assert message.startswith("Error: Access denied - path outside allowed directories")
+
+    def test_outside_directory(self, sandbox):
+        assert "Access denied" in _error(sandbox, "list_directory", path=str(sandbox.parent))
+        assert "Access denied" in _error(sandbox, "write_file", path=str(sandbox.parent / "x.txt"), content="")
+
+    def test_symlink_leading_out(self, sandbox):
+        (sandbox / "link.txt").symlink_to(sandbox.parent / "secret.txt")
+
+        assert "symlink target outside" in _error(sandbox, "read_text_file", path=str(sandbox / "link.txt"))
+        assert "No matches found" == _text(sandbox, "search_files", path=str(sandbox), pattern="link")
+
+    def test_relative_paths_use_the_project_root(self, sandbox):
+        assert NativeFilesystem.allowed_directories(_config("src")) == [
+            os.path.normcase(os.path.realpath(sandbox / "src"))
+        ]
+        assert json.loads(_text(sandbox, "directory_tree", path="src/pkg")) == [{"name": "util.py", "type": "file"}]
+
+
+class TestManagerRouting:
+    """Test that call_mcp_server serves native tools without the server."""
+
+    @pytest.fixture
+    def manager(self, sandbox):
+        from src.mcp.manager import MCP_Manager
+        from src.mcp.mcp_register_structure import Command
+
+        original_servers = dict(MCP_Manager.mcp_servers)
+        MCP_Manager.add_server(
+            name="filesystem", runner=Command.NPX, package=None,
+            args=["-y", "@modelcontextprotocol/server-filesystem", str(sandbox)], func=Mock(),
+        )
+        try:
+            yield MCP_Manager
+        finally:
+            MCP_Manager.mcp_servers = original_servers
+
+    def test_native_tool_does_not_start_the_server(self, manager, sandbox):
+        with patch.object(manager, "ensure_running") as ensure_running:
+            response = manager.call_mcp_server("filesystem", "read_text_file", {"path": str(sandbox / "notes.md"), "head": 1})
+
+        assert response == {"success": True, "data": {"content": [{"type": "text", "text": "one"}]}}
+        ensure_running.assert_not_called()
+
+    def test_other_tools_go_to_the_server(self, manager):
+        with patch.object(manager, "ensure_running", return_value=False) as ensure_running:
+            response = manager.call_mcp_server("filesystem", "move_file", {"source": "a", "destination": "b"})
+
+        ensure_running.assert_called_once_with("filesystem")
+        assert response["success"] is False
@@ -0,0 +1,110 @@
+"""
+Tests for replicated MCP server pools.
+
+Runs several replicas of the fake MCP server from conftest.py, which answers with its own
+pid, so every reply tells which replica served it.
+
+Tests:
+- Every replica is started and initialized
+- Concurrent calls spread over the least-loaded replicas; dead replicas are skipped
+- Sticky pools route one affinity key to one replica
+- Per-replica stats (calls, queue depth, latency) and the report
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.mcp.pool import McpServerPool
+from src.mcp.transport import McpStdioTransport
+
+
+def _call(pool, seconds=0.0, affinity=None):
+    reply = pool.request_sync("tools/call", {"name": "t", "arguments": {"seconds": seconds}}, timeout_s=10, affinity=affinity)
+    return reply["result"]["pid"]
+
+
+class TestStartup:
+    """Test starting and initializing the replicas."""
+
+    def test_every_replica_is_running(self, make_pool):
+        pool = make_pool(replicas=3)
+
+        assert pool.healthy == [0, 1, 2]
+        assert len({replica.pid for replica in pool.replicas}) == 3
+        assert pool.pid == pool.replicas[0].pid
+
+    def test_replicas_default_to_one(self, make_pool):
+        pool = make_pool(replicas=0)
+
+        assert len(pool.replicas) == 1
+        assert _call(pool) == pool.pid
+
+
+class TestLoadBalancing:
+    """Test least-loaded dispatch."""
+
+    def test_concurrent_calls_use_every_replica(self, make_pool):
+        pool = make_pool(replicas=3)
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            pids = list(executor.map(lambda _: _call(pool, seconds=0.5), range(3)))
+
+        assert sorted(pids) == sorted(replica.pid for replica in pool.replicas)
+        assert all(stats.max_in_flight == 1 for stats in pool.stats)
+
+    def test_dead_replica_is_skipped(self, make_pool):
+        pool = make_pool(replicas=2)
+        pool.replicas[1].close_sync()
+
+        assert pool.healthy == [0]
+        assert {_call(pool) for _ in range(3)} == {pool.replicas[0].pid}
+
+    def test_no_running_replica_raises(self, make_pool):
+        pool = make_pool(replicas=2)
+        for replica in pool.replicas:
+            replica.close_sync()
+
+        with pytest.raises(McpStdioTransport.ServerExited):
+            _call(pool)
+
+
+class TestStickyRouting:
+    """Test affinity routing of stateful servers."""
+
+    def test_same_key_same_replica(self, make_pool):
+        pool = make_pool(replicas=3, sticky=True)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            pids = list(executor.map(lambda _: _call(pool, seconds=0.1, affinity="branch-1"), range(4)))
+
+        assert len(set(pids)) == 1
+
+    def test_calls_without_key_go_to_primary(self, make_pool):
+        pool = make_pool(replicas=3, sticky=True)
+
+        assert {_call(pool) for _ in range(3)} == {pool.pid}
+
+    def test_affinity_context_sets_key(self, make_pool):
+        pool = make_pool(replicas=3, sticky=True)
+        key = next(key for key in ("a", "b", "c", "d", "e") if _call(pool, affinity=key) != pool.pid)
+
+        with McpServerPool.affinity(key):
+            assert _call(pool) == _call(pool, affinity=key) != pool.pid
+        assert _call(pool) == pool.pid
+
+
+class TestReport:
+    """Test per-replica stats."""
+
+    def test_report_counts_calls_and_latency(self, make_pool):
+        pool = make_pool(replicas=2)
+        for _ in range(4):
+            _call(pool, seconds=0.05)
+
+        report = pool.report()
+
+        assert report["healthy"] == 2
+        assert report["start_errors"] == []
+        assert sum(replica["calls"] for replica in report["replicas"]) == 4
+        assert all(replica["in_flight"] == 0 for replica in report["replicas"])
+        assert all(replica["avg_latency_ms"] >= 50 for replica in report["replicas"] if replica["calls"])
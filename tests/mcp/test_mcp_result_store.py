@@ -0,0 +1,110 @@
+"""
+Tests for the MCP result cap and blob store.
+
+Tests:
+- Small results pass through unchanged
+- Oversized results are stored whole on disk and replaced by a preview with the blob path
+- tools/call and resources/read shapes, isError and non-text items in the preview
+- Blob retention and log digests
+"""
+import hashlib
+import json
+import time
+from pathlib import Path
+
+import pytest
+from unittest.mock import patch
+
+from src.config import settings
+from src.mcp.result_store import McpResultStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    with patch.dict(
+        settings.MCP_CONFIG,
+        {
+            "MCP_RESULT_MAX_KB": 1,
+            "MCP_RESULT_PREVIEW_KB": 0.25,
+            "MCP_RESULT_BLOB_DIR": tmp_path / "blobs",
+            "MCP_RESULT_BLOB_MAX_FILES": 2,
+        },
+    ), patch.object(McpResultStore, "_log_capped"):
+        yield tmp_path / "blobs"
+
+
+def _text_result(size, **extra):
+    return {"content": [{"type": "text", "text": "x" * size}], **extra}
+
+
+class TestCap:
+    """Test capping of tool results."""
+
+    def test_small_result_is_unchanged(self, store):
+        result = _text_result(1000)
+
+        assert McpResultStore.cap("fs", "read_file", result) is result
+        assert not store.exists()
+
+    def test_large_result_is_stored_and_previewed(self, store):
+        result = _text_result(5000)
+
+        capped = McpResultStore.cap("fs", "directory_tree", result)
+
+        text = capped["content"][0]["text"]
+        assert text.startswith("x" * 256) and "x" * 257 not in text
+        blob = capped["_meta"]["blob"]
+        assert blob["path"] in text
+        stored = Path(blob["path"]).read_bytes()
+        assert json.loads(stored) == result
+        assert blob["sha256"] == hashlib.sha256(stored).hexdigest()
+        assert blob["bytes"] == len(stored)
+
+    def test_error_flag_is_kept(self, store):
+        capped = McpResultStore.cap("fs", "search_files", _text_result(5000, isError=True))
+
+        assert capped["isError"] is True
+
+    def test_resources_keep_their_shape(self, store):
+        result = {"contents": [{"uri": "file:///big.log", "mimeType": "text/plain", "text": "y" * 5000}]}
+
+        capped = McpResultStore.cap("fs", "file:///big.log", result)
+
+        assert capped["contents"][0]["uri"] == "file:///big.log"
+        assert capped["contents"][0]["text"].startswith("y" * 256)
+
+    def test_binary_items_are_omitted_from_the_preview(self, store):
+        result = {"content": [{"type": "image", "mimeType": "image/png", "data": "A" * 5000}]}
+
+        capped = McpResultStore.cap("browser", "screenshot", result)
+
+        assert capped["content"][0]["text"].startswith("[image/png content omitted]")
+        assert "AAAA" not in capped["content"][0]["text"]
+
+    def test_disabled_cap(self, store):
+        result = _text_result(5000)
+        with patch.dict(settings.MCP_CONFIG, {"MCP_RESULT_MAX_KB": 0}):
+            assert McpResultStore.cap("fs", "read_file", result) is result
+
+
+class TestBlobs:
+    """Test blob retention and digests."""
+
+    def test_only_the_newest_blobs_are_kept(self, store):
+        paths = []
+        for size in range(3):
+            paths.append(McpResultStore.store("fs", _text_result(10 + size))["path"])
+            time.sleep(0.01)  # distinct modification times
+
+        assert sorted(str(path) for path in store.glob("*.json")) == sorted(paths[1:])
+        assert not list(store.glob("*.tmp"))
+
+    def test_describe_gives_size_and_hash(self):
+        arguments = {"path": "notes.md", "content": "hello"}
+        encoded = json.dumps(arguments, ensure_ascii=False).encode("utf-8")
+
+        assert McpResultStore.describe(arguments) == {
+            "bytes": len(encoded),
+            "sha256": hashlib.sha256(encoded).hexdigest()[:16],
+        }
+        assert McpResultStore.describe("abc")["bytes"] == 3
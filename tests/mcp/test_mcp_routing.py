@@ -0,0 +1,75 @@
+"""
+Tests for the MCP tool-to-server routing table.
+
+Tests:
+- Routes built from tools/list names resolve with one lookup
+- Name conflicts across servers are namespaced as <server>__<tool>
+- A restarting server rebuilds only its own routes
+"""
+import pytest
+
+from src.mcp.routing import McpRoutingTable
+
+
+@pytest.fixture(autouse=True)
+def table():
+    McpRoutingTable.clear()
+    yield McpRoutingTable
+    McpRoutingTable.clear()
+
+
+class TestResolve:
+    """Test plain routes."""
+
+    def test_reported_tools_resolve_to_their_server(self):
+        exposed = McpRoutingTable.update_server("filesystem", ["read_file", "write_file"])
+
+        assert exposed == {"read_file": "read_file", "write_file": "write_file"}
+        assert McpRoutingTable.resolve("read_file") == ("filesystem", "read_file")
+        assert McpRoutingTable.servers() == {"filesystem": ["read_file", "write_file"]}
+
+    def test_unknown_tool_is_none(self):
+        McpRoutingTable.update_server("filesystem", ["read_file"])
+
+        assert McpRoutingTable.resolve("create_issue") is None
+
+
+class TestConflicts:
+    """Test namespacing of tools offered by several servers."""
+
+    def test_later_server_is_namespaced(self):
+        McpRoutingTable.update_server("filesystem", ["read_file"])
+        exposed = McpRoutingTable.update_server("github", ["read_file", "create_issue"])
+
+        assert exposed == {"read_file": "github__read_file", "create_issue": "create_issue"}
+        assert McpRoutingTable.resolve("read_file") == ("filesystem", "read_file")
+        assert McpRoutingTable.resolve("github__read_file") == ("github", "read_file")
+        assert McpRoutingTable.resolve("filesystem__read_file") == ("filesystem", "read_file")
+        assert McpRoutingTable.conflicts() == {"read_file": ["filesystem", "github"]}
+
+    def test_removed_owner_hands_plain_name_over(self):
+        McpRoutingTable.update_server("filesystem", ["read_file"])
+        McpRoutingTable.update_server("github", ["read_file"])
+
+        McpRoutingTable.remove_server("filesystem")
+
+        assert McpRoutingTable.resolve("read_file") == ("github", "read_file")
+        assert McpRoutingTable.resolve("github__read_file") == ("github", "read_file")
+        assert McpRoutingTable.resolve("filesystem__read_file") is None
+
+
+class TestIncrementalRebuild:
+    """Test re-reporting tools after a restart."""
+
+    def test_restart_keeps_ownership_and_other_servers(self):
+        McpRoutingTable.update_server("filesystem", ["read_file", "old_tool"])
+        McpRoutingTable.update_server("github", ["read_file", "create_issue"])
+
+        exposed = McpRoutingTable.update_server("filesystem", ["read_file", "new_tool"])
+
+        assert exposed == {"read_file": "read_file", "new_tool": "new_tool"}
+        assert McpRoutingTable.resolve("old_tool") is None
+        assert McpRoutingTable.resolve("new_tool") == ("filesystem", "new_tool")
+        assert McpRoutingTable.resolve("read_file") == ("filesystem", "read_file")
+        assert McpRoutingTable.resolve("create_issue") == ("github", "create_issue")
+        assert McpRoutingTable.resolve("github__read_file") == ("github", "read_file")
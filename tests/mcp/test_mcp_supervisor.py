@@ -0,0 +1,166 @@
+"""
+Tests for MCP server recovery: the supervisor, call retries and the warm standby.
+
+Runs the fake MCP server from conftest.py, which answers ping and can crash or hang.
+
+Tests:
+- A call whose process dies is retried once on a fresh process
+- Health checks replace exited and wedged replicas
+- Recovery handlers run after a replica is replaced
+- Failover to the warm standby
+- Restart backoff when a replacement cannot start
+"""
+import time
+
+import pytest
+from unittest.mock import patch
+
+from src.config import settings
+from src.mcp.supervisor import McpSupervisor
+from src.mcp.transport import McpEventLoop, McpStdioTransport
+
+
+@pytest.fixture(autouse=True)
+def _quiet_supervisor():
+    with patch.object(McpSupervisor, "_log_restart"), \
+            patch.dict(settings.MCP_CONFIG, {"MCP_HEALTH_CHECK_TIMEOUT_S": 0.5, "MCP_RESTART_BACKOFF_MAX_S": 60}):
+        yield
+
+
+def _call(pool, name="echo", **arguments):
+    return pool.request_sync("tools/call", {"name": name, "arguments": arguments}, timeout_s=5)["result"]["pid"]
+
+
+def _check(pool):
+    McpEventLoop.run(McpSupervisor.check("fake", pool))
+
+
+def _wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.05)
+
+
+class TestCallRetry:
+    """Test the transparent retry of calls that lose their process."""
+
+    def test_crashed_call_is_retried_on_a_fresh_process(self, make_pool, tmp_path):
+        pool = make_pool()
+        pool.auto_recover = True
+        old_pid = pool.pid
+
+        new_pid = _call(pool, "crash_once", marker=str(tmp_path / "crashed"))
+
+        assert new_pid != old_pid
+        assert pool.recoveries == 1
+        assert pool.stats[0].errors == 1
+
+    def test_without_recovery_the_crash_surfaces(self, make_pool, tmp_path):
+        pool = make_pool()
+
+        with pytest.raises(McpStdioTransport.ServerExited):
+            _call(pool, "crash_once", marker=str(tmp_path / "crashed"))
+
+    def test_dead_server_is_recovered_before_the_call(self, make_pool):
+        pool = make_pool()
+        pool.auto_recover = True
+        pool.primary.close_sync()
+
+        assert _call(pool) == pool.pid
+
+    def test_dead_sticky_server_is_recovered_before_the_call(self, make_pool):
+        pool = make_pool()
+        pool.sticky = True
+        pool.auto_recover = True
+        old_pid = pool.pid
+        pool.primary.close_sync()
+
+        assert _call(pool) == pool.pid != old_pid
+
+
+class TestHealthChecks:
+    """Test supervisor checks."""
+
+    def test_exited_replica_is_replaced(self, make_pool):
+        pool = make_pool(replicas=2)
+        old_pid = pool.replicas[1].pid
+        pool.replicas[1].process.kill()
+        _wait_for(lambda: not pool.replicas[1].running)
+
+        _check(pool)
+
+        assert pool.healthy == [0, 1]
+        assert pool.replicas[1].pid != old_pid
+
+    def test_recovery_handlers_run_after_replacement(self, make_pool):
+        pool = make_pool(replicas=2)
+        recovered = []
+        pool.add_recovery_handler(lambda server, index: recovered.append((server, index, pool.replicas[index].pid)))
+
+        McpEventLoop.run(pool.recover(1))
+
+        assert recovered == [("fake", 1, pool.replicas[1].pid)]
+
+    def test_wedged_replica_is_replaced(self, make_pool):
+        pool = make_pool()
+        old_pid = pool.pid
+        with pytest.raises(McpStdioTransport.CallTimeout):
+            pool.request_sync("tools/call", {"name": "wedge", "arguments": {}}, timeout_s=0.2)
+
+        _check(pool)
+
+        assert pool.pid != old_pid
+        assert _call(pool) == pool.pid
+
+    def test_healthy_replicas_are_left_alone(self, make_pool):
+        pool = make_pool(replicas=2)
+        pids = [replica.pid for replica in pool.replicas]
+
+        _check(pool)
+
+        assert [replica.pid for replica in pool.replicas] == pids
+        assert pool.recoveries == 0
+
+
+class TestStandby:
+    """Test failover to the warm standby."""
+
+    def test_failover_uses_the_standby(self, make_pool):
+        pool = make_pool()
+        pool.auto_recover = True
+        pool.enable_standby()
+        _wait_for(lambda: pool.standby is not None and pool.standby.running)
+        standby_pid = pool.standby.pid
+
+        pool.primary.process.kill()
+        _wait_for(lambda: not pool.primary.running)
+
+        assert _call(pool) == standby_pid
+        assert pool.failovers == 1
+        _wait_for(lambda: pool.standby is not None and pool.standby.running)  # refilled in the background
+        assert pool.standby.pid != standby_pid
+
+
+class TestBackoff:
+    """Test restart backoff."""
+
+    def test_failed_restart_is_not_retried_before_backoff(self, make_pool, fake_server_command, tmp_path):
+        spawned = []
+
+        def factory(index):
+            # only the first process can start; replacements fail
+            command = fake_server_command if not spawned else [str(tmp_path / "missing")]
+            spawned.append(index)
+            return McpStdioTransport(f"fake#{index}", command)
+
+        pool = make_pool(factory=factory)
+        pool.primary.process.kill()
+        _wait_for(lambda: not pool.primary.running)
+
+        _check(pool)
+        _check(pool)
+
+        assert len(spawned) == 2  # one failed restart; the second check is inside the backoff
+        assert McpSupervisor._failures[("fake", 0)] == 1
+        McpSupervisor.unwatch("fake")
@@ -0,0 +1,141 @@
+"""
+Tests for the multiplexed MCP stdio transport.
+
+Runs the fake MCP server from conftest.py, which logs to stdout, answers out of order,
+sends notifications and can hang.
+
+Tests:
+- Responses are routed by id, so concurrent calls overlap
+- Log lines and notifications never corrupt a reply
+- Per-call timeouts send notifications/cancelled; a server exit fails pending calls
+- stderr draining, the bounded stderr buffer and rate-limited forwarding
+- Replies larger than the stream buffer; oversized replies fail their call
+"""
+import asyncio
+import time
+
+import pytest
+from src.mcp.transport import McpEventLoop, McpStdioTransport, StderrCapture
+
+@pytest.fixture
+def transport(fake_server_command, quiet_mcp_logs):
+    transport = McpStdioTransport("fake", fake_server_command)
+    transport.start_sync()
+    yield transport
+    transport.close_sync()
+
+
+def _call(transport, name, timeout_s=5, **arguments):
+    return transport.request_sync("tools/call", {"name": name, "arguments": arguments}, timeout_s=timeout_s)
+
+
+class TestMultiplexing:
+    """Test routing of responses by id."""
+
+    def test_reply_matches_request_despite_log_lines(self, transport):
+        reply = _call(transport, "echo", text="hi")
+
+        assert (reply["result"]["content"], reply["result"]["args"]) == ("echo", {"text": "hi"})
+        assert transport.skipped_lines >= 1
+
+    def test_concurrent_calls_overlap(self, transport):
+        async def both():
+            return await asyncio.gather(
+                transport.request("tools/call", {"name": "sleep", "arguments": {"seconds": 0.5}}, timeout_s=5),
+                transport.request("tools/call", {"name": "sleep", "arguments": {"seconds": 0.5}}, timeout_s=5),
+            )
+
+        started = time.perf_counter()
+        replies = McpEventLoop.run(both())
+
+        assert time.perf_counter() - started < 0.9
+        assert [r["result"]["content"] for r in replies] == ["sleep", "sleep"]
+
+    def test_notifications_are_delivered_separately(self, transport):
+        seen = []
+        transport.add_notification_handler(lambda server, message: seen.append((server, message["method"])))
+
+        _call(transport, "echo")
+        deadline = time.time() + 2
+        while not seen and time.time() < deadline:
+            time.sleep(0.01)
+
+        assert ("fake", "notifications/progress") in seen
+        assert transport.notifications[-1]["method"] == "notifications/progress"
+
+
+class TestFailures:
+    """Test timeouts and server exits."""
+
+    def test_timeout_cancels_on_server(self, transport):
+        with pytest.raises(McpStdioTransport.CallTimeout):
+            _call(transport, "hang", timeout_s=0.2)
+
+        deadline = time.time() + 2
+        while time.time() < deadline:
+            if any(n["method"] == "test/saw_cancel" for n in transport.notifications):
+                break
+            time.sleep(0.01)
+        cancels = [n for n in transport.notifications if n["method"] == "test/saw_cancel"]
+        assert cancels and cancels[0]["params"]["reason"].startswith("timed out")
+        assert transport.in_flight == 0
+
+    def test_server_exit_fails_pending_calls(self, transport):
+        with pytest.raises(McpStdioTransport.ServerExited):
+            _call(transport, "exit")
+        with pytest.raises(McpStdioTransport.ServerExited):
+            _call(transport, "echo")
+
+
+class TestLargeReplies:
+    """Test chunked reads and the message size limit."""
+
+    def test_reply_beyond_the_stream_buffer(self, transport):
+        reply = _call(transport, "big", size=3 * 1024 * 1024)
+
+        assert len(reply["result"]["args"]["data"]) == 3 * 1024 * 1024
+
+    def test_oversized_reply_fails_its_call(self, transport):
+        transport.max_message_bytes = 2 * 1024 * 1024
+
+        with pytest.raises(McpStdioTransport.ResponseTooLarge):
+            _call(transport, "big", size=3 * 1024 * 1024)
+        assert _call(transport, "echo")["result"]["content"] == "echo"  # the stream is still in sync
+
+
+class TestStderr:
+    """Test stderr draining and capture."""
+
+    def test_chatty_stderr_does_not_block_calls(self, transport):
+        reply = _call(transport, "chatty", lines=5000)
+
+        assert reply["result"]["content"] == "chatty"
+        deadline = time.time() + 2
+        while transport.stderr.total_lines < 5000 and time.time() < deadline:
+            time.sleep(0.01)
+        assert transport.stderr.total_lines == 5000
+        assert transport.stderr.tail().endswith("noise 4999 " + "x" * 100)
+
+    def test_buffer_keeps_only_the_last_bytes(self):
+        capture = StderrCapture("fake", limit_bytes=100, forward=lambda server, line: None)
+
+        for i in range(50):
+            capture.add(f"line {i:02d}")
+
+        assert capture.tail().endswith("line 49")
+        assert len(capture.tail()) <= 100
+        assert "line 00" not in capture.tail()
+
+    def test_forwarding_is_rate_limited(self):
+        forwarded = []
+        capture = StderrCapture("fake", lines_per_second=5, forward=lambda server, line: forwarded.append(line))
+
+        for i in range(100):
+            capture.add(f"line {i}")
+
+        assert forwarded == [f"line {i}" for i in range(5)]
+        assert capture.suppressed == 95
+
+        capture._last_refill -= 1  # a second later
+        capture.add("after pause")
+        assert forwarded[-2:] == ["... 95 stderr line(s) not logged (rate limit)", "after pause"]
@@ -21,11 +21,13 @@ class TestModelManagerIntegration(unittest.TestCase):
         """Reset singleton instance before each test"""
         ModelManager.instance = None
         ModelManager.current_model = None
+        ModelManager._registry.clear()
 
     def tearDown(self):
         """Clean up after each test"""
         ModelManager.instance = None
         ModelManager.current_model = None
+        ModelManager._registry.clear()
 
     @patch("subprocess.Popen")
     @patch.object(ModelManager, "invoke")
@@ -103,7 +105,7 @@ class TestModelManagerIntegration(unittest.TestCase):
 
     @patch("subprocess.Popen")
     def test_multiple_instances_same_functionality(self, mock_popen):
-        """Test that multiple instance references work identically"""
+        """Test that clients for different models share the class-level state"""
         mock_process = MagicMock()
         mock_process.stdout.read.return_value.decode.return_value = ""
         mock_popen.return_value = mock_process
@@ -111,8 +113,9 @@ class TestModelManagerIntegration(unittest.TestCase):
         manager1 = ModelManager(model=settings.DEFAULT_MODEL)
         manager2 = ModelManager(model=settings.CYPHER_MODEL)
 
-        # Both should be the same instance
-        self.assertIs(manager1, manager2)
+        # Each configuration gets its own pooled client
+        self.assertIsNot(manager1, manager2)
+        self.assertIs(ModelManager(model=settings.DEFAULT_MODEL), manager1)
 
         # Both should have access to the same class variables
         self.assertEqual(manager1.current_model, manager2.current_model)
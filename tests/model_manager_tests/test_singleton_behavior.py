@@ -20,11 +20,13 @@ class TestModelManagerSingleton(unittest.TestCase):
         """Reset singleton instance before each test"""
         ModelManager.instance = None
         ModelManager.current_model = None
+        ModelManager._registry.clear()
 
     def tearDown(self):
         """Clean up after each test"""
         ModelManager.instance = None
         ModelManager.current_model = None
+        ModelManager._registry.clear()
 
     @patch("subprocess.Popen")
     def test_singleton_instance_creation(self, mock_popen):
@@ -45,8 +47,8 @@ class TestModelManagerSingleton(unittest.TestCase):
         self.assertEqual(id(manager1), id(manager2))
 
     @patch("subprocess.Popen")
-    def test_singleton_across_different_parameters(self, mock_popen):
-        """Test singleton behavior with different initialization parameters"""
+    def test_separate_clients_for_different_parameters(self, mock_popen):
+        """Different configurations get their own pooled client (parameters are honoured)"""
         mock_process = MagicMock()
         mock_process.stdout.read.return_value.decode.return_value = ""
         mock_popen.return_value = mock_process
@@ -54,7 +56,8 @@ class TestModelManagerSingleton(unittest.TestCase):
         manager1 = ModelManager(model=settings.DEFAULT_MODEL)
         manager2 = ModelManager(model=settings.CYPHER_MODEL)
 
-        self.assertIs(manager1, manager2)
+        self.assertIsNot(manager1, manager2)
+        self.assertIs(ModelManager.instance, manager1)
 
     @patch("subprocess.Popen")
     def test_thread_safety_basic(self, mock_popen):
@@ -22,11 +22,13 @@ class TestModelManagerThreadSafety(unittest.TestCase):
         """Reset singleton instance before each test"""
         ModelManager.instance = None
         ModelManager.current_model = None
+        ModelManager._registry.clear()
 
     def tearDown(self):
         """Clean up after each test"""
         ModelManager.instance = None
         ModelManager.current_model = None
+        ModelManager._registry.clear()
 
     @patch("subprocess.Popen")
     def test_concurrent_instance_creation(self, mock_popen):
@@ -21,6 +21,7 @@ from unittest.mock import Mock, patch
 
 # Add project root to path
 
+from src.utils.endpoint_guard import EndpointGuard
 from src.utils.open_ai_integration import OpenAIIntegration
 import openai
 
@@ -141,9 +142,7 @@ class APIErrorTestSuite:
 
         try:
             # Reset circuit breaker state
-            OpenAIIntegration._failure_count = 0
-            OpenAIIntegration._circuit_open = False
-            OpenAIIntegration._circuit_open_until = None
+            EndpointGuard.reset()
 
             integration = OpenAIIntegration()
 
@@ -166,11 +165,12 @@ class APIErrorTestSuite:
                         pass
 
                 # Check if circuit breaker is open
-                if OpenAIIntegration._circuit_open:
+                breaker = integration._guard().breaker
+                if breaker.state == breaker.OPEN:
                     self.log_test(
                         "Circuit Breaker",
                         "PASS",
-                        f"Circuit opened after {OpenAIIntegration._failure_count} failures",
+                        f"Circuit opened after {breaker.failure_count} failures",
                     )
                     return True
                 else:
@@ -227,9 +227,7 @@ class APIErrorTestSuite:
 
         try:
             # Reset circuit breaker
-            OpenAIIntegration._failure_count = 0
-            OpenAIIntegration._circuit_open = False
-            OpenAIIntegration._circuit_open_until = None
+            EndpointGuard.reset()
 
             integration = OpenAIIntegration()
 
@@ -0,0 +1,117 @@
+"""
+Unit tests for the record/replay Cassette.
+
+Tests:
+- Recording calls into a gzipped cassette and replaying them without the live call
+- Exact-digest matching with in-order fallback by label, strict misses
+- Original vs zero replay latency and the async variant
+"""
+import asyncio
+import time
+
+import pytest
+from unittest.mock import patch
+
+from src.utils.cassette import LLM, TOOL, Cassette, CassetteFile
+
+
+def _record(path, calls):
+    with Cassette.record(path, meta={"initial_state": {"original_goal": "goal"}}):
+        for kind, label, request, result in calls:
+            Cassette.through(kind, label, request, lambda result=result: result, encode=list if kind == TOOL else str)
+
+
+class TestRecord:
+    """Test recording."""
+
+    def test_inactive_cassette_runs_live_call(self):
+        assert not Cassette.active()
+        assert Cassette.through(LLM, "site", {"a": 1}, lambda: "live") == "live"
+
+    def test_record_writes_entries_and_meta(self, tmp_path):
+        path = tmp_path / "run.cassette.json.gz"
+        _record(path, [(LLM, "planner", {"m": 1}, "plan"), (TOOL, "shell", {"cmd": "ls"}, (True, "out"))])
+
+        cassette = CassetteFile.load(path)
+        assert cassette.meta["initial_state"] == {"original_goal": "goal"}
+        assert [(e.kind, e.label, e.response) for e in cassette.entries] == [
+            (LLM, "planner", "plan"), (TOOL, "shell", [True, "out"])
+        ]
+        assert not Cassette.active()
+
+    def test_nested_cassettes_are_rejected(self, tmp_path):
+        with Cassette.record(tmp_path / "a.cassette.json.gz"):
+            with pytest.raises(Cassette.CassetteError):
+                with Cassette.record(tmp_path / "b.cassette.json.gz"):
+                    pass
+
+
+class TestReplay:
+    """Test replay matching and latency."""
+
+    def test_replay_serves_recorded_response(self, tmp_path):
+        path = tmp_path / "run.cassette.json.gz"
+        _record(path, [(TOOL, "shell", {"cmd": "ls"}, (True, "out"))])
+
+        def live():
+            raise AssertionError("live call during replay")
+
+        with Cassette.replay(path, latency="zero") as cassette:
+            result = Cassette.through(TOOL, "shell", {"cmd": "ls"}, live, decode=tuple)
+
+        assert result == (True, "out")
+        assert cassette.report()["served"] == 1
+        assert cassette.report()["fuzzy"] == 0
+
+    def test_changed_request_falls_back_to_label_order(self, tmp_path):
+        path = tmp_path / "run.cassette.json.gz"
+        _record(path, [(LLM, "planner", {"prompt": "at 10:00"}, "first"), (LLM, "planner", {"prompt": "at 10:01"}, "second")])
+
+        with Cassette.replay(path, latency="zero") as cassette, patch.object(Cassette, "_log_miss") as log_miss:
+            answers = [Cassette.through(LLM, "planner", {"prompt": f"at 11:0{i}"}, lambda: "live") for i in range(3)]
+
+        assert answers == ["first", "second", "live"]
+        log_miss.assert_called_once()
+        assert cassette.report() | {"path": None} == {
+            "path": None, "entries": 2, "llm_calls": 2, "tool_calls": 0,
+            "served": 2, "fuzzy": 2, "missed": 1, "unused": 0,
+        }
+
+    def test_strict_replay_raises_on_miss(self, tmp_path):
+        path = tmp_path / "run.cassette.json.gz"
+        _record(path, [])
+
+        with Cassette.replay(path, strict=True):
+            with pytest.raises(Cassette.CassetteMissError):
+                Cassette.through(LLM, "planner", {}, lambda: "live")
+
+    def test_original_latency_is_reproduced(self, tmp_path):
+        path = tmp_path / "run.cassette.json.gz"
+        with Cassette.record(path):
+            Cassette.through(LLM, "slow", {}, lambda: time.sleep(0.05) or "done")
+
+        started = time.perf_counter()
+        with Cassette.replay(path, latency="original"):
+            Cassette.through(LLM, "slow", {}, lambda: "live")
+        assert time.perf_counter() - started >= 0.04
+
+    def test_async_replay(self, tmp_path):
+        path = tmp_path / "run.cassette.json.gz"
+        _record(path, [(LLM, "chat", {"q": 1}, "hello")])
+
+        async def live():
+            return "live"
+
+        async def run():
+            with Cassette.replay(path, latency="zero"):
+                return await Cassette.through_async(LLM, "chat", {"q": 1}, live)
+
+        assert asyncio.run(run()) == "hello"
+
+    def test_invalid_latency_mode(self, tmp_path):
+        path = tmp_path / "run.cassette.json.gz"
+        _record(path, [])
+
+        with pytest.raises(Cassette.CassetteError):
+            with Cassette.replay(path, latency="fast"):
+                pass
@@ -0,0 +1,127 @@
+"""
+Unit tests for ContextWindow.
+
+Tests:
+- Verbatim window sized by the token budget, newest turn always kept
+- Incremental, cached rolling summary (folded in batches) and cache invalidation
+- Extractive fallback when the summarizer fails, cached tool catalogues
+"""
+from types import SimpleNamespace
+
+import pytest
+from unittest.mock import patch
+
+
+def _messages(count, size=40):
+    return [SimpleNamespace(type="human" if i % 2 == 0 else "ai", content=f"turn {i} " + "x" * size) for i in range(count)]
+
+
+@pytest.fixture
+def window():
+    from src.utils.context_window import ContextWindow
+
+    calls = []
+
+    def summarizer(previous, new_turns):
+        calls.append(list(new_turns))
+        return f"{previous} +{len(new_turns)}".strip()
+
+    ContextWindow.reset()
+    with patch("src.utils.context_window.settings") as settings, patch.object(ContextWindow, "summarizer", summarizer):
+        settings.CONTEXT_HISTORY_TOKENS = 60
+        settings.CONTEXT_SUMMARY_TOKENS = 100
+        yield ContextWindow, calls
+    ContextWindow.reset()
+
+
+class TestWindow:
+    """Test the verbatim window."""
+
+    def test_short_history_is_kept_verbatim(self, window):
+        context_window, calls = window
+
+        context = context_window.build(_messages(2))
+
+        assert context.summary == ""
+        assert context.recent == ["human: turn 0 " + "x" * 40, "ai: turn 1 " + "x" * 40]
+        assert calls == []
+
+    def test_empty_history_renders_placeholder(self, window):
+        context_window, _ = window
+
+        assert context_window.build([]).render() == "No previous messages in this conversation."
+
+    def test_oversized_newest_turn_is_truncated(self, window):
+        context_window, _ = window
+
+        context = context_window.build(_messages(1, size=1000))
+
+        assert context.recent[0].endswith("…[truncated]")
+        assert len(context.recent[0]) < 300
+
+
+class TestSummary:
+    """Test the rolling summary cache."""
+
+    def test_old_turns_are_folded_to_half_budget(self, window):
+        context_window, calls = window
+
+        context = context_window.build(_messages(8))
+
+        assert context.summarized_turns > 0
+        assert context.summary == f"+{context.summarized_turns}"
+        assert sum(len(turn) // 4 + 1 for turn in context.recent) <= 30
+        assert len(calls) == 1
+
+    def test_summary_is_reused_and_extended_incrementally(self, window):
+        context_window, calls = window
+        messages = _messages(8)
+
+        first = context_window.build(messages)
+        again = context_window.build(messages)
+        assert again.summary == first.summary
+        assert len(calls) == 1
+
+        grown = messages + _messages(4)
+        context_window.build(grown)
+        assert len(calls) == 2
+        # only turns not yet summarised are sent to the summarizer
+        assert calls[1][0] == f"human: {grown[first.summarized_turns].content}"
+
+    def test_rewritten_history_starts_new_summary(self, window):
+        context_window, calls = window
+        context_window.build(_messages(8))
+
+        context = context_window.build(_messages(8, size=41))
+
+        assert len(calls) == 2
+        assert context.summary == f"+{context.summarized_turns}"
+
+    def test_failed_summarizer_falls_back_to_extractive(self, window):
+        from src.utils.context_window import ContextWindow
+
+        context_window, _ = window
+
+        def broken(previous, new_turns):
+            raise RuntimeError("model down")
+
+        with patch.object(ContextWindow, "summarizer", broken), patch.object(ContextWindow, "_log_summary_failure") as log:
+            context = context_window.build(_messages(8))
+
+        assert context.summary.startswith("human: turn 0")
+        log.assert_called_once()
+
+
+class TestToolCatalogue:
+    """Test cached tool catalogues."""
+
+    def test_catalogue_is_cached_per_tool_set(self, window):
+        context_window, _ = window
+        tool = SimpleNamespace(name="search", description="web search")
+
+        first = context_window.tool_catalogue([tool])
+        tool.description = "changed"
+
+        assert first == "Tool: search\nDescription: web search"
+        assert context_window.tool_catalogue([tool]) is first
+        assert context_window.tool_catalogue([]) == "No tools available."
@@ -0,0 +1,237 @@
+"""
+Unit tests for EndpointGuard.
+
+Tests:
+- AIMD limit growth and shrinkage, deadline-bounded slot acquisition
+- Async slots: cancelled waiters do not leak a slot
+- Circuit breaker transitions including the single half-open probe
+- Error classification and jittered, deadline-capped backoff
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+from unittest.mock import patch
+
+
+@pytest.fixture
+def guard_cls():
+    from src.utils.endpoint_guard import EndpointGuard
+
+    EndpointGuard.reset()
+    yield EndpointGuard
+    EndpointGuard.reset()
+
+
+class _StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"Error code: {status_code}")
+        self.status_code = status_code
+
+
+class TestAdaptiveLimiter:
+    """Test the AIMD in-flight limit."""
+
+    def test_success_grows_limit_additively(self):
+        from src.utils.endpoint_guard import SUCCESS, AdaptiveLimiter
+
+        limiter = AdaptiveLimiter(initial_limit=2, max_limit=10)
+        for _ in range(4):
+            with limiter.slot() as slot:
+                slot.outcome = SUCCESS
+
+        assert 3 <= limiter.limit < 4
+
+    def test_overload_shrinks_limit_multiplicatively(self):
+        from src.utils.endpoint_guard import OVERLOAD, AdaptiveLimiter
+
+        limiter = AdaptiveLimiter(initial_limit=8, min_limit=1)
+        with limiter.slot() as slot:
+            slot.outcome = OVERLOAD
+
+        assert limiter.limit == 4
+        assert limiter.in_flight == 0
+
+    def test_limit_never_drops_below_minimum(self):
+        from src.utils.endpoint_guard import OVERLOAD, AdaptiveLimiter
+
+        limiter = AdaptiveLimiter(initial_limit=1, min_limit=1)
+        limiter.acquire()
+        limiter.release(OVERLOAD)
+
+        assert limiter.limit == 1
+
+    def test_exception_in_slot_releases_it(self):
+        from src.utils.endpoint_guard import AdaptiveLimiter
+
+        limiter = AdaptiveLimiter(initial_limit=1)
+        with pytest.raises(ValueError):
+            with limiter.slot():
+                raise ValueError("boom")
+
+        assert limiter.in_flight == 0
+        assert limiter.limit == 1
+
+    def test_full_limiter_honours_deadline(self, guard_cls):
+        from src.utils.endpoint_guard import AdaptiveLimiter
+
+        limiter = AdaptiveLimiter(initial_limit=1)
+        limiter.acquire()
+
+        with pytest.raises(guard_cls.DeadlineExceededError):
+            limiter.acquire(deadline=time.monotonic() + 0.05)
+
+    def test_waiter_gets_slot_when_released(self):
+        from src.utils.endpoint_guard import AdaptiveLimiter
+
+        limiter = AdaptiveLimiter(initial_limit=1)
+        limiter.acquire()
+        acquired = threading.Event()
+
+        def waiter():
+            limiter.acquire(deadline=time.monotonic() + 2)
+            acquired.set()
+
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        limiter.release()
+        thread.join(timeout=2)
+
+        assert acquired.is_set()
+
+    async def test_cancelled_async_waiter_does_not_leak_a_slot(self):
+        from src.utils.endpoint_guard import AdaptiveLimiter
+
+        limiter = AdaptiveLimiter(initial_limit=1, min_limit=1)
+        limiter.acquire()
+
+        async def waiter():
+            async with limiter.slot_async():
+                pass
+
+        task = asyncio.create_task(waiter())
+        await asyncio.sleep(0.02)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        limiter.release()
+
+        assert limiter.in_flight == 0
+        async with limiter.slot_async(deadline=time.monotonic() + 1):
+            assert limiter.in_flight == 1
+
+    async def test_async_waiter_honours_deadline(self, guard_cls):
+        from src.utils.endpoint_guard import AdaptiveLimiter
+
+        limiter = AdaptiveLimiter(initial_limit=1)
+        limiter.acquire()
+
+        with pytest.raises(guard_cls.DeadlineExceededError):
+            async with limiter.slot_async(deadline=time.monotonic() + 0.05):
+                pass
+        assert limiter.in_flight == 1
+
+
+class TestCircuitBreaker:
+    """Test breaker state transitions."""
+
+    def test_opens_after_max_failures(self):
+        from src.utils.endpoint_guard import CircuitBreaker
+
+        breaker = CircuitBreaker(max_failures=3, open_timeout=60)
+        opened = [breaker.record_failure() for _ in range(3)]
+
+        assert opened == [False, False, True]
+        assert breaker.allow_request() is False
+
+    def test_half_open_allows_single_probe(self):
+        from src.utils.endpoint_guard import CircuitBreaker
+
+        breaker = CircuitBreaker(max_failures=1, open_timeout=0)
+        breaker.record_failure()
+
+        assert breaker.allow_request() is True
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow_request() is False
+
+    def test_probe_success_closes(self):
+        from src.utils.endpoint_guard import CircuitBreaker
+
+        breaker = CircuitBreaker(max_failures=1, open_timeout=0)
+        breaker.record_failure()
+        breaker.allow_request()
+
+        assert breaker.record_success() is True
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.allow_request() is True
+
+    def test_probe_failure_reopens(self):
+        from src.utils.endpoint_guard import CircuitBreaker
+
+        breaker = CircuitBreaker(max_failures=5, open_timeout=60)
+        breaker.state, breaker.open_until = CircuitBreaker.OPEN, time.monotonic() - 1
+        breaker.allow_request()
+
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.allow_request() is False
+
+    def test_released_probe_can_be_retried(self):
+        from src.utils.endpoint_guard import CircuitBreaker
+
+        breaker = CircuitBreaker(max_failures=1, open_timeout=0)
+        breaker.record_failure()
+        breaker.allow_request()
+        breaker.release_probe()
+
+        assert breaker.allow_request() is True
+
+
+class TestEndpointGuard:
+    """Test the per-endpoint registry, classification and backoff."""
+
+    def test_guards_are_per_endpoint_and_model(self, guard_cls):
+        first = guard_cls.for_endpoint("https://a/v1", "big")
+
+        assert guard_cls.for_endpoint("https://a/v1", "big") is first
+        assert guard_cls.for_endpoint("https://a/v1", "small") is not first
+
+    def test_failures_of_one_model_do_not_trip_another(self, guard_cls):
+        from src.utils.endpoint_guard import OVERLOAD
+
+        big = guard_cls.for_endpoint("https://a/v1", "big")
+        small = guard_cls.for_endpoint("https://a/v1", "small")
+        with patch.object(guard_cls, "_log"):
+            for _ in range(big.breaker.max_failures):
+                big.record(OVERLOAD)
+
+        assert big.breaker.allow_request() is False
+        assert small.breaker.allow_request() is True
+
+    @pytest.mark.parametrize(
+        "error, expected",
+        [
+            (_StatusError(429), "overload"),
+            (_StatusError(502), "overload"),
+            (_StatusError(400), "failure"),
+            (TimeoutError(), "overload"),
+            (ValueError("bad"), "failure"),
+        ],
+    )
+    def test_classify(self, guard_cls, error, expected):
+        assert guard_cls.classify(error) == expected
+
+    def test_backoff_is_jittered_and_capped(self, guard_cls):
+        from src.config import settings
+
+        delays = [guard_cls.backoff_delay(10) for _ in range(50)]
+
+        assert all(0 <= delay <= settings.LLM_RETRY_MAX_DELAY for delay in delays)
+        assert len(set(delays)) > 1
+
+    def test_backoff_respects_deadline(self, guard_cls):
+        assert guard_cls.backoff_delay(10, deadline=time.monotonic() + 0.01) <= 0.01
+        with pytest.raises(guard_cls.DeadlineExceededError):
+            guard_cls.backoff_delay(1, deadline=time.monotonic() - 1)
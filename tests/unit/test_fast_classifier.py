@@ -0,0 +1,97 @@
+"""
+Unit tests for the local fast-path message classifier.
+
+Tests:
+- Keyword rules for explicit overrides
+- The hashed logistic model trained on the seed set, confidence thresholding
+- Accuracy on the held-out evaluation set
+"""
+from pathlib import Path
+
+import pytest
+from unittest.mock import patch
+
+EVAL_PATH = Path(__file__).resolve().parents[2] / "benchmarks" / "data" / "classifier_eval.jsonl"
+
+
+@pytest.fixture
+def classifier():
+    from src.utils.fast_classifier import FastClassifier
+
+    with patch("src.utils.fast_classifier.settings") as settings:
+        settings.FAST_CLASSIFIER_THRESHOLD = 0.8
+        settings.FAST_CLASSIFIER_ONNX_PATH = ""
+        settings.FAST_CLASSIFIER_ENABLED = True
+        FastClassifier.reset()
+        yield FastClassifier
+    FastClassifier.reset()
+
+
+class TestRules:
+    """Test keyword rules."""
+
+    @pytest.mark.parametrize(
+        "text, label",
+        [
+            ("agent mode: clean up my downloads", "agent"),
+            ("please use the llm for this one", "llm"),
+            ("rag search the onboarding guide", "tool"),
+            ("translate good night to french", "tool"),
+            ("hello!", "llm"),
+            ("explain that again", "llm"),
+            ("what time is it", "tool"),
+            ("what's the weather in lisbon", "tool"),
+        ],
+    )
+    def test_rule_matches(self, classifier, text, label):
+        result = classifier.classify(text)
+
+        assert (result.label, result.source) == (label, "rule")
+        assert result.confident
+
+    def test_translate_rule_skips_chained_requests(self, classifier):
+        result = classifier.classify("translate the readme and then commit it")
+
+        assert result.source == "model"
+
+    @pytest.mark.parametrize(
+        "text, expected",
+        [("ok run it", True), ("do that again", True), ("search the web for python 3.13 release notes", False)],
+    )
+    def test_follow_up_detection(self, text, expected):
+        from src.utils.fast_classifier import is_follow_up
+
+        assert is_follow_up(text) is expected
+
+
+class TestModel:
+    """Test the trained model and thresholds."""
+
+    def test_model_is_trained_once(self, classifier):
+        assert classifier.model() is classifier.model()
+
+    def test_features_are_stable(self):
+        from src.utils.fast_classifier import features
+
+        assert features("Search the web") == features("search the web")
+
+    def test_threshold_controls_fallback(self, classifier):
+        text = "what is the latest version of django"
+
+        low = classifier.classify(text, threshold=0.0)
+        high = classifier.classify(text, threshold=1.01)
+
+        assert low.source == "model" and low.confident
+        assert not high.confident
+        assert classifier.report() == {"local": 1, "fallback": 1, "local_rate": 0.5}
+
+    def test_held_out_accuracy(self, classifier):
+        from src.utils.fast_classifier import load_examples
+
+        examples = load_examples(EVAL_PATH)
+        results = [(classifier.classify(text), label) for text, label in examples]
+        covered = [(r, label) for r, label in results if r.confident]
+
+        assert sum(r.label == label for r, label in results) / len(results) >= 0.85
+        assert sum(r.label == label for r, label in covered) / len(covered) >= 0.95
+        assert len(covered) / len(results) >= 0.6
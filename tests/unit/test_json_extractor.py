@@ -0,0 +1,184 @@
+"""
+Unit tests for the single-pass JSON extractor.
+
+Tests:
+- Direct parsing and extraction from prose / markdown
+- String-aware brace matching
+- Schema hints
+- Repair mode (trailing commas, single quotes, truncated tails)
+- Incremental extraction of a string field from a stream
+- Incremental extraction of array elements from a stream
+"""
+import pytest
+
+import json
+
+from src.utils.json_extractor import StreamingArrayExtractor, StreamingFieldExtractor, extract_json, repair_json
+
+
+class TestJsonExtraction:
+    """Test candidate discovery."""
+
+    def test_direct_json(self):
+        """Clean JSON should take the direct path."""
+        result = extract_json('{"message_type": "llm"}')
+        assert result.value == {"message_type": "llm"}
+        assert result.method == "direct"
+
+    def test_markdown_block_with_prose(self):
+        """JSON inside a fenced block surrounded by prose should be found."""
+        text = 'Sure:\n```json\n{"message_type": "tool"}\n```\nDone.'
+        assert extract_json(text).value == {"message_type": "tool"}
+
+    def test_braces_inside_strings_are_ignored(self):
+        """Braces in string values must not break balancing."""
+        text = 'Result: {"reasoning": "use {name} and }", "ok": true} trailing'
+        assert extract_json(text).value == {"reasoning": "use {name} and }", "ok": True}
+
+    def test_objects_preferred_over_arrays(self):
+        """Without a hint the first object wins over an earlier array."""
+        assert extract_json('list [1, 2] then {"a": 1}').value == {"a": 1}
+
+    def test_array_returned_when_no_object(self):
+        """A lone array in prose should still be returned."""
+        assert extract_json('the tools are ["read_file", "write_file"].').value == ["read_file", "write_file"]
+
+    def test_schema_hint_skips_non_matching_objects(self):
+        """Required keys should select the right candidate."""
+        text = 'Tool echo {"results": []} and my answer {"goal_achieved": true}'
+        assert extract_json(text, schema_hint={"goal_achieved"}).value == {"goal_achieved": True}
+
+    def test_no_json_returns_none(self):
+        """Plain prose yields no result."""
+        assert extract_json("nothing to see {here}") is None
+
+
+class TestJsonRepair:
+    """Test repair mode."""
+
+    def test_trailing_commas(self):
+        """Trailing commas should be removed."""
+        result = extract_json('{"a": [1, 2,], "b": 3,}')
+        assert result.value == {"a": [1, 2], "b": 3}
+        assert result.method == "repair"
+
+    def test_single_quotes_and_python_literals(self):
+        """Python-style dicts should be converted."""
+        assert extract_json("{'a': 'it\\'s', 'b': True, 'c': None}").value == {"a": "it's", "b": True, "c": None}
+
+    def test_truncated_tail(self):
+        """A response cut off mid-string should be closed."""
+        result = extract_json('{"tasks": [{"id": 1, "description": "read the fi')
+        assert result.value == {"tasks": [{"id": 1, "description": "read the fi"}]}
+        assert result.method == "truncated_repair"
+
+    def test_truncated_dangling_key(self):
+        """A key without a value should be dropped."""
+        assert extract_json('{"a": 1, "b"').value == {"a": 1}
+
+    def test_repair_disabled(self):
+        """With repair=False broken JSON is not fixed."""
+        assert extract_json('{"a": 1,}', repair=False) is None
+
+    def test_repair_leaves_double_quoted_strings_untouched(self):
+        """Content of valid strings must survive repair unchanged."""
+        assert repair_json('{"text": "True, None,]"}') == '{"text": "True, None,]"}'
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
+
+
+def _feed_in_chunks(text, size, field="response"):
+    extractor = StreamingFieldExtractor(field)
+    out = "".join(extractor.feed(text[i:i + size]) for i in range(0, len(text), size))
+    return extractor, out
+
+
+class TestStreamingFieldExtractor:
+    """Test incremental string-field extraction."""
+
+    @pytest.mark.parametrize("size", [1, 2, 3, 7, 1000])
+    def test_any_chunking_yields_the_decoded_value(self, size):
+        """Escapes, \\uXXXX sequences and surrogate pairs may be split across chunks."""
+        value = 'Hi "there"\n\tcafé 😀 \\ done'
+        text = json.dumps({"response": value})
+
+        extractor, out = _feed_in_chunks(text, size)
+
+        assert out == value
+        assert extractor.complete
+
+    def test_nested_key_with_same_name_is_ignored(self):
+        """Only the top-level field is extracted."""
+        text = '{"meta": {"response": "no"}, "note": "response", "response": "yes"}'
+
+        extractor, out = _feed_in_chunks(text, 4)
+
+        assert out == "yes"
+
+    def test_prose_before_object_is_skipped(self):
+        """Text before the first brace is ignored."""
+        extractor, out = _feed_in_chunks('Sure! {"response": "ok"}', 3)
+
+        assert out == "ok"
+
+    @pytest.mark.parametrize("size", [1, 5, 1000])
+    def test_braces_in_prose_are_skipped(self, size):
+        """Only a brace that opens a JSON object (then a quoted key) starts extraction."""
+        extractor, out = _feed_in_chunks('Use {x} or { y }, then:\n```json\n{\n  "response": "ok"}', size)
+
+        assert out == "ok"
+        assert extractor.complete
+
+    def test_unpaired_surrogates_become_replacement_characters(self):
+        """Lone high or low surrogate escapes decode to U+FFFD."""
+        extractor, out = _feed_in_chunks('{"response": "a\\udc00b\\ud83dc"}', 2)
+
+        assert out == "a\ufffdb\ufffdc"
+
+    def test_partial_value_before_stream_ends(self):
+        """Text is available before the closing quote arrives."""
+        extractor = StreamingFieldExtractor("response")
+
+        assert extractor.feed('{"response": "Hel') == "Hel"
+        assert extractor.started and not extractor.complete
+        assert extractor.feed('lo"}') == "lo"
+        assert extractor.value == "Hello"
+
+    def test_missing_field_yields_nothing(self):
+        """A stream without the field produces no text."""
+        extractor, out = _feed_in_chunks('{"answer": "x"}', 2)
+
+        assert out == ""
+        assert not extractor.started
+
+
+class TestStreamingArrayExtractor:
+    """Test incremental array element extraction."""
+
+    @pytest.mark.parametrize("size", [1, 4, 1000])
+    def test_elements_are_yielded_as_they_close(self, size):
+        """Brackets, commas and escaped quotes inside strings do not split elements."""
+        text = 'Plan:\n[{"a": "x]},\\"", "b": [1, 2]}, 3, "s,t", {"c": True,}]'
+        extractor = StreamingArrayExtractor()
+
+        elements = [e for i in range(0, len(text), size) for e in extractor.feed(text[i:i + size])]
+
+        assert elements == [{"a": 'x]},"', "b": [1, 2]}, 3, "s,t", {"c": True}]
+        assert extractor.complete
+
+    def test_object_is_yielded_before_the_next_separator(self):
+        """An object is available as soon as its closing brace arrives."""
+        extractor = StreamingArrayExtractor()
+
+        assert extractor.feed('[{"a": 1') == []
+        assert extractor.feed("}") == [{"a": 1}]
+        assert not extractor.complete
+
+    def test_undecodable_element_is_skipped(self):
+        """An element that cannot be repaired is counted and skipped."""
+        extractor = StreamingArrayExtractor()
+
+        assert extractor.feed('[{"a" }, {"b": 2}]') == [{"b": 2}]
+        assert extractor.skipped == 1
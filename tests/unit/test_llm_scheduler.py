@@ -0,0 +1,200 @@
+"""
+Unit tests for LLMScheduler.
+
+Tests:
+- Grants within the per-minute budget and the background reserve
+- Priority ordering of queued requests
+- Context-scoped priority classes, deadlines and per-class statistics
+- Async waiters: cancellation and deadlines leave no ticket or grant behind
+"""
+import threading
+import time
+
+import pytest
+from unittest.mock import patch
+
+
+@pytest.fixture
+def scheduler():
+    from src.utils.llm_scheduler import LLMScheduler
+
+    LLMScheduler.reset()
+    with patch("src.utils.llm_scheduler.settings") as settings:
+        settings.LLM_RATE_LIMIT_PER_MINUTE = 3
+        settings.LLM_INTERACTIVE_RESERVE = 1
+        yield LLMScheduler
+    LLMScheduler.reset()
+
+
+def _fill_window(scheduler, count):
+    now = time.monotonic()
+    with scheduler._condition:
+        scheduler._grants.extend([now] * count)
+
+
+class TestBudget:
+    """Test the shared per-minute budget."""
+
+    def test_grants_immediately_within_budget(self, scheduler):
+        from src.utils.llm_scheduler import Priority
+
+        waits = [scheduler.acquire(Priority.AGENT) for _ in range(3)]
+
+        assert all(wait < 0.1 for wait in waits)
+        assert scheduler.window_usage() == 3
+
+    def test_background_leaves_interactive_reserve(self, scheduler):
+        from src.utils.endpoint_guard import EndpointGuard
+        from src.utils.llm_scheduler import Priority
+
+        _fill_window(scheduler, 2)
+
+        with pytest.raises(EndpointGuard.DeadlineExceededError):
+            scheduler.acquire(Priority.BACKGROUND, deadline=time.monotonic() + 0.05)
+        assert scheduler.acquire(Priority.INTERACTIVE) < 0.1
+
+    def test_expired_grants_free_budget(self, scheduler):
+        from src.utils.llm_scheduler import Priority
+
+        with scheduler._condition:
+            scheduler._grants.extend([time.monotonic() - scheduler.WINDOW_SECONDS - 1] * 3)
+
+        assert scheduler.acquire(Priority.AGENT) < 0.1
+        assert scheduler.window_usage() == 1
+
+
+class TestPriorityOrdering:
+    """Test that queued requests are served by priority class."""
+
+    def test_interactive_overtakes_queued_background(self, scheduler):
+        from src.utils.llm_scheduler import Priority
+
+        _fill_window(scheduler, 3)
+        order = []
+
+        def request(priority):
+            scheduler.acquire(priority, deadline=time.monotonic() + 5)
+            order.append(priority)
+
+        background = threading.Thread(target=request, args=(Priority.BACKGROUND,))
+        background.start()
+        time.sleep(0.05)
+        interactive = threading.Thread(target=request, args=(Priority.INTERACTIVE,))
+        interactive.start()
+        time.sleep(0.05)
+
+        # free the whole window at once; the interactive request must be granted first
+        with scheduler._condition:
+            scheduler._grants.clear()
+            scheduler._condition.notify_all()
+        interactive.join(timeout=2)
+        background.join(timeout=2)
+
+        assert order == [Priority.INTERACTIVE, Priority.BACKGROUND]
+
+    def test_abandoned_request_leaves_queue(self, scheduler):
+        from src.utils.endpoint_guard import EndpointGuard
+        from src.utils.llm_scheduler import Priority
+
+        _fill_window(scheduler, 3)
+        with pytest.raises(EndpointGuard.DeadlineExceededError):
+            scheduler.acquire(Priority.AGENT, deadline=time.monotonic() + 0.02)
+
+        assert scheduler._waiting == []
+        assert scheduler.report()["agent"]["queued"] == 0
+
+
+class TestPriorityContext:
+    """Test context-scoped priority classes and statistics."""
+
+    def test_default_priority_is_agent(self, scheduler):
+        from src.utils.llm_scheduler import Priority
+
+        assert scheduler.current_priority() == Priority.AGENT
+
+    def test_priority_context_applies_to_acquire(self, scheduler):
+        from src.utils.llm_scheduler import Priority
+
+        with scheduler.priority(Priority.BACKGROUND):
+            scheduler.acquire()
+
+        report = scheduler.report()
+        assert report["background"]["granted"] == 1
+        assert report["agent"]["granted"] == 0
+        assert scheduler.current_priority() == Priority.AGENT
+
+    def test_async_acquire_uses_context_priority(self, scheduler):
+        import asyncio
+
+        from src.utils.llm_scheduler import Priority
+
+        async def run():
+            with scheduler.priority(Priority.INTERACTIVE):
+                return await scheduler.acquire_async()
+
+        asyncio.run(run())
+
+        assert scheduler.report()["interactive"]["granted"] == 1
+
+
+class TestAsyncAcquire:
+    """Test that async waiters wait on the event loop and can be abandoned safely."""
+
+    def test_cancelled_waiter_takes_no_grant(self, scheduler):
+        import asyncio
+
+        from src.utils.llm_scheduler import Priority
+
+        _fill_window(scheduler, 3)
+
+        async def run():
+            task = asyncio.create_task(scheduler.acquire_async(Priority.AGENT))
+            await asyncio.sleep(0.02)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(run())
+        with scheduler._condition:
+            scheduler._grants.clear()
+
+        assert scheduler._waiting == []
+        assert scheduler.report()["agent"]["queued"] == 0
+        assert scheduler.report()["agent"]["granted"] == 0
+
+    def test_async_waiter_honours_deadline(self, scheduler):
+        import asyncio
+
+        from src.utils.endpoint_guard import EndpointGuard
+        from src.utils.llm_scheduler import Priority
+
+        _fill_window(scheduler, 3)
+
+        with pytest.raises(EndpointGuard.DeadlineExceededError):
+            asyncio.run(scheduler.acquire_async(Priority.AGENT, deadline=time.monotonic() + 0.05))
+        assert scheduler._waiting == []
+
+    def test_async_waiters_keep_priority_order(self, scheduler):
+        import asyncio
+
+        from src.utils.llm_scheduler import Priority
+
+        _fill_window(scheduler, 3)
+        order = []
+
+        async def request(priority):
+            await scheduler.acquire_async(priority, deadline=time.monotonic() + 5)
+            order.append(priority)
+
+        async def run():
+            background = asyncio.create_task(request(Priority.BACKGROUND))
+            await asyncio.sleep(0.02)
+            interactive = asyncio.create_task(request(Priority.INTERACTIVE))
+            await asyncio.sleep(0.02)
+            with scheduler._condition:
+                scheduler._grants.clear()
+            await asyncio.gather(background, interactive)
+
+        asyncio.run(run())
+
+        assert order == [Priority.INTERACTIVE, Priority.BACKGROUND]
@@ -0,0 +1,116 @@
+"""
+Unit tests for LLMUsage.
+
+Tests:
+- Usage parsing for OpenAI usage objects and LangChain usage_metadata dicts
+- Node and workflow attribution through context variables
+- Summaries and JSON-lines export
+"""
+import json
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.fixture
+def usage():
+    from src.utils.llm_usage import LLMUsage
+
+    LLMUsage.reset_session()
+    yield LLMUsage
+    LLMUsage.reset_session()
+
+
+class TestUsageParsing:
+    """Test reading token counts from the different usage shapes."""
+
+    def test_openai_usage_object(self, usage):
+        raw = SimpleNamespace(
+            prompt_tokens=120,
+            completion_tokens=30,
+            total_tokens=150,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=64),
+        )
+        record = usage.record(model="m", latency_s=0.5, usage=raw, call_site="goal_validator")
+
+        assert (record.prompt_tokens, record.completion_tokens, record.total_tokens) == (120, 30, 150)
+        assert record.cached_tokens == 64
+        assert record.cache_hit is True
+
+    def test_langchain_usage_metadata(self, usage):
+        record = usage.record(model="llama", latency_s=0.1, usage={"input_tokens": 10, "output_tokens": 5})
+
+        assert (record.prompt_tokens, record.completion_tokens, record.total_tokens) == (10, 5, 15)
+        assert record.cache_hit is False
+
+    def test_missing_usage_records_latency_only(self, usage):
+        record = usage.record(model="m", latency_s=1.23456, stream=True)
+
+        assert record.total_tokens == 0
+        assert record.latency_s == 1.2346
+        assert record.stream is True
+
+
+class TestAttribution:
+    """Test node and workflow attribution."""
+
+    def test_calls_outside_nodes_are_unattributed(self, usage):
+        assert usage.record(model="m", latency_s=0).node == "unattributed"
+
+    def test_node_context_labels_calls(self, usage):
+        with usage.node("subAGENT_classifier"):
+            inner = usage.record(model="m", latency_s=0)
+        outer = usage.record(model="m", latency_s=0)
+
+        assert inner.node == "subAGENT_classifier"
+        assert outer.node == "unattributed"
+
+    def test_workflow_accumulator_is_scoped(self, usage):
+        usage.record(model="m", latency_s=0)
+        token = usage.start_workflow("agent_node")
+        with usage.node("subAGENT_finalizer"):
+            usage.record(model="m", latency_s=0.2, usage={"prompt_tokens": 7, "completion_tokens": 3})
+        accumulator = usage.end_workflow(token)
+
+        assert accumulator.label == "agent_node"
+        assert len(accumulator.records) == 1
+        assert accumulator.records[0].workflow == "agent_node"
+        assert usage.session_summary()["calls"] == 2
+
+
+class TestSummaryAndExport:
+    """Test summaries and JSON-lines export."""
+
+    def test_summary_breakdowns(self, usage):
+        with usage.node("planner"):
+            usage.record(model="big", latency_s=1.0, usage={"prompt_tokens": 100, "completion_tokens": 50})
+        with usage.node("classifier"):
+            usage.record(model="small", latency_s=0.1, usage={"prompt_tokens": 10, "completion_tokens": 2})
+            usage.record(model="small", latency_s=0.1, usage={"prompt_tokens": 10, "completion_tokens": 2})
+
+        summary = usage.session_summary()
+
+        assert summary["calls"] == 3
+        assert summary["total_tokens"] == 174
+        assert list(summary["by_node"]) == ["planner", "classifier"]
+        assert summary["by_model"]["small"]["calls"] == 2
+        assert summary["by_node"]["classifier"]["latency_s"] == 0.2
+
+    def test_export_jsonl_appends_records(self, usage, tmp_path):
+        token = usage.start_workflow("agent_node")
+        usage.record(model="m", latency_s=0.3, usage={"prompt_tokens": 1, "completion_tokens": 1})
+        accumulator = usage.end_workflow(token)
+
+        path = usage.export_jsonl(accumulator, tmp_path / "usage.jsonl")
+        usage.export_jsonl(accumulator, path)
+
+        lines = path.read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 2
+        assert json.loads(lines[0])["workflow"] == "agent_node"
+
+    def test_empty_workflow_is_not_exported(self, usage, tmp_path):
+        token = usage.start_workflow("agent_node")
+        accumulator = usage.end_workflow(token)
+
+        assert usage.export_jsonl(accumulator, tmp_path / "usage.jsonl") is None
+        assert usage.log_summary(accumulator) is None
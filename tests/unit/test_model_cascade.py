@@ -0,0 +1,125 @@
+"""
+Unit tests for ModelCascade.
+
+Tests:
+- Small-model answers accepted above the confidence threshold
+- Escalation on low confidence, validation failure and small-model errors
+- Per call-site statistics and bounded latency samples
+- Cascade disabled by default
+"""
+import json
+
+import pytest
+from unittest.mock import patch
+
+
+@pytest.fixture
+def cascade(message_classes):
+    from src.config import settings
+    from src.utils.model_cascade import ModelCascade
+
+    ModelCascade.reset_stats()
+    with patch.object(settings, "MODEL_CASCADE_ENABLED", True):
+        yield ModelCascade
+    ModelCascade.reset_stats()
+
+
+def _envelope(answer, confidence):
+    return json.dumps({"answer": answer, "confidence": confidence})
+
+
+def _small_model(**kwargs):
+    """Patch the small model's pooled API client (ModelManager.invoke)."""
+    return patch("src.utils.model_manager.ModelManager.invoke", **kwargs)
+
+
+def _small_reply(answer, confidence):
+    from langchain_core.messages import AIMessage
+
+    return AIMessage(content=_envelope(answer, confidence))
+
+
+class TestModelCascadeRouting:
+    """Test small-model acceptance and escalation."""
+
+    def test_confident_small_answer_is_accepted(self, cascade):
+        """A confident, valid small answer should skip the large model."""
+        escalate_calls = []
+        with _small_model(return_value=_small_reply({"message_type": "tool"}, 0.95)):
+            result = cascade.run(
+                "classify_message_type", "system", "user",
+                escalate=lambda: escalate_calls.append(1) or {"message_type": "llm"},
+            )
+
+        assert result == {"message_type": "tool"}
+        assert escalate_calls == []
+        assert cascade.report()["classify_message_type"]["small_accepted"] == 1
+
+    def test_low_confidence_escalates(self, cascade):
+        """A small answer below the threshold should fall back to the large model."""
+        with _small_model(return_value=_small_reply({"message_type": "tool"}, 0.2)):
+            result = cascade.run(
+                "classify_message_type", "system", "user",
+                escalate=lambda: {"message_type": "agent"},
+            )
+
+        assert result == {"message_type": "agent"}
+        stats = cascade.report()["classify_message_type"]
+        assert stats["escalations"] == 1
+        assert stats["escalation_rate"] == 1.0
+
+    def test_validator_failure_escalates(self, cascade):
+        """A confident answer with the wrong shape should still escalate."""
+        with _small_model(return_value=_small_reply({"message_type": "unknown"}, 0.99)):
+            result = cascade.run(
+                "classify_message_type", "system", "user",
+                escalate=lambda: {"message_type": "llm"},
+                validator=lambda r: r.get("message_type") in ("llm", "tool", "agent"),
+            )
+
+        assert result == {"message_type": "llm"}
+
+    def test_small_model_error_escalates(self, cascade):
+        """Errors from the small model should never reach the caller."""
+        with _small_model(side_effect=RuntimeError("endpoint down")):
+            result = cascade.run(
+                "goal_validator", "system", "user",
+                escalate=lambda: {"goal_achieved": True},
+            )
+
+        assert result == {"goal_achieved": True}
+
+    def test_unknown_call_site_uses_large_model(self, cascade):
+        """Call sites without a profile should go straight to the large model."""
+        with _small_model() as small:
+            result = cascade.run("not_profiled", "system", "user", escalate=lambda: [1])
+
+        assert result == [1]
+        small.assert_not_called()
+        assert cascade.report()["not_profiled"]["calls"] == 1
+
+    def test_disabled_cascade_uses_large_model(self, cascade):
+        """With the cascade switched off no small-model request is made."""
+        from src.config import settings
+
+        with patch.object(settings, "MODEL_CASCADE_ENABLED", False), \
+                _small_model() as small:
+            result = cascade.run("classify_message_type", "system", "user", escalate=lambda: {"message_type": "llm"})
+
+        assert result == {"message_type": "llm"}
+        small.assert_not_called()
+
+
+class TestCascadeStats:
+    """Test the per call-site statistics."""
+
+    def test_latency_samples_are_bounded(self):
+        from src.utils.model_cascade import LATENCY_SAMPLES, CascadeStats
+
+        stats = CascadeStats(large_calls=1, large_latency_total=2.0)
+        for _ in range(LATENCY_SAMPLES + 10):
+            stats.small_accepted += 1
+            stats.accepted_small_latencies.append(0.5)
+
+        assert len(stats.accepted_small_latencies) == LATENCY_SAMPLES
+        assert stats.estimated_latency_saved == pytest.approx(1.5 * (LATENCY_SAMPLES + 10))
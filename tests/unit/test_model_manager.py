@@ -64,5 +64,46 @@ class TestModelManagerInvoke:
         assert callable(model_manager.invoke)
 
 
+
+class TestModelManagerRegistry:
+    """Test per-configuration client registry."""
+
+    def test_same_configuration_returns_same_client(self):
+        """Identical configurations should share one pooled client."""
+        from src.utils.model_manager import ModelManager
+        from src.config import settings
+
+        first = ModelManager(model=settings.GPT_MODEL, temperature=0.3, max_tokens=1000)
+        second = ModelManager(model=settings.GPT_MODEL, temperature=0.3, max_tokens=1000)
+
+        assert first is second
+
+    def test_different_generation_params_get_separate_clients(self):
+        """Generation params must not be ignored after the first instance."""
+        from src.utils.model_manager import ModelManager
+        from src.config import settings
+
+        classifier = ModelManager(model=settings.GPT_MODEL, temperature=0.3, max_tokens=1000)
+        writer = ModelManager(model=settings.GPT_MODEL, temperature=0.7)
+
+        assert classifier is not writer
+        assert classifier.openai_chat is writer.openai_chat  # shared HTTP pool
+
+    def test_invoke_passes_generation_params(self, message_classes):
+        """invoke should forward the client's model, max_tokens and temperature."""
+        from src.utils.model_manager import ModelManager
+        from src.config import settings
+
+        llm = ModelManager(model=settings.GPT_MODEL, temperature=0.2, max_tokens=256, top_p=0.9)
+        with patch.object(llm.openai_chat, "generate_text", return_value="ok") as generate:
+            llm.invoke("hello")
+
+        kwargs = generate.call_args.kwargs
+        assert kwargs["model"] == settings.GPT_MODEL
+        assert kwargs["temperature"] == 0.2
+        assert kwargs["max_tokens"] == 256
+        assert kwargs["top_p"] == 0.9
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
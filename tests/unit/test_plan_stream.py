@@ -0,0 +1,164 @@
+"""
+Unit tests for PlanStream.
+
+Tests:
+- Tasks are handed out as soon as their array element closes, before the stream ends
+- Rejected elements, replanning, reconciliation against the full response and unusable responses
+- The class-level active plan collected by the task planner
+"""
+import json
+import threading
+
+import pytest
+from unittest.mock import patch
+
+from src.utils.plan_stream import PlanStream
+
+PLAN = [
+    {"description": "search docs", "tool_name": "search"},
+    {"description": "read file", "tool_name": "read_file"},
+    {"description": "summarize", "tool_name": "perform_synthesis"},
+]
+
+
+@pytest.fixture(autouse=True)
+def _reset():
+    PlanStream.clear()
+    with patch.object(PlanStream, "_log_report"):
+        yield
+    PlanStream.clear()
+
+
+def _accept_all(index, element):
+    return (index, element["description"])
+
+
+def _drain(plan):
+    tasks = []
+    while not plan.finished:
+        tasks += plan.wait(timeout=1)
+    return tasks + plan.take()
+
+
+def _gated_producer(chunks, gates):
+    """Yield chunks; before chunk i waits for gates[i] when given."""
+
+    def produce(plan):
+        for i, chunk in enumerate(chunks):
+            if i in gates:
+                gates[i].wait(1)
+            yield chunk
+
+    return produce
+
+
+class TestStreaming:
+    """Test incremental task hand-out."""
+
+    def test_first_task_is_ready_before_the_stream_ends(self):
+        text = json.dumps(PLAN)
+        split = text.index("}") + 1
+        gate = threading.Event()
+        plan = PlanStream(_accept_all).start(_gated_producer([text[:split], text[split:]], {1: gate}))
+
+        first = plan.wait(timeout=1)
+
+        assert first == [(0, "search docs")]
+        assert not plan.finished
+        gate.set()
+        assert _drain(plan) == [(1, "read file"), (2, "summarize")]
+
+    def test_rejected_elements_are_dropped(self):
+        def accept(index, element):
+            return None if element["tool_name"] == "read_file" else element["description"]
+
+        plan = PlanStream(accept).start(lambda p: [json.dumps(PLAN)])
+
+        assert _drain(plan) == ["search docs", "summarize"]
+        assert (plan.received, plan.accepted) == (3, 2)
+
+    def test_reconciliation_recovers_unparsed_elements(self):
+        # the second element is cut off: the stream ends inside it, the full-response repair closes it
+        text = json.dumps(PLAN[:1])[:-1] + ', {"description": "read file", "tool_name": "read_file"'
+        plan = PlanStream(_accept_all).start(lambda p: iter([text]))
+        tasks = _drain(plan)
+
+        assert tasks == [(0, "search docs"), (1, "read file")]
+        assert plan.reconciled == 1
+
+    def test_reconciliation_recovers_a_skipped_middle_element(self):
+        text = json.dumps(PLAN)
+        with patch("src.utils.plan_stream.StreamingArrayExtractor") as extractor:
+            # the incremental parser misses the second element but cuts out the third
+            extractor.return_value.feed.return_value = [PLAN[0], PLAN[2]]
+            plan = PlanStream(_accept_all).start(lambda p: [text])
+            tasks = _drain(plan)
+
+        assert tasks == [(0, "search docs"), (1, "summarize"), (2, "read file")]
+        assert (plan.received, plan.reconciled) == (3, 1)
+
+    def test_reconciliation_keeps_duplicate_elements(self):
+        plan = PlanStream(_accept_all).start(lambda p: [json.dumps([PLAN[0], PLAN[0]])])
+
+        assert _drain(plan) == [(0, "search docs"), (1, "search docs")]
+        assert plan.reconciled == 0
+
+    def test_replan_replaces_rejected_elements(self):
+        def accept(index, element):
+            return None if element["tool_name"] == "bad_tool" else (index, element["description"])
+
+        streamed = [PLAN[0], {"description": "broken step", "tool_name": "bad_tool"}]
+        plan = PlanStream(accept, lambda p: [PLAN[1]]).start(lambda p: [json.dumps(streamed)])
+
+        assert _drain(plan) == [(0, "search docs"), (2, "read file")]
+        assert (plan.replanned, plan.report()["replanned"]) == (1, 1)
+
+    def test_unusable_response_yields_no_tasks(self):
+        plan = PlanStream(_accept_all).start(lambda p: ["I cannot plan this."])
+
+        assert plan.wait(timeout=1) == []
+        assert plan.finished and plan.accepted == 0
+
+    def test_producer_error_finishes_the_plan(self):
+        def broken(plan):
+            yield '[{"description": "a", "tool_name": "x"}'
+            raise ConnectionError("stream dropped")
+
+        plan = PlanStream(_accept_all).start(broken)
+        tasks = _drain(plan)
+
+        assert tasks == [(0, "a")]
+        assert isinstance(plan.error, ConnectionError)
+
+
+class TestActivePlan:
+    """Test the plan collected by the task planner."""
+
+    def test_collect_waits_then_deactivates(self):
+        text = json.dumps(PLAN)
+        split = text.index("}") + 1
+        gate = threading.Event()
+        plan = PlanStream(_accept_all).start(_gated_producer([text[:split], text[split:]], {1: gate}))
+        plan.wait(timeout=1)
+        PlanStream.activate(plan)
+
+        assert PlanStream.collect() == []
+        assert PlanStream.is_streaming()
+        gate.set()
+        collected = []
+        while PlanStream.is_streaming():
+            collected += PlanStream.collect(wait=True, timeout=1)
+
+        assert collected == [(1, "read file"), (2, "summarize")]
+        assert PlanStream._active is None
+
+    def test_clear_cancels_the_active_plan(self):
+        gate = threading.Event()
+        plan = PlanStream(_accept_all).start(_gated_producer(["[", "]"], {1: gate}))
+        PlanStream.activate(plan)
+
+        PlanStream.clear()
+        gate.set()
+
+        assert plan.cancelled
+        assert not PlanStream.is_streaming()
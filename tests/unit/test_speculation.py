@@ -0,0 +1,167 @@
+"""
+Unit tests for SpeculativeChat.
+
+Tests:
+- Adopting a speculation for the same turn and the time-to-first-token saved
+- Cancelling on a non-llm route, stopping the producer and counting wasted tokens
+- Stale speculations, key mismatches and producer failures
+- The classifier and chatBot nodes cancel speculations nobody will adopt
+"""
+import threading
+import time
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from langchain_core.messages import HumanMessage
+
+
+@pytest.fixture
+def speculative():
+    from src.utils.speculation import SpeculativeChat
+
+    SpeculativeChat.reset()
+    with patch("src.utils.speculation.settings") as settings:
+        settings.SPECULATIVE_CHAT_ENABLED = True
+        yield SpeculativeChat
+    SpeculativeChat.reset()
+
+
+def _streaming_producer(chunks, delay=0.01, gate=None):
+    def produce(speculation):
+        speculation.prompt_tokens = 100
+        for chunk in chunks:
+            if gate is not None:
+                gate.wait(1)
+            if speculation.cancelled:
+                break
+            time.sleep(delay)
+            speculation.add_chunk(chunk)
+        return speculation.content
+
+    return produce
+
+
+class TestAdoption:
+    """Test adopting the speculative reply."""
+
+    def test_adopted_reply_is_returned(self, speculative):
+        speculative.start((1, "hi"), _streaming_producer(["Hel", "lo"]))
+        speculative.resolve((1, "hi"), adopt=True)
+
+        speculation = speculative.take((1, "hi"))
+
+        assert speculation.result(timeout=1) == "Hello"
+        report = speculative.report()
+        assert report["adopted"] == 1
+        assert report["wasted_completion_tokens"] == 0
+
+    def test_ttft_saved_is_bounded_by_head_start(self, speculative):
+        speculative.start((1, "hi"), _streaming_producer(["a"], delay=0.05))
+        time.sleep(0.02)  # classifier still running
+        speculation = speculative.take((1, "hi"))
+        speculation.result(timeout=1)
+
+        report = speculative.report()
+        assert 0.015 <= report["ttft_saved_s"] <= 0.05
+
+    def test_take_with_other_key_returns_none(self, speculative):
+        speculative.start((1, "hi"), _streaming_producer(["a"]))
+
+        assert speculative.take((2, "other")) is None
+
+
+class TestCancellation:
+    """Test cancelling speculative replies."""
+
+    def test_non_llm_route_cancels_and_counts_waste(self, speculative):
+        gate = threading.Event()
+        speculation = speculative.start((1, "search x"), _streaming_producer(["abcdefgh"] * 10, delay=0, gate=gate))
+        gate.set()
+        while not speculation.content:
+            time.sleep(0.001)
+
+        speculative.resolve((1, "search x"), adopt=False)
+        speculation.wait(1)
+
+        assert speculation.result() is None
+        assert speculative.take((1, "search x")) is None
+        report = speculative.report()
+        assert report["cancelled"] == 1
+        assert report["wasted_prompt_tokens"] == 100
+        assert 0 < report["wasted_completion_tokens"] <= 20
+
+    def test_new_turn_cancels_stale_speculation(self, speculative):
+        first = speculative.start((1, "a"), _streaming_producer(["x"] * 50))
+        speculative.start((2, "b"), _streaming_producer(["y"]))
+
+        assert first.wait(1)
+        assert first.cancelled
+        assert speculative.take((2, "b")) is not None
+
+    def test_failed_producer_yields_none(self, speculative):
+        def broken(speculation):
+            raise RuntimeError("endpoint down")
+
+        speculative.start((1, "hi"), broken)
+        speculation = speculative.take((1, "hi"))
+
+        assert speculation.result(timeout=1) is None
+        assert isinstance(speculation.error, RuntimeError)
+        assert speculative.report()["failed"] == 1
+
+
+class TestNodes:
+    """Test that the graph nodes cancel speculations they will not use."""
+
+    def test_classifier_error_cancels_the_speculation(self, speculative):
+        from src.agents import classify_agent
+        from src.agents.chat_llm import speculation_key
+
+        messages = [HumanMessage(content="hello there")]
+        started = []
+
+        def speculate(turn):
+            started.append(speculative.start(speculation_key(turn), _streaming_producer(["x"] * 100)))
+
+        with patch.object(classify_agent.settings, "FAST_CLASSIFIER_ENABLED", False), \
+                patch.object(classify_agent.settings, "console", MagicMock()), \
+                patch.object(classify_agent, "speculate_chat_response", side_effect=speculate), \
+                patch.object(classify_agent, "ModelManager"), \
+                patch.object(classify_agent.ToolAssign, "get_tools_list", return_value=[]), \
+                patch.object(classify_agent.ModelCascade, "run", side_effect=RuntimeError("router down")):
+            with pytest.raises(RuntimeError):
+                classify_agent.classify_message_type({"messages": messages})
+
+        assert started[0].wait(1)
+        assert started[0].cancelled
+        assert speculative.take(speculation_key(messages)) is None
+
+    @pytest.mark.parametrize("streaming_display", [True, False])
+    def test_chat_node_cancels_a_late_speculation_before_the_fallback(self, speculative, streaming_display):
+        from src.agents import chat_llm
+
+        messages = [HumanMessage(content="hello there")]
+        gate = threading.Event()  # the speculative reply never arrives before the deadline
+        speculation = speculative.start(chat_llm.speculation_key(messages), _streaming_producer(["late"], gate=gate))
+        cancelled_at_fallback = []
+
+        def fresh_stream(prompt, on_chunk=None):
+            cancelled_at_fallback.append(speculation.cancelled)
+            return '{"response": "fresh"}'
+
+        with patch.object(chat_llm.settings, "console", MagicMock()), \
+                patch.object(chat_llm.settings, "CHAT_STREAMING_DISPLAY", streaming_display), \
+                patch.object(chat_llm.settings, "LLM_CALL_DEADLINE", 0.05), \
+                patch.object(chat_llm, "StreamingMessageView"), \
+                patch.object(chat_llm, "print_message"), \
+                patch.object(chat_llm, "build_chat_prompt"), \
+                patch.object(chat_llm.SpeculativeChat, "log_report"), \
+                patch.object(chat_llm, "stream_chat_response", side_effect=fresh_stream):
+            result = chat_llm.generate_llm_response({"messages": messages})
+        gate.set()
+
+        assert cancelled_at_fallback == [True]
+        assert result["messages"][0].content == "fresh"
+        assert speculation.wait(1)
+        assert speculative.report()["cancelled"] == 1